@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Union
 
 from pydantic import BaseModel
 
@@ -8,6 +8,11 @@ class OpenIdConnnectClient(BaseModel):
     realm_name: str
     client_id: str
     client_secret: str
+    verify_token_signature_locally: bool = True
+    jwks_url: Union[None, str] = None
+    token_issuer: Union[None, str] = None
+    jwks_cache_ttl_in_seconds: int = 3600
+    jwks_request_timeout_in_seconds: int = 10
 
 
 class OpenIdConnnectAdmin(BaseModel):
@@ -28,6 +33,8 @@ class AuthConfiguration(BaseModel):
     one_time_token_expires_in_seconds: int = 300
     openid_connect_client: OpenIdConnnectClient
     active_authentication_service: Literal["standalone", "keycloak"] = "standalone"
+    validated_token_cache_max_entries: int = 10000
+    validated_token_cache_ttl_in_seconds: int = 60
 
 
 class MetabolightsServiceAccount(BaseModel):
@@ -16,6 +16,8 @@ class CeleryPeriodicTaskConfiguration(BaseModel):
     es_compound_sync_task_period_in_secs: int = 600
     es_study_sync_task_period_in_secs: int = 600
     worker_heath_check_period_in_seconds: int = 600
+    study_reindex_debounce_period_in_seconds: int = 30
+    study_reindex_drain_period_in_seconds: int = 10
 
 
 class CelerySettings(BaseModel):
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic import BaseModel
 
 
@@ -17,6 +19,9 @@ class ChebiPipelineSearchServices(BaseModel):
     classyfire_url: str = "http://classyfire.wishartlab.com"
     opsin_url: str = "https://www.ebi.ac.uk/opsin/ws/"
     chemspider_url: str = "http://parts.chemspider.com/JSON.ashx?op="
+    chemspider_inchikey_url: str = (
+        "http://www.chemspider.com/InChI.asmx/InChIKeyToCSID?inchi_key="
+    )
     chem_plus_url: str = (
         "https://chem.nlm.nih.gov/api/data/inchikey/equals/INCHI_KEY?data=summary"
     )
@@ -27,6 +32,41 @@ class ChebiPipelineSearchServices(BaseModel):
     )
 
 
+class CompoundLookupProviderSettings(BaseModel):
+    requests_per_second: float = 5
+    max_concurrency: int = 4
+    deadline_in_seconds: float = 60
+    ttl_in_seconds: int = 30 * 24 * 60 * 60
+    empty_result_ttl_in_seconds: int = 24 * 60 * 60
+
+
+def default_compound_lookup_providers() -> Dict[str, CompoundLookupProviderSettings]:
+    return {
+        # a PubChem search sends more than one request
+        "pubchem": CompoundLookupProviderSettings(
+            requests_per_second=2, max_concurrency=2
+        ),
+        "cactus": CompoundLookupProviderSettings(),
+        "opsin": CompoundLookupProviderSettings(requests_per_second=10),
+        "chemspider": CompoundLookupProviderSettings(),
+        "unichem": CompoundLookupProviderSettings(requests_per_second=10),
+        "dime": CompoundLookupProviderSettings(),
+        "classyfire": CompoundLookupProviderSettings(
+            requests_per_second=0.2, max_concurrency=1
+        ),
+    }
+
+
+class CompoundLookupSettings(BaseModel):
+    enabled: bool = True
+    # default is <server.temp_directory_path>/chebi_pipeline/compound_lookup_cache.sqlite
+    cache_file_path: str = ""
+    max_workers: int = 8
+    providers: Dict[str, CompoundLookupProviderSettings] = (
+        default_compound_lookup_providers()
+    )
+
+
 class ChebiPipelineConfiguration(BaseModel):
     chebi_annotation_sub_folder: str = "chebi_pipeline_annotations"
     run_standalone_chebi_pipeline_python_file: str = "app/ws/chebi_pipeline_utils.py"
@@ -39,6 +79,7 @@ class ChebiPipelineConfiguration(BaseModel):
     removed_hs_mol_count: int = 500
     classyfire_mapping: str
     search_services: ChebiPipelineSearchServices = ChebiPipelineSearchServices()
+    compound_lookup: CompoundLookupSettings = CompoundLookupSettings()
 
 
 class ChebiServiceSettings(BaseModel):
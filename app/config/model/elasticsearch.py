@@ -13,6 +13,9 @@ class ElasticsearchConfiguration(BaseModel):
     elasticsearch_all_mappings_json: str = "./resources/es_all_mappings.json"
     elasticsearch_study_mappings_json: str = "./resources/es_study_mappings.json"
     elasticsearch_compound_mappings_json: str = "./resources/es_compound_mappings.json"
+    bulk_chunk_size: int = 100
+    bulk_max_workers: int = 4
+    bulk_request_timeout: int = 300
 
 
 class ElasticsearchSettings(BaseModel):
@@ -11,5 +11,16 @@ class ApiConfiguration(BaseModel):
     validation_service_url: str
 
 
+class OntologySearchConfiguration(BaseModel):
+    ols_deadline_in_seconds: float = 5
+    zooma_deadline_in_seconds: float = 5
+    bioportal_deadline_in_seconds: float = 5
+    max_workers: int = 16
+    ontology_name_lookup_max_workers: int = 8
+    cache_ttl_in_seconds: int = 24 * 60 * 60
+    empty_result_cache_ttl_in_seconds: int = 10 * 60
+
+
 class ExternalDependenciesSettings(BaseModel):
     api: ApiConfiguration
+    ontology_search: OntologySearchConfiguration = OntologySearchConfiguration()
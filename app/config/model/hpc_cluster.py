@@ -6,6 +6,8 @@ from pydantic import BaseModel
 class HpcClusterConfiguration(BaseModel):
     job_status_read_timeout: int = 30
     task_get_timeout_in_seconds: int = 30
+    job_status_snapshot_refresh_period_in_seconds: int = 15
+    job_status_snapshot_max_age_in_seconds: int = 60
     fella_pathway_script_path: str = ""
 
 
@@ -24,12 +24,17 @@ class RedisConnection(BaseModel):
     redis_db: int
     redis_connection: Union[None, StandaloneRedisConnection] = None
     sentinel_connection: Union[None, SentinelConnection] = None
+    max_connections: int = 50
+    health_check_interval: int = 30
+    retry_count: int = 3
 
 
 class RedisConfiguration(BaseModel):
     banner_message_key: str = "metabolights:banner:message"
     species_tree_cache_key: str = "metabolights:species:tree"
     study_folder_maintenance_mode_key_prefix: str = "metabolights:maintenance:mode"
+    ontology_search_cache_key_prefix: str = "metabolights:ontology:search"
+    hpc_job_status_snapshot_key_prefix: str = "metabolights:hpc:job_status"
 
 
 class RedisSettings(BaseModel):
@@ -5,3 +5,4 @@ class ReportSettings(BaseModel):
     mariana_report_folder_name: str
     report_base_folder_name: str
     report_global_folder_name: str = "global"
+    combined_maf_max_workers: int = 4
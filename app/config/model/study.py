@@ -60,9 +60,20 @@ class StudySettings(BaseModel):
     files_list_json_file_creation_timeout: int = 90
 
     investigation_file_name: str = "i_Investigation.txt"
+    isa_study_cache_max_entries: int = 256
+    data_file_hash_max_workers: int = 4
+    data_file_hash_buffer_size: int = 1048576
+    eb_eye_export_max_workers: int = 4
+    maf_stats_max_workers: int = 4
+    tsv_row_index_cache_max_entries: int = 32
+    tsv_table_cache_max_size_in_mb: int = 256
+    file_reference_index_cache_max_entries: int = 64
+    data_file_index_recheck_window_in_seconds: int = 86400
+    data_file_index_full_scan_interval_in_seconds: int = 604800
     internal_logs_folder_name: str = "logs"
     internal_temp_folder_name: str = "temp"
     internal_backup_folder_name: str = "internal-backup"
+    snapshot_store_folder_name: str = "snapshot-store"
 
     validation_report_file_name: str = "validation_report.json"
     metabolights_website_link: str = "https://www.ebi.ac.uk/metabolights"
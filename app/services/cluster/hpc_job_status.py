@@ -0,0 +1,233 @@
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Union
+
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.services.cluster.hpc_client import HpcClient, HpcJob
+from app.services.cluster.hpc_utils import (
+    get_new_hpc_compute_client,
+    get_new_hpc_datamover_client,
+)
+from app.utils import MetabolightsException
+from app.ws.redis.redis import get_redis_server
+
+logger = logging.getLogger("wslog")
+
+HPC_CLIENT_FACTORIES: Dict[str, Callable[[], HpcClient]] = {
+    "datamover": get_new_hpc_datamover_client,
+    "compute": get_new_hpc_compute_client,
+}
+
+
+class HpcJobStatusSnapshot(BaseModel):
+    cluster: str
+    updated_at: float = 0
+    jobs: List[HpcJob] = []
+
+
+class SubmittedHpcJob(BaseModel):
+    submitted_at: float
+    job: HpcJob
+
+
+class HpcJobStatusCache(object):
+    """
+    Shared job status snapshots of HPC clusters. A periodic task refreshes the
+    snapshot of each cluster with one squeue / bjobs call and stores it in Redis.
+    Job queries are answered from the local copy or Redis copy of the snapshot.
+    If there is no snapshot younger than max_age_in_seconds (periodic task or
+    Redis is not available), the snapshot is refreshed by the caller, and
+    concurrent callers in the same process share the refresh.
+
+    Jobs submitted after the cluster was read are not in the snapshot yet. They
+    are recorded separately and returned by job name until a snapshot read
+    after the submission replaces them.
+    """
+
+    def __init__(
+        self,
+        storage: Any,
+        key_prefix: str,
+        refresh_period_in_seconds: int,
+        max_age_in_seconds: int,
+        client_factories: Union[None, Dict[str, Callable[[], HpcClient]]] = None,
+        retry_period_in_seconds: int = 60,
+    ):
+        self.storage = storage
+        self.key_prefix = key_prefix
+        self.refresh_period_in_seconds = refresh_period_in_seconds
+        self.max_age_in_seconds = max(max_age_in_seconds, refresh_period_in_seconds)
+        self.client_factories = client_factories or HPC_CLIENT_FACTORIES
+        self.retry_period_in_seconds = retry_period_in_seconds
+        self.storage_disabled_until = 0.0
+        self.snapshots: Dict[str, HpcJobStatusSnapshot] = {}
+        self.submitted_jobs: Dict[str, SubmittedHpcJob] = {}
+        self.failed_at: Dict[str, float] = {}
+        self.locks = {x: threading.Lock() for x in self.client_factories}
+
+    def get_key(self, cluster: str) -> str:
+        return f"{self.key_prefix}:{cluster}"
+
+    def get_submitted_job_key(self, cluster: str, job_name: str) -> str:
+        return f"{self.key_prefix}:{cluster}:submitted:{job_name}"
+
+    def _is_storage_available(self) -> bool:
+        return (
+            self.storage is not None and time.monotonic() >= self.storage_disabled_until
+        )
+
+    def _disable_storage(self, ex: Exception):
+        self.storage_disabled_until = time.monotonic() + self.retry_period_in_seconds
+        logger.warning("HPC job status snapshots are not shared temporarily: %s", ex)
+
+    def _load(self, key: str, model_class: type) -> Any:
+        if not self._is_storage_available():
+            return None
+        try:
+            value = self.storage.get_value(key)
+        except Exception as ex:
+            self._disable_storage(ex)
+            return None
+        if not value:
+            return None
+        try:
+            return model_class.model_validate_json(value)
+        except Exception:
+            return None
+
+    def _store(self, key: str, value: BaseModel):
+        if not self._is_storage_available():
+            return
+        try:
+            self.storage.set_value(
+                key, value.model_dump_json(), ex=self.max_age_in_seconds
+            )
+        except Exception as ex:
+            self._disable_storage(ex)
+
+    def _is_fresh(
+        self, snapshot: Union[None, HpcJobStatusSnapshot], max_age: float
+    ) -> bool:
+        return snapshot is not None and time.time() - snapshot.updated_at < max_age
+
+    def refresh(self, cluster: str) -> HpcJobStatusSnapshot:
+        """
+        Read all jobs of the cluster and update the shared snapshot.
+        """
+        if cluster not in self.client_factories:
+            raise MetabolightsException(message=f"Invalid HPC cluster: {cluster}")
+        client = self.client_factories[cluster]()
+        timeout = get_settings().hpc_cluster.configuration.job_status_read_timeout
+        # jobs submitted while the cluster is being read may not be in the result
+        updated_at = time.time()
+        try:
+            jobs = client.get_job_status(timeout=timeout)
+        except Exception:
+            self.failed_at[cluster] = time.monotonic()
+            raise
+        self.failed_at.pop(cluster, None)
+        snapshot = HpcJobStatusSnapshot(
+            cluster=cluster, updated_at=updated_at, jobs=jobs
+        )
+        self.snapshots[cluster] = snapshot
+        self._store(self.get_key(cluster), snapshot)
+        return snapshot
+
+    def add_submitted_job(self, cluster: str, job: HpcJob):
+        """
+        Record a new job, so status checks find it before the next refresh.
+        """
+        key = self.get_submitted_job_key(
+            cluster, self._remove_prefix(cluster, job.name)
+        )
+        submitted_job = SubmittedHpcJob(submitted_at=time.time(), job=job)
+        self.submitted_jobs[key] = submitted_job
+        self._store(key, submitted_job)
+
+    def _get_submitted_job(
+        self, cluster: str, job_name: str, snapshot: HpcJobStatusSnapshot
+    ) -> Union[None, HpcJob]:
+        key = self.get_submitted_job_key(cluster, job_name)
+        submitted_jobs = [
+            self.submitted_jobs.get(key),
+            self._load(key, SubmittedHpcJob),
+        ]
+        submitted_jobs = [
+            x for x in submitted_jobs if x and x.submitted_at >= snapshot.updated_at
+        ]
+        if not submitted_jobs:
+            self.submitted_jobs.pop(key, None)
+            return None
+        return max(submitted_jobs, key=lambda x: x.submitted_at).job
+
+    def _get_job_prefix(self, cluster: str) -> str:
+        cluster_settings = getattr(get_settings().hpc_cluster, cluster)
+        return f"{cluster_settings.job_prefix}{cluster_settings.job_prefix_demimeter}"
+
+    def _remove_prefix(self, cluster: str, job_name: str) -> str:
+        prefix = self._get_job_prefix(cluster)
+        return job_name[len(prefix) :] if job_name.startswith(prefix) else job_name
+
+    def get_snapshot(self, cluster: str) -> HpcJobStatusSnapshot:
+        snapshot = self.snapshots.get(cluster)
+        if self._is_fresh(snapshot, self.refresh_period_in_seconds):
+            return snapshot
+        stored = self._load(self.get_key(cluster), HpcJobStatusSnapshot)
+        if self._is_fresh(stored, self.max_age_in_seconds):
+            self.snapshots[cluster] = stored
+            return stored
+        if cluster not in self.locks:
+            raise MetabolightsException(message=f"Invalid HPC cluster: {cluster}")
+        with self.locks[cluster]:
+            snapshot = self.snapshots.get(cluster)
+            if self._is_fresh(snapshot, self.refresh_period_in_seconds):
+                return snapshot
+            failed_at = self.failed_at.get(cluster)
+            if (
+                failed_at
+                and time.monotonic() - failed_at < self.refresh_period_in_seconds
+            ):
+                raise MetabolightsException(
+                    message=f"Job status of {cluster} cluster is not available."
+                )
+            return self.refresh(cluster)
+
+    def get_jobs(self, cluster: str, job_name: Union[None, str] = None) -> List[HpcJob]:
+        """
+        Return jobs of the cluster. Job name may be with or without job prefix.
+        """
+        snapshot = self.get_snapshot(cluster)
+        if not job_name:
+            return list(snapshot.jobs)
+        job_name = self._remove_prefix(cluster, job_name)
+        names = {job_name, f"{self._get_job_prefix(cluster)}{job_name}"}
+        jobs = [job for job in snapshot.jobs if job.name in names]
+        submitted_job = self._get_submitted_job(cluster, job_name, snapshot)
+        if submitted_job and submitted_job.job_id not in {x.job_id for x in jobs}:
+            jobs.append(submitted_job)
+        return jobs
+
+
+@lru_cache(1)
+def get_hpc_job_status_cache() -> HpcJobStatusCache:
+    settings = get_settings()
+    configuration = settings.hpc_cluster.configuration
+    return HpcJobStatusCache(
+        get_redis_server(),
+        key_prefix=settings.redis_cache.configuration.hpc_job_status_snapshot_key_prefix,
+        refresh_period_in_seconds=configuration.job_status_snapshot_refresh_period_in_seconds,
+        max_age_in_seconds=configuration.job_status_snapshot_max_age_in_seconds,
+    )
+
+
+def _reset_after_fork():
+    # locks may be held by threads of the parent process
+    get_hpc_job_status_cache.cache_clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
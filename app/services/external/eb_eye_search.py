@@ -4,9 +4,13 @@ import logging
 import os
 import pathlib
 import sys
+import threading
 import time
 import urllib
-from xml.dom.minidom import Document, Element
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Union
+from xml.dom.minidom import Document, Element, Node
 
 import pandas as pd
 
@@ -21,8 +25,17 @@ from app.ws.db.models import (
     StudyModel,
 )
 from app.ws.db.wrappers import update_study_model_from_directory
-from app.ws.db_connection import add_metabolights_data, get_public_studies
-from app.ws.dom_utils import create_generic_element, create_generic_element_attribute
+from app.ws.db_connection import (
+    add_metabolights_data,
+    add_metabolights_data_from_file,
+    get_public_studies,
+)
+from app.ws.dom_utils import (
+    create_generic_element,
+    create_generic_element_attribute,
+    serialize_pretty_nodes,
+    write_entries_document,
+)
 from app.ws.settings.utils import get_study_settings
 from app.ws.study.study_service import StudyService
 
@@ -40,8 +53,8 @@ class EbEyeSearchService:
     public_ftp_download = get_study_settings().mounted_paths.public_ftp_download_path
     metabolights_website_link = get_study_settings().metabolights_website_link
     europe_pmc_url = get_settings().external_dependencies.api.europe_pmc_api_url
-    metabolite_list = []
-    study_acc_list = []
+    # metabolite and study lists of the entry processed by the current thread
+    entry_state = threading.local()
     linked_studies = 0
     articles_linked = 0
     raw_files_list = get_settings().file_filters.raw_files_list
@@ -61,9 +74,39 @@ class EbEyeSearchService:
     def export_public_studies(thomson_reuters: bool = False):
         start_time = time.time()
         study_list = get_public_studies()
+        if thomson_reuters:
+            content_name = EbEyeSearchService.eb_eye_public_studies_thomson
+        else:
+            content_name = EbEyeSearchService.eb_eye_public_studies_ebi
+
+        def create_entry(study_id: str) -> str:
+            logger.info(f"EB EYE search export processing for the study  - {study_id}")
+            return EbEyeSearchService.create_study_entry(
+                study_id=study_id, thomson_reuters=thomson_reuters
+            )
+
+        i = EbEyeSearchService.export_entries(
+            content_name=content_name,
+            header_nodes=EbEyeSearchService.create_header_nodes(len(study_list)),
+            entry_ids=study_list,
+            create_entry=create_entry,
+        )
+        logger.info(f"processing completed for all the studies; Processed count  - {i}")
+        processed_time = (time.time() - start_time) / 60
+        result = f"Processed study count - {i}; Process completed in {processed_time} minutes"
+        send_email(
+            "EB EYE public studies export completed",
+            result,
+            None,
+            EbEyeSearchService.email,
+            None,
+        )
+        return {"processed_studies": i, "completed_in": processed_time}
+
+    @staticmethod
+    def create_header_nodes(entry_count: Union[None, int] = None) -> List[Node]:
         doc = Document()
         root = doc.createElement("database")
-        doc.appendChild(root)
         doc = create_generic_element(
             doc, root, "name", EbEyeSearchService.study_resource_name
         )
@@ -74,44 +117,87 @@ class EbEyeSearchService:
         doc = create_generic_element(
             doc, root, "release_date", datetime.date.today().strftime("%Y-%m-%d")
         )
-        doc = create_generic_element(doc, root, "entry_count", str(len(study_list)))
+        if entry_count is not None:
+            doc = create_generic_element(doc, root, "entry_count", str(entry_count))
+        return list(root.childNodes)
+
+    @staticmethod
+    def create_study_entry(study_id: str, thomson_reuters: bool) -> str:
+        doc = Document()
         entries = doc.createElement("entries")
-        root.appendChild(entries)
-        i = 0
-        for study_id in study_list:
-            logger.info(f"EB EYE search export processing for the study  - {study_id}")
-            doc = EbEyeSearchService.process_study(
-                doc=doc,
-                root=entries,
-                study_id=study_id,
-                thomson_reuters=thomson_reuters,
-            )
-            i = i + 1
-        logger.info(f"processing completed for all the studies; Processed count  - {i}")
-        xml_str = doc.toprettyxml(indent="")
-        if thomson_reuters:
-            add_metabolights_data(
-                content_name=EbEyeSearchService.eb_eye_public_studies_thomson,
-                data_format=EbEyeSearchService.content_type_xml,
-                content=xml_str,
-            )
-        else:
-            add_metabolights_data(
-                content_name=EbEyeSearchService.eb_eye_public_studies_ebi,
-                data_format=EbEyeSearchService.content_type_xml,
-                content=xml_str,
-            )
-        logger.info("Data stored to DB!")
-        processed_time = (time.time() - start_time) / 60
-        result = f"Processed study count - {i}; Process completed in {processed_time} minutes"
-        send_email(
-            "EB EYE public studies export completed",
-            result,
-            None,
-            EbEyeSearchService.email,
-            None,
+        doc = EbEyeSearchService.process_study(
+            doc=doc, root=entries, study_id=study_id, thomson_reuters=thomson_reuters
         )
-        return {"processed_studies": i, "completed_in": processed_time}
+        return serialize_pretty_nodes(entries.childNodes)
+
+    @staticmethod
+    def create_compound_entry(compound_acc: str) -> str:
+        doc = Document()
+        entries = doc.createElement("entries")
+        doc = EbEyeSearchService.process_compound(
+            doc=doc, root=entries, compound_acc=compound_acc
+        )
+        return serialize_pretty_nodes(entries.childNodes)
+
+    @staticmethod
+    def generate_entries(
+        entry_ids: List[str],
+        create_entry: Callable[[str], str],
+        max_workers: int = 4,
+    ) -> Iterator[str]:
+        """
+        Create entries in parallel and yield them in input order. At most
+        2 * max_workers entries are kept in memory.
+        """
+        max_workers = max(max_workers, 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for entry_id in entry_ids:
+                pending.append(executor.submit(create_entry, entry_id))
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    @staticmethod
+    def export_entries(
+        content_name: str,
+        header_nodes: List[Node],
+        entry_ids: List[str],
+        create_entry: Callable[[str], str],
+    ) -> int:
+        """
+        Write entries to the reports folder while they are created, and store the
+        file content in database.
+        """
+        settings = get_study_settings()
+        export_folder = os.path.join(
+            settings.mounted_paths.reports_root_path, "eb_eye_search"
+        )
+        os.makedirs(export_folder, exist_ok=True)
+        file_path = os.path.join(export_folder, content_name)
+        processed = 0
+
+        def count_entries():
+            nonlocal processed
+            for entry in EbEyeSearchService.generate_entries(
+                entry_ids, create_entry, settings.eb_eye_export_max_workers
+            ):
+                processed += 1
+                yield entry
+
+        write_entries_document(file_path, header_nodes, count_entries())
+        logger.info(f"Export file is created: {file_path}")
+        status, msg = add_metabolights_data_from_file(
+            content_name=content_name,
+            data_format=EbEyeSearchService.content_type_xml,
+            file_path=file_path,
+        )
+        if status:
+            logger.info("Data stored to DB!")
+        else:
+            logger.error(f"Data is not stored to DB! {msg}")
+        return processed
 
     @staticmethod
     def export_europe_pmc():
@@ -606,6 +692,7 @@ class EbEyeSearchService:
 
     @staticmethod
     def add_cross_references(doc: Document, root: Element, study: StudyModel):
+        EbEyeSearchService.entry_state.metabolite_list = []
         xrefs = doc.createElement("cross_references")
         for publication in study.publications:
             if publication.pubmedId != "":
@@ -625,7 +712,6 @@ class EbEyeSearchService:
 
     @staticmethod
     def process_maf_rows(doc: Document, xrefs: Element, rows_dict):
-        EbEyeSearchService.metabolite_list = []
         xref_list = []
         for row in rows_dict:
             database_identifier = row["database_identifier"]
@@ -634,8 +720,9 @@ class EbEyeSearchService:
                 metname = EbEyeSearchService.filter_non_printable(
                     metabolite_identification
                 )
-                if metname not in EbEyeSearchService.metabolite_list:
-                    EbEyeSearchService.metabolite_list.append(metname)
+                metabolite_list = EbEyeSearchService.entry_state.metabolite_list
+                if metname not in metabolite_list:
+                    metabolite_list.append(metname)
                 db_id = database_identifier.strip()
                 if db_id in xref_list:
                     continue
@@ -1137,7 +1224,8 @@ class EbEyeSearchService:
 
     @staticmethod
     def add_metabolites(doc: Document, additional_fields: Element, study: StudyModel):
-        for metabolite in EbEyeSearchService.metabolite_list:
+        metabolite_list = getattr(EbEyeSearchService.entry_state, "metabolite_list", [])
+        for metabolite in metabolite_list:
             if (
                 EbEyeSearchService.check_for_empty(metabolite)
                 and len(metabolite) <= 8191
@@ -1241,42 +1329,24 @@ class EbEyeSearchService:
     def export_compounds():
         start_time = time.time()
         compound_list = CompoundService.get_instance().get_all_compounds()
-        doc = Document()
-        root = doc.createElement("database")
-        doc.appendChild(root)
-        doc = create_generic_element(
-            doc, root, "name", EbEyeSearchService.study_resource_name
-        )
-        doc = create_generic_element(
-            doc, root, "description", EbEyeSearchService.study_resource_description
-        )
-        doc = create_generic_element(doc, root, "release", "1.0")
-        doc = create_generic_element(
-            doc, root, "release_date", datetime.date.today().strftime("%Y-%m-%d")
-        )
-        doc = create_generic_element(doc, root, "entry_count", str(len(compound_list)))
-        entries = doc.createElement("entries")
-        root.appendChild(entries)
-        i = 0
-        for compound_acc in compound_list:
+
+        def create_entry(compound_acc: str) -> str:
             logger.info(
                 f"EB EYE search export processing starting for compound  - {compound_acc}"
             )
-            doc = EbEyeSearchService.process_compound(
-                doc=doc, root=entries, compound_acc=compound_acc
-            )
+            entry = EbEyeSearchService.create_compound_entry(compound_acc)
             logger.info(f"processing completed for the compound  - {compound_acc}")
-            i = i + 1
+            return entry
+
+        i = EbEyeSearchService.export_entries(
+            content_name=EbEyeSearchService.eb_eye_public_compounds_ebi,
+            header_nodes=EbEyeSearchService.create_header_nodes(len(compound_list)),
+            entry_ids=compound_list,
+            create_entry=create_entry,
+        )
         logger.info(
             f"processing completed for all the compounds; Processed count  - {i}"
         )
-        xml_str = doc.toprettyxml(indent="")
-        add_metabolights_data(
-            content_name=EbEyeSearchService.eb_eye_public_compounds_ebi,
-            data_format=EbEyeSearchService.content_type_xml,
-            content=xml_str,
-        )
-        logger.info("Data stored to DB!")
         processed_time = (time.time() - start_time) / 60
         result = f"Processed compounds count - {i}; Process completed in {processed_time} minutes"
         send_email(
@@ -1331,19 +1401,15 @@ class EbEyeSearchService:
     def add_cross_references_for_compound(
         doc: Document, root: Element, compound: MetaboLightsCompoundModel
     ):
-        EbEyeSearchService.study_acc_list = []
+        study_acc_list = []
+        EbEyeSearchService.entry_state.study_acc_list = study_acc_list
         xrefs = doc.createElement("cross_references")
         for cross_reference in compound.crossReference:
             if cross_reference is not None:
                 db_name = cross_reference.db.name
                 if db_name.upper() == "MTBLS":
-                    if (
-                        cross_reference.accession
-                        not in EbEyeSearchService.study_acc_list
-                    ):
-                        EbEyeSearchService.study_acc_list.append(
-                            cross_reference.accession
-                        )
+                    if cross_reference.accession not in study_acc_list:
+                        study_acc_list.append(cross_reference.accession)
                     ref = doc.createElement("ref")
                     ref.setAttribute(attname="dbkey", value=cross_reference.accession)
                     ref.setAttribute(attname="dbname", value=db_name.upper())
@@ -1437,7 +1503,8 @@ class EbEyeSearchService:
                         attr_value="organism_group",
                     )
 
-        for study_acc in EbEyeSearchService.study_acc_list:
+        study_acc_list = getattr(EbEyeSearchService.entry_state, "study_acc_list", [])
+        for study_acc in study_acc_list:
             doc = create_generic_element_attribute(
                 doc=doc,
                 root=additional_fields,
@@ -638,59 +638,43 @@ class DataMoverAvailableStorage(object):
         ignore_list=None,
         force=True,
     ):
-        job_no_found = "is not found in queue"
-        status, message, msg_out, msg_err = list_jobs(self.datamover_queue, job_name)
+        result = SyncCalculationTaskResult()
         try:
-            if status:
-                if job_no_found in msg_err:
-                    if not os.path.exists(calc_log_file):
-                        return self._init_sync_analysis(
-                            folder_type=folder_type,
-                            source_ftp_folder=source_ftp_folder,
-                            ignore_list=ignore_list,
-                        )
-                    else:
-                        result = self._check_calc_log_file_status(
-                            calc_log_file=calc_log_file,
-                            sync_log_file=sync_log_file,
-                            folder_type=folder_type,
-                            source_ftp_folder=source_ftp_folder,
-                            job_found=False,
-                            force=force,
-                            ignore_list=ignore_list,
-                        )
-                        result.last_update_time = time.ctime(
-                            os.path.getmtime(calc_log_file)
-                        )
-                        return result
-                if "JOBID" in msg_out:
-                    job_id = "NONE"
-                    splitted_value = msg_out.split("\n")
-                    if len(splitted_value) > 1 and splitted_value[1]:
-                        job_out = splitted_value[1]
-                        splitted = job_out.split(" ")
-                        if len(splitted) > 1 and splitted[0]:
-                            job_id = splitted[0]
-
+            jobs = list_jobs(self.datamover_queue, job_name)
+            if not jobs:
+                if not os.path.exists(calc_log_file):
+                    return self._init_sync_analysis(
+                        folder_type=folder_type,
+                        source_ftp_folder=source_ftp_folder,
+                        ignore_list=ignore_list,
+                    )
+                else:
                     result = self._check_calc_log_file_status(
                         calc_log_file=calc_log_file,
                         sync_log_file=sync_log_file,
                         folder_type=folder_type,
                         source_ftp_folder=source_ftp_folder,
-                        job_found=True,
+                        job_found=False,
                         force=force,
                         ignore_list=ignore_list,
                     )
                     result.last_update_time = time.ctime(
                         os.path.getmtime(calc_log_file)
                     )
-                    result.description = f"Job ID : {job_id}"
                     return result
-                else:
-                    result.status = SyncCalculationStatus.UNKNOWN
-            else:
-                result.status = SyncCalculationStatus.UNKNOWN
-                # raise MetabolightsException(message=message, http_code=500)
+            job_id = jobs[0].job_id or "NONE"
+            result = self._check_calc_log_file_status(
+                calc_log_file=calc_log_file,
+                sync_log_file=sync_log_file,
+                folder_type=folder_type,
+                source_ftp_folder=source_ftp_folder,
+                job_found=True,
+                force=force,
+                ignore_list=ignore_list,
+            )
+            result.last_update_time = time.ctime(os.path.getmtime(calc_log_file))
+            result.description = f"Job ID : {job_id}"
+            return result
         except Exception as e:
             message = f"Could not check the Sync analysis status for study sync  - {self.studyId}"
             logger.error(message + " ;  reason  :-" + str(e))
@@ -958,56 +942,33 @@ class DataMoverAvailableStorage(object):
         return sync_metafiles_result, sync_rdfiles_result
 
     def _check_folder_sync_result(self, task_name=None) -> SyncTaskResult:
-        job_no_found = "is not found in queue"
         job_name = f"{self.studyId}_{task_name}"
         queue = self.datamover_queue
         study_log_file = self._get_study_log_file_path(
             study_id=self.studyId, task_name=task_name
         )
         result: SyncTaskResult = SyncTaskResult()
-        status, message, msg_out, msg_err = list_jobs(queue=queue, job_name=job_name)
         try:
-            if status:
-                if job_no_found in msg_err:
-                    if not os.path.exists(study_log_file):
-                        result.status = SyncTaskStatus.NO_TASK
-                        result.last_update_time = "NONE"
-                        result.description = "NONE"
-                        return result
-                    else:
-                        result.status = self._check_sync_log_file_status(
-                            study_log_file, False
-                        )
-                        result.last_update_time = time.ctime(
-                            os.path.getmtime(study_log_file)
-                        )
-                        result.description = "NONE"
-                        return result
-                if "JOBID" in msg_out:
-                    job_id = "NONE"
-                    splitted_value = msg_out.split("\n")
-                    if len(splitted_value) > 1 and splitted_value[1]:
-                        job_out = splitted_value[1]
-                        splitted = job_out.split(" ")
-                        if len(splitted) > 1 and splitted[0]:
-                            job_id = splitted[0]
-
+            jobs = list_jobs(queue=queue, job_name=job_name)
+            if not jobs:
+                if not os.path.exists(study_log_file):
+                    result.status = SyncTaskStatus.NO_TASK
+                    result.last_update_time = "NONE"
+                    result.description = "NONE"
+                    return result
+                else:
                     result.status = self._check_sync_log_file_status(
-                        study_log_file, True
+                        study_log_file, False
                     )
                     result.last_update_time = time.ctime(
                         os.path.getmtime(study_log_file)
                     )
-                    result.description = job_id
-                    return result
-                else:
-                    result.status = SyncTaskStatus.UNKNOWN
-                    result.last_update_time = "NONE"
                     result.description = "NONE"
-            else:
-                result.status = SyncTaskStatus.UNKNOWN
-                result.last_update_time = "NONE"
-                result.description = "NONE"
+                    return result
+            result.status = self._check_sync_log_file_status(study_log_file, True)
+            result.last_update_time = time.ctime(os.path.getmtime(study_log_file))
+            result.description = jobs[0].job_id or "NONE"
+            return result
         except Exception as e:
             message = f"Could not check the job status for study sync  - {self.studyId}"
             logger.error(message + " ;  reason  :-" + str(e))
@@ -3,7 +3,8 @@ import fnmatch
 import glob
 import os
 import pathlib
-from typing import Dict, List, Union
+import re
+from typing import Dict, Iterable, Iterator, List, Union
 
 from pydantic import BaseModel
 
@@ -16,6 +17,12 @@ DEFAULT_SAMPLE_FILE_NAME = "_history"
 # SKIP_FOLDER_NAMES= {"audit", "chebi_pipeline_annotations", "__MACOSX", "AUDIT_FILES", "INTERNAL_FILES"}
 SKIP_FOLDER_CONTAINS_ANY = ["fid*", "ser*", "pdata"]
 SKIP_FOLDER_CONTAINS_FILE_NAME_PATTERN = "acqu*"
+STOP_FOLDER_FILE_MATCHER = re.compile(
+    fnmatch.translate(SKIP_FOLDER_CONTAINS_FILE_NAME_PATTERN)
+)
+STOP_FOLDER_CONTAINS_ANY_MATCHERS = [
+    re.compile(fnmatch.translate(x)) for x in SKIP_FOLDER_CONTAINS_ANY
+]
 
 SKIP_FILE_EXTENSIONS = {".__MACOSX"}
 
@@ -153,6 +160,133 @@ def get_all_study_metadata_and_data_files(
     return file_descriptors
 
 
+class FolderEntry(object):
+    """
+    Entry yielded by scan_folder. Stat results of os.scandir are reused, so an
+    entry needs at most one stat call. Set skip_children of a folder entry to
+    stop scan_folder descending into it.
+    """
+
+    __slots__ = ("dir_entry", "relative_path", "skip_children", "_stat")
+
+    def __init__(self, dir_entry: os.DirEntry, relative_path: str):
+        self.dir_entry = dir_entry
+        self.relative_path = relative_path
+        self.skip_children = False
+        self._stat = None
+
+    @property
+    def name(self) -> str:
+        return self.dir_entry.name
+
+    @property
+    def path(self) -> str:
+        return self.dir_entry.path
+
+    @property
+    def suffix(self) -> str:
+        # same as pathlib suffix
+        name = self.dir_entry.name
+        idx = name.rfind(".")
+        if 0 < idx < len(name) - 1:
+            return name[idx:]
+        return ""
+
+    def is_dir(self) -> bool:
+        try:
+            return self.dir_entry.is_dir()
+        except OSError:
+            return False
+
+    def is_symlink(self) -> bool:
+        try:
+            return self.dir_entry.is_symlink()
+        except OSError:
+            return False
+
+    def stat(self) -> Union[None, os.stat_result]:
+        """
+        Return stat result of the target file. It is None for broken links.
+        """
+        if self._stat is None:
+            try:
+                self._stat = self.dir_entry.stat()
+            except OSError:
+                return None
+        return self._stat
+
+
+def scan_folder(
+    root_path: str,
+    folder_path: Union[None, str] = None,
+    recursive: bool = True,
+    include_hidden: bool = True,
+    exclude: Union[None, Iterable[str]] = None,
+    exclude_names: Union[None, Iterable[str]] = None,
+) -> Iterator[FolderEntry]:
+    """
+    Yield entries under folder_path lazily, parent folders first. Relative paths
+    of entries are relative to root_path.
+
+    :param folder_path: start folder. Default is root_path.
+    :param include_hidden: yield names starting with "."
+    :param exclude: relative paths to skip with their sub folders
+    :param exclude_names: folder or file names to skip with their sub folders
+    """
+    root_path = str(root_path)
+    folder_path = str(folder_path) if folder_path else root_path
+    exclude = set(exclude or [])
+    exclude_names = set(exclude_names or [])
+    prefix = os.path.relpath(folder_path, root_path)
+    prefix = "" if prefix == "." else prefix + os.sep
+    stack = [(os.scandir(folder_path), prefix)]
+    try:
+        while stack:
+            iterator, prefix = stack[-1]
+            dir_entry = next(iterator, None)
+            if dir_entry is None:
+                iterator.close()
+                stack.pop()
+                continue
+            name = dir_entry.name
+            if not include_hidden and name.startswith("."):
+                continue
+            if name in exclude_names:
+                continue
+            relative_path = prefix + name
+            if relative_path in exclude:
+                continue
+            entry = FolderEntry(dir_entry, relative_path)
+            yield entry
+            if recursive and not entry.skip_children and entry.is_dir():
+                stack.append((os.scandir(entry.path), relative_path + os.sep))
+    finally:
+        for iterator, _ in stack:
+            iterator.close()
+
+
+def get_stop_folder_files(folder_path: str, names: List[str]) -> List[str]:
+    """
+    Return parameter and data files of a folder if it is a stop folder (e.g.
+    Bruker fid folders), otherwise an empty list.
+    """
+    files = [x for x in names if "." not in x and STOP_FOLDER_FILE_MATCHER.match(x)]
+    if not files:
+        return []
+    referenced_sub_files = set(files)
+    is_stop_folder = False
+    for matcher in STOP_FOLDER_CONTAINS_ANY_MATCHERS:
+        expected_files = [
+            x for x in names if "." not in x and "_" not in x and matcher.match(x)
+        ]
+        if expected_files:
+            referenced_sub_files.update(expected_files)
+            is_stop_folder = True
+    if not is_stop_folder:
+        return []
+    return [os.path.join(folder_path, x) for x in referenced_sub_files]
+
+
 def get_study_folder_files(
     root_path: str,
     file_descriptors: Dict[str, FileDescriptor],
@@ -163,66 +297,40 @@ def get_study_folder_files(
     exclude_list=None,
     include_metadata_files=False,
     add_sub_folders: bool = True,
-):
-    if not exclude_list:
-        exclude_list = []
-    relative_root_path = str(root).replace(f"{root_path}", "").lstrip("/")
-    if str(root_path) != str(root):
-        if not relative_root_path or relative_root_path in exclude_list:
-            yield root
-    for item in root.iterdir():
-        relative_path = str(item).replace(f"{root_path}", "").lstrip("/")
-        if relative_path in exclude_list:
-            continue
-        name = str(item)
-        if not list_all_files:
-            if item.name and item.name[0] == ".":
-                continue
-
-        if item.is_dir():
-            # if not list_all_files:
-            #     if item.name in SKIP_FOLDER_NAMES:
-            #         continue
-            sub_filename = ""
-            referenced_sub_files = set()
-            is_stop_folder = False
-            if relative_path and str(relative_path) not in MANAGED_FOLDERS:
-                search = glob.iglob(f"{item}/{SKIP_FOLDER_CONTAINS_FILE_NAME_PATTERN}")
-
-                files = [x for x in search if "." not in os.path.basename(x)]
-
-                if files:
-                    referenced_sub_files = referenced_sub_files.union(set(files))
-                    for parameters_file in SKIP_FOLDER_CONTAINS_ANY:
-                        items = glob.iglob(f"{item}/{parameters_file}")
-                        expected_files = [
-                            x
-                            for x in items
-                            if "." not in os.path.basename(x)
-                            and "_" not in os.path.basename(x)
-                        ]
-                        if expected_files:
-                            referenced_sub_files = referenced_sub_files.union(
-                                set(expected_files)
-                            )
-                            sub_filename = parameters_file
-                            is_stop_folder = True
-
-            ext = item.suffix.lower()
-            relative_path = str(item).replace(f"{root_path}", "").lstrip("/")
-
-            m_time = os.path.getmtime(item)
+) -> Iterator[FolderEntry]:
+    root_path = str(root_path)
+    pattern_matcher = re.compile(fnmatch.translate(pattern)) if pattern else None
+    root_prefix = root_path.rstrip(os.sep) + os.sep
+    iterator = scan_folder(
+        root_path,
+        folder_path=str(root),
+        recursive=recursive,
+        include_hidden=list_all_files,
+        exclude=exclude_list,
+    )
+    for entry in iterator:
+        relative_path = entry.relative_path
+        name = root_prefix + relative_path
+        stat_result = entry.stat()
+        if entry.is_dir():
+            stop_folder_files = []
+            names = None
+            if relative_path not in MANAGED_FOLDERS:
+                names = [x.name for x in os.scandir(entry.path)]
+                stop_folder_files = get_stop_folder_files(entry.path, names)
+            is_stop_folder = len(stop_folder_files) > 0
+            ext = entry.suffix.lower()
+            m_time = stat_result.st_mtime
             if ext in STOP_FOLDER_EXTENSIONS or is_stop_folder:
-                if pattern and not fnmatch.fnmatch(name, pattern):
+                entry.skip_children = True
+                if pattern_matcher and not pattern_matcher.match(name):
                     continue
                 if is_stop_folder:
                     sub_filename = ""
                 else:
-                    if ext in STOP_FOLDER_SAMPLE_FILES:
-                        sub_filename = STOP_FOLDER_SAMPLE_FILES[ext]
-                    else:
-                        sub_filename = DEFAULT_SAMPLE_FILE_NAME
-
+                    sub_filename = STOP_FOLDER_SAMPLE_FILES.get(
+                        ext, DEFAULT_SAMPLE_FILE_NAME
+                    )
                 file_descriptors[relative_path] = FileDescriptor(
                     relative_path=relative_path,
                     is_dir=True,
@@ -231,26 +339,25 @@ def get_study_folder_files(
                     is_stop_folder=True,
                     sub_filename=sub_filename,
                 )
-                if is_stop_folder:
-                    for subfile in referenced_sub_files:
-                        relative_path = (
-                            str(subfile).replace(f"{root_path}", "").lstrip("/")
-                        )
-                        file_descriptors[relative_path] = FileDescriptor(
-                            relative_path=relative_path,
-                            is_dir=False,
-                            modified_time=m_time,
-                            extension="",
-                            is_stop_folder=False,
-                            sub_filename="",
-                        )
-                yield item
+                for sub_file in stop_folder_files:
+                    sub_file_path = sub_file.replace(root_prefix, "", 1)
+                    file_descriptors[sub_file_path] = FileDescriptor(
+                        relative_path=sub_file_path,
+                        is_dir=False,
+                        modified_time=m_time,
+                        extension="",
+                        is_stop_folder=False,
+                        sub_filename="",
+                    )
+                yield entry
             else:
-                if not pattern or (pattern and fnmatch.fnmatch(name, pattern)):
-                    is_empty = True
-                    for _ in root.iterdir():
-                        is_empty = False
-                        break
+                if not pattern_matcher or pattern_matcher.match(name):
+                    is_empty = False
+                    # only empty folders are added if add_sub_folders is False
+                    if not add_sub_folders:
+                        if names is None:
+                            names = [x.name for x in os.scandir(entry.path)]
+                        is_empty = not names
                     if add_sub_folders or is_empty:
                         file_descriptors[relative_path] = FileDescriptor(
                             relative_path=relative_path,
@@ -260,52 +367,30 @@ def get_study_folder_files(
                             is_stop_folder=False,
                             is_empty=is_empty,
                         )
-
-                if recursive:
-                    yield from get_study_folder_files(
-                        root_path,
-                        file_descriptors,
-                        item,
-                        list_all_files=list_all_files,
-                        pattern=pattern,
-                        recursive=recursive,
-                        exclude_list=exclude_list,
-                        include_metadata_files=include_metadata_files,
-                    )
-                else:
-                    yield item
+                yield entry
         else:
-            if pattern and not fnmatch.fnmatch(name, pattern):
+            if pattern_matcher and not pattern_matcher.match(name):
                 continue
-            ext = item.suffix.lower()
+            ext = entry.suffix.lower()
             if not list_all_files:
                 if ext in SKIP_FILE_EXTENSIONS:
                     continue
                 if not include_metadata_files:
                     if (
-                        len(item.name) > 2
-                        and item.name[:2] in METADATA_FILE_PREFIXES
-                        and (item.name.endswith(".txt") or item.name.endswith(".tsv"))
+                        len(entry.name) > 2
+                        and entry.name[:2] in METADATA_FILE_PREFIXES
+                        and (entry.name.endswith(".txt") or entry.name.endswith(".tsv"))
                     ):
                         continue
-
-            relative_path = str(item).replace(f"{root_path}/", "")
-            if item.is_symlink() and not item.resolve().exists():
-                continue
-            if not item.exists():
+            # broken symbolic links are skipped
+            if stat_result is None:
                 continue
-            file_size = 0
-            if not item.is_symlink() or (item.is_symlink() and item.resolve().exists()):
-                file_size = os.path.getsize(item)
-                m_time = os.path.getmtime(item)
-                is_empty = True if item.stat().st_size == 0 else False
             file_descriptors[relative_path] = FileDescriptor(
                 relative_path=relative_path,
                 is_dir=False,
-                modified_time=m_time,
+                modified_time=stat_result.st_mtime,
                 extension=ext,
-                is_empty=is_empty,
-                file_size=file_size,
+                is_empty=stat_result.st_size == 0,
+                file_size=stat_result.st_size,
             )
-
-            yield item
+            yield entry
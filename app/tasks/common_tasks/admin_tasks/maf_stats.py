@@ -0,0 +1,23 @@
+import logging
+
+from app.tasks.worker import MetabolightsTask, celery
+from app.utils import MetabolightsException
+from app.ws.stats import update_maf_stats
+
+logger = logging.getLogger("wslog")
+
+
+@celery.task(
+    bind=True,
+    base=MetabolightsTask,
+    soft_time_limit=60 * 60 * 24,
+    name="app.tasks.common_tasks.admin_tasks.maf_stats.update_maf_stats_task",
+)
+def update_maf_stats_task(self, user_token: str):
+    logger.info("Received request to update study statistics.")
+    status, message = update_maf_stats()
+    if not status:
+        raise MetabolightsException(
+            http_code=500, message=f"Study statistics are not updated: {message}"
+        )
+    return {"status": status, "message": message}
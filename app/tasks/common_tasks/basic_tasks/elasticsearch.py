@@ -1,4 +1,5 @@
 import json
+import logging
 import os
 
 from app.tasks.worker import MetabolightsTask, celery, send_email
@@ -7,6 +8,9 @@ from app.ws.db.dbmanager import DBManager
 from app.ws.db.schemes import RefMetabolite, Study, User
 from app.ws.db.types import StudyStatus
 from app.ws.elasticsearch.elastic_service import ElasticsearchService
+from app.ws.study.reindex_debouncer import get_study_reindex_debouncer
+
+logger = logging.getLogger("wslog")
 
 
 @celery.task(
@@ -21,6 +25,35 @@ def reindex_study(self, user_token, study_id):
     return {"study_id": study_id}
 
 
+def request_study_reindex(study_id: str):
+    """
+    Trigger a debounced reindex of a study. Requests in the debounce period
+    are coalesced into one reindex task.
+    """
+    try:
+        get_study_reindex_debouncer().request(study_id)
+    except Exception as ex:
+        logger.warning(
+            "Debounced reindex request of %s failed, reindex is triggered: %s",
+            study_id,
+            ex,
+        )
+        inputs = {"user_token": None, "study_id": study_id}
+        reindex_study.apply_async(kwargs=inputs, expires=60)
+
+
+@celery.task(
+    base=MetabolightsTask,
+    name="app.tasks.common_tasks.basic_tasks.elasticsearch.reindex_pending_studies",
+)
+def reindex_pending_studies():
+    study_ids = get_study_reindex_debouncer().pop_due_studies()
+    for study_id in study_ids:
+        inputs = {"user_token": None, "study_id": study_id}
+        reindex_study.apply_async(kwargs=inputs, expires=60)
+    return {"study_ids": study_ids}
+
+
 @celery.task(
     base=MetabolightsTask,
     name="app.tasks.common_tasks.basic_tasks.elasticsearch.delete_study_index",
@@ -123,27 +156,18 @@ def reindex_all_studies(user_token, send_email_to_submitter=False):
 
 def reindex_studies_in_list(user_token, studies):
     es = ElasticsearchService.get_instance()
-    failed_indexed_studies = {}
-    indexed_studies = []
     start = (current_time().strftime("%Y-%m-%d %H:%M:%S"),)
-    try:
-        for item in studies:
-            try:
-                es._reindex_study(
-                    item.acc, user_token, include_validation_results=False, sync=True
-                )
-                indexed_studies.append(item.acc)
-            except Exception as ex:
-                failed_indexed_studies[item.acc] = str(ex)
-    except Exception as exc:
-        raise exc
+    result = es.bulk_reindex_studies(
+        [item.acc for item in studies], user_token, include_validation_results=False
+    )
     return {
         "started_at": start,
         "completed_at": current_time().strftime("%Y-%m-%d %H:%M:%S"),
         "executed_on": os.uname().nodename,
         "total_studies": len(studies),
-        "indexed_studies": len(indexed_studies),
-        "failed_indexed_studies": failed_indexed_studies,
+        "indexed_studies": result["indexed"],
+        "failed_indexed_studies": result["failed"],
+        "documents_per_second": result["documents_per_second"],
     }
 
 
@@ -184,26 +208,15 @@ def reindex_all_compounds(email, send_email_to_submitter=False):
                 compounds.append(metabolite)
 
         es = ElasticsearchService.get_instance()
-        failed_indexed_compounds = {}
-        indexed_compounds = []
-
-        try:
-            for item in compounds:
-                try:
-                    es._reindex_compound(item.acc)
-                    indexed_compounds.append(item.acc)
-                except Exception as ex:
-                    failed_indexed_compounds[item.acc] = str(ex)
-
-        except Exception as exc:
-            raise exc
+        bulk_result = es.bulk_reindex_compounds([item.acc for item in compounds])
 
         result = {
             "time": current_time().strftime("%Y-%m-%d %H:%M:%S"),
             "executed_on": os.uname().nodename,
             "total_compounds": len(compounds),
-            "indexed_compounds": len(indexed_compounds),
-            "failed_index_compounds": failed_indexed_compounds,
+            "indexed_compounds": bulk_result["indexed"],
+            "failed_index_compounds": bulk_result["failed"],
+            "documents_per_second": bulk_result["documents_per_second"],
         }
         result_str = json.dumps(result, indent=4)
         result_str = result_str.replace("\n", "<p>")
@@ -1,9 +1,8 @@
 import datetime
-import json
 import logging
 import os
 import pathlib
-from typing import Dict, List, OrderedDict, Union
+from typing import Dict, List, Union
 
 import boto3
 from celery.result import AsyncResult
@@ -15,6 +14,12 @@ from app.study_folder_utils import FileDescriptor
 from app.tasks.worker import MetabolightsTask, celery
 from app.utils import current_time
 from app.ws.redis.redis import get_redis_server
+from app.ws.study.data_file_index import (
+    PRIVATE_DATA_FILES,
+    PUBLIC_DATA_FILES,
+    DataFileIndex,
+    is_metadata_file_name,
+)
 
 logger = logging.getLogger("wslog")
 
@@ -40,49 +45,35 @@ def index_study_data_files(
         mounted_paths.cluster_public_ftp_root_path, study_id, "METADATA_REVISIONS"
     )
 
-    file_descriptors: OrderedDict[str, FileDescriptor] = OrderedDict()
     ignore_files = [
         settings.study.audit_files_symbolic_link_name,
         settings.study.internal_files_symbolic_link_name,
     ]
-    study_private_ftp_path_item = pathlib.Path(private_data_files_path)
-    ordered_private_data_files = OrderedDict()
-    if study_private_ftp_path_item.exists():
+    target_root_path = os.path.join(
+        mounted_paths.cluster_study_internal_files_root_path, study_id, "DATA_FILES"
+    )
+    os.makedirs(target_root_path, exist_ok=True)
+    data_file_index = DataFileIndex(target_root_path)
+    recheck_window = settings.study.data_file_index_recheck_window_in_seconds
+    full_scan_interval = settings.study.data_file_index_full_scan_interval_in_seconds
+    if os.path.exists(private_data_files_path):
         current = os.stat(private_data_files_path).st_mode & 0o777
         try:
             if current != Acl.READ_ONLY.value:
                 os.chmod(private_data_files_path, mode=Acl.READ_ONLY.value)
-            file_descriptors = get_ftp_data_files(
-                root_path=private_data_files_path,
-                file_descriptors=file_descriptors,
-                root=study_private_ftp_path_item,
+            stats = data_file_index.update_source(
+                PRIVATE_DATA_FILES,
+                private_data_files_path,
                 recursive=recursive,
                 ignore_files=ignore_files,
+                skip_file=is_metadata_file_name,
+                recheck_window_in_seconds=recheck_window,
+                full_scan_interval_in_seconds=full_scan_interval,
             )
+            logger.info("%s private data file index is updated: %s", study_id, stats)
         finally:
             if current != Acl.READ_ONLY.value:
                 os.chmod(private_data_files_path, mode=current)
-
-        data_files = {}
-        for item, descriptor in file_descriptors.items():
-            if descriptor.name.endswith(".tsv") and descriptor.name.startswith("m_"):
-                continue
-            if (
-                descriptor.name.endswith(".txt")
-                and len(descriptor.name) > 2
-                and descriptor.name[:2] in {"i_", "s_", "a_"}
-            ):
-                continue
-            descriptor.relative_path = f"FILES/{descriptor.relative_path}"
-            descriptor.parent_relative_path = (
-                f"FILES/{descriptor.parent_relative_path}"
-                if descriptor.parent_relative_path
-                else "FILES"
-            )
-            data_files[f"FILES/{item}"] = descriptor.model_dump()
-        keys = list(data_files.keys())
-        keys.sort()
-        ordered_private_data_files = OrderedDict([(x, data_files[x]) for x in keys])
     else:
         raise Exception(f"There is no folder on private ftp {folder_name}")
 
@@ -102,40 +93,31 @@ def index_study_data_files(
         except Exception as ex:
             pass
     if settings.study.public_study_storage_type == "nfs":
-        public_data_files, error_message = get_file_index_from_nfs_storage(
-            study_id=study_id, recursive=recursive, ignore_files=ignore_files
+        error_message = update_file_index_from_nfs_storage(
+            data_file_index,
+            study_id=study_id,
+            recursive=recursive,
+            ignore_files=ignore_files,
         )
     elif settings.study.public_study_storage_type == "object-storage":
         public_data_files, error_message = get_file_index_from_object_storage(
             study_id=study_id, recursive=recursive, ignore_files=ignore_files
         )
+        data_file_index.replace_source(PUBLIC_DATA_FILES, public_data_files)
     else:
         raise Exception(
             f"Invalid public study storage type: {settings.study.public_study_storage_type}"
         )
-    keys = list(public_data_files.keys())
-    keys.sort()
-    ordered_public_data_files = OrderedDict([(x, public_data_files[x]) for x in keys])
-
-    target_root_path = os.path.join(
-        mounted_paths.cluster_study_internal_files_root_path, study_id, "DATA_FILES"
+    index_datetime = current_time().isoformat()
+    data_file_index.save(
+        index_datetime=index_datetime,
+        study_id=study_id,
+        revision_number_on_public_ftp=revision_number_on_public_ftp,
     )
-    os.makedirs(target_root_path, exist_ok=True)
-    target_path = os.path.join(target_root_path, "data_file_index.json")
-    result = {
-        "private_data_files": ordered_private_data_files,
-        "public_data_files": ordered_public_data_files,
-    }
-    result["index_datetime"] = current_time().isoformat()
-    result["study_id"] = study_id
-    result["revision_number_on_public_ftp"] = revision_number_on_public_ftp
-
-    with open(target_path, "w") as f:
-        json.dump(result, f, indent=2)
     return {
         "study_id": study_id,
-        "index_datetime": result["index_datetime"],
-        "target_path": target_path,
+        "index_datetime": index_datetime,
+        "target_path": data_file_index.manifest_path,
     }
 
 
@@ -274,124 +256,36 @@ def search_files_on_object_storage(
     return public_data_files, error_message
 
 
-def get_file_index_from_nfs_storage(
-    study_id: str, recursive: bool = True, ignore_files: Union[None, List[str]] = None
-) -> Dict[str, FileDescriptor]:
+def update_file_index_from_nfs_storage(
+    data_file_index: DataFileIndex,
+    study_id: str,
+    recursive: bool = True,
+    ignore_files: Union[None, List[str]] = None,
+) -> Union[None, str]:
     settings = get_settings()
     mounted_paths = settings.hpc_cluster.datamover.mounted_paths
     public_data_files_path = os.path.join(
         mounted_paths.cluster_public_ftp_root_path, study_id, "FILES"
     )
-    public_data_files_path_item = pathlib.Path(public_data_files_path)
-    public_data_files = {}
-    public_data_file_descriptors: OrderedDict[str, FileDescriptor] = OrderedDict()
     error_message = None
     try:
-        if public_data_files_path_item.exists():
-            public_data_file_descriptors = get_ftp_data_files(
-                root_path=public_data_files_path,
-                file_descriptors=public_data_file_descriptors,
-                root=public_data_files_path_item,
-                recursive=recursive,
-                ignore_files=ignore_files,
-            )
-
-            for item, descriptor in public_data_file_descriptors.items():
-                descriptor.relative_path = f"FILES/{descriptor.relative_path}"
-                descriptor.parent_relative_path = (
-                    f"FILES/{descriptor.parent_relative_path}"
-                    if descriptor.parent_relative_path
-                    else "FILES"
-                )
-                public_data_files[f"FILES/{item}"] = descriptor.model_dump()
+        stats = data_file_index.update_source(
+            PUBLIC_DATA_FILES,
+            public_data_files_path,
+            recursive=recursive,
+            ignore_files=ignore_files,
+            recheck_window_in_seconds=(
+                settings.study.data_file_index_recheck_window_in_seconds
+            ),
+            full_scan_interval_in_seconds=(
+                settings.study.data_file_index_full_scan_interval_in_seconds
+            ),
+        )
+        logger.info("%s public data file index is updated: %s", study_id, stats)
     except Exception as ex:
         error_message = f"Failed to list files from NFS storage: {ex}"
         logger.error(error_message)
-    return public_data_files, error_message
-
-
-def get_ftp_data_files(
-    root_path: str,
-    file_descriptors: Dict[str, FileDescriptor],
-    root: pathlib.Path,
-    recursive=True,
-    ignore_files: Union[None, List[str]] = None,
-):
-    iterator = get_study_folder_files(
-        root_path=root_path,
-        file_descriptors=file_descriptors,
-        root=root,
-        recursive=recursive,
-        ignore_files=ignore_files,
-    )
-
-    list(iterator)
-    return file_descriptors
-
-
-def get_study_folder_files(
-    root_path: str,
-    file_descriptors: Dict[str, FileDescriptor],
-    root: pathlib.Path,
-    recursive: bool = True,
-    ignore_files: Union[None, List[str]] = None,
-):
-    relative_root_path = str(root).replace(f"{root_path}", "").lstrip("/")
-    if str(root_path) != str(root):
-        if not relative_root_path:
-            yield root
-    for item in root.iterdir():
-        relative_path = str(item).replace(f"{root_path}", "").lstrip("/")
-
-        if ignore_files:
-            ignore = [x for x in ignore_files if relative_path.startswith(x)]
-            if ignore:
-                continue
-
-        if item.name.startswith(".nfs"):
-            continue
-        m_time = os.path.getmtime(item)
-
-        parent_relative_path = ""
-        if "/" in relative_path:
-            parent_relative_path = str(pathlib.Path(relative_path).parent)
-
-        if item.is_dir():
-            file_descriptors[relative_path] = FileDescriptor(
-                name=item.name,
-                relative_path=relative_path,
-                is_dir=True,
-                modified_time=m_time,
-                extension=item.suffix,
-                parent_relative_path=parent_relative_path,
-            )
-            if recursive:
-                yield from get_study_folder_files(root_path, file_descriptors, item)
-            else:
-                yield item
-        else:
-            if item.is_symlink() and not item.resolve().exists():
-                continue
-            if not item.exists():
-                continue
-            file_size = 0
-            is_empty = True
-            if not item.is_symlink() or (item.is_symlink() and item.resolve().exists()):
-                file_size = os.path.getsize(item)
-                m_time = os.path.getmtime(item)
-                is_empty = True if file_size == 0 else False
-            file_descriptors[relative_path] = FileDescriptor(
-                name=item.name,
-                relative_path=relative_path,
-                is_dir=False,
-                modified_time=m_time,
-                extension=item.suffix,
-                file_size=file_size,
-                is_empty=is_empty,
-                parent_relative_path=parent_relative_path,
-            )
-
-            yield item
+    return error_message
 
 
 def sync_private_ftp_data_files(study_id: str, obfuscation_code: str) -> SyncTaskResult:
@@ -403,16 +297,14 @@ def sync_private_ftp_data_files(study_id: str, obfuscation_code: str) -> SyncTas
     target_root_path = os.path.join(
         mounted_paths.study_internal_files_root_path, study_id, "DATA_FILES"
     )
-    target_path = os.path.join(target_root_path, "data_file_index.json")
+    data_file_index = DataFileIndex(target_root_path)
     current_datetime_result = redis.get_value(
         f"{study_id}:index_private_ftp_storage:current_datetime"
     )
-    if current_datetime_result and os.path.exists(target_path):
+    if current_datetime_result and data_file_index.exists():
         current_datetime = current_datetime_result.decode()
-        if os.path.exists(target_path):
-            with open(target_path) as f:
-                all_directory_files = json.load(f)
-            index_datetime = all_directory_files["index_datetime"]
+        if data_file_index.exists():
+            index_datetime = data_file_index.manifest["index_datetime"]
             last_index_time = datetime.datetime.fromisoformat(
                 index_datetime
             ).timestamp()
@@ -0,0 +1,23 @@
+import logging
+
+from app.services.cluster.hpc_job_status import (
+    HPC_CLIENT_FACTORIES,
+    get_hpc_job_status_cache,
+)
+from app.tasks.worker import celery
+
+logger = logging.getLogger("wslog")
+
+
+@celery.task(name="app.tasks.system_monitor_tasks.hpc_job_status.refresh_job_status")
+def refresh_job_status():
+    cache = get_hpc_job_status_cache()
+    results = {}
+    for cluster in HPC_CLIENT_FACTORIES:
+        try:
+            snapshot = cache.refresh(cluster)
+            results[cluster] = len(snapshot.jobs)
+        except Exception as ex:
+            logger.error("Job status of %s cluster is not refreshed: %s", cluster, ex)
+            results[cluster] = str(ex)
+    return results
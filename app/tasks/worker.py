@@ -67,6 +67,7 @@ admin_tasks = [
     "app.tasks.system_monitor_tasks.heartbeat",
     "app.tasks.system_monitor_tasks.worker_maintenance",
     "app.tasks.system_monitor_tasks.integration_check",
+    "app.tasks.system_monitor_tasks.hpc_job_status",
 ]
 
 
@@ -78,6 +79,7 @@ celery = Celery(
         "app.tasks.common_tasks.admin_tasks.es_and_db_compound_synchronization",
         "app.tasks.common_tasks.admin_tasks.es_and_db_study_synchronization",
         "app.tasks.common_tasks.admin_tasks.create_jira_tickets",
+        "app.tasks.common_tasks.admin_tasks.maf_stats",
         "app.tasks.common_tasks.report_tasks.eb_eye_search",
         "app.tasks.common_tasks.report_tasks.europe_pmc",
         "app.tasks.common_tasks.curation_tasks.chebi_pipeline",
@@ -96,6 +98,7 @@ celery = Celery(
         "app.tasks.system_monitor_tasks.heartbeat",
         "app.tasks.system_monitor_tasks.worker_maintenance",
         "app.tasks.system_monitor_tasks.integration_check",
+        "app.tasks.system_monitor_tasks.hpc_job_status",
     ],
 )
 logger_filter = CeleryWorkerLogFilter()
@@ -173,6 +176,7 @@ def update_task_was_sent_state(sender=None, headers=None, **kwargs):
 
 service_account_apitoken = get_settings().auth.service_account.api_token
 periodic_task_configuration = get_settings().celery.periodic_task_configuration
+hpc_cluster_configuration = get_settings().hpc_cluster.configuration
 
 celery.conf.beat_schedule = {
     "check_integration": {
@@ -180,6 +184,20 @@ celery.conf.beat_schedule = {
         "schedule": periodic_task_configuration.integration_test_period_in_seconds * 3,
         "options": {"expires": 55},
     },
+    "reindex_pending_studies": {
+        "task": "app.tasks.common_tasks.basic_tasks.elasticsearch.reindex_pending_studies",
+        "schedule": periodic_task_configuration.study_reindex_drain_period_in_seconds,
+        "options": {
+            "expires": periodic_task_configuration.study_reindex_drain_period_in_seconds
+        },
+    },
+    "refresh_hpc_job_status": {
+        "task": "app.tasks.system_monitor_tasks.hpc_job_status.refresh_job_status",
+        "schedule": hpc_cluster_configuration.job_status_snapshot_refresh_period_in_seconds,
+        "options": {
+            "expires": hpc_cluster_configuration.job_status_snapshot_refresh_period_in_seconds
+        },
+    },
 }
 
 
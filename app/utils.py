@@ -16,7 +16,7 @@ def ttl_cache(maxsize: int = 128, typed: bool = False, ttl: int = -1):
     if ttl <= 0:
         ttl = 60 * 60
 
-    hash_gen = _ttl_hash_gen(ttl)
+    start_time = time.time()
 
     def wrapper(func: Callable) -> Callable:
         @lru_cache(maxsize, typed)
@@ -24,7 +24,8 @@ def ttl_cache(maxsize: int = 128, typed: bool = False, ttl: int = -1):
             return func(*args, **kwargs)
 
         def wrapped(*args, **kwargs) -> Any:
-            th = next(hash_gen)
+            # computed on each call without shared state, so it is thread safe
+            th = floor((time.time() - start_time) / ttl)
             return ttl_func(th, *args, **kwargs)
 
         return update_wrapper(wrapped, func)
@@ -32,13 +33,6 @@ def ttl_cache(maxsize: int = 128, typed: bool = False, ttl: int = -1):
     return wrapper
 
 
-def _ttl_hash_gen(seconds: int):
-    start_time = time.time()
-
-    while True:
-        yield floor((time.time() - start_time) / seconds)
-
-
 def current_time(utc_timezone: bool = True) -> datetime.datetime:
     if utc_timezone:
         return datetime.datetime.now(datetime.timezone.utc)
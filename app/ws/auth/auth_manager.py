@@ -1,6 +1,7 @@
 import base64
 import hashlib
 import logging
+import threading
 import uuid
 from datetime import timedelta
 from typing import Any, List, Union
@@ -18,6 +19,7 @@ from app.utils import (
     current_time,
 )
 from app.ws.auth.service import AbstractAuthManager, AuthToken, AuthUser
+from app.ws.auth.token_cache import ValidatedTokenCache
 from app.ws.db.dbmanager import DBManager
 from app.ws.db.models import SimplifiedUserModel
 from app.ws.db.schemes import User
@@ -33,6 +35,54 @@ logger = logging.getLogger("wslog")
 class KeycloakAuthService:
     def __init__(self, config: AuthConfiguration):
         self.config = config
+        self._jwks_client: Union[None, jwt.PyJWKClient] = None
+        self._jwks_client_lock = threading.Lock()
+
+    def get_realm_url(self) -> str:
+        settings = self.config.openid_connect_client
+        return f"{settings.server_url.rstrip('/')}/realms/{settings.realm_name}"
+
+    def get_jwks_client(self) -> jwt.PyJWKClient:
+        """
+        JWKS client of the realm. Key set is cached for jwks_cache_ttl_in_seconds
+        and reloaded earlier if a token is signed with an unknown key id.
+        """
+        if not self._jwks_client:
+            with self._jwks_client_lock:
+                if not self._jwks_client:
+                    settings = self.config.openid_connect_client
+                    jwks_url = settings.jwks_url
+                    if not jwks_url:
+                        jwks_url = (
+                            f"{self.get_realm_url()}/protocol/openid-connect/certs"
+                        )
+                    self._jwks_client = jwt.PyJWKClient(
+                        jwks_url,
+                        cache_jwk_set=True,
+                        lifespan=settings.jwks_cache_ttl_in_seconds,
+                        timeout=settings.jwks_request_timeout_in_seconds,
+                    )
+        return self._jwks_client
+
+    def decode_token(self, token: str) -> dict[str, Any]:
+        """
+        Verify signature, expiry and issuer of the token with realm public keys.
+        """
+        settings = self.config.openid_connect_client
+        issuer = settings.token_issuer or self.get_realm_url()
+        try:
+            signing_key = self.get_jwks_client().get_signing_key_from_jwt(token)
+            return jwt.decode(
+                token,
+                key=signing_key.key,
+                algorithms=[signing_key.algorithm_name],
+                issuer=issuer,
+                options={"verify_aud": False, "require": ["exp", "iat"]},
+            )
+        except jwt.PyJWTError as ex:
+            raise MetabolightsAuthenticationException(
+                http_code=401, message=f"JWT token is not validated: {ex}", exception=ex
+            )
 
     def get_keycloak_openid(self) -> KeycloakOpenID:
         settings = self.config.openid_connect_client
@@ -74,12 +124,17 @@ class KeycloakAuthService:
 
     def set_auth_user_info(
         self, jwt_token: str, user: None | AuthUser = None
+    ) -> AuthUser:
+        options = {"verify_signature": False}
+        payload: dict[str, str | list | dict] = jwt.decode(jwt_token, options=options)
+        return self.create_auth_user(payload, user)
+
+    def create_auth_user(
+        self, payload: dict[str, Any], user: None | AuthUser = None
     ) -> AuthUser:
         if not user:
             user = AuthUser()
 
-        options = {"verify_signature": False}
-        payload: dict[str, str | list | dict] = jwt.decode(jwt_token, options=options)
         orcid = payload.get("orcid", "").replace("https://orcid.org/", "") or ""
         roles = [x for x in payload.get("realm_access", {}).get("roles", [])]
         user.email = payload.get("email")
@@ -96,9 +151,12 @@ class KeycloakAuthService:
 
     def validate_token(self, jwt: str) -> AuthUser:
         try:
-            auth_server: KeycloakOpenID = self.get_keycloak_openid()
-            auth_server.userinfo(jwt)
-            auth_user = self.set_auth_user_info(jwt)
+            if self.config.openid_connect_client.verify_token_signature_locally:
+                auth_user = self.create_auth_user(self.decode_token(jwt))
+            else:
+                auth_server: KeycloakOpenID = self.get_keycloak_openid()
+                auth_server.userinfo(jwt)
+                auth_user = self.set_auth_user_info(jwt)
 
             if not auth_user.email_verified:
                 raise MetabolightsAuthenticationException(
@@ -122,6 +180,10 @@ class AuthenticationManager(AbstractAuthManager):
         else:
             self.settings: AuthConfiguration = settings
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.validated_token_cache = ValidatedTokenCache(
+            max_entries=self.settings.validated_token_cache_max_entries,
+            ttl_in_seconds=self.settings.validated_token_cache_ttl_in_seconds,
+        )
         self.external_auth_service = None
         if self.settings.active_authentication_service == "keycloak":
             self.external_auth_service = KeycloakAuthService(self.settings)
@@ -411,6 +473,25 @@ class AuthenticationManager(AbstractAuthManager):
         issuer_name: Union[None, str] = None,
         db_session=None,
     ):
+        cache_key = self.validated_token_cache.get_key(token, audience, issuer_name)
+        user: Union[None, SimplifiedUserModel] = self.validated_token_cache.get(
+            cache_key
+        )
+        if not user:
+            user = self._validate_oauth2_token(
+                token, audience=audience, issuer_name=issuer_name, db_session=db_session
+            )
+            payload = jwt.decode(token, options={"verify_signature": False})
+            self.validated_token_cache.put(cache_key, payload.get("exp"), user)
+        return user.model_copy(deep=True)
+
+    def _validate_oauth2_token(
+        self,
+        token: str,
+        audience: Union[None, str] = None,
+        issuer_name: Union[None, str] = None,
+        db_session=None,
+    ) -> SimplifiedUserModel:
         if self.external_auth_service:
             auth_user = self.external_auth_service.validate_token(token)
 
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+import time
+from typing import Any, Union
+
+from cachetools import TLRUCache
+
+
+class ValidatedTokenCache(object):
+    """
+    Bounded cache of validated tokens and their principals.
+
+    Keys are sha256 digests of tokens. An entry expires at the token expiry time
+    or after ttl_in_seconds, whichever is earlier, so a principal is never served
+    for an expired token.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_in_seconds: int = 60):
+        self.max_entries = max_entries
+        self.ttl_in_seconds = ttl_in_seconds
+        self.enabled = max_entries > 0 and ttl_in_seconds > 0
+        self.cache = TLRUCache(
+            maxsize=max(max_entries, 1), ttu=self._get_expiry_time, timer=time.time
+        )
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_expiry_time(self, key, value, now: float) -> float:
+        expires_at, _ = value
+        return min(expires_at, now + self.ttl_in_seconds)
+
+    @staticmethod
+    def get_key(token: str, *args) -> str:
+        content = "\t".join([token] + [str(x) for x in args])
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Union[None, Any]:
+        if not self.enabled:
+            return None
+        with self.lock:
+            item = self.cache.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return item[1]
+
+    def put(self, key: str, expires_at: Union[None, int, float], value: Any):
+        """
+        :param expires_at: token expiry time (epoch seconds). If it is None,
+            only ttl_in_seconds is used.
+        """
+        if not self.enabled or value is None:
+            return
+        if expires_at is None:
+            expires_at = float("inf")
+        if expires_at <= time.time():
+            return
+        with self.lock:
+            self.cache[key] = (expires_at, value)
+
+    def invalidate(self, key: str):
+        with self.lock:
+            self.cache.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.cache),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,297 @@
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache, update_wrapper
+from typing import Any, Callable, Dict, Tuple, Union
+
+from app.config import get_settings
+from app.config.model.chebi import (
+    CompoundLookupProviderSettings,
+    CompoundLookupSettings,
+)
+
+logger = logging.getLogger("wslog")
+
+
+class CompoundLookupCache(object):
+    """
+    Persistent lookup cache of compound resolution services (PubChem, Cactus,
+    OPSIN, etc.). Results are stored in a SQLite file with an expiration time,
+    so pipeline re-runs and other studies reuse them.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        dirname = os.path.dirname(file_path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            file_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS compound_lookup "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "DELETE FROM compound_lookup WHERE expires_at <= ?", (time.time(),)
+            )
+
+    def get(self, key: str, now: Union[None, float] = None) -> Tuple[bool, Any]:
+        now = time.time() if now is None else now
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value FROM compound_lookup WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+        if not row:
+            return False, None
+        return True, json.loads(row[0])
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_in_seconds: int,
+        now: Union[None, float] = None,
+    ):
+        now = time.time() if now is None else now
+        content = json.dumps(value, default=str)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO compound_lookup (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, content, now + ttl_in_seconds),
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class ProviderRateLimiter(object):
+    """
+    Limits concurrent requests and request start rate of a provider.
+    """
+
+    def __init__(self, requests_per_second: float, max_concurrency: int):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0
+        self.semaphore = threading.BoundedSemaphore(max(max_concurrency, 1))
+        self.lock = threading.Lock()
+        self.next_start_time = 0.0
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        with self.lock:
+            now = time.monotonic()
+            start_time = max(now, self.next_start_time)
+            self.next_start_time = start_time + self.interval
+        if start_time > now:
+            time.sleep(start_time - now)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.semaphore.release()
+
+
+_call_state = threading.local()
+
+
+def set_lookup_error():
+    """
+    Mark the current provider call as failed. Providers return empty results
+    on errors, and these results are not cached.
+    """
+    _call_state.failed = True
+
+
+def is_empty_result(value: Any) -> bool:
+    if isinstance(value, (tuple, list)):
+        return not any(value)
+    return not value
+
+
+class CompoundLookupEngine(object):
+    """
+    Runs provider requests in a shared worker pool with per-provider rate limits
+    and deadlines. Identical requests share one provider call while it is in
+    progress, and results are stored in the lookup cache.
+    """
+
+    def __init__(
+        self,
+        cache: Union[None, CompoundLookupCache],
+        settings: CompoundLookupSettings,
+    ):
+        self.cache = cache
+        self.settings = settings
+        self.providers: Dict[str, CompoundLookupProviderSettings] = dict(
+            settings.providers
+        )
+        self.limiters: Dict[str, ProviderRateLimiter] = {}
+        self.in_flight: Dict[str, Future] = {}
+        self.lock = threading.RLock()
+        max_workers = sum(x.max_concurrency for x in self.providers.values())
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(max_workers, 1), thread_name_prefix="compound-lookup"
+        )
+        self.stats = {
+            "lookups": 0,
+            "cache_hits": 0,
+            "shared_lookups": 0,
+            "provider_calls": 0,
+            "provider_errors": 0,
+            "deadline_exceeded": 0,
+        }
+
+    def get_provider_settings(self, provider: str) -> CompoundLookupProviderSettings:
+        with self.lock:
+            if provider not in self.providers:
+                self.providers[provider] = CompoundLookupProviderSettings()
+            return self.providers[provider]
+
+    def get_rate_limiter(self, provider: str) -> ProviderRateLimiter:
+        with self.lock:
+            if provider not in self.limiters:
+                settings = self.get_provider_settings(provider)
+                self.limiters[provider] = ProviderRateLimiter(
+                    settings.requests_per_second, settings.max_concurrency
+                )
+            return self.limiters[provider]
+
+    def _count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def lookup(
+        self, provider: str, func: Callable, args: Tuple, empty_result: Any = None
+    ) -> Any:
+        """
+        Return cached result or call the provider. If the provider does not
+        respond before its deadline, empty_result is returned and the result
+        is stored in the cache when the call is completed.
+        """
+        key = f"{provider}:{func.__name__}:{json.dumps(args, default=str)}"
+        self._count("lookups")
+        found, value = self._get_cached(key, empty_result)
+        if found:
+            return value
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future:
+                self.stats["shared_lookups"] += 1
+            else:
+                # the call may be completed after the first cache read. Its
+                # result is cached before the key is removed from in_flight.
+                found, value = self._get_cached(key, empty_result)
+                if found:
+                    return value
+                future = self.executor.submit(self._call, provider, key, func, args)
+                self.in_flight[key] = future
+                future.add_done_callback(lambda _: self._remove_in_flight(key))
+        deadline = self.get_provider_settings(provider).deadline_in_seconds
+        try:
+            return future.result(timeout=deadline)
+        except FutureTimeoutError:
+            self._count("deadline_exceeded")
+            logger.warning(
+                "%s lookup is not completed in %s seconds: %s", provider, deadline, key
+            )
+            return empty_result
+
+    def _get_cached(self, key: str, empty_result: Any) -> Tuple[bool, Any]:
+        if not self.cache:
+            return False, None
+        found, value = self.cache.get(key)
+        if not found:
+            return False, None
+        self._count("cache_hits")
+        return True, tuple(value) if isinstance(empty_result, tuple) else value
+
+    def _remove_in_flight(self, key: str):
+        with self.lock:
+            self.in_flight.pop(key, None)
+
+    def _call(self, provider: str, key: str, func: Callable, args: Tuple) -> Any:
+        _call_state.failed = False
+        with self.get_rate_limiter(provider):
+            result = func(*args)
+        failed = _call_state.failed
+        self._count("provider_calls")
+        if failed:
+            self._count("provider_errors")
+        elif self.cache:
+            settings = self.get_provider_settings(provider)
+            ttl = settings.ttl_in_seconds
+            if is_empty_result(result):
+                ttl = settings.empty_result_ttl_in_seconds
+            if ttl > 0:
+                try:
+                    self.cache.set(key, result, ttl)
+                except Exception as ex:
+                    logger.warning("Compound lookup result is not cached: %s", ex)
+        return result
+
+
+@lru_cache(1)
+def get_compound_lookup_engine() -> Union[None, CompoundLookupEngine]:
+    settings = get_settings()
+    lookup_settings = settings.chebi.pipeline.compound_lookup
+    if not lookup_settings.enabled:
+        return None
+    cache_file_path = lookup_settings.cache_file_path
+    if not cache_file_path:
+        cache_file_path = os.path.join(
+            settings.server.temp_directory_path,
+            "chebi_pipeline",
+            "compound_lookup_cache.sqlite",
+        )
+    cache = None
+    try:
+        cache = CompoundLookupCache(cache_file_path)
+    except Exception as ex:
+        logger.warning("Compound lookup cache %s is not used: %s", cache_file_path, ex)
+    return CompoundLookupEngine(cache, lookup_settings)
+
+
+def _reset_after_fork():
+    # worker threads and database connection are not shared with child processes
+    get_compound_lookup_engine.cache_clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def compound_lookup(provider: str, empty_result: Any = None):
+    """
+    Send calls of a compound resolution function through the lookup engine.
+    Arguments are bound to the function signature, so positional and keyword
+    calls share cache entries.
+    """
+
+    def wrapper(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def wrapped(*args, **kwargs) -> Any:
+            engine = get_compound_lookup_engine()
+            if not engine:
+                return func(*args, **kwargs)
+            bound_args = signature.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            return engine.lookup(provider, func, bound_args.args, empty_result)
+
+        return update_wrapper(wrapped, func)
+
+    return wrapper
@@ -1,5 +1,7 @@
 import logging
-import math
+import os
+import pickle
+from typing import Dict, List, Union
 
 import numpy as np
 import pandas as pd
@@ -22,6 +24,10 @@ class CuratedMetaboliteTable(object):
     SMILES_INDEX = CuratedMetabolitesFileColumn.SMILES.value
     INCHI_INDEX = CuratedMetabolitesFileColumn.INCHI.value
 
+    INDEXED_COLUMNS = (COMPOUND_INDEX, INCHI_INDEX, SMILES_INDEX)
+    INDEX_FILE_SUFFIX = ".index.pickle"
+    INDEX_FILE_VERSION = 1
+
     EMPTY_LIST = []
     _instance = None
 
@@ -37,80 +43,139 @@ class CuratedMetaboliteTable(object):
             self.file_path = (
                 get_settings().chebi.pipeline.curated_metabolite_list_file_location
             )
-        self.df = None
+        self.rows: Union[None, List[list]] = None
         self.initialized = False
         self.priority_row_set = set()
+        self.indexes: Dict[int, Dict[str, List[int]]] = {}
+
+    @property
+    def index_file_path(self) -> str:
+        return f"{self.file_path}{self.INDEX_FILE_SUFFIX}"
+
+    @staticmethod
+    def normalize_value(value: str) -> str:
+        return remove_few_characters_for_consistency(value).lower()
 
     def initialize_df(self):
         if self.initialized:
             return
         try:
-            self.df: pd.DataFrame = pd.read_table(
-                self.file_path, engine="python", header=None
-            )
-            self.df[self.COMPOUND_INDEX] = self.df[self.COMPOUND_INDEX].str.replace(
-                '"', "", regex=True
-            )
+            stat = os.stat(self.file_path)
+            if not self.load_index_file(stat):
+                self.load_table()
+                for column_index in self.INDEXED_COLUMNS:
+                    self.build_column_index(column_index)
+                self.save_index_file(stat)
             logger.info(
-                f"Curated table is loaded. Current row count is {len(self.df.index)}."
+                f"Curated table is loaded. Current row count is {len(self.rows)}."
             )
-            priority_row_list = self.df.index[
-                self.df[self.PRIORITY_INDEX] >= 1
-            ].to_list()
-            self.priority_row_set = set(priority_row_list)
-            self.df = self.df.replace(np.nan, "", regex=True)
             self.initialized = True
         except Exception as e:
             logger.warning(
                 f"Error while reading curated metabolite table file {self.file_path}."
             )
 
+    def load_table(self):
+        try:
+            df: pd.DataFrame = pd.read_table(self.file_path, header=None)
+        except pd.errors.ParserError:
+            df: pd.DataFrame = pd.read_table(
+                self.file_path, engine="python", header=None
+            )
+        df[self.COMPOUND_INDEX] = df[self.COMPOUND_INDEX].str.replace(
+            '"', "", regex=True
+        )
+        priority_row_list = df.index[df[self.PRIORITY_INDEX] >= 1].to_list()
+        self.priority_row_set = set(priority_row_list)
+        df = df.replace(np.nan, "", regex=True)
+        self.rows = df.astype(object).values.tolist()
+        self.indexes = {}
+
+    def build_column_index(self, column_index: int) -> Dict[str, List[int]]:
+        """
+        Map normalized values (and each synonym of "|" separated values) of a column
+        to row indices in ascending order.
+        """
+        index: Dict[str, List[int]] = {}
+        for row_index, row in enumerate(self.rows):
+            data = row[column_index] if column_index < len(row) else None
+            if not data or not isinstance(data, str):
+                continue
+            if "|" in data:
+                keys = {self.normalize_value(x) for x in safe_split_string(data)}
+            else:
+                keys = {self.normalize_value(data)}
+            for key in keys:
+                index.setdefault(key, []).append(row_index)
+        self.indexes[column_index] = index
+        return index
+
+    def load_index_file(self, stat: os.stat_result) -> bool:
+        if not os.path.exists(self.index_file_path):
+            return False
+        try:
+            with open(self.index_file_path, "rb") as f:
+                content = pickle.load(f)
+            if (
+                content.get("version") != self.INDEX_FILE_VERSION
+                or content.get("source_mtime_ns") != stat.st_mtime_ns
+                or content.get("source_size") != stat.st_size
+            ):
+                return False
+            self.rows = content["rows"]
+            self.priority_row_set = content["priority_rows"]
+            self.indexes = content["indexes"]
+            return True
+        except Exception as ex:
+            logger.warning(f"Curated table index file is not loaded: {str(ex)}")
+            return False
+
+    def save_index_file(self, stat: os.stat_result):
+        content = {
+            "version": self.INDEX_FILE_VERSION,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "source_size": stat.st_size,
+            "rows": self.rows,
+            "priority_rows": self.priority_row_set,
+            "indexes": self.indexes,
+        }
+        temp_file_path = f"{self.index_file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file_path, "wb") as f:
+                pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file_path, self.index_file_path)
+        except Exception as ex:
+            logger.warning(f"Curated table index file is not saved: {str(ex)}")
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
     def get_matching_rows(self, column_index: int, value: str):
-        if self.df is None:
+        if self.rows is None:
             return self.EMPTY_LIST
         self.initialize_df()
 
         input_value = "".join(value.split())
-        input_value = remove_few_characters_for_consistency(input_value).lower()
-        search_column = self.df[column_index]
-
-        def match_row(data):
-            if not data or (isinstance(data, float) and math.isnan(data)):
-                return np.NaN
+        input_value = self.normalize_value(input_value)
+        index = self.indexes.get(column_index)
+        if index is None:
+            index = self.build_column_index(column_index)
 
-            if "|" in data:
-                splitted_data = safe_split_string(data)
-                for item in splitted_data:
-                    trimmed_item = remove_few_characters_for_consistency(item).lower()
-                    if trimmed_item == input_value:
-                        return data
-            else:
-                trimmed_data = remove_few_characters_for_consistency(data).lower()
-                if trimmed_data == input_value:
-                    return data
-            return np.NaN
-
-        result = search_column.apply(match_row).dropna()
-        result_list = result.index.to_list()
+        result_list = index.get(input_value)
         if not result_list:
             return self.EMPTY_LIST
         if len(result_list) == 1:
-            return self.df.loc[result_list[0]].to_list()
+            return list(self.rows[result_list[0]])
 
         same_name_match = False
         same_name_index = result_list[0]
-        for item in result.items():
-            if item[1] == input_value:
-                same_name_index = item[0]
+        for row_index in result_list:
+            if self.rows[row_index][column_index] == input_value:
+                same_name_index = row_index
                 same_name_match = True
         if same_name_match:
-            return self.df.loc[same_name_index].to_list()
-
-        result_match_index_set = set(result_list)
-        priorities = result_match_index_set.intersection(self.priority_row_set)
-        if priorities:
-            if same_name_index not in priorities:
-                same_name_index = next(iter(priorities))
-            return self.df.loc[same_name_index].to_list()
-        else:
-            return self.df.loc[same_name_index].to_list()
+            return list(self.rows[same_name_index])
+
+        priorities = [x for x in result_list if x in self.priority_row_set]
+        if priorities and same_name_index not in priorities:
+            same_name_index = priorities[0]
+        return list(self.rows[same_name_index])
@@ -9,7 +9,9 @@ import sys
 import time
 import urllib.parse
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Dict, List
 
 import cirpy
 import ctfile
@@ -38,6 +40,11 @@ from app.ws.chebi.chebi_utils import (
     get_all_ontology_children_in_path,
     get_complete_chebi_entity_v2,
 )
+from app.ws.chebi.compound_lookup import (
+    compound_lookup,
+    get_compound_lookup_engine,
+    set_lookup_error,
+)
 from app.ws.chebi.search.curated_metabolite_table import CuratedMetaboliteTable
 from app.ws.chebi.settings import get_chebi_ws_settings
 from app.ws.cluster_jobs import submit_job
@@ -754,6 +761,119 @@ def get_cas_from_synonyms(synonyms):
             return i[4:]
 
 
+def get_search_compound_name(comp_name: str) -> str:
+    comp_name = comp_name.strip()  # Remove leading/trailing spaces before we search
+    comp_name = comp_name.replace("Î´", "delta").replace("?", "").replace("*", "")
+    if "[" in comp_name:
+        comp_name = comp_name.replace("[U]", "").replace("[S]", "")
+        comp_name = re.sub(re.escape(r"[iso\d]"), "", comp_name)
+    return comp_name
+
+
+def metabolights_name_search(comp_name: str):
+    # This is the standard MetaboLights aka Plugin search
+    search_res = wsc.get_maf_search("name", comp_name)
+    if not search_res:
+        search_res = wsc.get_maf_search("name", clean_comp_name(comp_name))
+    return search_res
+
+
+def get_compound_names_to_search(short_df, exiting_pubchem_file) -> List[str]:
+    comp_names = []
+    for row in short_df.itertuples(index=False):
+        comp_name = safe_str(row[1])
+        if exiting_pubchem_file:
+            if str(row[3]).rstrip(".0") == "1":
+                continue
+            alt_name = str(row[2])
+            if len(alt_name) > 0:
+                comp_name = alt_name
+        if comp_name and check_if_unknown(comp_name):
+            comp_names.append(get_search_compound_name(comp_name))
+    return comp_names
+
+
+def resolve_compound_name(
+    comp_name: str, name_search: Callable = metabolights_name_search
+):
+    """
+    Send external service requests of a compound name in the same order as
+    search_and_update_maf, so the results are in the compound lookup cache
+    when the MAF row is updated. Returns the MetaboLights search result.
+    """
+    search_res = name_search(comp_name)
+    if search_res and search_res["content"]:
+        database_identifier = search_res["content"][0]["databaseId"]
+        if database_identifier and database_identifier.startswith("CHEBI:"):
+            return search_res
+
+    pc_inchi_key = pubchem_search(
+        comp_name, search_type="name", search_category="compound"
+    )[2]
+    cactus_stdinchikey = cactus_search(comp_name, "stdinchikey")
+    opsin_stdinchikey = opsin_search(comp_name, "stdinchikey")
+    for search_type in ("smiles", "stdinchi", "names"):
+        cactus_search(comp_name, search_type)
+    for search_type in ("smiles", "stdinchi"):
+        opsin_search(comp_name, search_type)
+    get_csid(pc_inchi_key if pc_inchi_key else cactus_stdinchikey)
+
+    final_inchi_key, _ = get_ranked_values(
+        pc_inchi_key, cactus_stdinchikey, opsin_stdinchikey, None
+    )
+    if final_inchi_key:
+        get_csid(final_inchi_key)
+        processUniChemResponseAll(final_inchi_key)
+        processUniChemResponse(final_inchi_key)
+        get_dime_db(final_inchi_key)
+    return search_res
+
+
+def prefetch_compound_lookups(
+    comp_names: List[str], name_search: Callable = metabolights_name_search
+) -> Dict[str, Any]:
+    """
+    Resolve distinct compound names concurrently. Returns MetaboLights search
+    results of the compound names.
+    """
+    unique_names = list(dict.fromkeys(x for x in comp_names if x))
+    if not unique_names or not get_compound_lookup_engine():
+        return {}
+    max_workers = get_settings().chebi.pipeline.compound_lookup.max_workers
+    max_workers = min(max(max_workers, 1), len(unique_names))
+    print_log(
+        f"Resolving {len(unique_names)} distinct compound names with {max_workers} workers"
+    )
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            x: executor.submit(resolve_compound_name, x, name_search)
+            for x in unique_names
+        }
+        for comp_name, future in futures.items():
+            try:
+                results[comp_name] = future.result()
+            except Exception as ex:
+                print_log(f"    -- Compound name '{comp_name}' is not resolved: {ex}")
+    return results
+
+
+def print_compound_lookup_stats(lookup_engine, initial_stats, rows, start_time):
+    elapsed_time = max(time.time() - start_time, 0.001)
+    print_log(f"Rows per minute: {round(rows * 60 / elapsed_time, 2)}")
+    if not lookup_engine:
+        return
+    stats = lookup_engine.get_stats()
+    stats = {x: stats[x] - initial_stats.get(x, 0) for x in stats}
+    hit_ratio = stats["cache_hits"] / stats["lookups"] if stats["lookups"] else 0
+    print_log(
+        f"Compound lookups: {stats['lookups']}, cache hit ratio: {hit_ratio:.2%}, "
+        f"provider calls: {stats['provider_calls']}, "
+        f"provider errors: {stats['provider_errors']}, "
+        f"deadline exceeded: {stats['deadline_exceeded']}"
+    )
+
+
 def search_and_update_maf(
     study_id: str,
     study_metadata_location: str,
@@ -890,6 +1010,14 @@ def search_and_update_maf(
     else:
         short_df = maf_df[[database_identifier_column, maf_compound_name_column]]
 
+    # Distinct compound names are resolved concurrently. Rows are updated in
+    # order below and they read provider results from the lookup cache.
+    lookup_engine = get_compound_lookup_engine()
+    initial_lookup_stats = lookup_engine.get_stats() if lookup_engine else {}
+    maf_search_results = prefetch_compound_lookups(
+        get_compound_names_to_search(short_df, exiting_pubchem_file)
+    )
+
     # Search using the compound name column
     for idx, row in short_df.iterrows():
         database_id = row[0]
@@ -987,21 +1115,12 @@ def search_and_update_maf(
             else:
                 start_time = time.time()
                 chebi_found = False
-                comp_name = (
-                    comp_name.strip()
-                )  # Remove leading/trailing spaces before we search
-                comp_name = (
-                    comp_name.replace("Î´", "delta").replace("?", "").replace("*", "")
-                )
-                if "[" in comp_name:
-                    comp_name = comp_name.replace("[U]", "").replace("[S]", "")
-                    comp_name = re.sub(re.escape(r"[iso\d]"), "", comp_name)
+                comp_name = get_search_compound_name(comp_name)
 
-                search_res = wsc.get_maf_search(
-                    "name", comp_name
-                )  # This is the standard MetaboLights aka Plugin search
-                if not search_res:
-                    search_res = wsc.get_maf_search("name", clean_comp_name(comp_name))
+                if comp_name in maf_search_results:
+                    search_res = maf_search_results[comp_name]
+                else:
+                    search_res = metabolights_name_search(comp_name)
 
                 if search_res and search_res["content"]:
                     result = search_res["content"][0]
@@ -1557,6 +1676,9 @@ def search_and_update_maf(
             print_log("------------------------------------")
         row_idx += 1
 
+    print_compound_lookup_stats(
+        lookup_engine, initial_lookup_stats, new_maf_len, first_start_time
+    )
     pubchem_df = re_sort_pubchem_file(pubchem_df)
 
     # Update the submitted MAF in the chebi sub-folder, before adding species
@@ -2351,6 +2473,7 @@ def check_classyfire_api():
     return status
 
 
+@compound_lookup("classyfire")
 def classyfire(inchi):
     print_log("    -- Starting querying ClassyFire")
     url = get_settings().chebi.pipeline.search_services.classyfire_url
@@ -2367,6 +2490,7 @@ def classyfire(inchi):
         query_id = r.json()["id"]
         print_log("    -- Got ClassyFire query id: " + str(query_id))
     except Exception as e:
+        set_lookup_error()
         print_log("    -- Error querying ClassyFire: " + str(e), mode="error")
     return query_id
 
@@ -2601,7 +2725,7 @@ def direct_chebi_search(
 
 def check_chemspider_api(inchikey="BSYNRYMUTXBXSQ-UHFFFAOYSA-N"):
     chemspider_search_status = "Failure"
-    csurl_base = "http://www.chemspider.com/InChI.asmx/InChIKeyToCSID?inchi_key="
+    csurl_base = get_settings().chebi.pipeline.search_services.chemspider_inchikey_url
     try:
         url = csurl_base + inchikey
         print_log("Checking Chemspider API..   ", mode="info")
@@ -2613,9 +2737,10 @@ def check_chemspider_api(inchikey="BSYNRYMUTXBXSQ-UHFFFAOYSA-N"):
     return chemspider_search_status
 
 
+@compound_lookup("chemspider", empty_result="")
 def get_csid(inchikey):
     csid = ""
-    csurl_base = "http://www.chemspider.com/InChI.asmx/InChIKeyToCSID?inchi_key="
+    csurl_base = get_settings().chebi.pipeline.search_services.chemspider_inchikey_url
     try:
         if inchikey:
             url1 = csurl_base + inchikey
@@ -2642,6 +2767,7 @@ def get_csid(inchikey):
                         )
                         return ""
     except Exception as e:
+        set_lookup_error()
         print_log("Chemspider API search failure.. ", mode="info")
     return csid
 
@@ -2760,6 +2886,7 @@ def check_opsin_api(comp_name):
     return status
 
 
+@compound_lookup("opsin", empty_result="")
 def opsin_search(comp_name, req_type):
     result = ""
     try:
@@ -2774,6 +2901,7 @@ def opsin_search(comp_name, req_type):
             except Exception as ex:
                 logger.warning(f"Invalid result from {url}  {str(ex)}")
     except Exception as e:
+        set_lookup_error()
         print_log("OPSIN Search failed ..", mode="info")
     return result
 
@@ -2789,6 +2917,7 @@ def check_cactus_api(comp_name, search_type="stdinchikey"):
     return status
 
 
+@compound_lookup("cactus")
 def cactus_search(comp_name, search_type):
     result = None
     if comp_name is None:
@@ -2799,6 +2928,7 @@ def cactus_search(comp_name, search_type):
         result = cirpy.resolve(comp_name, search_type)
         synonyms = ""
     except Exception as e:
+        set_lookup_error()
         print_log("    -- ERROR: Cactus search failed! " + str(e), mode="error")
         return result
 
@@ -2913,6 +3043,7 @@ def is_correct_int(num, length):
     return False
 
 
+@compound_lookup("pubchem", empty_result=("",) * 9)
 def pubchem_search(comp_name, search_type="name", search_category="compound"):
     iupac = ""
     inchi = ""
@@ -2973,6 +3104,7 @@ def pubchem_search(comp_name, search_type="name", search_category="compound"):
                 + "'"
             )  # Nothing was found
         except Exception as e:
+            set_lookup_error()
             print_log(str(e))
 
         if compound:
@@ -3019,6 +3151,7 @@ def pubchem_search(comp_name, search_type="name", search_category="compound"):
                 + "'"
             )
     except Exception as error:
+        set_lookup_error()
         print_log(
             "    -- Unable to search PubChem for '"
             + search_category
@@ -3146,6 +3279,7 @@ def processDbNames(name: str = None):
     return name
 
 
+@compound_lookup("unichem", empty_result="")
 def processUniChemResponseAll(inchi_key):
     print_log(" Querying Unichem URL with inchi key - " + inchi_key)
     unichem_url = get_settings().chebi.pipeline.search_services.unichem_url
@@ -3164,11 +3298,13 @@ def processUniChemResponseAll(inchi_key):
             unichem_id = unichem_id.rstrip(";")
             return unichem_id
     except Exception as e:
+        set_lookup_error()
         print_log(f" UNICHEM API failed; exception - {e}", mode="error")
         print_log(f" UNICHEM failed URL - {unichem_url}", mode="info")
     return ""
 
 
+@compound_lookup("unichem", empty_result="")
 def processUniChemResponse(inchi_key):
     print_log(" Querying Unichem URL with inchi key - " + inchi_key)
     unichem_url = get_settings().chebi.pipeline.search_services.unichem_url
@@ -3222,6 +3358,7 @@ def processUniChemResponse(inchi_key):
             unichem_id = unichem_id.rstrip(";")
             return unichem_id
     except Exception as e:
+        set_lookup_error()
         print_log(" UNICHEM API failed; exception ", mode="info")
         print_log(f" UNICHEM failed URL - {unichem_url}", mode="info")
     return ""
@@ -3258,6 +3395,7 @@ def check_dime_db_api(inchi_key="BSYNRYMUTXBXSQ-UHFFFAOYSA-N"):
     return dimedb_search_status
 
 
+@compound_lookup("dime", empty_result="")
 def get_dime_db(inchi_key):
     print_log(" Querying DIME DB for inchi key - " + inchi_key)
     dime_url = get_settings().chebi.pipeline.search_services.dime_url
@@ -3312,6 +3450,7 @@ def get_dime_db(inchi_key):
                     f"Invalid result from {dime_url} for input: {inchi_key}  {str(ex)}"
                 )
     except Exception as e:
+        set_lookup_error()
         print_log(" DimeDB API is Error !")
 
     return dime_db_ids
@@ -26,6 +26,7 @@ from flask_restful_swagger import swagger
 
 from app.config import get_settings
 from app.services.cluster.hpc_client import HpcJob, SubmittedJobResult
+from app.services.cluster.hpc_job_status import get_hpc_job_status_cache
 from app.services.cluster.hpc_utils import (
     get_new_hpc_compute_client,
     get_new_hpc_datamover_client,
@@ -65,8 +66,10 @@ def submit_job(
         queue = settings.hpc_cluster.compute.default_queue
 
     if queue == settings.hpc_cluster.datamover.default_queue:
+        cluster = "datamover"
         client = get_new_hpc_datamover_client()
     else:
+        cluster = "compute"
         client = get_new_hpc_compute_client()
     if email:
         if account is None:
@@ -97,6 +100,16 @@ def submit_job(
         queue=queue,
     )
     if result.job_ids:
+        get_hpc_job_status_cache().add_submitted_job(
+            cluster,
+            HpcJob(
+                job_id=str(result.job_ids[0]),
+                status="PENDING",
+                name=job_name,
+                submit_time=int(current_time().timestamp()),
+                queue=queue,
+            ),
+        )
         return (
             True,
             f"Job submitted successfully. Job id {result.job_ids[0]}",
@@ -114,18 +127,18 @@ def submit_job(
         )
 
 
-def list_jobs(queue=None, job_name=None):
+def list_jobs(queue=None, job_name=None) -> List[HpcJob]:
+    """
+    Return jobs from the shared job status snapshot of the cluster. The snapshot
+    is refreshed periodically, so status checks do not connect to the cluster.
+    """
     settings = get_settings()
 
     if queue == settings.hpc_cluster.datamover.default_queue:
-        client = get_new_hpc_datamover_client()
+        cluster = "datamover"
     else:
-        client = get_new_hpc_compute_client()
-    jobs: List[HpcJob] = client.get_job_status()
-    if not job_name:
-        return jobs
-
-    return [job for job in jobs if job_name == job.name]
+        cluster = "compute"
+    return get_hpc_job_status_cache().get_jobs(cluster, job_name)
 
 
 def kill_job(queue=None, job_id=None):
@@ -331,12 +344,8 @@ class LsfUtils(Resource):
             queue = request.args.get("queue")
             job_name = request.args.get("job_name")
 
-        status, message, job_out, job_err = list_jobs(queue, job_name)
-
-        if status:
-            return {"message": message, "out": job_out, "error": job_err}
-        else:
-            return {"message": message, "out": job_out, "error": job_err}
+        jobs = list_jobs(queue, job_name)
+        return {"jobs": [job.model_dump() for job in jobs]}
 
     @swagger.operation(
         summary="Submit a new cluster job on Codon (curator only)",
@@ -18,7 +18,6 @@
 import datetime
 import logging
 import os
-import re
 import traceback
 import uuid
 from contextlib import contextmanager
@@ -37,6 +36,7 @@ from app.ws.db import get_db_connection_pool
 from app.ws.db.types import CurationRequest, StudyCategory, UserRole, UserStatus
 from app.ws.settings.utils import get_study_settings
 from app.ws.study import identifier_service
+from app.ws.study.study_title_index import get_study_title_index
 from app.ws.utils import (
     check_user_token,
     fixUserDictKeys,
@@ -140,9 +140,18 @@ query_studies_user = """
     s.mhd_model_version,
     s.dataset_license,
     s.template_version,
-    s.created_at
-    from studies s, users u, study_user su
-    where s.id = su.studyid and su.userid = u.id and u.apitoken = %(apitoken)s;
+    s.created_at,
+    sr.revision_comment,
+    sr.status,
+    sr.task_message,
+    sr.mhd_share_status
+    from studies s
+    join study_user su on s.id = su.studyid
+    join users u on su.userid = u.id
+    left join study_revisions sr
+        on sr.accession_number = s.acc and sr.revision_number = s.revision_number
+    where u.apitoken = %(apitoken)s
+    order by s.id
     """
 
 query_provisional_study_ids_for_user = """
@@ -404,170 +413,92 @@ def get_user(username):
         )
 
 
-def get_all_private_studies_for_user(user_token):
+def get_user_studies(user_token, offset: int = 0, limit: Union[None, int] = None):
     val_query_params(user_token)
-
+    query = query_studies_user.rstrip().rstrip(";")
+    params = {"apitoken": user_token, "offset": max(offset or 0, 0)}
+    if limit is not None:
+        query += " limit %(limit)s"
+        params["limit"] = max(limit, 0)
+    query += " offset %(offset)s;"
     with get_connection() as (conn, cursor):
-        cursor.execute(query_studies_user, {"apitoken": user_token})
-        study_list = cursor.fetchall()
-    settings = get_study_settings()
-    study_location = settings.mounted_paths.study_metadata_files_root_path
-    file_name = settings.investigation_file_name
-    isa_title = "Study Title"
-    isa_descr = "Study Description"
+        cursor.execute(query, params)
+        return cursor.fetchall()
 
-    complete_list = []
-    for i, row in enumerate(study_list):
-        title = "N/A"
-        description = "N/A"
 
+def get_all_private_studies_for_user(user_token):
+    study_list = get_user_studies(user_token)
+    study_list = [x for x in study_list if x[0] and x[3].strip() == "Provisional"]
+    title_index = get_study_title_index()
+    index_items = title_index.get_items([x[0] for x in study_list])
+
+    complete_list = []
+    for row in study_list:
         study_id = row[0]
         release_date = row[1]
         submission_date = row[2]
         status = row[3]
         curation_request = row[4]
+        index_item = index_items[study_id]
 
-        if status.strip() == "Provisional":
-            complete_study_location = os.path.join(study_location, study_id)
-            complete_file_name = os.path.join(complete_study_location, file_name)
-
-            logger.info(
-                "Trying to load the investigation file (%s) for Study %s",
-                file_name,
-                study_id,
-            )
-            # Get the Assay table or create a new one if it does not already exist
-            try:
-                with open(complete_file_name, encoding="utf-8") as f:
-                    for line in f:
-                        line = re.sub(r"\s+", " ", line)
-                        if line.startswith(isa_title):
-                            title = (
-                                line.replace(isa_title, "")
-                                .replace(' "', "")
-                                .replace('" ', "")
-                            )
-                        if line.startswith(isa_descr):
-                            description = (
-                                line.replace(isa_descr, "")
-                                .replace(' "', "")
-                                .replace('" ', "")
-                            )
-            except FileNotFoundError:
-                logger.error("The file %s was not found", complete_file_name)
-            revision_status = None
-            revision_task_message = None
-            revision_comment = None
-            if row[6] is not None:
-                revision_success, revision = get_study_revision(
-                    study_id=study_id, revision_number=row[6]
-                )
-                if revision_success:
-                    revision_comment = revision[3] or ""
-                    revision_status = revision[4]
-                    revision_task_message = revision[5] or ""
+        revision_status = None
+        revision_task_message = None
+        revision_comment = None
+        if row[6] is not None and row[18] is not None:
+            revision_comment = row[17] or ""
+            revision_status = row[18]
+            revision_task_message = row[19] or ""
 
-            complete_list.append(
-                {
-                    "accession": study_id,
-                    "updated": get_single_file_information(complete_file_name),
-                    "releaseDate": release_date,
-                    "createdDate": submission_date,
-                    "status": status,
-                    "title": title.strip(),
-                    "description": description.strip(),
-                    "curationRequest": curation_request.strip(),
-                    "revisionNumber": row[6],
-                    "revisionDatetime": row[7],
-                    "revisionStatus": revision_status,
-                    "revisionComment": revision_comment,
-                    "revisionTaskMessage": revision_task_message,
-                }
-            )
+        complete_list.append(
+            {
+                "accession": study_id,
+                "updated": index_item.updated,
+                "releaseDate": release_date,
+                "createdDate": submission_date,
+                "status": status,
+                "title": index_item.title,
+                "description": index_item.description,
+                "curationRequest": curation_request.strip(),
+                "revisionNumber": row[6],
+                "revisionDatetime": row[7],
+                "revisionStatus": revision_status,
+                "revisionComment": revision_comment,
+                "revisionTaskMessage": revision_task_message,
+            }
+        )
 
     return complete_list
 
 
-def get_all_studies_for_user(user_token):
-    val_query_params(user_token)
-
-    with get_connection() as (conn, cursor):
-        cursor.execute(query_studies_user, {"apitoken": user_token})
-        study_list = cursor.fetchall()
-
+def get_all_studies_for_user(
+    user_token, offset: int = 0, limit: Union[None, int] = None
+):
+    study_list = get_user_studies(user_token, offset=offset, limit=limit)
     if not study_list:
         return []
-    study_location = get_settings().study.mounted_paths.study_metadata_files_root_path
-    file_name = "i_Investigation.txt"
-    isa_title = "Study Title"
-    isa_descr = "Study Description"
+    for row in study_list:
+        if not row[0]:
+            logger.error(f"Study ID is empty for id {row[5]}")
+    study_list = [x for x in study_list if x[0]]
+    title_index = get_study_title_index()
+    index_items = title_index.get_items([x[0] for x in study_list])
+    public_configuration = get_settings().ftp_server.public.configuration
 
     complete_list = []
-    for i, row in enumerate(study_list):
-        title = "N/A"
-        description = "N/A"
-
+    for row in study_list:
         study_id = row[0]
         release_date = row[1]
         submission_date = row[2]
         status = row[3]
         curation_request = row[4]
-        table_id = row[5]
-
-        if not study_id:
-            logger.error(f"Study ID is empty for id {table_id}")
-            continue
-        complete_study_location = os.path.join(study_location, study_id)
-        complete_file_name = os.path.join(complete_study_location, file_name)
-
-        logger.debug(
-            "Trying to load the investigation file (%s) for Study %s",
-            file_name,
-            study_id,
-        )
-        # Get the Assay table or create a new one if it does not already exist
-        try:
-            with open(complete_file_name, encoding="utf-8") as f:
-                for line in f:
-                    line = re.sub(r"\s+", " ", line)
-                    if line.startswith(isa_title):
-                        title = (
-                            line.replace(isa_title, "")
-                            .replace(' "', "")
-                            .replace('" ', "")
-                        )
-                    if line.startswith(isa_descr):
-                        description = (
-                            line.replace(isa_descr, "")
-                            .replace(' "', "")
-                            .replace('" ', "")
-                        )
-        except FileNotFoundError:
-            logger.error("The file %s was not found", complete_file_name)
-        except:
-            logger.error("An exception occurred while parsing ISA")
-            logger.info("Retrying with another encoding ")
-            with open(complete_file_name, encoding="latin-1") as f:
-                for line in f:
-                    line = re.sub(r"\s+", " ", line)
-                    if line.startswith(isa_title):
-                        title = (
-                            line.replace(isa_title, "")
-                            .replace(' "', "")
-                            .replace('" ', "")
-                        )
-                    if line.startswith(isa_descr):
-                        description = (
-                            line.replace(isa_descr, "")
-                            .replace(' "', "")
-                            .replace('" ', "")
-                        )
+        index_item = index_items[study_id]
+
         http_url = None
         ftp_url = None
         globus_url = None
         aspera_path = None
         if status == "Public":
-            configuration = get_settings().ftp_server.public.configuration
+            configuration = public_configuration
             http_url = os.path.join(
                 configuration.public_studies_http_base_url, study_id
             )
@@ -584,15 +515,11 @@ def get_all_studies_for_user(user_token):
         revision_task_message = None
         revision_comment = None
         revision_mhd_submission_status = None
-        if revision_number > 0:
-            revision_success, revision = get_study_revision(
-                study_id=study_id, revision_number=row[6]
-            )
-            if revision_success:
-                revision_comment = revision[3] or ""
-                revision_status = revision[4]
-                revision_task_message = revision[5] or ""
-                revision_mhd_submission_status = revision[6] or ""
+        if revision_number > 0 and row[18] is not None:
+            revision_comment = row[17] or ""
+            revision_status = row[18]
+            revision_task_message = row[19] or ""
+            revision_mhd_submission_status = row[20] or ""
 
         revision_datetime = row[7].isoformat() if row[7] else None
         first_private_date = row[8].isoformat() if row[8] else None
@@ -607,12 +534,12 @@ def get_all_studies_for_user(user_token):
         complete_list.append(
             {
                 "accession": study_id,
-                "updated": get_single_file_information(complete_file_name),
+                "updated": index_item.updated,
                 "releaseDate": release_date,
                 "createdDate": submission_date,
                 "status": status.strip(),
-                "title": title.strip(),
-                "description": description.strip(),
+                "title": index_item.title,
+                "description": index_item.description,
                 "curationRequest": curation_request.strip(),
                 "revisionNumber": row[6],
                 "revisionDatetime": revision_datetime,
@@ -1420,6 +1347,28 @@ def get_connection(row_factory=tuple_row):
             yield conn, cur
 
 
+MAF_INFO_COLUMNS = (
+    "acc",
+    "database_identifier",
+    "metabolite_identification",
+    "database_found",
+    "metabolite_found",
+)
+
+MAF_INFO_TABLE_DEFINITION = """
+    CREATE TABLE {table_name} (
+        acc VARCHAR,
+        database_identifier VARCHAR,
+        metabolite_identification VARCHAR,
+        database_found VARCHAR,
+        metabolite_found VARCHAR
+    );
+"""
+
+
+MAF_INFO_STAGING_TABLE = "maf_info_staging"
+
+
 def database_maf_info_table_actions(study_id=None):
     if study_id:
         val_acc(study_id)
@@ -1431,14 +1380,7 @@ def database_maf_info_table_actions(study_id=None):
         try:
             sql_trunc = "truncate table maf_info;"
             sql_drop = "drop table maf_info;"
-            sql_create = """
-                CREATE table maf_info(
-                                        acc VARCHAR,
-                                        database_identifier VARCHAR,
-                                        metabolite_identification VARCHAR,
-                                        database_found VARCHAR,
-                                        metabolite_found VARCHAR);
-            """
+            sql_create = MAF_INFO_TABLE_DEFINITION.format(table_name="maf_info")
             status, msg = insert_update_data(sql_trunc)
             status, msg = insert_update_data(sql_drop)
             status, msg = insert_update_data(sql_create)
@@ -1446,6 +1388,137 @@ def database_maf_info_table_actions(study_id=None):
             logger.warning("Database table maf_info error " + str(e))
 
 
+def copy_maf_info_rows(cursor, rows, table_name="maf_info") -> int:
+    """
+    Load maf_info rows with COPY. Each row is a sequence of MAF_INFO_COLUMNS values.
+    """
+    row_count = 0
+    sql = f"copy {table_name} ({', '.join(MAF_INFO_COLUMNS)}) from stdin"
+    with cursor.copy(sql) as copy:
+        for row in rows:
+            copy.write_row(row)
+            row_count += 1
+    return row_count
+
+
+def add_maf_info_rows(rows, study_id=None, table_name="maf_info"):
+    """
+    Insert maf_info rows in one transaction. If study_id is defined, current rows of the study are replaced,
+    and readers see the previous rows until the transaction is committed.
+    """
+    if study_id:
+        val_acc(study_id)
+    try:
+        with get_connection() as (conn, cursor):
+            if study_id:
+                cursor.execute(
+                    f"delete from {table_name} where acc = %(study_id)s;",
+                    {"study_id": study_id},
+                )
+            row_count = copy_maf_info_rows(cursor, rows, table_name)
+        return True, f"Database command success. {row_count} maf_info rows are added."
+    except Exception as e:
+        msg = "maf_info rows could not be added: " + str(e)
+        logger.error(msg)
+        return False, msg
+
+
+def create_maf_info_staging_table(keep_study_ids=None):
+    """
+    Prepare the staging table of a maf_info reload. If keep_study_ids is defined, an interrupted reload
+    continues: the staging table is kept and only rows of these studies are retained.
+    Otherwise the staging table is created again.
+    """
+    try:
+        with get_connection() as (conn, cursor):
+            if keep_study_ids is None:
+                cursor.execute(f"drop table if exists {MAF_INFO_STAGING_TABLE};")
+                cursor.execute(
+                    MAF_INFO_TABLE_DEFINITION.format(table_name=MAF_INFO_STAGING_TABLE)
+                )
+            else:
+                cursor.execute(
+                    MAF_INFO_TABLE_DEFINITION.format(
+                        table_name=MAF_INFO_STAGING_TABLE
+                    ).replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS")
+                )
+                cursor.execute(
+                    f"delete from {MAF_INFO_STAGING_TABLE} where not (acc = any(%(study_ids)s));",
+                    {"study_ids": list(keep_study_ids)},
+                )
+        return True, "Database command success."
+    except Exception as e:
+        msg = "maf_info staging table could not be created: " + str(e)
+        logger.error(msg)
+        return False, msg
+
+
+def swap_maf_info_staging_table():
+    """
+    Index the staging table and replace maf_info with it in one short transaction.
+    Readers see the previous maf_info table until the swap is committed.
+    """
+    try:
+        with get_connection() as (conn, cursor):
+            # index may exist if a previous swap failed after it was committed
+            cursor.execute(
+                f"create index if not exists {MAF_INFO_STAGING_TABLE}_acc_idx on {MAF_INFO_STAGING_TABLE} (acc);"
+            )
+            cursor.execute(f"analyze {MAF_INFO_STAGING_TABLE};")
+            conn.commit()
+            with conn.transaction():
+                cursor.execute("drop table if exists maf_info;")
+                cursor.execute(
+                    f"alter table {MAF_INFO_STAGING_TABLE} rename to maf_info;"
+                )
+                cursor.execute(
+                    f"alter index {MAF_INFO_STAGING_TABLE}_acc_idx rename to maf_info_acc_idx;"
+                )
+        return True, "Database command success. maf_info table is replaced."
+    except Exception as e:
+        msg = "maf_info table could not be replaced: " + str(e)
+        logger.error(msg)
+        return False, msg
+
+
+def reload_maf_info_table(rows):
+    """
+    Replace all maf_info rows. Rows are loaded into the staging table, then the staging table replaces maf_info.
+    """
+    status, msg = create_maf_info_staging_table()
+    if status:
+        status, msg = add_maf_info_rows(rows, table_name=MAF_INFO_STAGING_TABLE)
+    if status:
+        status, msg = swap_maf_info_staging_table()
+    return status, msg
+
+
+def update_study_stats(study_stats):
+    """
+    Update row counts and number of files of studies in one transaction.
+    Each item has study_id, sample_rows, assay_rows, maf_rows and number_of_files keys.
+    """
+    sql = """
+        UPDATE studies SET
+            sample_rows = %(sample_rows)s,
+            assay_rows = %(assay_rows)s,
+            maf_rows = %(maf_rows)s,
+            number_of_files = %(number_of_files)s
+        WHERE acc = %(study_id)s;
+    """
+    try:
+        with get_connection() as (conn, cursor):
+            cursor.executemany(sql, study_stats)
+        return (
+            True,
+            f"Database command success. {len(study_stats)} studies are updated.",
+        )
+    except Exception as e:
+        msg = "Study statistics could not be updated: " + str(e)
+        logger.error(msg)
+        return False, msg
+
+
 def add_maf_info_data(
     acc,
     database_identifier,
@@ -1454,29 +1527,17 @@ def add_maf_info_data(
     metabolite_found,
 ):
     val_acc(acc)
-    status = False
-    msg = None
-    sql = """
-        insert into maf_info values(
-                                %(acc)s,
-                                %(database_identifier)s,
-                                %(metabolite_identification)s,
-                                %(database_found)s,
-                                %(metabolite_found)s
-                                );
-    """
-    input_data = {
-        "acc": acc,
-        "database_identifier": database_identifier,
-        "metabolite_identification": metabolite_identification,
-        "database_found": database_found,
-        "metabolite_found": metabolite_found,
-    }
-    try:
-        status, msg = insert_update_data(sql, input_data)
-    except Exception as e:
-        return False, str(e)
-    return status, msg
+    return add_maf_info_rows(
+        [
+            (
+                acc,
+                database_identifier,
+                metabolite_identification,
+                database_found,
+                metabolite_found,
+            )
+        ]
+    )
 
 
 def add_metabolights_data(content_name, data_format, content):
@@ -1501,6 +1562,39 @@ def add_metabolights_data(content_name, data_format, content):
     return status, msg
 
 
+COPY_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def add_metabolights_data_from_file(
+    content_name, data_format, file_path, chunk_size=4 * 1024 * 1024
+):
+    """
+    Store file content in metabolights_data_reuse table. Content is streamed in
+    chunks with COPY, so the whole file is not loaded into memory.
+    """
+    sql = "copy metabolights_data_reuse(content_name, data_format, content) from stdin"
+    try:
+        with get_connection() as (conn, cursor):
+            with cursor.copy(sql) as copy:
+                fields = [
+                    str(x).translate(COPY_TEXT_ESCAPES)
+                    for x in (content_name, data_format)
+                ]
+                copy.write("\t".join(fields) + "\t")
+                with open(file_path, encoding="utf-8") as f:
+                    while True:
+                        data = f.read(chunk_size)
+                        if not data:
+                            break
+                        copy.write(data.translate(COPY_TEXT_ESCAPES))
+                copy.write("\n")
+        return True, "Database command success " + sql
+    except Exception as e:
+        msg = "Database command " + sql + " failed with error " + str(e)
+        logger.error(msg)
+        return False, msg
+
+
 def val_acc(study_id=None):
     if study_id:
         if (
@@ -1,5 +1,8 @@
+import io
 import logging
-from xml.dom.minidom import Document
+import os
+from typing import Iterable, List
+from xml.dom.minidom import Document, Node
 
 """
 Utils for Documents
@@ -40,6 +43,56 @@ def create_generic_element_attribute(
     return doc
 
 
+def serialize_pretty_nodes(nodes: List[Node]) -> str:
+    """
+    Serialize nodes in the same format as Document.toprettyxml(indent="").
+    """
+    writer = io.StringIO()
+    for node in nodes:
+        node.writexml(writer, "", "", "\n")
+    return writer.getvalue()
+
+
+def write_entries_document(
+    file_path: str,
+    header_nodes: List[Node],
+    entries: Iterable[str],
+    root_name: str = "database",
+    entries_name: str = "entries",
+) -> int:
+    """
+    Write a document with header nodes and serialized entries to a file while
+    entries are generated. Output is same as toprettyxml(indent="") of the
+    document that contains all entries, but only one entry is kept in memory.
+
+    :param entries: entries serialized with serialize_pretty_nodes
+    :return: number of non-empty entries
+    """
+    temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+    written = 0
+    try:
+        with open(temp_file_path, "w", encoding="utf-8") as f:
+            f.write(f'<?xml version="1.0" ?>\n<{root_name}>\n')
+            f.write(serialize_pretty_nodes(header_nodes))
+            for entry in entries:
+                if not entry:
+                    continue
+                if written == 0:
+                    f.write(f"<{entries_name}>\n")
+                f.write(entry)
+                written += 1
+            if written:
+                f.write(f"</{entries_name}>\n")
+            else:
+                f.write(f"<{entries_name}/>\n")
+            f.write(f"</{root_name}>\n")
+        os.replace(temp_file_path, file_path)
+    finally:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+    return written
+
+
 def main():
     # doc = Document()
     # doc = create_generic_element(doc, 'test-elem', '4666')
@@ -2,8 +2,8 @@ import json
 import logging
 import os
 import time
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Union
 
 from elasticsearch import Elasticsearch
 
@@ -378,44 +378,226 @@ class ElasticsearchService(object):
 
     def _reindex_compound(self, compound_id):
         try:
-            with DBManager.get_instance().session_maker() as db_session:
-                metabolite = (
-                    db_session.query(RefMetabolite)
-                    .filter(RefMetabolite.acc == compound_id)
-                    .first()
-                )
-
-                if not metabolite:
-                    raise MetabolightsDBException(f"{compound_id} does not exist")
-
-                compound = models.MetaboLightsCompoundIndexModel.model_validate(
-                    metabolite
-                )
-                organisms = set()
-                if compound.metSpecies:
-                    for item in compound.metSpecies:
-                        if item and item.species and item.species.species:
-                            organisms.add(item.species.species)
-                compound.name = compound.name
-                for organism in organisms:
-                    organism_item = models.OrganismModel(organismName=organism)
-                    compound.organism.append(organism_item)
-
-                document = compound.model_dump()
-                params = {"request_timeout": 120}
-                self.client.index(
-                    index=self.INDEX_NAME,
-                    doc_type=self.DOC_TYPE_COMPOUND,
-                    body=document,
-                    id=compound_id,
-                    params=params,
-                )
-                return compound_id
+            document = self.build_compound_document(compound_id)
+            params = {"request_timeout": 120}
+            self.client.index(
+                index=self.INDEX_NAME,
+                doc_type=self.DOC_TYPE_COMPOUND,
+                body=document,
+                id=compound_id,
+                params=params,
+            )
+            return compound_id
         except Exception as e:
             raise MetabolightsException(
                 "Error while reindexing.", exception=e, http_code=500
             )
 
+    def build_compound_document(self, compound_id) -> Dict[str, Any]:
+        with DBManager.get_instance().session_maker() as db_session:
+            metabolite = (
+                db_session.query(RefMetabolite)
+                .filter(RefMetabolite.acc == compound_id)
+                .first()
+            )
+
+            if not metabolite:
+                raise MetabolightsDBException(f"{compound_id} does not exist")
+
+            compound = models.MetaboLightsCompoundIndexModel.model_validate(metabolite)
+            organisms = set()
+            if compound.metSpecies:
+                for item in compound.metSpecies:
+                    if item and item.species and item.species.species:
+                        organisms.add(item.species.species)
+            for organism in organisms:
+                organism_item = models.OrganismModel(organismName=organism)
+                compound.organism.append(organism_item)
+
+            return compound.model_dump()
+
+    def build_study_document(
+        self, study_id, user_token, include_validation_results: bool = False
+    ) -> Dict[str, Any]:
+        m_study = StudyService.get_instance().get_study_from_db_and_folder(
+            study_id,
+            user_token,
+            optimize_for_es_indexing=True,
+            revalidate_study=include_validation_results,
+            include_maf_files=False,
+        )
+        m_study.indexTimestamp = int(time.time())
+        return m_study.model_dump()
+
+    def bulk_index_documents(
+        self,
+        doc_type: str,
+        documents: Dict[str, Dict[str, Any]],
+        request_timeout: Union[None, int] = None,
+    ) -> Dict[str, str]:
+        """
+        Index documents with a single bulk request.
+        :param doc_type: document type of all documents
+        :param documents: documents with their ids
+        :return: ids and error messages of failed documents
+        """
+        if not documents:
+            return {}
+        timeout = request_timeout or self.settings.configuration.bulk_request_timeout
+        body = []
+        for doc_id, document in documents.items():
+            body.append(
+                {"index": {"_index": self.INDEX_NAME, "_type": doc_type, "_id": doc_id}}
+            )
+            body.append(document)
+        response = self.client.bulk(body=body, params={"request_timeout": timeout})
+        failed = {}
+        if response and response.get("errors"):
+            for item in response.get("items", []):
+                action = item.get("index") or item.get("create") or {}
+                if action.get("status", 500) >= 300:
+                    failed[str(action.get("_id"))] = str(action.get("error"))
+        return failed
+
+    def bulk_reindex(
+        self,
+        doc_type: str,
+        ids: List[str],
+        build_document: Callable[[str], Dict[str, Any]],
+        chunk_size: Union[None, int] = None,
+        max_workers: Union[None, int] = None,
+        on_chunk_indexed: Union[
+            None, Callable[[List[str], Dict[str, str]], None]
+        ] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build documents concurrently and index them chunk by chunk with bulk requests.
+        At most chunk_size documents are kept in memory.
+        :param build_document: function to create a document from its id
+        :param on_chunk_indexed: called with ids and failed ids of each chunk
+        :return: summary of the reindex operation
+        """
+        configuration = self.settings.configuration
+        chunk_size = max(chunk_size or configuration.bulk_chunk_size, 1)
+        max_workers = max(max_workers or configuration.bulk_max_workers, 1)
+        failed: Dict[str, str] = {}
+        indexed_count = 0
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for idx in range(0, len(ids), chunk_size):
+                chunk = ids[idx : idx + chunk_size]
+                documents = {}
+                chunk_failed = {}
+                futures = {executor.submit(build_document, x): x for x in chunk}
+                for future in as_completed(futures):
+                    doc_id = futures[future]
+                    try:
+                        documents[doc_id] = future.result()
+                    except Exception as ex:
+                        chunk_failed[doc_id] = str(ex)
+                try:
+                    chunk_failed.update(self.bulk_index_documents(doc_type, documents))
+                except Exception as ex:
+                    for doc_id in documents:
+                        chunk_failed[doc_id] = str(ex)
+                indexed_count += len(chunk) - len(chunk_failed)
+                failed.update(chunk_failed)
+                if on_chunk_indexed:
+                    on_chunk_indexed(chunk, chunk_failed)
+                elapsed = time.time() - start
+                logger.info(
+                    "%s/%s %s documents are processed. %.2f documents/sec.",
+                    idx + len(chunk),
+                    len(ids),
+                    doc_type,
+                    (idx + len(chunk)) / elapsed if elapsed > 0 else 0,
+                )
+
+        elapsed = time.time() - start
+        return {
+            "total": len(ids),
+            "indexed": indexed_count,
+            "failed": failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "documents_per_second": round(len(ids) / elapsed, 3) if elapsed > 0 else 0,
+        }
+
+    def bulk_reindex_studies(
+        self,
+        study_ids: List[str],
+        user_token,
+        include_validation_results: bool = False,
+        chunk_size: Union[None, int] = None,
+        max_workers: Union[None, int] = None,
+    ) -> Dict[str, Any]:
+        return self.bulk_reindex(
+            self.DOC_TYPE_STUDY,
+            study_ids,
+            lambda x: self.build_study_document(
+                x, user_token, include_validation_results
+            ),
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+            on_chunk_indexed=self.update_reindex_tasks,
+        )
+
+    def bulk_reindex_compounds(
+        self,
+        compound_ids: List[str],
+        chunk_size: Union[None, int] = None,
+        max_workers: Union[None, int] = None,
+    ) -> Dict[str, Any]:
+        return self.bulk_reindex(
+            self.DOC_TYPE_COMPOUND,
+            compound_ids,
+            self.build_compound_document,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+        )
+
+    def update_reindex_tasks(self, study_ids: List[str], failed: Dict[str, str]):
+        """
+        Update REINDEX task states of studies with a single database commit.
+        """
+        if not study_ids:
+            return
+        task_name = StudyTaskName.REINDEX
+        now = current_time(utc_timezone=True).replace(tzinfo=None)
+        try:
+            with DBManager.get_instance().session_maker() as db_session:
+                tasks = (
+                    db_session.query(StudyTask)
+                    .filter(
+                        StudyTask.study_acc.in_(study_ids),
+                        StudyTask.task_name == task_name,
+                    )
+                    .all()
+                )
+                tasks_map = {x.study_acc: x for x in tasks}
+                for study_id in study_ids:
+                    task = tasks_map.get(study_id)
+                    if not task:
+                        task = StudyTask()
+                        task.study_acc = study_id
+                        task.task_name = task_name
+                        task.last_request_executed = now
+                    task.last_request_time = now
+                    task.last_execution_time = now
+                    if study_id in failed:
+                        task.last_execution_status = StudyTaskStatus.EXECUTION_FAILED
+                        task.last_execution_message = (
+                            f"{study_id} reindex is failed: {failed[study_id]}"
+                        )
+                    else:
+                        task.last_execution_status = (
+                            StudyTaskStatus.EXECUTION_SUCCESSFUL
+                        )
+                        task.last_execution_message = f"{study_id} is indexed."
+                    db_session.add(task)
+                db_session.commit()
+        except Exception as ex:
+            logger.error(f"Reindex task states are not updated: {str(ex)}")
+
     def get_study(self, study_id, request_timeout=10):
         params = {"request_timeout": request_timeout}
         result = self.client.get(
@@ -457,22 +639,15 @@ class ElasticsearchService(object):
 
         def index_study():
             try:
-                validations = include_validation_results
-                m_study = StudyService.get_instance().get_study_from_db_and_folder(
-                    study_id,
-                    user_token,
-                    optimize_for_es_indexing=True,
-                    revalidate_study=validations,
-                    include_maf_files=False,
+                document = self.build_study_document(
+                    study_id, user_token, include_validation_results
                 )
-                m_study.indexTimestamp = int(time.time())
-                document = m_study.model_dump()
                 params = {"request_timeout": 120}
                 self.client.index(
                     index=self.INDEX_NAME,
                     doc_type=self.DOC_TYPE_STUDY,
                     body=document,
-                    id=m_study.studyIdentifier,
+                    id=document.get("studyIdentifier") or study_id,
                     params=params,
                 )
                 message = f"{study_id} is indexed."
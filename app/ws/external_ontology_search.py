@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from app.config import get_settings
+from app.ws.redis.redis import get_redis_server
+
+logger = logging.getLogger("wslog")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Collapse whitespaces and lower case the query. IRIs are case sensitive and
+    they are not lower cased.
+    """
+    query = " ".join(query.split()) if query else ""
+    if query.startswith("http:") or query.startswith("https:"):
+        return query
+    return query.lower()
+
+
+class OntologySearchResultCache(object):
+    """
+    Persistent TTL cache of external ontology search results. Results are stored
+    in Redis and keyed by provider name and normalized query parameters. After a
+    storage error, the cache is not used for retry_period_in_seconds, so an
+    unavailable Redis server does not slow down searches.
+    """
+
+    def __init__(
+        self,
+        storage: Any,
+        key_prefix: str,
+        ttl_in_seconds: int,
+        empty_result_ttl_in_seconds: int,
+        retry_period_in_seconds: int = 60,
+    ):
+        self.storage = storage
+        self.key_prefix = key_prefix
+        self.ttl_in_seconds = ttl_in_seconds
+        self.empty_result_ttl_in_seconds = empty_result_ttl_in_seconds
+        self.retry_period_in_seconds = retry_period_in_seconds
+        self.disabled_until = 0.0
+
+    def get_key(self, provider: str, *args: str) -> str:
+        params = json.dumps([normalize_query(x) if x else "" for x in args])
+        digest = hashlib.sha256(params.encode("utf-8")).hexdigest()
+        return f"{self.key_prefix}:{provider}:{digest}"
+
+    def _is_available(self) -> bool:
+        return self.storage is not None and time.monotonic() >= self.disabled_until
+
+    def _disable(self, ex: Exception):
+        self.disabled_until = time.monotonic() + self.retry_period_in_seconds
+        logger.warning("Ontology search cache is disabled temporarily: %s", ex)
+
+    def get(self, provider: str, *args: str) -> Union[None, List[Dict[str, Any]]]:
+        if not self._is_available():
+            return None
+        try:
+            value = self.storage.get_value(self.get_key(provider, *args))
+        except Exception as ex:
+            self._disable(ex)
+            return None
+        if value is None:
+            return None
+        try:
+            return json.loads(value)
+        except Exception:
+            return None
+
+    def set(self, provider: str, values: List[Dict[str, Any]], *args: str):
+        if not self._is_available():
+            return
+        ttl = self.ttl_in_seconds if values else self.empty_result_ttl_in_seconds
+        if ttl <= 0:
+            return
+        try:
+            self.storage.set_value(
+                self.get_key(provider, *args), json.dumps(values), ex=ttl
+            )
+        except Exception as ex:
+            self._disable(ex)
+
+
+class ProviderSearch(object):
+    def __init__(self, name: str, search: Callable[[], List[Any]], deadline: float):
+        self.name = name
+        self.search = search
+        self.deadline = deadline
+
+
+def _start_searches(
+    searches: List[ProviderSearch], executor: ThreadPoolExecutor
+) -> List[Tuple[ProviderSearch, Future, float]]:
+    now = time.monotonic()
+    return [(x, executor.submit(x.search), now + x.deadline) for x in searches]
+
+
+def _get_search_result(search: ProviderSearch, future: Future, deadline: float):
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FutureTimeoutError:
+        # search continues in background and its result is cached when it completes
+        logger.warning(
+            "%s search is not completed in %s seconds.", search.name, search.deadline
+        )
+    except Exception as ex:
+        logger.error("%s search failed: %s", search.name, ex)
+    return []
+
+
+def search_first_match(
+    searches: List[ProviderSearch], executor: ThreadPoolExecutor
+) -> List[Any]:
+    """
+    Start all searches concurrently and return the first non-empty result in
+    list order. A search is skipped if it is not completed before its deadline.
+    """
+    for search, future, deadline in _start_searches(searches, executor):
+        result = _get_search_result(search, future, deadline)
+        if result:
+            return result
+    return []
+
+
+def search_all(
+    searches: List[ProviderSearch], executor: ThreadPoolExecutor
+) -> List[Any]:
+    """
+    Start all searches concurrently and merge their results in list order.
+    """
+    result = []
+    for search, future, deadline in _start_searches(searches, executor):
+        result.extend(_get_search_result(search, future, deadline))
+    return result
+
+
+@lru_cache(1)
+def get_ontology_search_executor() -> ThreadPoolExecutor:
+    settings = get_settings().external_dependencies.ontology_search
+    return ThreadPoolExecutor(
+        max_workers=max(settings.max_workers, 1),
+        thread_name_prefix="ontology-search",
+    )
+
+
+@lru_cache(1)
+def get_ontology_search_result_cache() -> OntologySearchResultCache:
+    settings = get_settings()
+    search_settings = settings.external_dependencies.ontology_search
+    return OntologySearchResultCache(
+        get_redis_server(),
+        key_prefix=settings.redis_cache.configuration.ontology_search_cache_key_prefix,
+        ttl_in_seconds=search_settings.cache_ttl_in_seconds,
+        empty_result_ttl_in_seconds=search_settings.empty_result_cache_ttl_in_seconds,
+    )
+
+
+def _reset_after_fork():
+    # worker threads of the parent process do not exist in child processes
+    get_ontology_search_executor.cache_clear()
+    get_ontology_search_result_cache.cache_clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
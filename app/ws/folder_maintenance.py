@@ -38,6 +38,8 @@ from app.ws.db_connection import update_study_sample_type
 from app.ws.isa_table_templates import create_investigation_file, create_sample_sheet
 from app.ws.settings.utils import get_cluster_settings, get_study_settings
 from app.ws.study.comment_utils import update_mhd_comments
+from app.ws.study.file_hash_cache import FileHashCache, sha256sum
+from app.ws.study.snapshot_store import SnapshotStore
 
 logger = logging.getLogger("wslog")
 
@@ -527,6 +529,7 @@ class StudyFolderMaintenanceTask(object):
         metadata_files_signature_root_path: Union[None, str] = None,
         stage: None | str = "BACKUP",
         after_creation_callback: Union[None, Callable] = None,
+        snapshot_store_path: Union[None, str] = None,
     ):
         # if os.path.exists(self.study_metadata_files_path):
         metadata_files_list = self.get_all_metadata_files(
@@ -546,10 +549,16 @@ class StudyFolderMaintenanceTask(object):
             audit_folder_hash_path = os.path.join(audit_folder_path, "HASHES")
             os.makedirs(audit_folder_hash_path, exist_ok=True)
 
-            for file in metadata_files_list:
-                basename = os.path.basename(file)
-                target_file = os.path.join(audit_folder_path, basename)
-                shutil.copy2(file, target_file)
+            if not snapshot_store_path:
+                snapshot_store_path = os.path.join(
+                    os.path.dirname(audit_folder_root_path),
+                    self.study_settings.snapshot_store_folder_name,
+                )
+            snapshot_store = SnapshotStore(snapshot_store_path)
+            snapshot_result = snapshot_store.snapshot_files(
+                metadata_files_list, audit_folder_path
+            )
+            snapshot_store.prune()
             if after_creation_callback:
                 after_creation_callback(audit_folder_path)
             if not metadata_files_signature_root_path:
@@ -581,7 +590,9 @@ class StudyFolderMaintenanceTask(object):
                 item=audit_folder_path,
                 action=MaintenanceAction.CREATE,
                 parameters={},
-                message=f"{self.study_id}: Audit folder {folder_name} was created.",
+                message=f"{self.study_id}: Audit folder {folder_name} was created. "
+                f"Linked: {snapshot_result.linked_files}, "
+                f"stored: {snapshot_result.stored_files}",
                 successful=True,
             )
             self.actions.append(action_log)
@@ -1640,7 +1651,9 @@ class StudyFolderMaintenanceTask(object):
         final_hash = hashlib.sha256(",".join(hashes).encode("utf-8")).hexdigest()
         return final_hash, file_hashes
 
-    def calculate_data_file_hashes(self, search_path: Union[None, str] = None):
+    def calculate_data_file_hashes(
+        self, search_path: Union[None, str] = None, use_hash_cache: bool = True
+    ):
         search_path = (
             search_path if search_path else f"{self.study_metadata_files_path}/FILES"
         )
@@ -1648,28 +1661,38 @@ class StudyFolderMaintenanceTask(object):
             recursive=True, search_path=search_path
         )
         file_hashes = OrderedDict()
+        data_files_list = [x for x in data_files_list if os.path.isfile(x)]
         data_files_list.sort()
+        hash_cache = FileHashCache(
+            self.get_data_file_hash_cache_path(search_path) if use_hash_cache else None,
+            max_workers=self.study_settings.data_file_hash_max_workers,
+            buffer_size=self.study_settings.data_file_hash_buffer_size,
+        )
+        hash_result = hash_cache.calculate_hashes(data_files_list)
         hashes = []
         prefix = search_path + "/"
         for file in data_files_list:
             index = file.replace(prefix, "FILES/")
-            if os.path.isfile(file):
-                hash = self.sha256sum(file)
-                file_hashes[index] = hash
-                hashes.append(f"{index}:{hash}")
+            hash = hash_result.hashes[file]
+            file_hashes[index] = hash
+            hashes.append(f"{index}:{hash}")
 
         final_hash = hashlib.sha256(",".join(hashes).encode("utf-8")).hexdigest()
         return final_hash, file_hashes, search_path
 
+    def get_data_file_hash_cache_path(self, search_path: str) -> str:
+        search_path_hash = hashlib.sha256(search_path.encode("utf-8")).hexdigest()
+        return os.path.join(
+            self.study_internal_files_path,
+            "DATA_FILES",
+            f"data_file_hash_cache_{search_path_hash[:16]}.json",
+        )
+
     def sha256sum(self, filename):
         if not filename or not os.path.exists(filename) or os.path.isdir(filename):
             return hashlib.sha256("".encode()).hexdigest()
 
-        sha256_hash = hashlib.sha256()
-        with open(filename, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+        return sha256sum(filename, self.study_settings.data_file_hash_buffer_size)
 
     def get_all_private_ftp_metadata_files(self, recursive=False):
         mounted_paths = get_settings().hpc_cluster.datamover.mounted_paths
@@ -29,8 +29,11 @@ from isatools.convert import isatab2json
 from isatools.isatab import dump, load
 
 from app.ws.settings.utils import get_study_settings
+from app.ws.study.isa_study_cache import get_isa_study_cache
+from app.ws.study.snapshot_store import SnapshotStore
+from app.ws.study.study_title_index import get_study_title_index
 from app.ws.study.utils import get_study_metadata_path
-from app.ws.utils import copy_file, new_timestamped_folder
+from app.ws.utils import new_timestamped_folder
 
 """
 MetaboLights ISA-API client
@@ -119,6 +122,43 @@ class IsaApiClient:
                     return candidate, parts[2] if identifier else None
         return "", None
 
+    def update_assay_comments(self, isa_inv: model.Investigation):
+        if not isa_inv.studies or not isa_inv.studies[0].assays:
+            return
+        for item in isa_inv.studies[0].assays:
+            assay: model.Assay = item
+            assay_type = None
+            identifier = None
+            assay_type_labels = [
+                x.value
+                for x in assay.comments
+                if x.name == "Assay Type Label" and x.value
+            ]
+            if len(assay_type_labels) == 1:
+                assay_type = assay_type_labels[0]
+            assay_identifiers = [
+                x.value
+                for x in assay.comments
+                if x.name == "Assay Identifier" and x.value
+            ]
+            if len(assay_identifiers) == 1:
+                identifier = assay_identifiers[0]
+            if assay_type and assay_type in self.ASSAY_TYPES and identifier:
+                continue
+            assay_type, identifier = self.find_assay_type_and_identifier(assay)
+            new_comments = [
+                model.Comment(name="Assay Identifier", value=identifier or ""),
+                model.Comment(name="Assay Type Label", value=assay_type or ""),
+            ]
+            new_comments.extend(
+                [
+                    x
+                    for x in assay.comments
+                    if x.name not in {"Assay Type Label", "Assay Identifier"}
+                ]
+            )
+            assay.comments = new_comments
+
     def get_isa_study(
         self,
         study_id,
@@ -150,47 +190,18 @@ class IsaApiClient:
             std_path = study_location
 
         try:
-            i_filename = glob.glob(os.path.join(std_path, "i_*.txt"))[0]
-            fp = open(i_filename, encoding="utf-8")
-            # loading tables also load Samples and Assays
-            isa_inv = load(fp, skip_load_tables)
+            cache = get_isa_study_cache()
+            isa_inv = cache.get(std_path, skip_load_tables)
+            if isa_inv is None:
+                signature = cache.get_signature(std_path, skip_load_tables)
+                i_filename = glob.glob(os.path.join(std_path, "i_*.txt"))[0]
+                with open(i_filename, encoding="utf-8") as fp:
+                    # loading tables also load Samples and Assays
+                    isa_inv = load(fp, skip_load_tables)
+                self.update_assay_comments(isa_inv)
+                cache.put(std_path, skip_load_tables, signature, isa_inv)
             # ToDo. Add MAF to isa_study
             isa_study: model.Study = isa_inv.studies[0]
-            if isa_inv.studies and isa_study.assays:
-                for item in isa_study.assays:
-                    assay: model.Assay = item
-                    assay_type = None
-                    identifier = None
-                    assay_type_labels = [
-                        x.value
-                        for x in assay.comments
-                        if x.name == "Assay Type Label" and x.value
-                    ]
-                    if len(assay_type_labels) == 1:
-                        assay_type = assay_type_labels[0]
-                    assay_identifiers = [
-                        x.value
-                        for x in assay.comments
-                        if x.name == "Assay Identifier" and x.value
-                    ]
-                    if len(assay_identifiers) == 1:
-                        identifier = assay_identifiers[0]
-                    if assay_type and assay_type in self.ASSAY_TYPES and identifier:
-                        continue
-                    assay_type, identifier = self.find_assay_type_and_identifier(assay)
-                    new_comments = [
-                        model.Comment(name="Assay Identifier", value=identifier or ""),
-                        model.Comment(name="Assay Type Label", value=assay_type or ""),
-                    ]
-                    new_comments.extend(
-                        [
-                            x
-                            for x in assay.comments
-                            if x.name not in {"Assay Type Label", "Assay Identifier"}
-                        ]
-                    )
-                    assay.comments = new_comments
-
         except IndexError as e:
             logger.exception(
                 "Failed to find Investigation file %s from %s", study_id, std_path
@@ -344,46 +355,38 @@ class IsaApiClient:
         if (
             save_investigation_copy or save_samples_copy or save_assays_copy
         ):  # Only create audit folder when requested
+            study_audit_files_path = os.path.join(
+                settings.mounted_paths.study_audit_files_root_path, study_id
+            )
             update_path = os.path.join(
-                settings.mounted_paths.study_audit_files_root_path,
-                study_id,
-                settings.audit_folder_name,
+                study_audit_files_path, settings.audit_folder_name
             )
 
             dest_path = new_timestamped_folder(update_path)
 
             # make a copy before applying changes
+            files = []
             if save_investigation_copy:
-                src_file = os.path.join(std_path, settings.investigation_file_name)
-                dest_file = os.path.join(dest_path, settings.investigation_file_name)
-                logger.info("Copying %s to %s", src_file, dest_file)
-                copy_file(src_file, dest_file)
-
+                files.append(os.path.join(std_path, settings.investigation_file_name))
             if save_samples_copy:
-                for sample_file in glob.glob(os.path.join(std_path, "s_*.txt")):
-                    sample_file_name = os.path.basename(sample_file)
-                    src_file = sample_file
-                    dest_file = os.path.join(dest_path, sample_file_name)
-                    logger.info("Copying %s to %s", src_file, dest_file)
-                    copy_file(src_file, dest_file)
-
+                files.extend(glob.glob(os.path.join(std_path, "s_*.txt")))
             if save_assays_copy:
-                for assay_file in glob.glob(os.path.join(std_path, "a_*.txt")):
-                    assay_file_name = os.path.basename(assay_file)
-                    src_file = assay_file
-                    dest_file = os.path.join(dest_path, assay_file_name)
-                    logger.info("Copying %s to %s", src_file, dest_file)
-                    copy_file(src_file, dest_file)
+                files.extend(glob.glob(os.path.join(std_path, "a_*.txt")))
                 # Save the MAF
-                for maf in glob.glob(os.path.join(std_path, "m_*.tsv")):
-                    maf_file_name = os.path.basename(maf)
-                    src_file = maf
-                    dest_file = os.path.join(dest_path, maf_file_name)
-                    logger.info("Copying %s to %s", src_file, dest_file)
-                    copy_file(src_file, dest_file)
+                files.extend(glob.glob(os.path.join(std_path, "m_*.tsv")))
+            logger.info("Copying %s files to %s", len(files), dest_path)
+            # unchanged files are linked to the files of previous audit folders
+            snapshot_store = SnapshotStore(
+                os.path.join(
+                    study_audit_files_path, settings.snapshot_store_folder_name
+                )
+            )
+            snapshot_store.snapshot_files(files, dest_path)
 
         logger.info("Writing %s to %s", settings.investigation_file_name, std_path)
         i_file_name = settings.investigation_file_name
         dump(inv_obj, std_path, i_file_name=i_file_name, skip_dump_tables=False)
+        get_isa_study_cache().invalidate(std_path)
+        get_study_title_index().invalidate(os.path.basename(os.path.normpath(std_path)))
 
         return
@@ -28,7 +28,7 @@ from flask_restful_swagger import swagger
 from isatools import model
 from marshmallow import ValidationError
 
-from app.tasks.common_tasks.basic_tasks.elasticsearch import reindex_study
+from app.tasks.common_tasks.basic_tasks.elasticsearch import request_study_reindex
 from app.utils import metabolights_exception_handler
 from app.ws import mm_models
 from app.ws.auth.permissions import validate_submission_update, validate_submission_view
@@ -284,8 +284,7 @@ class StudyTitle(Resource):
         iac.write_isa_study(
             isa_inv, None, std_path, save_investigation_copy=save_audit_copy
         )
-        inputs = {"user_token": None, "study_id": study_id}
-        reindex_study.apply_async(kwargs=inputs, expires=60)
+        request_study_reindex(study_id)
         logger.info("Applied %s", new_title)
         return jsonify({"title": new_title})
 
@@ -401,8 +400,7 @@ class StudyReleaseDate(Resource):
         )
         # update database
         update_release_date(study_id, new_date)
-        inputs = {"user_token": None, "study_id": study_id}
-        reindex_study.apply_async(kwargs=inputs, expires=60)
+        request_study_reindex(study_id)
         logger.info("Applied %s", new_date)
         return jsonify({"release_date": new_date})
 
@@ -635,12 +633,9 @@ class StudyDescription(Resource):
         iac.write_isa_study(
             isa_inv, None, std_path, save_investigation_copy=save_audit_copy
         )
-        inputs = {"user_token": None, "study_id": study_id}
-        reindex_task = reindex_study.apply_async(kwargs=inputs, expires=60)
+        request_study_reindex(study_id)
         logger.info(
-            "Applied %s and reindex task is triggered for %s",
-            new_description,
-            reindex_task.id,
+            "Applied %s and reindex is requested for %s", new_description, study_id
         )
         return jsonify({"description": isa_study.description})
 
@@ -840,8 +835,7 @@ class StudyContacts(Resource):
         iac.write_isa_study(
             isa_inv, None, std_path, save_investigation_copy=save_audit_copy
         )
-        inputs = {"user_token": None, "study_id": study_id}
-        reindex_study.apply_async(kwargs=inputs, expires=60)
+        request_study_reindex(study_id)
 
         # Using context to avoid envelop tags in contained objects
         logger.info("Got %s contacts", len(new_contacts))
@@ -1191,8 +1185,7 @@ class StudyContacts(Resource):
         iac.write_isa_study(
             isa_inv, None, std_path, save_investigation_copy=save_audit_copy
         )
-        inputs = {"user_token": None, "study_id": study_id}
-        reindex_study.apply_async(kwargs=inputs, expires=60)
+        request_study_reindex(study_id)
         logger.info("Updated %s", updated_contact.email)
 
         return PersonSchema().dump(updated_contact)
@@ -3574,8 +3567,7 @@ class StudySubmitters(Resource):
             for submitter in data:
                 email = submitter.get("email")
                 study_submitters(study_id, email, "add")
-                inputs = {"user_token": None, "study_id": study_id}
-                reindex_study.apply_async(kwargs=inputs, expires=60)
+                request_study_reindex(study_id)
         except:
             logger.error("Could not add user " + email + " to study " + study_id)
 
@@ -3661,8 +3653,7 @@ class StudySubmitters(Resource):
             for submitter in data:
                 email = submitter.get("email")
                 study_submitters(study_id, email, "delete")
-                inputs = {"user_token": None, "study_id": study_id}
-                reindex_task = reindex_study.apply_async(kwargs=inputs, expires=60)
+                request_study_reindex(study_id)
         except:
             logger.error("Could not delete user " + email + " from study " + study_id)
 
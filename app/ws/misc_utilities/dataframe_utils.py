@@ -4,6 +4,49 @@ import pandas
 
 logger = logging.getLogger("builder")
 
+LCMS_MAF_COLUMNS = [
+    "database_identifier",
+    "chemical_formula",
+    "inchi",
+    "metabolite_identification",
+    "mass_to_charge",
+    "fragmentation",
+    "modification",
+    "charge",
+    "retention_time",
+    "taxid",
+    "species",
+    "database",
+    "database_version",
+    "reliability",
+    "uri",
+    "search_engine",
+    "search_engine_score",
+    "smallmolecule_abundance_sub",
+    "smallmolecule_abundance_stdev_sub",
+    "smallmolecule_abundance_std_error_sub",
+]
+
+NMR_MAF_COLUMNS = [
+    "database_identifier",
+    "chemical_formula",
+    "smiles",
+    "inchi",
+    "metabolite_identification",
+    "chemical_shift",
+    "multiplicity",
+    "taxid",
+    "species",
+    "database",
+    "database_version",
+    "reliability",
+    "uri",
+    "search_engine",
+    "search_engine_score",
+    "smallmolecule_abundance_sub",
+    "smallmolecule_abundance_stdev_sub",
+]
+
 
 class DataFrameUtils:
     @staticmethod
@@ -252,31 +295,7 @@ class DataFrameUtils:
         :param df: LCMS maf file to clean up.
         :return: Dataframe with renamed columns and unwanted columns removed.
         """
-        keep = [
-            "database_identifier",
-            "chemical_formula",
-            "inchi",
-            "metabolite_identification",
-            "mass_to_charge",
-            "fragmentation",
-            "modification",
-            "charge",
-            "retention_time",
-            "taxid",
-            "species",
-            "database",
-            "database_version",
-            "reliability",
-            "uri",
-            "search_engine",
-            "search_engine_score",
-            "smallmolecule_abundance_sub",
-            "smallmolecule_abundance_stdev_sub",
-            "smallmolecule_abundance_std_error_sub",
-        ]
-        k = pandas.DataFrame(columns=keep)
-        k = pandas.concat([k, df], sort=False)
-        df = k[keep]
+        df = df.reindex(columns=LCMS_MAF_COLUMNS)
         df.insert(0, "maf_filename", maf_filename)
         df.insert(0, "study_id", study_id)
         return df
@@ -295,29 +314,8 @@ class DataFrameUtils:
         :return: Dataframe with renamed columns and unwanted columns removed.
         """
         logger.info("hit NMR MAF cleanup")
-        keep = [
-            "database_identifier",
-            "chemical_formula",
-            "smiles",
-            "inchi",
-            "metabolite_identification",
-            "chemical_shift",
-            "multiplicity",
-            "taxid",
-            "species",
-            "database",
-            "database_version",
-            "reliability",
-            "uri",
-            "search_engine",
-            "search_engine_score",
-            "smallmolecule_abundance_sub",
-            "smallmolecule_abundance_stdev_sub",
-        ]
-        k = pandas.DataFrame(columns=keep)
         try:
-            k = pandas.concat([k, df], sort=False)
-            df = k[keep]
+            df = df.reindex(columns=NMR_MAF_COLUMNS)
             df.insert(0, "maf_filename", maf_filename)
             df.insert(0, "study_id", study_id)
         except Exception as e:
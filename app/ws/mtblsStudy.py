@@ -328,7 +328,25 @@ class MyMtblsStudiesDetailed(Resource):
                 "type": "string",
                 "required": True,
                 "allowMultiple": False,
-            }
+            },
+            {
+                "name": "offset",
+                "description": "Number of studies to skip",
+                "required": False,
+                "allowEmptyValue": False,
+                "allowMultiple": False,
+                "paramType": "query",
+                "dataType": "integer",
+            },
+            {
+                "name": "limit",
+                "description": "Maximum number of studies to return. All studies are returned if it is not set.",
+                "required": False,
+                "allowEmptyValue": False,
+                "allowMultiple": False,
+                "paramType": "query",
+                "dataType": "integer",
+            },
         ],
         responseMessages=[
             {"code": 200, "message": "OK."},
@@ -343,7 +361,13 @@ class MyMtblsStudiesDetailed(Resource):
         result = validate_user_has_submitter_or_super_user_role(request)
         user_token = result.context.user_api_token
 
-        user_studies = get_all_studies_for_user(user_token)
+        try:
+            offset = int(request.args.get("offset", 0))
+            limit = request.args.get("limit")
+            limit = int(limit) if limit is not None else None
+        except ValueError:
+            abort(400, message="offset and limit must be integers.")
+        user_studies = get_all_studies_for_user(user_token, offset=offset, limit=limit)
 
         return jsonify({"data": user_studies})
 
@@ -24,9 +24,10 @@ import re
 import socket
 import ssl
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from functools import lru_cache
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Set, Tuple, Union
 from urllib.parse import quote_plus
 
 import pandas as pd
@@ -38,6 +39,18 @@ from pydantic.alias_generators import to_camel
 from app.config import get_settings
 from app.study_folder_utils import convert_relative_to_real_path
 from app.utils import current_time, ttl_cache
+from app.ws.external_ontology_search import (
+    ProviderSearch,
+    get_ontology_search_executor,
+    get_ontology_search_result_cache,
+    search_all,
+    search_first_match,
+)
+from app.ws.ontology_search_index import (
+    ONTOLOGY_SEARCH_INDEX_VERSION,
+    OntologySearchIndex,
+)
+from app.ws.study.file_hash_cache import sha256sum
 from app.ws.study_templates.models import (
     FileTemplates,
     ValidationConfiguration,
@@ -141,6 +154,9 @@ def filter_term_by_keyword(
     return False
 
 
+SEARCH_INDEX_FIELDS = {filter_term_label: "name", filter_term_definition: "definition"}
+
+
 class DefaultControlLists(BaseModel):
     control_lists: Dict[str, List[Entity] | ValidationControls | FileTemplates] = {}
     model_config = ConfigDict(alias_generator=to_camel)
@@ -161,6 +177,9 @@ class MetaboLightsOntology:
         self.branch_map: Dict[str, List[Entity]] = {}
         self.sorted_search_entities: List[Entity] = []
         self.initiate()
+        self.search_index = OntologySearchIndex(
+            self.sorted_search_entities, self.branch_map
+        )
         default_list: DefaultControlLists = DefaultControlLists()
         default_list.control_lists = self.branch_map
         self.update_validation_configuration(default_list.control_lists)
@@ -219,6 +238,15 @@ class MetaboLightsOntology:
         limit: int = 50,
         filter_method=filter_term_label,
     ) -> List[Entity]:
+        if filter_method in SEARCH_INDEX_FIELDS:
+            return self.search_index.search(
+                label,
+                branch=branch,
+                include_contain_matches=include_contain_matches,
+                include_case_insensitive_matches=include_case_insensitive_matches,
+                limit=limit,
+                field=SEARCH_INDEX_FIELDS[filter_method],
+            )
         entities = self.get_branch_entities(branch)
 
         result = []
@@ -577,6 +605,38 @@ TERM_PRIORITY_MAP = {
 }
 
 
+def get_external_ontology_search(
+    provider: str, term: str, mapping: str = "", ontologies: str = ""
+) -> ProviderSearch:
+    """
+    Search task of an external ontology provider (OLS, Zooma or Bioportal).
+    Results are read from and stored in the persistent search result cache.
+    Providers receive the original term. The normalized term is used only in
+    the cache key.
+    """
+    settings = get_settings().external_dependencies.ontology_search
+    if provider == "OLS":
+        deadline = settings.ols_deadline_in_seconds
+        search_method = lambda: getOLSTerm(term, mapping, ontologies=ontologies)
+    elif provider == "Zooma":
+        deadline = settings.zooma_deadline_in_seconds
+        search_method = lambda: getZoomaTerm(term, mapping)
+    else:
+        deadline = settings.bioportal_deadline_in_seconds
+        search_method = lambda: getBioportalTerm(term, mapping, ontologies=ontologies)
+
+    def search() -> List[Entity]:
+        cache = get_ontology_search_result_cache()
+        cached_result = cache.get(provider, term, mapping, ontologies)
+        if cached_result is not None:
+            return [Entity.model_validate(x) for x in cached_result]
+        result = search_method()
+        cache.set(provider, [x.model_dump() for x in result], term, mapping, ontologies)
+        return result
+
+    return ProviderSearch(provider, search, deadline)
+
+
 def get_ontology_search_result(term: str, branch, ontologies, mapping, queryFields):
     result = []
     if not term and not branch:
@@ -588,23 +648,22 @@ def get_ontology_search_result(term: str, branch, ontologies, mapping, queryFiel
         file = convert_relative_to_real_path(
             get_settings().file_resources.mtbls_ontology_file
         )
-        mtbls_ontology: MetaboLightsOntology = load_ontology_file(file)
-        if mtbls_ontology:
-            exact_search = mtbls_ontology.get_entity_by_iri(term)
+        search_index = get_ontology_search_index(file)
+        if search_index:
+            exact_search = search_index.get_entity_by_iri(term)
     if exact_search:
         result = exact_search
     if term.startswith("http://") or term.startswith("http://"):
         result = getOLSTerm(term, mapping, ontologies=ontologies)
     elif ontologies:  # if has ontology searching restriction
         logger.info("Search ontology %s in", ontologies)
-        # print('Searching ontology  %s' % ontologies)
-        try:
-            result = getOLSTerm(term, mapping, ontologies=ontologies)
-            result += getBioportalTerm(term, mapping, ontologies=ontologies)
-
-        except Exception as e:
-            print(e.args)
-            logger.info(e.args)
+        result = search_all(
+            [
+                get_external_ontology_search("OLS", term, mapping, ontologies),
+                get_external_ontology_search("Bioportal", term, mapping, ontologies),
+            ],
+            get_ontology_search_executor(),
+        )
     else:
         if not queryFields:  # if found the term, STOP
             # is_url = term.startswith('http')
@@ -644,31 +703,18 @@ def get_ontology_search_result(term: str, branch, ontologies, mapping, queryFiel
             #         logger.info(e.args)
 
             if not result:
-                # print("Can't query it in Zooma.tsv, requesting OLS")
-                logger.info("Can't query it in Zooma.tsv, requesting OLS")
-                try:
-                    result = getOLSTerm(term, mapping, ontologies=ontologies)
-                except Exception as e:
-                    print(e.args)
-                    logger.info(e.args)
-
-            if not result and not is_url:
-                # print("Can't find query in OLS, requesting Zooma")
-                logger.info("Can't find query in OLS, requesting Zooma")
-                try:
-                    result = getZoomaTerm(term)
-                except Exception as e:
-                    print(e.args)
-                    logger.info(e.args)
-
-            if not result:
-                # print("Can't query it in Zooma, request Bioportal")
-                logger.info("Can't query it in Zooma, request Bioportal")
-                try:
-                    result = getBioportalTerm(term)
-                except Exception as e:
-                    # print(e.args)
-                    logger.info(e.args)
+                # OLS, Zooma and Bioportal are requested concurrently and
+                # the first non-empty result is selected in this order.
+                logger.info(
+                    "Can't find query in MTBLS ontology, requesting OLS, Zooma and Bioportal"
+                )
+                searches = [
+                    get_external_ontology_search("OLS", term, mapping, ontologies)
+                ]
+                if not is_url:
+                    searches.append(get_external_ontology_search("Zooma", term))
+                searches.append(get_external_ontology_search("Bioportal", term))
+                result = search_first_match(searches, get_ontology_search_executor())
 
         else:
             if "MTBLS" in queryFields:
@@ -677,14 +723,17 @@ def get_ontology_search_result(term: str, branch, ontologies, mapping, queryFiel
             if "MTBLS_Zooma" in queryFields:
                 result += getMetaboZoomaTerm(term, mapping)
 
+            searches = []
             if "OLS" in queryFields:
-                result += getOLSTerm(term, mapping)
+                searches.append(get_external_ontology_search("OLS", term, mapping))
 
             if "Zooma" in queryFields:
-                result += getZoomaTerm(term, mapping)
+                searches.append(get_external_ontology_search("Zooma", term, mapping))
 
             if "Bioportal" in queryFields:
-                result += getBioportalTerm(term)
+                searches.append(get_external_ontology_search("Bioportal", term))
+            if searches:
+                result += search_all(searches, get_ontology_search_executor())
 
     response = []
     # add WoRMs terms as a entity
@@ -873,6 +922,39 @@ def load_ontology_file(filepath) -> MetaboLightsOntology:
     return None
 
 
+def get_ontology_search_index_path(filepath: str, sha256: str) -> str:
+    return os.path.join(
+        get_settings().server.temp_directory_path,
+        "ontology_search_index",
+        f"{os.path.basename(filepath)}.{sha256}."
+        f"v{ONTOLOGY_SEARCH_INDEX_VERSION}.pickle",
+    )
+
+
+@lru_cache(1)
+def get_ontology_search_index(filepath) -> Union[None, OntologySearchIndex]:
+    """
+    Load the search index of an ontology file. The index is built from the
+    ontology file only if there is no index file for its current checksum.
+    """
+    try:
+        index_path = get_ontology_search_index_path(filepath, sha256sum(filepath))
+    except OSError as ex:
+        logger.error("Ontology file %s is not read: %s", filepath, ex)
+        return None
+    index = OntologySearchIndex.load(index_path)
+    if index:
+        return index
+    mtbls_ontology: MetaboLightsOntology = load_ontology_file(filepath)
+    if not mtbls_ontology:
+        return None
+    try:
+        mtbls_ontology.search_index.save(index_path)
+    except Exception as ex:
+        logger.warning("Ontology search index %s is not saved: %s", index_path, ex)
+    return mtbls_ontology.search_index
+
+
 # def initiate_mtbls_model():
 #     file = convert_relative_to_real_path(
 #         get_settings().file_resources.mtbls_ontology_file
@@ -888,8 +970,8 @@ def getMetaboTerm(keyword, branch, mapping="", limit=100):
     file = convert_relative_to_real_path(
         get_settings().file_resources.mtbls_ontology_file
     )
-    mtbls_ontology: MetaboLightsOntology = load_ontology_file(file)
-    if not mtbls_ontology:
+    search_index = get_ontology_search_index(file)
+    if not search_index:
         return []
     # onto = mtbls_ontology.ontology
 
@@ -898,9 +980,9 @@ def getMetaboTerm(keyword, branch, mapping="", limit=100):
     search_result: List[Entity] = []
     if keyword:
         include_contain_matches = mapping != "exact"
-        search_result = mtbls_ontology.get_entity_by_iri(keyword)
+        search_result = search_index.get_entity_by_iri(keyword)
         if not search_result:
-            search_result = mtbls_ontology.search_ontology_entities(
+            search_result = search_index.search(
                 keyword,
                 branch=branch,
                 include_case_insensitive_matches=True,
@@ -964,7 +1046,7 @@ def getMetaboTerm(keyword, branch, mapping="", limit=100):
                 branch=branch
             )
         )
-        entities = mtbls_ontology.get_branch_entities(branch)
+        entities = search_index.get_branch_entities(branch)
         return entities[:limit] if len(entities) > limit else entities
         # if branch:  # term = 0, branch = 1, return whole ontology branch
         #     logger.info("Search Metabolights ontology whole {branch} branch ... ".format(branch=branch))
@@ -1203,6 +1285,7 @@ def getMetaboZoomaTerm(keyword, mapping):
             temp = pd.concat(frame).reset_index(drop=True)
 
         temp = temp.drop_duplicates(subset="PROPERTY_VALUE", keep="last", inplace=False)
+        ontology_names = get_ontology_names(temp["SEMANTIC_TAG"].tolist())
 
         for i in range(len(temp)):
             iri = temp.iloc[i]["SEMANTIC_TAG"]
@@ -1220,10 +1303,8 @@ def getMetaboZoomaTerm(keyword, mapping):
                 zooma_confidence="High",
             )
 
-            try:
-                enti.onto_name, enti.definition = get_ontology_name(iri)
-            except:
-                enti.onto_name = ""
+            onto_name, enti.definition = ontology_names.get(iri, ("", ""))
+            enti.onto_name = onto_name if onto_name else ""
 
             res.append(enti)
     except Exception as e:
@@ -1263,10 +1344,6 @@ def getZoomaTerm(keyword, mapping="", limit=50):
 
             enti = Entity(name=name, iri=iri, zooma_confidence=term["confidence"])
 
-            if enti.onto_name == "":
-                enti.onto_name, enti.definition = get_ontology_name(iri)
-            if not enti.onto_name:
-                enti.onto_name = ""
             try:
                 enti.provenance_name = term["provenance"]["source"]["name"].upper()
             except:
@@ -1281,6 +1358,11 @@ def getZoomaTerm(keyword, mapping="", limit=50):
 
             if len(res) >= limit:
                 break
+
+        ontology_names = get_ontology_names([x.iri for x in res])
+        for enti in res:
+            onto_name, enti.definition = ontology_names.get(enti.iri, ("", ""))
+            enti.onto_name = onto_name if onto_name else ""
     except Exception as e:
         logger.error("getZooma" + str(e))
     return res
@@ -1475,44 +1557,66 @@ def getOnto_info(pre_fix):
         return "", "", ""
 
 
-@ttl_cache(1024)
-def get_ontology_name(iri):
-    # get ontology name by giving iri of entity
+@ttl_cache(4096, ttl=24 * 60 * 60)
+def fetch_ontology_name(iri) -> Tuple[str, str]:
+    # get ontology name by giving iri of entity. Request errors are not cached.
     ontology_name = ""
     description = ""
+    uri = "terms/findByIdAndIsDefiningOntology?iri=" + iri
+    url = os.path.join(get_settings().external_dependencies.api.ols_api_url, uri)
+    fp = urllib.request.urlopen(url, timeout=5)
+    content = fp.read().decode("utf-8")
+    j_content = json.loads(content)
+    if not j_content.get("_embedded", {}).get("terms", []):
+        return "", description
+    item = j_content["_embedded"]["terms"][0]
     try:
-        uri = "terms/findByIdAndIsDefiningOntology?iri=" + iri
-        url = os.path.join(get_settings().external_dependencies.api.ols_api_url, uri)
-        fp = urllib.request.urlopen(url, timeout=5)
-        content = fp.read().decode("utf-8")
-        j_content = json.loads(content)
-        if not j_content.get("_embedded", {}).get("terms", []):
-            return "", description
-        item = j_content["_embedded"]["terms"][0]
+        ontology_name = item.get("ontology_prefix", "")
         try:
-            ontology_name = item.get("ontology_prefix", "")
-            try:
-                substring = iri.split("/")[-1]
-                if "_" in substring:
-                    ontology_name = substring.split("_")[0]
-            except:
-                pass
-
-            try:
-                description = item["ontology_name"]["description"][0]
-            except:
-                pass
+            substring = iri.split("/")[-1]
+            if "_" in substring:
+                ontology_name = substring.split("_")[0]
+        except:
+            pass
 
-            if not ontology_name and item["ontology_name"]:
-                ontology_name = item["ontology_name"].upper()
+        try:
+            description = item["ontology_name"]["description"][0]
         except:
             pass
+
+        if not ontology_name and item["ontology_name"]:
+            ontology_name = item["ontology_name"].upper()
     except:
-        if "BAO" in iri:
-            return "BAO", description
+        pass
     return ontology_name, description
 
 
+def get_ontology_name(iri):
+    try:
+        return fetch_ontology_name(iri)
+    except:
+        if "BAO" in iri:
+            return "BAO", ""
+    return "", ""
+
+
+def get_ontology_names(iris: List[str]) -> Dict[str, Tuple[str, str]]:
+    """
+    Ontology names and descriptions of entities. Each distinct iri is requested
+    once and the requests run concurrently.
+    """
+    unique_iris = list(dict.fromkeys(x for x in iris if x))
+    if len(unique_iris) < 2:
+        return {x: get_ontology_name(x) for x in unique_iris}
+    settings = get_settings().external_dependencies.ontology_search
+    max_workers = min(
+        max(settings.ontology_name_lookup_max_workers, 1), len(unique_iris)
+    )
+    # a new executor is used. Callers may run in the ontology search executor.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(unique_iris, executor.map(get_ontology_name, unique_iris)))
+
+
 def term_sort_key(term: Entity, ontology_priority_map):
     priority = ontology_priority_map.get(term.onto_name.upper(), 100000)
     return f"{priority:08}:{term.name.lower()}"
@@ -0,0 +1,196 @@
+import bisect
+import logging
+import os
+import pickle
+from typing import Any, Dict, Iterable, List, Set, Union
+
+logger = logging.getLogger("wslog")
+
+ONTOLOGY_SEARCH_INDEX_VERSION = 1
+NGRAM_SIZE = 3
+
+
+def get_ngrams(value: str) -> Set[str]:
+    return {value[idx : idx + NGRAM_SIZE] for idx in range(len(value) - NGRAM_SIZE + 1)}
+
+
+class OntologyFieldIndex(object):
+    """
+    Exact, prefix and substring index of an entity field (e.g. label).
+
+    Prefix matches are found with binary search on sorted values, substring
+    matches with an inverted index of lower case character trigrams.
+    """
+
+    def __init__(self, values: List[str]):
+        self.values = values
+        self.lower_values = [x.lower() for x in values]
+        self.exact: Dict[str, List[int]] = {}
+        self.lower_exact: Dict[str, List[int]] = {}
+        self.ngrams: Dict[str, List[int]] = {}
+        for entity_id, value in enumerate(values):
+            if not value:
+                continue
+            lower_value = self.lower_values[entity_id]
+            self.exact.setdefault(value, []).append(entity_id)
+            self.lower_exact.setdefault(lower_value, []).append(entity_id)
+            for ngram in get_ngrams(lower_value):
+                self.ngrams.setdefault(ngram, []).append(entity_id)
+        ordered = sorted((x, i) for i, x in enumerate(values) if x)
+        self.sorted_values = [x[0] for x in ordered]
+        self.sorted_ids = [x[1] for x in ordered]
+        ordered = sorted((x, i) for i, x in enumerate(self.lower_values) if x)
+        self.sorted_lower_values = [x[0] for x in ordered]
+        self.sorted_lower_ids = [x[1] for x in ordered]
+
+    def find_exact(self, keyword: str, case_insensitive: bool) -> List[int]:
+        if case_insensitive:
+            return self.lower_exact.get(keyword.lower(), [])
+        return self.exact.get(keyword, [])
+
+    def find_prefix(self, keyword: str, case_insensitive: bool) -> List[int]:
+        if case_insensitive:
+            keyword = keyword.lower()
+            values, ids = self.sorted_lower_values, self.sorted_lower_ids
+        else:
+            values, ids = self.sorted_values, self.sorted_ids
+        result = []
+        idx = bisect.bisect_left(values, keyword)
+        while idx < len(values) and values[idx].startswith(keyword):
+            result.append(ids[idx])
+            idx += 1
+        return result
+
+    def find_substring(self, keyword: str, case_insensitive: bool) -> Iterable[int]:
+        lower_keyword = keyword.lower()
+        if len(lower_keyword) < NGRAM_SIZE:
+            candidates = range(len(self.values))
+        else:
+            postings = sorted(
+                (self.ngrams.get(x, []) for x in get_ngrams(lower_keyword)), key=len
+            )
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+        if case_insensitive:
+            return [x for x in candidates if lower_keyword in self.lower_values[x]]
+        return [x for x in candidates if keyword in self.values[x]]
+
+
+class OntologySearchIndex(object):
+    """
+    Search index of MetaboLights ontology entities. Results and their order are
+    the same as linear search passes of MetaboLightsOntology: exact matches,
+    prefix matches and then substring matches, each sorted by entity name.
+    """
+
+    def __init__(self, entities: List[Any], branch_map: Dict[str, List[Any]]):
+        self.entities = list(entities)
+        self.iri_ids: Dict[str, int] = {}
+        for entity_id, entity in enumerate(self.entities):
+            self.iri_ids.setdefault(entity.iri, entity_id)
+        self.names = [x.name for x in self.entities]
+        self.branches: Dict[str, List[int]] = {}
+        self.branch_positions: Dict[str, Dict[int, int]] = {}
+        for branch, items in branch_map.items():
+            if not isinstance(items, list):
+                continue
+            ids = [self.iri_ids[x.iri] for x in items if x.iri in self.iri_ids]
+            self.branches[branch] = ids
+            positions = {}
+            for position, entity_id in enumerate(ids):
+                positions.setdefault(entity_id, position)
+            self.branch_positions[branch] = positions
+        self.fields = {
+            "name": OntologyFieldIndex(self.names),
+            "definition": OntologyFieldIndex([x.definition for x in self.entities]),
+        }
+
+    def get_entity_by_iri(self, iri: str) -> List[Any]:
+        if iri and iri in self.iri_ids:
+            return [self.entities[self.iri_ids[iri]]]
+        return []
+
+    def get_branch_entities(self, branch: str) -> List[Any]:
+        if not branch:
+            return self.entities
+        return [self.entities[x] for x in self.branches.get(branch, [])]
+
+    def search(
+        self,
+        label: str = "",
+        branch: str = "",
+        include_contain_matches: bool = True,
+        include_case_insensitive_matches: bool = True,
+        limit: int = 50,
+        field: str = "name",
+    ) -> List[Any]:
+        if branch and branch not in self.branches:
+            return []
+        positions = self.branch_positions[branch] if branch else None
+        if not label:
+            if positions is None:
+                return self.entities[:limit]
+            ids = sorted(positions, key=positions.get)
+            return [self.entities[x] for x in ids[:limit]]
+
+        field_index = self.fields[field]
+        result: List[int] = []
+        included: Set[int] = set()
+
+        def add(candidates: Iterable[int], sort_by_name: bool = True):
+            selected = {
+                x
+                for x in candidates
+                if x not in included and (positions is None or x in positions)
+            }
+            included.update(selected)
+            if positions is None:
+                position_key = int
+            else:
+                position_key = positions.get
+            if sort_by_name:
+                result.extend(
+                    sorted(selected, key=lambda x: (self.names[x], position_key(x)))
+                )
+            else:
+                result.extend(sorted(selected, key=position_key))
+            return len(result) > limit
+
+        stages = [
+            (field_index.find_exact, False, False),
+            (field_index.find_prefix, False, True),
+        ]
+        if include_case_insensitive_matches:
+            stages.append((field_index.find_exact, True, True))
+            stages.append((field_index.find_prefix, True, True))
+        if include_contain_matches:
+            stages.append(
+                (field_index.find_substring, include_case_insensitive_matches, True)
+            )
+        for find, case_insensitive, sort_by_name in stages:
+            if add(find(label, case_insensitive), sort_by_name):
+                break
+        return [self.entities[x] for x in result[:limit]]
+
+    def save(self, file_path: str):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_file_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file_path, file_path)
+
+    @staticmethod
+    def load(file_path: str) -> Union[None, "OntologySearchIndex"]:
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, "rb") as f:
+                index = pickle.load(f)
+            if isinstance(index, OntologySearchIndex):
+                return index
+        except Exception as ex:
+            logger.warning("Ontology search index %s is not loaded: %s", file_path, ex)
+        return None
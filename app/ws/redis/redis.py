@@ -1,11 +1,34 @@
+import logging
+import os
+import threading
 from functools import lru_cache
-from typing import Union
+from typing import Any, Dict, List, Union
 
 import redis
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from redis.retry import Retry
 
 from app.config import get_settings
 from app.config.model.redis_cache import RedisConnection
 
+logger = logging.getLogger("wslog")
+
+_clients: Dict[tuple, redis.Redis] = {}
+_clients_lock = threading.Lock()
+_client_requests: Dict[tuple, int] = {}
+
+
+def _reset_clients_after_fork():
+    # Connections created by the parent process must not be shared with children.
+    global _clients_lock
+    _clients.clear()
+    _client_requests.clear()
+    _clients_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_clients_after_fork)
+
 
 class RedisStorage(object):
     def __init__(self, connection: Union[None, RedisConnection] = None):
@@ -15,15 +38,40 @@ class RedisStorage(object):
 
     def get_redis(
         self, readonly: bool = False, connection: Union[None, RedisConnection] = None
-    ):
-        rs = connection if connection else get_settings().redis_cache.connection
+    ) -> redis.Redis:
+        """
+        Return a process-wide client. Clients share a connection pool per
+        connection settings and mode, so a new TCP connection (and Sentinel
+        master discovery) is needed only when the pool has no idle connection.
+        """
+        rs = connection if connection else self.connection
+        key = (os.getpid(), rs.model_dump_json(), readonly)
+        client = _clients.get(key)
+        if client is None:
+            with _clients_lock:
+                client = _clients.get(key)
+                if client is None:
+                    client = self._create_redis(rs, readonly)
+                    _clients[key] = client
+        _client_requests[key] = _client_requests.get(key, 0) + 1
+        return client
+
+    @staticmethod
+    def _create_redis(rs: RedisConnection, readonly: bool) -> redis.Redis:
+        # Retry once the connection is lost. Sentinel pools discover the new
+        # master for each new connection, so a retry follows a master failover.
+        options = {
+            "password": rs.redis_password,
+            "db": rs.redis_db,
+            "max_connections": rs.max_connections,
+            "health_check_interval": rs.health_check_interval,
+            "retry": Retry(ExponentialBackoff(cap=2, base=0.1), rs.retry_count),
+            "retry_on_error": [ConnectionError, TimeoutError],
+        }
         if rs.connection_type == "redis":
             rc = rs.redis_connection
             master: redis.Redis = redis.Redis(
-                host=rc.redis_host,
-                password=rs.redis_password,
-                port=rc.redis_port,
-                db=rs.redis_db,
+                host=rc.redis_host, port=rc.redis_port, **options
             )
         else:
             sc = rs.sentinel_connection
@@ -32,19 +80,37 @@ class RedisStorage(object):
                 sentinel_hosts, sentinel_kwargs={"password": rs.redis_password}
             )
             if readonly:
-                master: redis.Redis = sentinel.slave_for(
-                    rs.sentinel_connection.master_name,
-                    password=rs.redis_password,
-                    db=rs.redis_db,
-                )
+                master: redis.Redis = sentinel.slave_for(sc.master_name, **options)
             else:
-                master: redis.Redis = sentinel.master_for(
-                    rs.sentinel_connection.master_name,
-                    password=rs.redis_password,
-                    db=rs.redis_db,
-                )
+                master: redis.Redis = sentinel.master_for(sc.master_name, **options)
         return master
 
+    @staticmethod
+    def get_pool_stats() -> List[Dict[str, Any]]:
+        """
+        Usage metrics of the connection pools created by the current process.
+        """
+        stats = []
+        for key, client in list(_clients.items()):
+            pid, _, readonly = key
+            if pid != os.getpid():
+                continue
+            pool = client.connection_pool
+            stats.append(
+                {
+                    "readonly": readonly,
+                    "pool_class": pool.__class__.__name__,
+                    "max_connections": pool.max_connections,
+                    "created_connections": getattr(pool, "_created_connections", 0),
+                    "idle_connections": len(
+                        getattr(pool, "_available_connections", [])
+                    ),
+                    "in_use_connections": len(getattr(pool, "_in_use_connections", [])),
+                    "client_requests": _client_requests.get(key, 0),
+                }
+            )
+        return stats
+
     def set_value_with_expiration_time(self, key, value, expiration_time):
         redis = self.get_redis()
         return redis.set(key, value, exat=expiration_time)
@@ -55,6 +121,18 @@ class RedisStorage(object):
             return redis.set(key, value, ex=ex)
         return redis.set(key, value)
 
+    def set_values(self, values: Dict[str, Any], ex=None):
+        """Set multiple keys with a single round-trip."""
+        if not values:
+            return []
+        pipeline = self.get_redis().pipeline(transaction=False)
+        for key, value in values.items():
+            if ex:
+                pipeline.set(key, value, ex=ex)
+            else:
+                pipeline.set(key, value)
+        return pipeline.execute()
+
     def is_key_in_store(self, key):
         redis = self.get_redis(readonly=True)
         value = redis.get(key)
@@ -67,15 +145,25 @@ class RedisStorage(object):
         value = redis.get(key)
         return value
 
+    def get_values(self, keys: List[str], readonly: bool = True) -> List[Any]:
+        """Get multiple keys with a single round-trip."""
+        if not keys:
+            return []
+        return self.get_redis(readonly=readonly).mget(keys)
+
     def search_keys(self, pattern):
         redis = self.get_redis(readonly=True)
-        value = redis.keys(pattern)
+        value = list(redis.scan_iter(match=pattern, count=1000))
         return value
 
     def delete_value(self, key):
         redis = self.get_redis()
         redis.delete(key)
 
+    def delete_values(self, keys: List[str]):
+        if keys:
+            self.get_redis().delete(*keys)
+
 
 @lru_cache(1)
 def get_redis_server() -> RedisStorage:
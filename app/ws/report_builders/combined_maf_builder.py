@@ -1,25 +1,40 @@
 import logging
 import os
-from typing import List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
 
 import pandas
 from flask_restful import abort
 
 from app.config import get_settings
-from app.ws.misc_utilities.dataframe_utils import DataFrameUtils
+from app.ws.misc_utilities.dataframe_utils import (
+    LCMS_MAF_COLUMNS,
+    NMR_MAF_COLUMNS,
+    DataFrameUtils,
+)
 from app.ws.settings.utils import get_study_settings
-from app.ws.utils import totuples
 
 logger = logging.getLogger("builder")
 
+MAF_COLUMNS = {"LCMS": LCMS_MAF_COLUMNS, "NMR": NMR_MAF_COLUMNS}
+
 
 class CombinedMafBuilder:
     """
     Builds a combined maf files from a given list of studies.
     """
 
-    def __init__(self, studies_to_combine: List[str], method: str):
+    def __init__(
+        self,
+        studies_to_combine: List[str],
+        method: str,
+        max_workers: Union[None, int] = None,
+    ):
         self.studies_to_combine = studies_to_combine
+        if max_workers is None:
+            max_workers = get_settings().report.combined_maf_max_workers
+        self.max_workers = max_workers
 
         self.method = method
         self.unopenable_maf_register = []
@@ -29,14 +44,10 @@ class CombinedMafBuilder:
 
     def build(self):
         """
-        Entry method to the class. Gets the generator that yields individual maf dicts, and adds that dict to the list.
-        We then try and create a new DataFrame object from that list of dicts.
+        Entry method to the class. MAF files are read and cleaned in parallel, and each cleaned dataframe is appended
+        to the combined maf file as soon as it is ready, so only a few dataframes are held in memory at once.
+        The combined file replaces the previous one after all MAF files are written.
         """
-        list_of_mafs = []
-        maf_generator = self.get_dataframe()
-
-        for maf_as_dict in maf_generator:
-            list_of_mafs.extend(maf_as_dict)
         settings = get_study_settings()
 
         reporting_path = os.path.join(
@@ -44,67 +55,114 @@ class CombinedMafBuilder:
             get_settings().report.report_base_folder_name,
             get_settings().report.report_global_folder_name,
         )
-        combined_maf = None
+        file_path = os.path.join(reporting_path, f"{self.method}_combined_maf.tsv")
         try:
-            combined_maf = pandas.DataFrame(list_of_mafs)
-        except Exception as e:
-            logger.error(f"Problem creating dataframe from list of dicts: {str(e)}")
-        try:
-            combined_maf.to_csv(
-                os.path.join(reporting_path, f"{self.method}_combined_maf.tsv"),
-                sep="\t",
-                encoding="utf-8",
-                index="false",
-            )
+            row_count = self.write_combined_maf(file_path)
+            logger.info(f"{row_count} rows are written to {file_path}")
         except Exception as e:
             # bad practice here catching base exception, but the pandas documentation did not reveal what errors or
             # exceptions to expect
             logger.error(f"Problem writing the combined maf file to csv:{str(e)}")
             abort(500)
 
+    def write_combined_maf(self, file_path: str) -> int:
+        """
+        Append cleaned MAF dataframes to a temporary file chunk by chunk, then move it to file_path.
+        Rows are numbered in the first column across all MAF files.
+
+        :param file_path: Path of the combined maf file.
+        :return: Number of rows in the combined maf file.
+        """
+        columns = self.get_columns()
+        temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        row_count = 0
+        try:
+            with open(temp_file_path, "w", encoding="utf-8", newline="") as f:
+                f.write("\t".join([""] + columns) + "\n")
+                for maf_temp in self.get_dataframe():
+                    maf_temp.index = pandas.RangeIndex(
+                        row_count, row_count + len(maf_temp.index)
+                    )
+                    maf_temp.to_csv(f, sep="\t", header=False, index=True)
+                    row_count += len(maf_temp.index)
+            os.replace(temp_file_path, file_path)
+        finally:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+        return row_count
+
+    def get_columns(self) -> List[str]:
+        return ["study_id", "maf_filename"] + MAF_COLUMNS[self.method]
+
     def get_dataframe(self):
         """
-        Yield an individual dataframe-as-a-dict. This is a generator method, with the idea being that with such massive files
-        we want to limit how many dataframes we are holding in memory at once. We convert the dataframe to a dict in this method,
-        and then yield it. This means we only have one dataframe open in memory at a time.
+        Yield cleaned MAF dataframes in study order. This is a generator method, with the idea being that with such
+        massive files we want to limit how many dataframes we are holding in memory at once. MAF files are read by a
+        thread pool and at most 2 * max_workers dataframes are waiting to be consumed.
 
         The method also sorts through each of the maf files found in the study directory, attempting to cast off any
         that might correspond to other analytical methods.
         """
-        for i, study_id in enumerate(self.studies_to_combine):
-            # copy = repr(self.original_study_location).strip("'")
+        max_workers = max(self.max_workers, 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for study_id, study_location, maf in self.get_maf_files():
+                pending.append(
+                    executor.submit(self.read_maf, study_id, study_location, maf)
+                )
+                if len(pending) >= 2 * max_workers:
+                    maf_temp = pending.popleft().result()
+                    if maf_temp is not None:
+                        yield maf_temp
+            while pending:
+                maf_temp = pending.popleft().result()
+                if maf_temp is not None:
+                    yield maf_temp
+
+    def get_maf_files(self):
+        for study_id in self.studies_to_combine:
             study_location = os.path.join(
                 get_study_settings().mounted_paths.study_metadata_files_root_path,
                 study_id,
             )
-
             for maf in self.sort_mafs(study_location, study_id):
-                maf_temp = None
-                try:
-                    maf_temp = pandas.read_csv(
-                        os.path.join(study_location, maf),
-                        sep="\t",
-                        header=0,
-                        encoding="unicode_escape",
-                    )
-                except pandas.errors.EmptyDataError as e:
-                    logger.error(
-                        f"EmptyDataError Issue with opening maf file {maf}: {str(e)}"
-                    )
-                    self.unopenable_maf_register.append(maf)
-                    continue
-                except Exception as e:
-                    logger.error(
-                        f"Issue with opening maf file {maf}, cause of error unclear: {str(e)}"
-                    )
-                    self.unopenable_maf_register.append(maf)
-                    continue
+                yield study_id, study_location, maf
 
-                cleanup_function = getattr(DataFrameUtils, f"{self.method}_maf_cleanup")
-                maf_temp = cleanup_function(maf_temp, study_id, maf)
-                maf_as_dict = totuples(df=maf_temp, text="dict")["dict"]
+    def read_maf(
+        self, study_id: str, study_location: str, maf: str
+    ) -> Union[None, pandas.DataFrame]:
+        """
+        Read only the combined maf columns of a MAF file and clean it up.
 
-                yield maf_as_dict
+        :return: Cleaned dataframe or None if the MAF file can not be opened.
+        """
+        columns = self.get_columns()
+        selected_columns = set(columns)
+        try:
+            maf_temp = pandas.read_csv(
+                os.path.join(study_location, maf),
+                sep="\t",
+                header=0,
+                encoding="unicode_escape",
+                usecols=lambda x: x in selected_columns,
+            )
+        except pandas.errors.EmptyDataError as e:
+            logger.error(f"EmptyDataError Issue with opening maf file {maf}: {str(e)}")
+            self.unopenable_maf_register.append(maf)
+            return None
+        except Exception as e:
+            logger.error(
+                f"Issue with opening maf file {maf}, cause of error unclear: {str(e)}"
+            )
+            self.unopenable_maf_register.append(maf)
+            return None
+
+        cleanup_function = getattr(DataFrameUtils, f"{self.method}_maf_cleanup")
+        maf_temp = cleanup_function(maf_temp, study_id, maf)
+        maf_temp = maf_temp.reindex(columns=columns)
+        maf_temp["study_id"] = study_id
+        maf_temp["maf_filename"] = maf
+        return maf_temp
 
     def sort_mafs(self, study_location: str, study_id: str):
         """
@@ -19,9 +19,9 @@
 import logging
 import os
 import random
-from zipfile import ZipFile
+from typing import List, Tuple, Union
 
-from flask import make_response, request, send_file
+from flask import Response, make_response, request, send_file
 from flask_restful import Resource, abort
 from flask_restful_swagger import swagger
 
@@ -29,13 +29,13 @@ from app.utils import metabolights_exception_handler
 from app.ws.auth.permissions import validate_submission_view
 from app.ws.db.types import StudyStatus
 from app.ws.mtblsWSclient import WsClient
-from app.ws.settings.utils import get_study_settings
 from app.ws.study.folder_utils import get_basic_files
 from app.ws.study.utils import (
     get_study_audit_files_path,
     get_study_internal_files_path,
     get_study_metadata_path,
 )
+from app.ws.study.zip_stream import stream_zip
 
 logger = logging.getLogger("wslog")
 # MetaboLights (Java-Based) WebService client
@@ -112,7 +112,6 @@ class SendFiles(Resource):
                 f"on EBI's public FTP server '{ftp}' and path '{path}' ",
             )
 
-        settings = get_study_settings()
         files = ""
         if file_name == "metadata":
             file_list = get_basic_files(
@@ -125,56 +124,13 @@ class SendFiles(Resource):
                     files = files + f_name + "|"
             file_name = files.rstrip("|")
 
-        remove_file = False
         safe_path = os.path.join(study_metadata_location, file_name)
-        zip_name = None
         try:
-            download_folder_path = os.path.join(
-                study_metadata_location,
-                settings.internal_files_symbolic_link_name,
-                "temp",
-            )
-            os.makedirs(download_folder_path, exist_ok=True)
-            short_zip = (
-                study_id
-                + "_"
-                + str(random.randint(100000, 200000))
-                + "_compressed_files.zip"
-            )
-            zip_name = os.path.join(download_folder_path, short_zip)
-            if os.path.isfile(zip_name):
-                os.remove(zip_name)
-            if "|" in file_name and not os.path.exists(safe_path):
-                zipfile = ZipFile(zip_name, mode="a")
-                remove_file = True
-                files = file_name.split("|")
-                for file in files:
-                    safe_path = os.path.join(study_metadata_location, file)
-                    if os.path.isdir(safe_path):
-                        for sub_file in recursively_get_files(safe_path):
-                            f_name = sub_file.path.replace(study_metadata_location, "")
-                            zipfile.write(sub_file.path, arcname=f_name)
-                    else:
-                        zipfile.write(safe_path, arcname=file)
-                zipfile.close()
-                remove_file = True
-                safe_path = zip_name
-                file_name = short_zip
-            else:
-                if os.path.isdir(safe_path):
-                    zipfile = ZipFile(zip_name, mode="a")
-                    for sub_file in recursively_get_files(safe_path):
-                        zipfile.write(
-                            sub_file.path.replace(study_metadata_location, ""),
-                            arcname=sub_file.name,
-                        )
-                    zipfile.close()
-                    remove_file = True
-                    safe_path = zip_name
-                    file_name = short_zip
-                else:
-                    head, tail = os.path.split(file_name)
-                    file_name = tail
+            zip_entries = get_zip_entries(study_metadata_location, file_name)
+            if zip_entries is not None:
+                return create_zip_stream_response(study_id, zip_entries)
+            head, tail = os.path.split(file_name)
+            file_name = tail
 
             resp = make_response(
                 send_file(
@@ -184,14 +140,10 @@ class SendFiles(Resource):
             # response.headers["Content-Disposition"] = "attachment; filename={}".format(file_name)
             resp.headers["Content-Type"] = "application/octet-stream"
             return resp
-        except FileNotFoundError as e:
+        except FileNotFoundError:
             abort(404, message="Could not find file " + file_name)
         except Exception as e:
             abort(404, message="Could not create zip file " + str(e))
-        finally:
-            if remove_file and os.path.exists(zip_name):
-                os.remove(zip_name)
-                logger.info("Removed zip file %s", zip_name)
 
 
 class SendFilesPrivate(Resource):
@@ -287,54 +239,12 @@ class SendFilesPrivate(Resource):
                     files = files + f_name + "|"
             file_name = files.rstrip("|")
 
-        remove_file = False
-        safe_path = os.path.join(study_metadata_location, file_name)
-        zip_name = None
         try:
-            download_folder_path = os.path.join(
-                get_study_internal_files_path(study_id), "temp"
-            )
-            os.makedirs(download_folder_path, exist_ok=True)
-            short_zip = (
-                study_id
-                + "_"
-                + str(random.randint(100000, 200000))
-                + "_compressed_files.zip"
-            )
-            zip_name = os.path.join(download_folder_path, short_zip)
-            if os.path.isfile(zip_name):
-                os.remove(zip_name)
-            if "|" in file_name and not os.path.exists(safe_path):
-                zipfile = ZipFile(zip_name, mode="a")
-                remove_file = True
-                files = file_name.split("|")
-                for file in files:
-                    safe_path = os.path.join(study_metadata_location, file)
-                    if os.path.isdir(safe_path):
-                        for sub_file in recursively_get_files(safe_path):
-                            f_name = sub_file.path.replace(study_metadata_location, "")
-                            zipfile.write(sub_file.path, arcname=f_name)
-                    else:
-                        zipfile.write(safe_path, arcname=file)
-                zipfile.close()
-                remove_file = True
-                safe_path = zip_name
-                file_name = short_zip
-            else:
-                if os.path.isdir(safe_path):
-                    zipfile = ZipFile(zip_name, mode="a")
-                    for sub_file in recursively_get_files(safe_path):
-                        zipfile.write(
-                            sub_file.path.replace(study_metadata_location, ""),
-                            arcname=sub_file.name,
-                        )
-                    zipfile.close()
-                    remove_file = True
-                    safe_path = zip_name
-                    file_name = short_zip
-                else:
-                    file_name = basename
-                    safe_path = target_path
+            zip_entries = get_zip_entries(study_metadata_location, file_name)
+            if zip_entries is not None:
+                return create_zip_stream_response(study_id, zip_entries)
+            file_name = basename
+            safe_path = target_path
 
             resp = make_response(
                 send_file(
@@ -344,14 +254,48 @@ class SendFilesPrivate(Resource):
             # response.headers["Content-Disposition"] = "attachment; filename={}".format(file_name)
             resp.headers["Content-Type"] = "application/octet-stream"
             return resp
-        except FileNotFoundError as e:
+        except FileNotFoundError:
             abort(404, message="Could not find file " + file_name)
         except Exception as e:
             abort(404, message="Could not create zip file " + str(e))
-        finally:
-            if remove_file:
-                os.remove(safe_path)
-                logger.info("Removed zip file " + safe_path)
+
+
+def get_zip_entries(
+    study_metadata_location: str, file_name: str
+) -> Union[None, List[Tuple[str, str]]]:
+    """
+    Return (file path, archive name) tuples if the requested file name is a
+    folder or a list of files separated by "|". Return None for a single file.
+    """
+    safe_path = os.path.join(study_metadata_location, file_name)
+    if "|" in file_name and not os.path.exists(safe_path):
+        zip_entries = []
+        for file in file_name.split("|"):
+            safe_path = os.path.join(study_metadata_location, file)
+            if os.path.isdir(safe_path):
+                for sub_file in recursively_get_files(safe_path):
+                    f_name = sub_file.path.replace(study_metadata_location, "")
+                    zip_entries.append((sub_file.path, f_name))
+            elif os.path.isfile(safe_path):
+                zip_entries.append((safe_path, file))
+            else:
+                raise FileNotFoundError(safe_path)
+        return zip_entries
+    if os.path.isdir(safe_path):
+        return [(x.path, x.name) for x in recursively_get_files(safe_path)]
+    return None
+
+
+def create_zip_stream_response(study_id: str, zip_entries: List[Tuple[str, str]]):
+    short_zip = (
+        study_id + "_" + str(random.randint(100000, 200000)) + "_compressed_files.zip"
+    )
+    logger.info("Streaming %s files in %s", len(zip_entries), short_zip)
+    resp = Response(stream_zip(zip_entries), direct_passthrough=True)
+    resp.headers["Content-Type"] = "application/octet-stream"
+    resp.headers["Content-Disposition"] = f"attachment; filename={short_zip}"
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 def recursively_get_files(base_dir):
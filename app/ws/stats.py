@@ -16,28 +16,68 @@
 #
 #  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the specific language governing permissions and limitations under the License.
 
+import itertools
 import logging
+import multiprocessing
 import os.path
-
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Set, Tuple, Union
+
+import pandas
 from flask import request
 from flask_restful import Resource
 from flask_restful_swagger import swagger
 
+from app.config import get_settings
+from app.study_folder_utils import scan_folder
+from app.tasks.worker import celery
 from app.ws.auth.permissions import validate_user_has_curator_role
 from app.ws.db_connection import (
-    add_maf_info_data,
-    database_maf_info_table_actions,
+    MAF_INFO_STAGING_TABLE,
+    add_maf_info_rows,
+    create_maf_info_staging_table,
     get_all_study_acc,
-    insert_update_data,
+    swap_maf_info_staging_table,
+    update_study_stats,
+    val_acc,
 )
-from app.ws.isaApiClient import IsaApiClient
 from app.ws.mtblsWSclient import WsClient
 from app.ws.settings.utils import get_study_settings
 from app.ws.utils import read_tsv
 
 logger = logging.getLogger("wslog")
 wsc = WsClient()
-iac = IsaApiClient()
+
+# task is defined in app.tasks, which imports update_maf_stats from this module
+UPDATE_MAF_STATS_TASK_NAME = (
+    "app.tasks.common_tasks.admin_tasks.maf_stats.update_maf_stats_task"
+)
+
+MAF_INFO_SOURCE_COLUMNS = ["database_identifier", "metabolite_identification"]
+
+UNKNOWN_IDENTIFIERS = (
+    "unknown",
+    "un-known",
+    "n/a",
+    "un_known",
+    "not known",
+    "not-known",
+    "not_known",
+    "unidentified",
+    "not identified",
+    "unmatched",
+    "0",
+    "na",
+    "nan",
+)
+
+UNKNOWN_IDENTIFIER_PATTERN = "|".join(
+    re.escape(x) for x in ("unknown", "unk-", "x - ", "m/z")
+)
 
 
 class StudyStats(Resource):
@@ -71,182 +111,302 @@ class StudyStats(Resource):
         ],
     )
     def post(self):
-        validate_user_has_curator_role(request)
+        result = validate_user_has_curator_role(request)
+        inputs = {"user_token": result.context.user_api_token}
+        task = celery.send_task(UPDATE_MAF_STATS_TASK_NAME, kwargs=inputs)
+        return {
+            "message": f"Study statistics update task is started. Task id: {task.id}"
+        }
+
+
+class StudyProgressLog(object):
+    """
+    Append-only list of processed study ids. An interrupted run continues from
+    the studies that are not in the list.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.completed: Set[str] = set()
+        if os.path.exists(file_path):
+            with open(file_path) as f:
+                self.completed = {x.strip() for x in f if x.strip()}
+
+    def add(self, study_ids: List[str]):
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, "a") as f:
+            f.write("".join(f"{x}\n" for x in study_ids))
+        self.completed.update(study_ids)
+
+    def clear(self):
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+        self.completed = set()
+
+
+def get_maf_stats_progress_log() -> StudyProgressLog:
+    return StudyProgressLog(
+        os.path.join(
+            get_settings().server.temp_directory_path,
+            "maf_stats",
+            "completed_studies.txt",
+        )
+    )
 
-        if update_maf_stats():
-            return {"Success": "Study statistics updated in database"}
 
-        return {"Error": "Study statistics could not be updated in database"}
+def count_files(folder_path: str) -> int:
+    # same as counting files of os.walk, symbolic links to folders are not followed
+    number_of_files = 0
+    for entry in scan_folder(folder_path):
+        if entry.is_dir():
+            entry.skip_children = entry.is_symlink()
+            continue
+        number_of_files += 1
+    return number_of_files
 
 
-def update_maf_stats():
-    # database_maf_info_table_actions()  # Truncate, drop and create the database table
+def get_investigation_values(line: str) -> List[str]:
+    values = line.rstrip("\r\n").split("\t")[1:]
+    return [x.strip().strip('"').strip() for x in values]
 
-    for acc in get_all_study_acc():
-        study_id = acc[0]
-        maf_len = 0
-        sample_len = 0
-        assay_len = 0
-        print(
-            "------------------------------------------ "
-            + study_id
-            + " ------------------------------------------"
+
+def get_study_file_names(study_metadata_location: str) -> Tuple[str, List[str]]:
+    """
+    Return sample and assay file names of the first study in the investigation
+    file. Only these lines are read, ISA-Tab objects are not created.
+    """
+    file_path = os.path.join(
+        study_metadata_location, get_study_settings().investigation_file_name
+    )
+    sample_file_name = None
+    assay_file_names = None
+    with open(file_path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if sample_file_name is None and line.startswith("Study File Name"):
+                values = get_investigation_values(line)
+                sample_file_name = values[0] if values else ""
+            elif assay_file_names is None and line.startswith("Study Assay File Name"):
+                assay_file_names = [x for x in get_investigation_values(line) if x]
+            if sample_file_name is not None and assay_file_names is not None:
+                break
+    return sample_file_name or "", assay_file_names or []
+
+
+def get_assay_maf_file_names(assay_df: pandas.DataFrame) -> List[str]:
+    if "Metabolite Assignment File" not in assay_df.columns:
+        return []
+    names = assay_df["Metabolite Assignment File"]
+    return [x for x in names.unique() if x]
+
+
+def collect_study_stats(study_id: str, study_metadata_location: str) -> Dict:
+    """
+    Read metadata files and MAF files of a study and return row counts and
+    maf_info rows. Sample and assay files are selected from the investigation
+    file and MAF files are selected from assay files. This function runs in a
+    worker process, so it does not access the database.
+    """
+    stats = {
+        "study_id": study_id,
+        "metadata_loaded": False,
+        "sample_rows": 0,
+        "assay_rows": 0,
+        "maf_rows": 0,
+        "number_of_files": 0,
+        "maf_info_rows": [],
+    }
+    try:
+        sample_file_name, assay_file_names = get_study_file_names(
+            study_metadata_location
+        )
+    except OSError as e:
+        logger.error(
+            "Failed to load ISA-Tab files for study " + study_id + ". " + str(e)
         )
+        return stats  # Cannot find the required metadata files
+    stats["metadata_loaded"] = True
 
-        try:
-            database_maf_info_table_actions(study_id)
-        except ValueError:
-            logger.error("Failed to update database for " + study_id)
-            continue
+    try:
+        stats["number_of_files"] = count_files(study_metadata_location)
+    except OSError:
+        stats["number_of_files"] = 0
 
-        study_metadata_location = os.path.join(
-            get_study_settings().mounted_paths.study_metadata_files_root_path, study_id
+    sample_file_path = os.path.join(study_metadata_location, sample_file_name)
+    if sample_file_name and os.path.isfile(sample_file_path):
+        stats["sample_rows"] = read_tsv(sample_file_path, cache=False).shape[0]
+    else:
+        logger.warning("No sample file found for " + study_id)
+
+    maf_file_names = []
+    for assay_file_name in assay_file_names:
+        file_name = os.path.join(study_metadata_location, assay_file_name)
+        assay_df = read_tsv(file_name, cache=False)
+        stats["assay_rows"] += assay_df.shape[0]
+        for maf_file_name in get_assay_maf_file_names(assay_df):
+            if maf_file_name not in maf_file_names:
+                maf_file_names.append(maf_file_name)
+
+    for maf_file_name in maf_file_names:
+        file_path = os.path.join(study_metadata_location, maf_file_name)
+        if not os.path.isfile(file_path):
+            logger.warning("Could not find file " + file_path)
+            continue
+        maf_df = read_tsv(file_path, col_names=MAF_INFO_SOURCE_COLUMNS, cache=False)
+        stats["maf_rows"] += maf_df.shape[0]
+        if not set(MAF_INFO_SOURCE_COLUMNS).issubset(maf_df.columns):
+            logger.error("MAF stats failed for " + study_id + ". File: " + file_path)
+            continue
+        stats["maf_info_rows"].extend(get_maf_info_rows(study_id, maf_df))
+    return stats
+
+
+def get_maf_info_rows(study_id: str, maf_df: pandas.DataFrame) -> List[Tuple]:
+    """
+    Return maf_info rows of a MAF dataframe. Values are same as clean_string and
+    is_identified results of each row.
+    """
+    database_identifiers = maf_df["database_identifier"]
+    metabolite_identifications = maf_df["metabolite_identification"]
+    return list(
+        zip(
+            itertools.repeat(study_id.strip(), len(maf_df.index)),
+            clean_strings(database_identifiers),
+            clean_strings(metabolite_identifications),
+            are_identified(database_identifiers),
+            are_identified(metabolite_identifications),
         )
-        try:
-            isa_study, isa_inv, std_path = iac.get_isa_study(
-                study_id=study_id,
-                skip_load_tables=True,
-                study_location=study_metadata_location,
-            )
-        except Exception as e:
-            logger.error(
-                "Failed to load ISA-Tab files for study " + study_id + ". " + str(e)
-            )
-            continue  # Cannot find the required metadata files, skip to the next study
+    )
 
-        try:
-            number_of_files = sum(
-                [len(files) for r, d, files in os.walk(study_metadata_location)]
-            )
-        except:
-            number_of_files = 0
 
-        try:
-            sample_file_name = isa_study.filename
-            sample_df = read_tsv(
-                os.path.join(study_metadata_location, sample_file_name)
-            )
-            sample_len = sample_df.shape[0]
-        except FileNotFoundError:
-            logger.warning("No sample file found for " + study_id)
-
-        for assay in isa_study.assays:
-            complete_maf = []
-            file_name = os.path.join(study_metadata_location, assay.filename)
-            logger.info(
-                "Trying to load TSV file (%s) for Study %s", file_name, study_id
-            )
-            # Get the Assay table or create a new one if it does not already exist
+def iterate_study_stats(
+    study_ids: List[str], metadata_root_path: str, max_workers: int
+) -> Iterator[Dict]:
+    """
+    Collect study statistics in worker processes and yield them in input order.
+    At most 2 * max_workers results are kept in memory.
+    """
+    max_workers = max(max_workers, 1)
+    # workers are forked from a single-threaded server process instead of the
+    # caller, which may have threads and open connections.
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        pending = deque()
+
+        def next_result():
+            study_id, future = pending.popleft()
             try:
-                assay_file_df = read_tsv(file_name)
+                return future.result()
+            except BrokenProcessPool:
+                raise
             except Exception as e:
-                logger.error("The file " + file_name + " was not found")
-            try:
-                assay_len = assay_len + assay_file_df.shape[0]
-                assay_maf_name = assay_file_df["Metabolite Assignment File"].iloc[0]
-                if not assay_maf_name:
-                    continue  # No MAF referenced in this assay
-            except Exception:
-                logger.error("Error in identifying MAF column in assay")
-                continue  # No MAF column found in this assay
-
-            maf_file_name = os.path.join(
-                study_metadata_location, assay_maf_name
-            )  # MAF sheet
-
-            if os.path.isfile(maf_file_name):
-                try:
-                    maf_df = read_tsv(maf_file_name)
-                except Exception as e:
-                    logger.error("The file " + maf_file_name + " was not found")
-
-                print(
-                    study_id
-                    + " - Rows: "
-                    + str(len(maf_df))
-                    + ". File: "
-                    + maf_file_name
-                )
-            else:
-                print("Could not find file " + maf_file_name)
-                continue
-
-            maf_len = maf_len + maf_df.shape[0]
-
-            for idx, row in maf_df.iterrows():
-                maf_row = {}
-                try:
-                    database_identifier = row["database_identifier"]
-                    metabolite_identification = row["metabolite_identification"]
-                    maf_row.update({"acc": study_id})
-                    maf_row.update({"database_identifier": database_identifier})
-                    maf_row.update(
-                        {"metabolite_identification": metabolite_identification}
-                    )
-                    maf_row.update(
-                        {"database_found": is_identified(database_identifier)}
-                    )
-                    maf_row.update(
-                        {"metabolite_found": is_identified(metabolite_identification)}
-                    )
-                except Exception as e:
-                    logger.error(
-                        "MAF stats failed for " + study_id + ". Error: " + str(e)
-                    )
-                    continue
-
-                complete_maf.append(maf_row)
-
-            status, msg = update_database_stats(complete_maf)  # Update once per MAF
-
-        study_sql = (
-            "UPDATE STUDIES SET sample_rows = "
-            + str(sample_len)
-            + ", assay_rows = "
-            + str(assay_len)
-            + ", maf_rows = "
-            + str(maf_len)
-            + ", number_of_files = "
-            + str(number_of_files)
-            + " WHERE ACC = '"
-            + str(study_id)
-            + "';"
-        )
-
-        status, msg = insert_update_data(study_sql)
-        print("Database updated: " + study_sql)
-
+                logger.error("MAF stats failed for " + study_id + ". " + str(e))
+                return None
+
+        for study_id in study_ids:
+            future = executor.submit(
+                collect_study_stats,
+                study_id,
+                os.path.join(metadata_root_path, study_id),
+            )
+            pending.append((study_id, future))
+            if len(pending) >= 2 * max_workers:
+                stats = next_result()
+                if stats:
+                    yield stats
+        while pending:
+            stats = next_result()
+            if stats:
+                yield stats
+
+
+def write_study_stats(
+    study_stats: List[Dict], progress_log: StudyProgressLog
+) -> Tuple[bool, str]:
+    """
+    Load maf_info rows of studies into the staging table and update their row
+    counts. Studies are recorded as processed after both are committed.
+    """
+    maf_info_rows = itertools.chain.from_iterable(
+        x["maf_info_rows"] for x in study_stats
+    )
+    status, msg = add_maf_info_rows(maf_info_rows, table_name=MAF_INFO_STAGING_TABLE)
+    rows = [x for x in study_stats if x["metadata_loaded"]]
+    if status and rows:
+        status, msg = update_study_stats(rows)
+    if status:
+        progress_log.add([x["study_id"] for x in study_stats])
     return status, msg
 
 
-def update_database_stats(complete_maf_list):
-    status = False
-    msg = "Database successfully updated"
-
-    for row in complete_maf_list:
-        acc = row["acc"]
-        acc = acc.strip()
-        database_identifier = row["database_identifier"]
-        database_identifier = clean_string(database_identifier)
-        metabolite_identification = row["metabolite_identification"]
-        metabolite_id = clean_string(metabolite_identification)
-        if metabolite_id != metabolite_identification:
-            # print('Compound name "' + metabolite_identification + '" changed to "' + metabolite_id + '"')
-            metabolite_identification = metabolite_id
-        database_found = row["database_found"]
-        database_found = clean_string(database_found)
-        metabolite_found = row["metabolite_found"]
-        metabolite_found = clean_string(metabolite_found)
-        status, msg = add_maf_info_data(
-            acc,
-            database_identifier,
-            metabolite_identification,
-            database_found,
-            metabolite_found,
-        )
-        if not status:
-            return status, msg
-
+def update_maf_stats(max_workers: Union[None, int] = None, resume: bool = True):
+    """
+    Update maf_info table and row counts of all studies. Studies are processed
+    in worker processes, and results are written in batches. maf_info rows are
+    loaded into a staging table that replaces maf_info after all studies are
+    processed, so rows of deleted studies are removed and readers see the
+    previous table until then. If resume is True, studies processed by an
+    interrupted run are skipped and their staged rows are kept.
+    """
+    if max_workers is None:
+        max_workers = get_study_settings().maf_stats_max_workers
+    batch_size = 50
+    progress_log = get_maf_stats_progress_log()
+    if not resume:
+        progress_log.clear()
+    study_ids = []
+    for acc in get_all_study_acc():
+        study_id = acc[0]
+        if study_id in progress_log.completed:
+            continue
+        try:
+            val_acc(study_id)
+        except Exception:
+            logger.error("Failed to update database for " + study_id)
+            continue
+        study_ids.append(study_id)
+    metadata_root_path = (
+        get_study_settings().mounted_paths.study_metadata_files_root_path
+    )
+    status, msg = create_maf_info_staging_table(
+        progress_log.completed if progress_log.completed else None
+    )
+    if not status:
+        return status, msg
+    status, msg = True, "Study statistics are updated"
+    processed = 0
+    batch = []
+    start = time.monotonic()
+    for stats in iterate_study_stats(study_ids, metadata_root_path, max_workers):
+        processed += 1
+        batch.append(stats)
+        if len(batch) >= batch_size:
+            result, result_msg = write_study_stats(batch, progress_log)
+            if not result:
+                status, msg = result, result_msg
+            batch = []
+            elapsed = time.monotonic() - start
+            logger.info(
+                "MAF stats progress: %s/%s studies, %.1f studies/min",
+                processed,
+                len(study_ids),
+                processed * 60 / elapsed if elapsed else 0,
+            )
+    if batch:
+        result, result_msg = write_study_stats(batch, progress_log)
+        if not result:
+            status, msg = result, result_msg
+    logger.info(
+        "MAF stats are updated for %s/%s studies in %.1f seconds",
+        processed,
+        len(study_ids),
+        time.monotonic() - start,
+    )
+    if status:
+        status, msg = swap_maf_info_staging_table()
+    if status:
+        # next run processes all studies
+        progress_log.clear()
     return status, msg
 
 
@@ -264,22 +424,18 @@ def clean_string(string):
     return new_string
 
 
+def clean_strings(values: pandas.Series) -> pandas.Series:
+    """
+    Vectorized clean_string for str columns.
+    """
+    values = values.astype(str).str.strip()
+    for old, new in (("'", ""), ("  ", " "), ("\t", ""), ("*", "")):
+        values = values.str.replace(old, new, regex=False)
+    return values
+
+
 def is_identified(maf_identifier):
-    unknown_list = (
-        "unknown",
-        "un-known",
-        "n/a",
-        "un_known",
-        "not known",
-        "not-known",
-        "not_known",
-        "unidentified",
-        "not identified",
-        "unmatched",
-        "0",
-        "na",
-        "nan",
-    )
+    unknown_list = UNKNOWN_IDENTIFIERS
 
     identified = "0"
     if not maf_identifier:
@@ -301,3 +457,16 @@ def is_identified(maf_identifier):
         identified = "1"
 
     return identified
+
+
+def are_identified(values: pandas.Series) -> pandas.Series:
+    """
+    Vectorized is_identified for str columns.
+    """
+    lower_values = values.astype(str).str.lower()
+    unknown = (
+        (values == "")
+        | lower_values.str.contains(UNKNOWN_IDENTIFIER_PATTERN, regex=True)
+        | lower_values.isin(UNKNOWN_IDENTIFIERS)
+    )
+    return unknown.map({True: "0", False: "1"})
@@ -0,0 +1,401 @@
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+from app.study_folder_utils import FileDescriptor
+
+logger = logging.getLogger("wslog")
+
+DATA_FILE_INDEX_FOLDER_NAME = "data_file_index"
+DATA_FILE_INDEX_MANIFEST_FILE_NAME = "index.json"
+FULL_SCAN_TIMES = "full_scan_times"
+LEGACY_DATA_FILE_INDEX_FILE_NAME = "data_file_index.json"
+DATA_FILES_ROOT_FOLDER = "FILES"
+PRIVATE_DATA_FILES = "private_data_files"
+PUBLIC_DATA_FILES = "public_data_files"
+
+
+def get_suffix(name: str) -> str:
+    # same as pathlib suffix
+    idx = name.rfind(".")
+    if 0 < idx < len(name) - 1:
+        return name[idx:]
+    return ""
+
+
+def get_pattern_prefix(pattern: str) -> str:
+    match = re.search(r"[*?\[]", pattern)
+    return pattern[: match.start()] if match else pattern
+
+
+def is_metadata_file_name(name: str) -> bool:
+    if name.startswith("m_") and name.endswith(".tsv"):
+        return True
+    return name.endswith(".txt") and len(name) > 2 and name[:2] in {"i_", "s_", "a_"}
+
+
+def write_json_file(file_path: str, content: Any):
+    temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_file_path, "w") as f:
+        json.dump(content, f)
+    os.replace(temp_file_path, file_path)
+
+
+class DataFileIndex(object):
+    """
+    Index of study data files sharded by folder.
+
+    Each indexed folder has a shard file that stores descriptors of its direct
+    children. The manifest stores modification time of each folder, so a folder
+    is listed again only if its content changed or it contains recently modified
+    files. All folders are listed again periodically, because a file can be
+    overwritten in place without changing its folder. Readers load only the
+    shards of the requested folders.
+
+    Shards and manifest are replaced atomically, so readers on other hosts do
+    not need locks.
+    """
+
+    def __init__(self, data_files_root_path: str):
+        self.data_files_root_path = data_files_root_path
+        self.index_path = os.path.join(
+            data_files_root_path, DATA_FILE_INDEX_FOLDER_NAME
+        )
+        self.manifest_path = os.path.join(
+            self.index_path, DATA_FILE_INDEX_MANIFEST_FILE_NAME
+        )
+        self.legacy_index_path = os.path.join(
+            data_files_root_path, LEGACY_DATA_FILE_INDEX_FILE_NAME
+        )
+        self._manifest: Union[None, Dict[str, Any]] = None
+        self._legacy_index: Union[None, Dict[str, Any]] = None
+        self._removed_shards: List[str] = []
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path) or os.path.exists(
+            self.legacy_index_path
+        )
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        if self._manifest is None:
+            self._manifest = {}
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path) as f:
+                    self._manifest = json.load(f)
+            elif os.path.exists(self.legacy_index_path):
+                # studies indexed before sharded indexes
+                with open(self.legacy_index_path) as f:
+                    self._legacy_index = json.load(f)
+                self._manifest = {
+                    k: v
+                    for k, v in self._legacy_index.items()
+                    if k not in {PRIVATE_DATA_FILES, PUBLIC_DATA_FILES}
+                }
+        return self._manifest
+
+    def _get_legacy_files(self, source: str) -> Union[None, Dict[str, Any]]:
+        if not self.manifest or self._legacy_index is None:
+            return None
+        return self._legacy_index.get(source) or {}
+
+    def _get_shard_path(self, source: str, folder: str) -> str:
+        name = hashlib.sha1(folder.encode("utf-8")).hexdigest()
+        return os.path.join(self.index_path, source, f"{name}.json")
+
+    def _load_shard(self, source: str, folder: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._get_shard_path(source, folder)) as f:
+                return json.load(f)["files"]
+        except FileNotFoundError:
+            return {}
+
+    def get_folders(self, source: str) -> Dict[str, Dict[str, Any]]:
+        if self._get_legacy_files(source) is not None:
+            return {}
+        return self.manifest.get("folders", {}).get(source, {})
+
+    def get_children(self, source: str, folder: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Return descriptors of files and folders in a folder.
+        """
+        files = self._get_legacy_files(source)
+        if files is not None:
+            return {
+                v["relative_path"]: v
+                for v in files.values()
+                if v["parent_relative_path"] == folder
+            }
+        if folder not in self.get_folders(source):
+            return {}
+        return self._load_shard(source, folder)
+
+    def search(self, source: str, pattern: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (relative path, descriptor) of files and folders that match a
+        fnmatch pattern. Only folders that can contain matches are loaded.
+        """
+        matcher = re.compile(fnmatch.translate(pattern))
+        files = self._get_legacy_files(source)
+        if files is not None:
+            for key, descriptor in files.items():
+                if matcher.match(key):
+                    yield key, descriptor
+            return
+        prefix = get_pattern_prefix(pattern)
+        for folder in self.get_folders(source):
+            folder_prefix = folder + "/"
+            if not folder_prefix.startswith(prefix) and not prefix.startswith(
+                folder_prefix
+            ):
+                continue
+            for key, descriptor in self._load_shard(source, folder).items():
+                if matcher.match(key):
+                    yield key, descriptor
+
+    def _write_shard(self, source: str, folder: str, files: Dict[str, Any]):
+        write_json_file(
+            self._get_shard_path(source, folder), {"folder": folder, "files": files}
+        )
+
+    def _create_descriptor(
+        self, entry: os.DirEntry, folder: str, stat_result: os.stat_result
+    ) -> Dict[str, Any]:
+        is_dir = entry.is_dir()
+        return FileDescriptor(
+            name=entry.name,
+            relative_path=f"{folder}/{entry.name}",
+            is_dir=is_dir,
+            modified_time=stat_result.st_mtime,
+            extension=get_suffix(entry.name),
+            file_size=0 if is_dir else stat_result.st_size,
+            is_empty=False if is_dir else stat_result.st_size == 0,
+            parent_relative_path=folder,
+        ).model_dump()
+
+    def _scan_folder(
+        self,
+        folder: str,
+        folder_path: str,
+        ignore_files: Tuple[str, ...],
+        skip_file: Union[None, Callable[[str], bool]],
+    ) -> Dict[str, Dict[str, Any]]:
+        files = {}
+        root_prefix_length = len(DATA_FILES_ROOT_FOLDER) + 1
+        with os.scandir(folder_path) as iterator:
+            for entry in iterator:
+                relative_path = f"{folder}/{entry.name}"
+                if ignore_files and relative_path[root_prefix_length:].startswith(
+                    ignore_files
+                ):
+                    continue
+                if entry.name.startswith(".nfs"):
+                    continue
+                try:
+                    stat_result = entry.stat()
+                except OSError:
+                    # broken symbolic link
+                    continue
+                if skip_file and skip_file(entry.name):
+                    continue
+                files[relative_path] = self._create_descriptor(
+                    entry, folder, stat_result
+                )
+        return files
+
+    def _refresh_files(
+        self, folder_path: str, files: Dict[str, Dict[str, Any]]
+    ) -> bool:
+        updated = False
+        for descriptor in files.values():
+            if descriptor["is_dir"]:
+                continue
+            try:
+                stat_result = os.stat(os.path.join(folder_path, descriptor["name"]))
+            except OSError:
+                continue
+            if (
+                descriptor["file_size"] != stat_result.st_size
+                or descriptor["modified_time"] != stat_result.st_mtime
+            ):
+                descriptor["file_size"] = stat_result.st_size
+                descriptor["modified_time"] = stat_result.st_mtime
+                descriptor["is_empty"] = stat_result.st_size == 0
+                updated = True
+        return updated
+
+    def update_source(
+        self,
+        source: str,
+        root_path: str,
+        recursive: bool = True,
+        ignore_files: Union[None, List[str]] = None,
+        skip_file: Union[None, Callable[[str], bool]] = None,
+        recheck_window_in_seconds: int = 86400,
+        full_scan_interval_in_seconds: int = 7 * 86400,
+    ) -> Dict[str, int]:
+        """
+        Update index of a data files folder. Folders with the same modification
+        time are not listed again. Their files are checked again only if one of
+        them was modified in the last recheck_window_in_seconds, e.g. files that
+        were being uploaded at the last update.
+
+        A file overwritten in place does not change its folder. If its previous
+        version was older than the recheck window, the change is not detected
+        until the next full scan. All folders are listed again if the last full
+        scan of the source is older than full_scan_interval_in_seconds.
+
+        :param root_path: folder indexed as FILES
+        :param ignore_files: prefixes of relative paths to skip
+        :param skip_file: filter to skip files by name
+        """
+        os.makedirs(os.path.join(self.index_path, source), exist_ok=True)
+        old_folders = dict(self.get_folders(source))
+        now = time.time()
+        last_full_scan_time = self.manifest.get(FULL_SCAN_TIMES, {}).get(source, 0)
+        full_scan = now - last_full_scan_time >= full_scan_interval_in_seconds
+        reusable_folders = {} if full_scan else old_folders
+        sub_folders: Dict[str, List[str]] = {}
+        for folder in reusable_folders:
+            parent, _, _ = folder.rpartition("/")
+            sub_folders.setdefault(parent, []).append(folder)
+        ignore_prefixes = tuple(ignore_files or [])
+        recheck_time = now - recheck_window_in_seconds
+        new_folders: Dict[str, Dict[str, Any]] = {}
+        folder_mtimes: Dict[str, float] = {}
+        updated_folders = set()
+        stats = {
+            "folders": 0,
+            "scanned": 0,
+            "rechecked": 0,
+            "reused": 0,
+            "full_scan": int(full_scan),
+        }
+        stack = [DATA_FILES_ROOT_FOLDER]
+        while stack:
+            folder = stack.pop()
+            folder_path = os.path.join(
+                root_path, folder[len(DATA_FILES_ROOT_FOLDER) + 1 :]
+            )
+            try:
+                folder_stat = os.stat(folder_path)
+            except OSError:
+                continue
+            stats["folders"] += 1
+            folder_mtimes[folder] = folder_stat.st_mtime
+            old_folder = reusable_folders.get(folder)
+            if old_folder and old_folder["mtime_ns"] == folder_stat.st_mtime_ns:
+                children = None
+                if old_folder["latest_modified_time"] >= recheck_time:
+                    children = self._load_shard(source, folder)
+                    if self._refresh_files(folder_path, children):
+                        updated_folders.add(folder)
+                    stats["rechecked"] += 1
+                else:
+                    stats["reused"] += 1
+                if children is None:
+                    child_folders = sub_folders.get(folder, [])
+                    latest_modified_time = old_folder["latest_modified_time"]
+                else:
+                    child_folders = [k for k, v in children.items() if v["is_dir"]]
+                    latest_modified_time = max(
+                        [v["modified_time"] for v in children.values()] or [0]
+                    )
+            else:
+                children = self._scan_folder(
+                    folder, folder_path, ignore_prefixes, skip_file
+                )
+                updated_folders.add(folder)
+                stats["scanned"] += 1
+                child_folders = [k for k, v in children.items() if v["is_dir"]]
+                latest_modified_time = max(
+                    [v["modified_time"] for v in children.values()] or [0]
+                )
+            if folder in updated_folders:
+                self._write_shard(source, folder, children)
+            new_folders[folder] = {
+                "mtime_ns": folder_stat.st_mtime_ns,
+                "latest_modified_time": latest_modified_time,
+            }
+            if recursive:
+                stack.extend(child_folders)
+        # modification times of sub folders in unchanged parent folders
+        for folder, parent_folder in (
+            (x, x.rpartition("/")[0]) for x in new_folders if "/" in x
+        ):
+            if parent_folder in updated_folders or parent_folder not in new_folders:
+                continue
+            children = self._load_shard(source, parent_folder)
+            descriptor = children.get(folder)
+            if descriptor and descriptor["modified_time"] != folder_mtimes[folder]:
+                descriptor["modified_time"] = folder_mtimes[folder]
+                self._write_shard(source, parent_folder, children)
+        self._set_folders(source, new_folders, old_folders)
+        if full_scan:
+            full_scan_times = dict(self.manifest.get(FULL_SCAN_TIMES, {}))
+            full_scan_times[source] = now
+            self._manifest[FULL_SCAN_TIMES] = full_scan_times
+        stats["updated"] = len(updated_folders)
+        return stats
+
+    def replace_source(self, source: str, descriptors: Dict[str, Dict[str, Any]]):
+        """
+        Replace index of a source with descriptors, e.g. object storage listing.
+        """
+        os.makedirs(os.path.join(self.index_path, source), exist_ok=True)
+        old_folders = dict(self.get_folders(source))
+        shards: Dict[str, Dict[str, Any]] = {DATA_FILES_ROOT_FOLDER: {}}
+        for key, descriptor in descriptors.items():
+            shards.setdefault(descriptor["parent_relative_path"], {})[key] = descriptor
+        new_folders = {}
+        for folder, children in shards.items():
+            self._write_shard(source, folder, children)
+            new_folders[folder] = {"mtime_ns": 0, "latest_modified_time": 0}
+        self._set_folders(source, new_folders, old_folders)
+
+    def _set_folders(
+        self,
+        source: str,
+        new_folders: Dict[str, Dict[str, Any]],
+        old_folders: Dict[str, Dict[str, Any]],
+    ):
+        manifest = dict(self.manifest)
+        folders = dict(manifest.get("folders", {}))
+        folders[source] = new_folders
+        manifest["folders"] = folders
+        self._manifest = manifest
+        self._legacy_index = None
+        self._removed_shards.extend(
+            self._get_shard_path(source, x) for x in old_folders if x not in new_folders
+        )
+
+    def save(self, **attributes):
+        """
+        Write the manifest with attributes (e.g. index_datetime).
+        """
+        manifest = dict(self.manifest)
+        manifest.update(attributes)
+        os.makedirs(self.index_path, exist_ok=True)
+        write_json_file(self.manifest_path, manifest)
+        self._manifest = manifest
+        # shards of deleted folders are not used by the new manifest
+        for shard_path in self._removed_shards:
+            try:
+                os.remove(shard_path)
+            except FileNotFoundError:
+                pass
+        self._removed_shards = []
+        if os.path.exists(self.legacy_index_path):
+            os.remove(self.legacy_index_path)
+
+    def clear(self):
+        shutil.rmtree(self.index_path, ignore_errors=True)
+        self._manifest = None
+        self._legacy_index = None
+        self._removed_shards = []
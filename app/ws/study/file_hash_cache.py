@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Union
+
+from pydantic import BaseModel
+
+logger = logging.getLogger("wslog")
+
+DEFAULT_HASH_BUFFER_SIZE = 1024 * 1024
+
+
+def sha256sum(file_path: str, buffer_size: int = DEFAULT_HASH_BUFFER_SIZE) -> str:
+    sha256_hash = hashlib.sha256()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            sha256_hash.update(view[:size])
+    return sha256_hash.hexdigest()
+
+
+class FileHashCacheItem(BaseModel):
+    size: int
+    mtime_ns: int
+    inode: int
+    sha256: str
+
+
+class FileHashResult(BaseModel):
+    hashes: Dict[str, str] = {}
+    hashed_files: int = 0
+    skipped_files: int = 0
+    hashed_bytes: int = 0
+    elapsed_seconds: float = 0
+    megabytes_per_second: float = 0
+
+
+class FileHashCache(object):
+    """
+    Persistent sha256 cache of study data files.
+
+    Entries are keyed by file path and are reused while size, mtime_ns and inode
+    of the file are unchanged. Only new or modified files are read and they are
+    hashed by a bounded worker pool.
+    """
+
+    def __init__(
+        self,
+        cache_file_path: Union[None, str],
+        max_workers: int = 4,
+        buffer_size: int = DEFAULT_HASH_BUFFER_SIZE,
+        progress_interval_in_seconds: int = 60,
+    ):
+        self.cache_file_path = cache_file_path
+        self.max_workers = max(max_workers, 1)
+        self.buffer_size = buffer_size
+        self.progress_interval_in_seconds = progress_interval_in_seconds
+        self.items: Dict[str, FileHashCacheItem] = {}
+
+    def load(self):
+        self.items = {}
+        if not self.cache_file_path or not os.path.exists(self.cache_file_path):
+            return
+        try:
+            with open(self.cache_file_path) as f:
+                content = json.load(f)
+            self.items = {
+                key: FileHashCacheItem.model_validate(value)
+                for key, value in content.items()
+            }
+        except Exception as ex:
+            logger.warning(
+                "Hash cache file %s is not loaded: %s", self.cache_file_path, ex
+            )
+
+    def save(self):
+        if not self.cache_file_path:
+            return
+        temp_file_path = f"{self.cache_file_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file_path), exist_ok=True)
+            content = {key: value.model_dump() for key, value in self.items.items()}
+            with open(temp_file_path, "w") as f:
+                json.dump(content, f)
+            os.replace(temp_file_path, self.cache_file_path)
+        except Exception as ex:
+            logger.warning(
+                "Hash cache file %s is not saved: %s", self.cache_file_path, ex
+            )
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+    def calculate_hashes(self, file_paths: List[str]) -> FileHashResult:
+        """
+        Calculate sha256 hashes of files. Cache entries of files that are not in
+        the input list are removed.
+        :param file_paths: regular file paths
+        :return: hashes in input order and statistics
+        """
+        self.load()
+        result = FileHashResult()
+        start = time.time()
+        current_items: Dict[str, FileHashCacheItem] = {}
+        stats: Dict[str, os.stat_result] = {}
+        files_to_hash = []
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            stats[file_path] = stat
+            item = self.items.get(file_path)
+            if (
+                item
+                and item.size == stat.st_size
+                and item.mtime_ns == stat.st_mtime_ns
+                and item.inode == stat.st_ino
+            ):
+                current_items[file_path] = item
+                result.skipped_files += 1
+            else:
+                files_to_hash.append(file_path)
+
+        total_bytes = sum(stats[x].st_size for x in files_to_hash)
+        logger.info(
+            "%s files will be hashed (%.2f MB). %s files are unchanged.",
+            len(files_to_hash),
+            total_bytes / (1024 * 1024),
+            result.skipped_files,
+        )
+        last_log_time = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(sha256sum, x, self.buffer_size): x
+                    for x in files_to_hash
+                }
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    stat = stats[file_path]
+                    current_items[file_path] = FileHashCacheItem(
+                        size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns,
+                        inode=stat.st_ino,
+                        sha256=future.result(),
+                    )
+                    result.hashed_files += 1
+                    result.hashed_bytes += stat.st_size
+                    now = time.time()
+                    if now - last_log_time > self.progress_interval_in_seconds:
+                        last_log_time = now
+                        logger.info(
+                            "%s/%s files are hashed. %.2f MB/s",
+                            result.hashed_files,
+                            len(files_to_hash),
+                            result.hashed_bytes / (1024 * 1024) / (now - start),
+                        )
+        finally:
+            # keep completed hashes even if a file could not be read
+            self.items = current_items
+            self.save()
+        result.hashes = {x: current_items[x].sha256 for x in file_paths}
+        result.elapsed_seconds = time.time() - start
+        if result.elapsed_seconds > 0:
+            result.megabytes_per_second = (
+                result.hashed_bytes / (1024 * 1024) / result.elapsed_seconds
+            )
+        logger.info(
+            "File hashes are calculated in %.2f seconds. "
+            "Hashed: %s, skipped: %s, throughput: %.2f MB/s",
+            result.elapsed_seconds,
+            result.hashed_files,
+            result.skipped_files,
+            result.megabytes_per_second,
+        )
+        return result
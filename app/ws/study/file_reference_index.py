@@ -0,0 +1,130 @@
+import glob
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Set, Union
+
+from cachetools import LRUCache
+
+from app.ws.settings.utils import get_study_settings
+
+logger = logging.getLogger("wslog")
+
+FileSignature = tuple[str, int, int]
+
+
+def get_reference_keys(value: str) -> Set[str]:
+    """
+    Return a metadata cell value and its path suffixes. A file is referenced if
+    its name or its relative path is one of them, e.g. "FILES/raw/x.mzML"
+    references "FILES/raw/x.mzML", "raw/x.mzML" and "x.mzML".
+    """
+    value = value.strip().strip('"').strip()
+    if not value:
+        return set()
+    keys = {value}
+    parts = value.replace("\\", "/").split("/")
+    for idx in range(1, len(parts)):
+        suffix = "/".join(parts[idx:])
+        if suffix:
+            keys.add(suffix)
+            keys.add(suffix.replace("/", os.sep))
+    return keys
+
+
+class FileReferenceIndex(object):
+    """
+    Values referenced in the ISA-Tab files of a folder that match a file name
+    pattern (e.g. a_*.txt). It is valid while the folder and metadata files are
+    not modified.
+    """
+
+    def __init__(self, directory: str, pattern: str):
+        self.directory = directory
+        self.pattern = pattern
+        self.signature = self.get_signature(directory, pattern)
+        self.references: Set[str] = set()
+        for file_path, _, _ in self.signature[1:]:
+            try:
+                with open(file_path, "r", encoding="utf8", errors="ignore") as f:
+                    for line in f:
+                        for value in line.rstrip("\r\n").split("\t"):
+                            self.references.update(get_reference_keys(value))
+            except Exception as ex:
+                logger.error("File Format error? Cannot read or open %s", file_path)
+                logger.error(str(ex))
+        logger.debug(
+            "%s references are indexed in %s files of %s",
+            len(self.references),
+            pattern,
+            directory,
+        )
+
+    @staticmethod
+    def get_signature(directory: str, pattern: str) -> tuple[FileSignature, ...]:
+        stat = os.stat(directory)
+        signature = [(directory, stat.st_mtime_ns, stat.st_size)]
+        for file_path in sorted(glob.glob(os.path.join(directory, pattern))):
+            stat = os.stat(file_path)
+            signature.append((file_path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def is_valid(self) -> bool:
+        try:
+            for file_path, mtime_ns, size in self.signature:
+                stat = os.stat(file_path)
+                if stat.st_mtime_ns != mtime_ns or stat.st_size != size:
+                    return False
+        except OSError:
+            return False
+        return True
+
+    def contains(self, file_name: str) -> bool:
+        return file_name in self.references
+
+
+class FileReferenceIndexCache(object):
+    """
+    Reference indexes of recently listed folders. Files are read only when an
+    index is created, so classifying each file of a folder needs only stat calls
+    of the folder and its metadata files.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.cache = LRUCache(maxsize=max(max_entries, 1))
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_index(self, directory: str, pattern: str) -> FileReferenceIndex:
+        key = (os.path.realpath(directory), pattern)
+        with self.lock:
+            index: Union[None, FileReferenceIndex] = self.cache.get(key)
+        if index and index.is_valid():
+            with self.lock:
+                self.hits += 1
+            return index
+        index = FileReferenceIndex(key[0], pattern)
+        with self.lock:
+            self.misses += 1
+            self.cache[key] = index
+        return index
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+@lru_cache(1)
+def get_file_reference_index_cache() -> FileReferenceIndexCache:
+    max_entries = get_study_settings().file_reference_index_cache_max_entries
+    return FileReferenceIndexCache(max_entries)
@@ -180,11 +180,12 @@ def get_file_information(
             file_list = os.listdir(path)
 
         if validation_only and short_format and not static_file_found:
+            listed_files = set(tree_file_list)
             for file_name in assay_file_list:
-                if (
-                    os.path.isfile(os.path.join(study_location, file_name))
-                    and file_name not in tree_file_list
+                if file_name not in listed_files and os.path.isfile(
+                    os.path.join(study_location, file_name)
                 ):
+                    listed_files.add(file_name)
                     tree_file_list.append(file_name)
 
         for entry in flatten_list(tree_file_list):
@@ -265,20 +266,32 @@ def get_file_information(
     return file_list, latest_update_time
 
 
+def _get_entry_key(entry):
+    key = tuple(sorted(entry.items())) if isinstance(entry, dict) else entry
+    try:
+        hash(key)
+    except TypeError:
+        return repr(key)
+    return key
+
+
 def flatten_list(list_name, flat_list=None):
     # Now, with sub-folders we may have lists of lists, so flatten the structure
     if not flat_list:
         flat_list = []
-
-    for entry in list_name:
-        if isinstance(entry, list):
-            for sub_entry in entry:
-                if isinstance(sub_entry, list):
-                    flatten_list(sub_entry, flat_list=flat_list)
-                elif sub_entry not in flat_list and type(sub_entry) is not bool:
-                    flat_list.append(sub_entry)
-        else:
-            if type(entry) is not bool and entry not in flat_list:
+    added_entries = {_get_entry_key(x) for x in flat_list}
+    end_of_list = object()
+    stack = [iter(list_name)]
+    while stack:
+        entry = next(stack[-1], end_of_list)
+        if entry is end_of_list:
+            stack.pop()
+        elif isinstance(entry, list):
+            stack.append(iter(entry))
+        elif type(entry) is not bool:
+            key = _get_entry_key(entry)
+            if key not in added_entries:
+                added_entries.add(key)
                 flat_list.append(entry)
     return flat_list
 
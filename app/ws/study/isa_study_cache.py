@@ -0,0 +1,122 @@
+import glob
+import logging
+import os
+import pickle
+import threading
+from functools import lru_cache
+from typing import Any, Union
+
+from cachetools import LRUCache
+
+from app.config import get_settings
+
+logger = logging.getLogger("wslog")
+
+FileSignature = tuple[str, int, int]
+
+
+class IsaStudyCache(object):
+    """
+    Process-wide cache of parsed ISA-Tab investigations.
+
+    Entries are keyed by study folder and load mode, and are valid only while
+    the (path, mtime_ns, size) signature of the files read by the parser is
+    unchanged. Parsed objects are stored as pickled snapshots, so every caller
+    gets its own copy and can modify it without affecting other readers.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.enabled = max_entries > 0
+        self._entries: LRUCache = LRUCache(maxsize=max(max_entries, 1))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def get_signature(
+        study_path: str, skip_load_tables: bool
+    ) -> Union[None, tuple[FileSignature, ...]]:
+        patterns = ["i_*.txt"]
+        if not skip_load_tables:
+            patterns.extend(["s_*.txt", "a_*.txt"])
+        signature = []
+        for pattern in patterns:
+            for file_path in sorted(glob.glob(os.path.join(study_path, pattern))):
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    return None
+                signature.append((file_path, stat.st_mtime_ns, stat.st_size))
+        if not signature:
+            return None
+        return tuple(signature)
+
+    def get(self, study_path: str, skip_load_tables: bool) -> Union[None, Any]:
+        if not self.enabled:
+            return None
+        key = (os.path.realpath(study_path), bool(skip_load_tables))
+        signature = self.get_signature(study_path, skip_load_tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if signature and entry and entry[0] == signature:
+                self.hits += 1
+                snapshot = entry[1]
+            else:
+                self.misses += 1
+                snapshot = None
+        if snapshot is None:
+            return None
+        return pickle.loads(snapshot)
+
+    def put(
+        self,
+        study_path: str,
+        skip_load_tables: bool,
+        signature: Union[None, tuple[FileSignature, ...]],
+        value: Any,
+    ) -> bool:
+        """
+        Store a parsed object if the files were not modified while parsing.
+        :param signature: file signature taken before the files were parsed
+        """
+        if not self.enabled or not signature:
+            return False
+        if signature != self.get_signature(study_path, skip_load_tables):
+            logger.debug("ISA files changed while parsing %s. Skip cache.", study_path)
+            return False
+        try:
+            snapshot = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as ex:
+            logger.warning("Parsed ISA study %s is not cached: %s", study_path, ex)
+            return False
+        key = (os.path.realpath(study_path), bool(skip_load_tables))
+        with self._lock:
+            self._entries[key] = (signature, snapshot)
+        return True
+
+    def invalidate(self, study_path: str):
+        real_path = os.path.realpath(study_path)
+        with self._lock:
+            for skip_load_tables in (True, False):
+                if self._entries.pop((real_path, skip_load_tables), None):
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxsize,
+            }
+
+
+@lru_cache(1)
+def get_isa_study_cache() -> IsaStudyCache:
+    return IsaStudyCache(max_entries=get_settings().study.isa_study_cache_max_entries)
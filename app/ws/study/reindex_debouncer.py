@@ -0,0 +1,89 @@
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, List, Union
+
+import redis
+
+from app.config import get_settings
+from app.ws.redis.redis import get_redis_server
+
+logger = logging.getLogger("wslog")
+
+# pop due studies atomically, so a study is triggered by one drain task only
+POP_DUE_STUDIES_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+end
+return ids
+"""
+
+
+class StudyReindexDebouncer(object):
+    """
+    Redis backed pending reindex set of studies.
+
+    Each request sets the due time of the study to now + debounce period, so a
+    burst of updates on a study is coalesced into one pending entry that is due
+    once the burst settles. A periodic task pops due studies and triggers one
+    reindex for each of them.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        debounce_period_in_seconds: int = 30,
+        key_prefix: str = "study_reindex",
+    ):
+        self.client = client
+        self.debounce_period_in_seconds = debounce_period_in_seconds
+        self.pending_key = f"{key_prefix}:pending"
+        self.stats_key = f"{key_prefix}:stats"
+        self._pop_due_studies = client.register_script(POP_DUE_STUDIES_SCRIPT)
+
+    def request(self, study_id: str, now: Union[None, float] = None) -> bool:
+        """
+        Add or postpone pending reindex of a study.
+        :return: False if the request is coalesced into a pending reindex
+        """
+        now = time.time() if now is None else now
+        due_time = now + self.debounce_period_in_seconds
+        pipeline = self.client.pipeline()
+        pipeline.zadd(self.pending_key, {study_id: due_time})
+        pipeline.hincrby(self.stats_key, "requested", 1)
+        added, _ = pipeline.execute()
+        if not added:
+            self.client.hincrby(self.stats_key, "coalesced", 1)
+        return bool(added)
+
+    def pop_due_studies(
+        self, now: Union[None, float] = None, limit: int = 1000
+    ) -> List[str]:
+        now = time.time() if now is None else now
+        study_ids = self._pop_due_studies(keys=[self.pending_key], args=[now, limit])
+        study_ids = [x.decode() if isinstance(x, bytes) else x for x in study_ids]
+        if study_ids:
+            self.client.hincrby(self.stats_key, "executed", len(study_ids))
+        return study_ids
+
+    def stats(self) -> Dict[str, int]:
+        pipeline = self.client.pipeline()
+        pipeline.hgetall(self.stats_key)
+        pipeline.zcard(self.pending_key)
+        counters, pending = pipeline.execute()
+        stats = {"requested": 0, "coalesced": 0, "executed": 0}
+        for key, value in counters.items():
+            key = key.decode() if isinstance(key, bytes) else key
+            stats[key] = int(value)
+        stats["pending"] = pending
+        return stats
+
+
+@lru_cache(1)
+def get_study_reindex_debouncer() -> StudyReindexDebouncer:
+    configuration = get_settings().celery.periodic_task_configuration
+    return StudyReindexDebouncer(
+        get_redis_server().get_redis(),
+        configuration.study_reindex_debounce_period_in_seconds,
+    )
@@ -0,0 +1,188 @@
+import errno
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import time
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from app.ws.study.file_hash_cache import (
+    DEFAULT_HASH_BUFFER_SIZE,
+    FileHashCache,
+    FileHashCacheItem,
+)
+
+logger = logging.getLogger("wslog")
+
+# linux/fs.h FICLONE ioctl
+FICLONE = 0x40049409
+
+
+class SnapshotResult(BaseModel):
+    linked_files: int = 0
+    reflinked_files: int = 0
+    copied_files: int = 0
+    stored_files: int = 0
+    stored_bytes: int = 0
+
+
+def reflink_file(source_path: str, target_path: str) -> bool:
+    """
+    Clone a file with copy-on-write extents if the filesystem supports it.
+    """
+    try:
+        with open(source_path, "rb") as source, open(target_path, "wb") as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+    except OSError:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        return False
+    shutil.copystat(source_path, target_path)
+    return True
+
+
+class SnapshotStore(object):
+    """
+    Content addressed store of snapshot (audit and revision folder) files.
+
+    Each distinct file content is stored once as objects/<sha256[:2]>/<sha256>
+    and snapshot files are hard links to the stored objects. If the snapshot
+    folder is on another filesystem, files are reflinked or copied.
+
+    Stored objects are shared by snapshots, so snapshot files must be replaced,
+    not modified in place. Hashes of source files are cached by size, mtime_ns
+    and inode, so unchanged files are not read again.
+    """
+
+    def __init__(self, store_path: str, buffer_size: int = DEFAULT_HASH_BUFFER_SIZE):
+        self.store_path = store_path
+        self.objects_path = os.path.join(store_path, "objects")
+        self.buffer_size = buffer_size
+        self.hash_cache = FileHashCache(
+            os.path.join(store_path, "file_hashes.json"), buffer_size=buffer_size
+        )
+
+    def get_object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_path, sha256[:2], sha256)
+
+    def _store_file(self, file_path: str, result: SnapshotResult) -> str:
+        # copy and hash in one pass, so the object matches its name even if
+        # the source file is updated concurrently.
+        sha256_hash = hashlib.sha256()
+        temp_file_path = os.path.join(
+            self.objects_path, f".{os.path.basename(file_path)}.{os.getpid()}.tmp"
+        )
+        size = 0
+        try:
+            with open(file_path, "rb") as source, open(temp_file_path, "wb") as target:
+                while True:
+                    chunk = source.read(self.buffer_size)
+                    if not chunk:
+                        break
+                    sha256_hash.update(chunk)
+                    target.write(chunk)
+                    size += len(chunk)
+            shutil.copystat(file_path, temp_file_path)
+            sha256 = sha256_hash.hexdigest()
+            object_path = self.get_object_path(sha256)
+            if os.path.exists(object_path):
+                os.remove(temp_file_path)
+            else:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                os.replace(temp_file_path, object_path)
+                result.stored_files += 1
+                result.stored_bytes += size
+        finally:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+        return sha256
+
+    def add_files(
+        self, file_paths: List[str], result: SnapshotResult
+    ) -> Dict[str, str]:
+        """
+        Store new or modified files and return their stored object paths.
+        """
+        os.makedirs(self.objects_path, exist_ok=True)
+        self.hash_cache.load()
+        object_paths = {}
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            item = self.hash_cache.items.get(file_path)
+            if (
+                item
+                and item.size == stat.st_size
+                and item.mtime_ns == stat.st_mtime_ns
+                and item.inode == stat.st_ino
+                and os.path.exists(self.get_object_path(item.sha256))
+            ):
+                sha256 = item.sha256
+            else:
+                sha256 = self._store_file(file_path, result)
+                self.hash_cache.items[file_path] = FileHashCacheItem(
+                    size=stat.st_size,
+                    mtime_ns=stat.st_mtime_ns,
+                    inode=stat.st_ino,
+                    sha256=sha256,
+                )
+            object_paths[file_path] = self.get_object_path(sha256)
+        self.hash_cache.save()
+        return object_paths
+
+    def snapshot_files(
+        self, file_paths: List[str], target_folder_path: str
+    ) -> SnapshotResult:
+        """
+        Create files in a snapshot folder with the same names and contents.
+        Existing files in the snapshot folder are replaced.
+        """
+        result = SnapshotResult()
+        os.makedirs(target_folder_path, exist_ok=True)
+        object_paths = self.add_files(file_paths, result)
+        for file_path, object_path in object_paths.items():
+            target_path = os.path.join(target_folder_path, os.path.basename(file_path))
+            if os.path.lexists(target_path):
+                os.remove(target_path)
+            try:
+                try:
+                    os.link(object_path, target_path)
+                except FileNotFoundError:
+                    # object was deleted by a concurrent prune after it was
+                    # found. A new object is not pruned, so it is linked.
+                    sha256 = self._store_file(file_path, result)
+                    object_path = self.get_object_path(sha256)
+                    os.link(object_path, target_path)
+                result.linked_files += 1
+                continue
+            except OSError as ex:
+                if ex.errno not in {errno.EXDEV, errno.EMLINK, errno.EPERM}:
+                    raise
+            if reflink_file(object_path, target_path):
+                result.reflinked_files += 1
+            else:
+                shutil.copy2(object_path, target_path)
+                result.copied_files += 1
+        logger.debug("Snapshot %s is created: %s", target_folder_path, result)
+        return result
+
+    def prune(self, min_age_in_seconds: int = 3600) -> int:
+        """
+        Delete stored objects that are not linked by any snapshot file. Recently
+        stored objects are kept, they may be linked by a snapshot in progress.
+        """
+        deleted = 0
+        if not os.path.exists(self.objects_path):
+            return deleted
+        max_ctime = time.time() - min_age_in_seconds
+        for folder in os.scandir(self.objects_path):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                stat = entry.stat()
+                if stat.st_nlink <= 1 and stat.st_ctime < max_ctime:
+                    os.remove(entry.path)
+                    deleted += 1
+        return deleted
@@ -36,6 +36,7 @@ from app.ws.study.comment_utils import (
     update_mhd_comments,
     update_revision_comments,
 )
+from app.ws.study.snapshot_store import SnapshotStore
 from app.ws.study.study_service import StudyService
 
 logger = logging.getLogger("wslog")
@@ -567,26 +568,45 @@ class StudyRevisionService:
                 shutil.rmtree(revisions_path)
 
             os.makedirs(metadata_revisions_path, exist_ok=True)
+            # revisions are published, so their store is in internal files folder
+            snapshot_store = SnapshotStore(
+                os.path.join(
+                    maintenance_task.study_internal_files_path,
+                    get_study_settings().snapshot_store_folder_name,
+                )
+            )
+
+            # source files of the revision folder. Hashes of these stable paths
+            # are cached, revision folder paths are new for each revision.
+            source_files = {
+                os.path.basename(x): x
+                for x in maintenance_task.get_all_metadata_files()
+            }
 
             def copy_mhd_files(audit_folder_path: str):
                 mhd_files_root_path = os.path.join(
                     maintenance_task.study_internal_files_path, "DATA_FILES"
                 )
-                for file_path in Path(mhd_files_root_path).glob(
-                    "*.json", case_sensitive=False
-                ):
-                    if file_path.is_file() and (
+                mhd_files = [
+                    str(file_path)
+                    for file_path in Path(mhd_files_root_path).glob(
+                        "*.json", case_sensitive=False
+                    )
+                    if file_path.is_file()
+                    and (
                         file_path.name.lower().endswith(".mhd.json")
                         or file_path.name.lower().endswith(".announcement.json")
-                    ):
-                        target_file = os.path.join(audit_folder_path, file_path.name)
-                        shutil.copy2(str(file_path), target_file)
+                    )
+                ]
+                source_files.update({os.path.basename(x): x for x in mhd_files})
+                snapshot_store.snapshot_files(mhd_files, audit_folder_path)
 
             dest_path = maintenance_task.create_audit_folder(
                 audit_folder_root_path=metadata_revisions_path,
                 folder_name=revision_folder_name,
                 stage=None,
                 after_creation_callback=copy_mhd_files,
+                snapshot_store_path=snapshot_store.store_path,
             )
 
             # delete previous version files on PUBLIC_METADATA top folder
@@ -597,20 +617,37 @@ class StudyRevisionService:
                     file_path.unlink()
                 elif file_path.name == "HASHES":
                     shutil.rmtree(file)
+
+            def get_snapshot_source(file: str) -> str:
+                # stored files keep modification time of their source files
+                source = source_files.get(os.path.basename(file))
+                try:
+                    source_stat = os.stat(source) if source else None
+                except OSError:
+                    source_stat = None
+                stat = os.stat(file)
+                if (
+                    source_stat
+                    and source_stat.st_size == stat.st_size
+                    and source_stat.st_mtime_ns == stat.st_mtime_ns
+                ):
+                    return source
+                return file
+
             # copy latest version files on to PUBLIC_METADATA top folder
             search_pattern = os.path.join(revisions_path, "*")
+            latest_files = []
             for file in glob.glob(search_pattern, recursive=False):
                 file_path = Path(file)
                 if file_path.is_file():
-                    basename = os.path.basename(file)
-                    target_file = os.path.join(revisions_root_path, basename)
-                    shutil.copy2(file, target_file)
+                    latest_files.append(get_snapshot_source(file))
                 elif file_path.is_dir() and file_path.name == "HASHES":
                     target_file = os.path.join(revisions_root_path, file_path.name)
                     # os.makedirs(target_file, exist_ok=True)
                     if os.path.exists(target_file):
                         shutil.rmtree(target_file)
                     shutil.copytree(file, target_file)
+            snapshot_store.snapshot_files(latest_files, revisions_root_path)
             # mounted_paths = get_settings().hpc_cluster.datamover.mounted_paths
             # files_path = os.path.join(mounted_paths.cluster_study_readonly_files_actual_root_path, study_id)
             # revisions_files_path = os.path.join(revisions_root_path, "FILES")
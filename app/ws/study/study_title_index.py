@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Union
+
+from pydantic import BaseModel
+
+from app.ws.redis.redis import RedisStorage, get_redis_server
+from app.ws.settings.utils import get_study_settings
+
+logger = logging.getLogger("wslog")
+
+STUDY_TITLE_INDEX_KEY = "metabolights:study_title_index"
+ISA_TITLE = "Study Title"
+ISA_DESCRIPTION = "Study Description"
+DATE_FORMAT = "%Y%m%d%H%M%S"
+
+
+class StudyTitleIndexItem(BaseModel):
+    mtime_ns: int = 0
+    size: int = 0
+    title: str = "N/A"
+    description: str = "N/A"
+    updated: str = ""
+
+
+def parse_title_and_description(file_path: str) -> tuple[str, str]:
+    title = "N/A"
+    description = "N/A"
+    for encoding in ("utf-8", "latin-1"):
+        try:
+            with open(file_path, encoding=encoding) as f:
+                for line in f:
+                    line = re.sub(r"\s+", " ", line)
+                    if line.startswith(ISA_TITLE):
+                        title = (
+                            line.replace(ISA_TITLE, "")
+                            .replace(' "', "")
+                            .replace('" ', "")
+                        )
+                    if line.startswith(ISA_DESCRIPTION):
+                        description = (
+                            line.replace(ISA_DESCRIPTION, "")
+                            .replace(' "', "")
+                            .replace('" ', "")
+                        )
+            break
+        except FileNotFoundError:
+            logger.error("The file %s was not found", file_path)
+            break
+        except UnicodeDecodeError:
+            logger.info("Retrying %s with another encoding", file_path)
+            title = "N/A"
+            description = "N/A"
+    return title.strip(), description.strip()
+
+
+class StudyTitleIndex(object):
+    """
+    Title and description index of study investigation files.
+
+    Items are stored in an in-process dictionary and in a Redis hash shared by
+    all workers. An item is valid while mtime and size of the investigation file
+    are unchanged, so only new or updated files are parsed again.
+    """
+
+    def __init__(
+        self,
+        study_metadata_root_path: str,
+        investigation_file_name: str = "i_Investigation.txt",
+        redis: Union[None, RedisStorage] = None,
+    ):
+        self.study_metadata_root_path = study_metadata_root_path
+        self.investigation_file_name = investigation_file_name
+        self.redis = redis
+        self._items: dict[str, StudyTitleIndexItem] = {}
+        self._lock = threading.Lock()
+
+    def get_file_path(self, study_id: str) -> str:
+        return os.path.join(
+            self.study_metadata_root_path, study_id, self.investigation_file_name
+        )
+
+    def get_items(self, study_ids: list[str]) -> dict[str, StudyTitleIndexItem]:
+        stats: dict[str, Union[None, os.stat_result]] = {}
+        for study_id in study_ids:
+            try:
+                stats[study_id] = os.stat(self.get_file_path(study_id))
+            except OSError:
+                stats[study_id] = None
+
+        result: dict[str, StudyTitleIndexItem] = {}
+        missing_ids = []
+        with self._lock:
+            for study_id in study_ids:
+                item = self._items.get(study_id)
+                if self._is_valid(item, stats[study_id]):
+                    result[study_id] = item
+                else:
+                    missing_ids.append(study_id)
+
+        shared_items = self._load_shared_items(missing_ids)
+        updated_items: dict[str, StudyTitleIndexItem] = {}
+        for study_id in missing_ids:
+            stat = stats[study_id]
+            item = shared_items.get(study_id)
+            if not self._is_valid(item, stat):
+                if stat is None:
+                    file_path = self.get_file_path(study_id)
+                    logger.error("The file %s was not found", file_path)
+                    result[study_id] = StudyTitleIndexItem()
+                    continue
+                title, description = parse_title_and_description(
+                    self.get_file_path(study_id)
+                )
+                item = StudyTitleIndexItem(
+                    mtime_ns=stat.st_mtime_ns,
+                    size=stat.st_size,
+                    title=title,
+                    description=description,
+                    updated=time.strftime(DATE_FORMAT, time.gmtime(stat.st_mtime)),
+                )
+                updated_items[study_id] = item
+            result[study_id] = item
+
+        with self._lock:
+            for study_id in missing_ids:
+                if stats[study_id] is not None:
+                    self._items[study_id] = result[study_id]
+        self._save_shared_items(updated_items)
+        return result
+
+    def invalidate(self, study_id: str):
+        with self._lock:
+            self._items.pop(study_id, None)
+        if self.redis:
+            try:
+                self.redis.get_redis().hdel(STUDY_TITLE_INDEX_KEY, study_id)
+            except Exception as ex:
+                logger.warning("Study title index update failed: %s", ex)
+
+    @staticmethod
+    def _is_valid(
+        item: Union[None, StudyTitleIndexItem], stat: Union[None, os.stat_result]
+    ) -> bool:
+        return (
+            item is not None
+            and stat is not None
+            and item.mtime_ns == stat.st_mtime_ns
+            and item.size == stat.st_size
+        )
+
+    def _load_shared_items(
+        self, study_ids: list[str]
+    ) -> dict[str, StudyTitleIndexItem]:
+        if not self.redis or not study_ids:
+            return {}
+        try:
+            values = self.redis.get_redis(readonly=True).hmget(
+                STUDY_TITLE_INDEX_KEY, study_ids
+            )
+        except Exception as ex:
+            logger.warning("Study title index is not loaded from Redis: %s", ex)
+            return {}
+        items = {}
+        for study_id, value in zip(study_ids, values):
+            if value:
+                try:
+                    items[study_id] = StudyTitleIndexItem.model_validate(
+                        json.loads(value)
+                    )
+                except Exception:
+                    logger.debug("Invalid study title index item for %s", study_id)
+        return items
+
+    def _save_shared_items(self, items: dict[str, StudyTitleIndexItem]):
+        if not self.redis or not items:
+            return
+        mapping = {key: value.model_dump_json() for key, value in items.items()}
+        try:
+            self.redis.get_redis().hset(STUDY_TITLE_INDEX_KEY, mapping=mapping)
+        except Exception as ex:
+            logger.warning("Study title index is not saved to Redis: %s", ex)
+
+
+@lru_cache(1)
+def get_study_title_index() -> StudyTitleIndex:
+    settings = get_study_settings()
+    return StudyTitleIndex(
+        settings.mounted_paths.study_metadata_files_root_path,
+        investigation_file_name=settings.investigation_file_name,
+        redis=get_redis_server(),
+    )
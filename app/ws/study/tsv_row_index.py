@@ -0,0 +1,250 @@
+import io
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from app.ws.settings.utils import get_study_settings
+
+logger = logging.getLogger("wslog")
+
+INDEX_READ_CHUNK_SIZE = 4 * 1024 * 1024
+NEW_LINE = ord("\n")
+QUOTE = ord('"')
+TAB = ord("\t")
+SPACE = ord(" ")
+CARRIAGE_RETURN = ord("\r")
+UNQUOTED, QUOTED, QUOTE_IN_QUOTED = range(3)
+
+
+class TsvRowIndex(object):
+    """
+    Byte offsets of data rows in a TSV file.
+
+    A row ends at a new line character that is not in a quoted value. A value
+    is quoted only if it starts with a quote, as in pandas read_csv. Blank
+    lines and lines with only spaces are not indexed, so row numbers are same as DataFrame row numbers of
+    pandas read_csv. Any page of rows can be parsed without reading preceding
+    rows.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        stat = os.stat(file_path)
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.header: bytes = b""
+        self.columns: List[str] = []
+        # start offset of each row and end offset of the last row
+        self.offsets = np.zeros(1, dtype=np.int64)
+        if self.size > 0:
+            self._build()
+
+    @property
+    def row_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def is_valid(self, stat: os.stat_result) -> bool:
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+    def _build(self):
+        boundaries = []
+        # whether the row ending at each boundary has a character other than
+        # space or new line. pandas skips other rows as blank lines.
+        non_blank_rows = []
+        non_blank = False
+        state = UNQUOTED
+        last_event = -1
+        previous_byte = NEW_LINE
+        position = 0
+        with open(self.file_path, "rb") as f:
+            while True:
+                chunk = f.read(INDEX_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = np.frombuffer(chunk, dtype=np.uint8)
+                new_lines = np.flatnonzero(data == NEW_LINE)
+                quotes = np.flatnonzero(data == QUOTE)
+                if state == UNQUOTED and not len(quotes):
+                    selected = new_lines + 1
+                else:
+                    state, last_event, selected = self._find_row_ends(
+                        data, new_lines, quotes, previous_byte, state, last_event
+                    )
+                    selected = np.array(selected, dtype=np.int64)
+                    last_event -= len(chunk)
+                boundaries.append(selected + position)
+                non_blank = self._find_non_blank_rows(
+                    data, selected, non_blank, non_blank_rows
+                )
+                previous_byte = int(data[-1])
+                position += len(chunk)
+        starts = np.concatenate(boundaries) if boundaries else np.zeros(0, np.int64)
+        starts = starts.astype(np.int64)
+        non_blank_rows = np.concatenate(non_blank_rows)[1:]
+        header_end = int(starts[0]) if len(starts) else self.size
+        if len(starts) and starts[-1] >= self.size:
+            starts = starts[:-1]
+        elif len(starts):
+            non_blank_rows = np.append(non_blank_rows, non_blank)
+        offsets = np.append(starts, self.size)
+        with open(self.file_path, "rb") as f:
+            self.header = f.read(header_end)
+        blank_rows = np.flatnonzero(~non_blank_rows)
+        if len(blank_rows):
+            offsets = np.delete(offsets, blank_rows)
+        self.offsets = offsets
+        if self.header.strip():
+            self.columns = self._parse(b"", nrows=0).columns.to_list()
+
+    @staticmethod
+    def _find_non_blank_rows(data, row_ends, non_blank, non_blank_rows) -> bool:
+        """
+        Append a flag for each row ending in the chunk. non_blank is the flag of
+        the row continuing from a previous chunk and the updated flag is returned
+        for the row continuing in the next chunk.
+        """
+        not_blank = (data != SPACE) & (data != CARRIAGE_RETURN) & (data != NEW_LINE)
+        segment_starts = np.append(0, row_ends)
+        if segment_starts[-1] == len(data):
+            segment_starts = segment_starts[:-1]
+        flags = np.logical_or.reduceat(not_blank, segment_starts)
+        flags[0] |= non_blank
+        if len(flags) > len(row_ends):
+            non_blank_rows.append(flags[:-1])
+            return bool(flags[-1])
+        non_blank_rows.append(flags)
+        return False
+
+    @staticmethod
+    def _find_row_ends(data, new_lines, quotes, previous_byte, state, last_event):
+        """
+        Follow quoted values in a chunk. Positions are relative to the chunk and
+        last_event is negative if the last quote or new line is in a previous
+        chunk. As in pandas, a quote starts a quoted value only if it is the
+        first character of a value, so other quotes (e.g. 5" tube) are text.
+        """
+        before = data[np.maximum(quotes - 1, 0)]
+        if len(quotes) and quotes[0] == 0:
+            before[0] = previous_byte
+        field_starts = (before == TAB) | (before == NEW_LINE)
+        events = np.concatenate((new_lines, quotes))
+        is_quote = np.concatenate(
+            (np.zeros(len(new_lines), dtype=bool), np.ones(len(quotes), dtype=bool))
+        )
+        is_field_start = np.concatenate(
+            (np.zeros(len(new_lines), dtype=bool), field_starts)
+        )
+        order = np.argsort(events, kind="stable")
+        selected = []
+        for event, quote, field_start in zip(
+            events[order].tolist(),
+            is_quote[order].tolist(),
+            is_field_start[order].tolist(),
+        ):
+            if state == QUOTE_IN_QUOTED:
+                if quote and event == last_event + 1:
+                    # escaped quote
+                    state = QUOTED
+                    last_event = event
+                    continue
+                state = UNQUOTED
+            if state == QUOTED:
+                if quote:
+                    state = QUOTE_IN_QUOTED
+            elif not quote:
+                selected.append(event + 1)
+            elif field_start:
+                state = QUOTED
+            last_event = event
+        return state, last_event, selected
+
+    def _parse(self, content: bytes, columns=None, **kwargs) -> pd.DataFrame:
+        for encoding in ("utf-8", "ISO-8859-1"):
+            try:
+                return pd.read_csv(
+                    io.BytesIO(self.header + content),
+                    sep="\t",
+                    header=0,
+                    encoding=encoding,
+                    usecols=columns,
+                    dtype=str,
+                    **kwargs,
+                )
+            except UnicodeDecodeError:
+                if encoding != "utf-8":
+                    raise
+        return pd.DataFrame()
+
+    def read_rows(
+        self,
+        start: int = 0,
+        count: Union[None, int] = None,
+        columns: Union[None, List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Parse rows in [start, start + count). Only the selected columns are
+        returned and empty values are converted to empty strings.
+        """
+        if not self.columns:
+            return pd.DataFrame()
+        start = min(max(start, 0), self.row_count)
+        end = self.row_count if count is None else min(start + count, self.row_count)
+        content = b""
+        if end > start:
+            with open(self.file_path, "rb") as f:
+                f.seek(int(self.offsets[start]))
+                content = f.read(int(self.offsets[end] - self.offsets[start]))
+        return self._parse(content, columns=columns or None).fillna("")
+
+
+class TsvRowIndexCache(object):
+    """
+    Row indexes of recently used TSV files. An index is rebuilt when the
+    modification time or size of its file changes.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.cache = LRUCache(maxsize=max(max_entries, 1))
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_index(self, file_path: str) -> TsvRowIndex:
+        key = os.path.realpath(file_path)
+        stat = os.stat(key)
+        with self.lock:
+            row_index: Union[None, TsvRowIndex] = self.cache.get(key)
+            if row_index and row_index.is_valid(stat):
+                self.hits += 1
+                return row_index
+            self.misses += 1
+        row_index = TsvRowIndex(key)
+        if self.max_entries > 0:
+            with self.lock:
+                self.cache[key] = row_index
+        return row_index
+
+    def invalidate(self, file_path: str):
+        with self.lock:
+            self.cache.pop(os.path.realpath(file_path), None)
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.cache),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+@lru_cache(1)
+def get_tsv_row_index_cache() -> TsvRowIndexCache:
+    return TsvRowIndexCache(get_study_settings().tsv_row_index_cache_max_entries)
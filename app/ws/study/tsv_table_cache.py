@@ -0,0 +1,150 @@
+import codecs
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Union
+
+import pandas as pd
+from cachetools import LRUCache
+
+from app.ws.settings.utils import get_study_settings
+
+logger = logging.getLogger("wslog")
+
+ENCODING_SNIFF_SIZE = 64 * 1024
+
+FileSignature = tuple[str, int, int]
+
+
+def detect_tsv_encoding(file_path: str, sniff_size: int = ENCODING_SNIFF_SIZE) -> str:
+    """
+    Return utf-8 if the first bytes of the file are valid UTF-8, otherwise
+    ISO-8859-1 (tables saved by Excel).
+    """
+    with open(file_path, "rb") as f:
+        prefix = f.read(sniff_size)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        # a multibyte character may be split at the end of the prefix
+        decoder.decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return "ISO-8859-1"
+    return "utf-8"
+
+
+def get_file_signature(file_path: str) -> FileSignature:
+    real_path = os.path.realpath(file_path)
+    stat = os.stat(real_path)
+    return real_path, stat.st_mtime_ns, stat.st_size
+
+
+class TsvTableCache(object):
+    """
+    Parsed TSV tables of recently read files.
+
+    Entries are keyed by (path, mtime_ns, size) of the file and selected column
+    names, so a modified file is parsed again. Total memory usage of cached
+    DataFrames is bounded by max_size_in_bytes. Cached DataFrames are shared and
+    must not be modified by readers.
+    """
+
+    def __init__(self, max_size_in_bytes: int = 256 * 1024 * 1024):
+        self.max_size_in_bytes = max_size_in_bytes
+        self.enabled = max_size_in_bytes > 0
+        self._entries: LRUCache = LRUCache(
+            maxsize=max(max_size_in_bytes, 1), getsizeof=self._get_entry_size
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.parse_count = 0
+        self.parse_seconds = 0.0
+        self.max_parse_seconds = 0.0
+
+    @staticmethod
+    def _get_entry_size(entry) -> int:
+        _, _, size = entry
+        return size
+
+    def get(
+        self, signature: FileSignature, columns: Union[None, tuple[str, ...]] = None
+    ) -> Union[None, pd.DataFrame]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get((signature[0], columns))
+            if entry and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return None
+
+    def put(
+        self,
+        signature: FileSignature,
+        columns: Union[None, tuple[str, ...]],
+        table_df: pd.DataFrame,
+    ) -> bool:
+        """
+        Store a parsed table if the file was not modified while parsing.
+        :param signature: file signature taken before the file was parsed
+        """
+        # str values of a DataFrame use more memory than the file
+        if not self.enabled or (
+            columns is None and signature[2] > self.max_size_in_bytes
+        ):
+            return False
+        try:
+            if signature != get_file_signature(signature[0]):
+                logger.debug("%s changed while parsing. Skip cache.", signature[0])
+                return False
+        except OSError:
+            return False
+        size = max(int(table_df.memory_usage(deep=True).sum()), 1)
+        if size > self.max_size_in_bytes:
+            return False
+        with self._lock:
+            self._entries[(signature[0], columns)] = (signature, table_df, size)
+        return True
+
+    def add_parse_time(self, seconds: float):
+        with self._lock:
+            self.parse_count += 1
+            self.parse_seconds += seconds
+            self.max_parse_seconds = max(self.max_parse_seconds, seconds)
+
+    def invalidate(self, file_path: str):
+        real_path = os.path.realpath(file_path)
+        with self._lock:
+            for key in [x for x in self._entries.keys() if x[0] == real_path]:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Union[int, float]]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+                "entries": len(self._entries),
+                "size_in_bytes": self._entries.currsize,
+                "max_size_in_bytes": self.max_size_in_bytes,
+                "parse_count": self.parse_count,
+                "mean_parse_ms": (
+                    self.parse_seconds * 1000 / self.parse_count
+                    if self.parse_count
+                    else 0.0
+                ),
+                "max_parse_ms": self.max_parse_seconds * 1000,
+            }
+
+
+@lru_cache(1)
+def get_tsv_table_cache() -> TsvTableCache:
+    max_size = get_study_settings().tsv_table_cache_max_size_in_mb
+    return TsvTableCache(max_size_in_bytes=max_size * 1024 * 1024)
@@ -0,0 +1,91 @@
+import logging
+import os
+import zipfile
+from typing import Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger("wslog")
+
+DEFAULT_ZIP_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Deflating these files uses CPU time but does not reduce their size.
+COMPRESSED_FILE_EXTENSIONS = {
+    ".7z",
+    ".bz2",
+    ".gz",
+    ".jpeg",
+    ".jpg",
+    ".png",
+    ".raw",
+    ".rar",
+    ".tgz",
+    ".wiff",
+    ".wiff2",
+    ".xz",
+    ".zip",
+    ".zst",
+}
+
+
+class _ZipStreamBuffer(object):
+    """
+    Write-only file object for ZipFile. ZipFile writes data descriptors
+    instead of seeking back when the output is not seekable.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        if data:
+            self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop_chunks(self) -> List[bytes]:
+        chunks = self.chunks
+        self.chunks = []
+        return chunks
+
+
+def get_compress_type(file_path: str) -> int:
+    _, ext = os.path.splitext(file_path.lower())
+    if ext in COMPRESSED_FILE_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def stream_zip(
+    entries: Iterable[Tuple[str, str]],
+    chunk_size: int = DEFAULT_ZIP_STREAM_CHUNK_SIZE,
+    compress_level: int = 6,
+) -> Iterator[bytes]:
+    """
+    Create a zip archive and yield it in chunks while input files are read.
+    Memory use is bounded by chunk_size, so no temporary zip file is needed.
+
+    :param entries: (file path, archive name) tuples
+    :param chunk_size: read size of input files
+    :param compress_level: zlib compression level of deflated entries
+    """
+    output = _ZipStreamBuffer()
+    with zipfile.ZipFile(output, mode="w", allowZip64=True) as zip_file:
+        for file_path, arcname in entries:
+            zip_info = zipfile.ZipInfo.from_file(file_path, arcname=arcname)
+            zip_info.compress_type = get_compress_type(file_path)
+            if zip_info.compress_type == zipfile.ZIP_DEFLATED:
+                # compress_level is available as a public attribute from Python 3.13
+                zip_info._compresslevel = compress_level
+            with (
+                open(file_path, "rb") as source,
+                zip_file.open(zip_info, mode="w") as target,
+            ):
+                while True:
+                    data = source.read(chunk_size)
+                    if not data:
+                        break
+                    target.write(data)
+                    yield from output.pop_chunks()
+            yield from output.pop_chunks()
+    yield from output.pop_chunks()
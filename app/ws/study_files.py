@@ -15,12 +15,10 @@
 #       http://www.apache.org/licenses/LICENSE-2.0
 #
 #  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the specific language governing permissions and limitations under the License.
-import fnmatch
 import glob
 import json
 import logging
 import os
-import pathlib
 import re
 import shutil
 import time
@@ -60,6 +58,11 @@ from app.ws.db.types import StudyStatus, UserRole
 from app.ws.isaApiClient import IsaApiClient
 from app.ws.mtblsWSclient import WsClient
 from app.ws.settings.utils import get_study_settings
+from app.ws.study.data_file_index import (
+    PRIVATE_DATA_FILES,
+    PUBLIC_DATA_FILES,
+    DataFileIndex,
+)
 from app.ws.study.folder_utils import (
     get_all_files,
     get_all_files_from_filesystem,
@@ -528,43 +531,22 @@ class StudyRawAndDerivedDataFiles(Resource):
         if not search_pattern.startswith(search_pattern_prefix):
             search_pattern = f"FILES/{search_pattern}"
 
-        study_data_file_index_path = os.path.join(
-            settings.mounted_paths.study_internal_files_root_path,
-            study_id,
-            "DATA_FILES",
-            "data_file_index.json",
+        data_file_index = DataFileIndex(
+            os.path.join(
+                settings.mounted_paths.study_internal_files_root_path,
+                study_id,
+                "DATA_FILES",
+            )
         )
-        if not os.path.exists(study_data_file_index_path):
+        if not data_file_index.exists():
             return {"files": []}
 
-        data_files = json.loads(pathlib.Path(study_data_file_index_path).read_text())
-        private_selected = fnmatch.filter(
-            data_files["private_data_files"].keys(), search_pattern
-        )
-        # public_selected = fnmatch.filter(data_files["public_data_files"].keys(), search_pattern)
         result = set()
-
-        if file_match and folder_match:
-            result.update(private_selected)
-            # result.update(public_selected)
-        elif file_match:
-            # result.update([x for x in public_selected if not data_files["public_data_files"][x]["is_dir"]])
-            result.update(
-                [
-                    x
-                    for x in private_selected
-                    if not data_files["private_data_files"][x]["is_dir"]
-                ]
-            )
-        else:
-            # result.update([x for x in public_selected if data_files["public_data_files"][x]["is_dir"]])
-            result.update(
-                [
-                    x
-                    for x in private_selected
-                    if data_files["private_data_files"][x]["is_dir"]
-                ]
-            )
+        for key, descriptor in data_file_index.search(
+            PRIVATE_DATA_FILES, search_pattern
+        ):
+            if (file_match and folder_match) or (file_match != descriptor["is_dir"]):
+                result.add(key)
         final_result = [{"name": x} for x in result]
         final_result.sort(key=lambda x: x["name"])
         return {"files": final_result}
@@ -833,48 +815,27 @@ class PublicStudyRawAndDerivedDataFiles(Resource):
         if not search_pattern.startswith(search_pattern_prefix):
             search_pattern = f"{data_files_subfolder}/{search_pattern}"
 
-        study_data_file_index_path = os.path.join(
-            settings.mounted_paths.study_internal_files_root_path,
-            study_id,
-            "DATA_FILES",
-            "data_file_index.json",
+        data_file_index = DataFileIndex(
+            os.path.join(
+                settings.mounted_paths.study_internal_files_root_path,
+                study_id,
+                "DATA_FILES",
+            )
         )
-        if not os.path.exists(study_data_file_index_path):
+        if not data_file_index.exists():
             return {"files": []}
 
-        data_files: dict = json.loads(
-            pathlib.Path(study_data_file_index_path).read_text()
-        )
-        if not data_files:
+        if not data_file_index.manifest:
             raise MetabolightsException(
                 "Study data files are not indexed. "
                 "Please contact with MetaboLights Team."
             )
-        if not data_files.get("public_data_files"):
-            data_files["public_data_files"] = {}
-        public_data_files = data_files["public_data_files"]
-
-        public_selected = fnmatch.filter(public_data_files.keys(), search_pattern) or []
         result = set()
-
-        if file_match and folder_match:
-            result.update(public_selected)
-        elif file_match:
-            result.update(
-                [
-                    x
-                    for x in public_selected
-                    if not data_files["public_data_files"][x]["is_dir"]
-                ]
-            )
-        else:
-            result.update(
-                [
-                    x
-                    for x in public_selected
-                    if data_files["public_data_files"][x]["is_dir"]
-                ]
-            )
+        for key, descriptor in data_file_index.search(
+            PUBLIC_DATA_FILES, search_pattern
+        ):
+            if (file_match and folder_match) or (file_match != descriptor["is_dir"]):
+                result.add(key)
 
         final_result = [{"name": x} for x in result]
         final_result.sort(key=lambda x: x["name"])
@@ -1965,16 +1926,18 @@ def get_study_metadata_and_data_files(
             target_root_path = os.path.join(
                 mounted_paths.study_internal_files_root_path, study_id, "DATA_FILES"
             )
-            target_path = os.path.join(target_root_path, "data_file_index.json")
+            data_file_index = DataFileIndex(target_root_path)
             private_data_files = None
             public_data_files = None
             valid_file = False
-            if os.path.exists(target_path):
+            if data_file_index.exists():
                 try:
-                    with open(target_path) as f:
-                        data_file_index = json.load(f)
-                    private_data_files = data_file_index["private_data_files"]
-                    public_data_files = data_file_index["public_data_files"]
+                    private_data_files = data_file_index.get_children(
+                        PRIVATE_DATA_FILES, directory
+                    )
+                    public_data_files = data_file_index.get_children(
+                        PUBLIC_DATA_FILES, directory
+                    )
                     valid_file = True
                 except Exception:
                     public_data_files = None
@@ -1985,19 +1948,13 @@ def get_study_metadata_and_data_files(
                 raise Exception(
                     "The data files are not indexed. Please index them before proceeding."
                 )
-            for x in private_data_files:
-                item_relative_path = private_data_files[x]["relative_path"]
-                item_parent_path = private_data_files[x]["parent_relative_path"]
-                if item_parent_path == directory:
-                    descriptor = FileDescriptor.model_validate(private_data_files[x])
-                    private_directory_files[item_relative_path] = descriptor
+            for item_relative_path, item in private_data_files.items():
+                descriptor = FileDescriptor.model_validate(item)
+                private_directory_files[item_relative_path] = descriptor
             if StudyStatus(study.status) in {StudyStatus.PUBLIC}:
-                for x in public_data_files:
-                    item_relative_path = public_data_files[x]["relative_path"]
-                    item_parent_path = public_data_files[x]["parent_relative_path"]
-                    if item_parent_path == directory:
-                        descriptor = FileDescriptor.model_validate(public_data_files[x])
-                        public_directory_files[item_relative_path] = descriptor
+                for item_relative_path, item in public_data_files.items():
+                    descriptor = FileDescriptor.model_validate(item)
+                    public_directory_files[item_relative_path] = descriptor
                 for relative_path, item in private_directory_files.items():
                     if relative_path in public_directory_files:
                         public_item = public_directory_files[relative_path]
@@ -19,6 +19,7 @@
 import glob
 import json
 import logging
+import math
 import os
 
 import numpy as np
@@ -38,9 +39,12 @@ from app.ws.db.types import UserRole
 from app.ws.isa_table_templates import get_assay_table_header
 from app.ws.study.folder_utils import write_audit_files
 from app.ws.study.study_service import StudyService
+from app.ws.study.tsv_row_index import get_tsv_row_index_cache
 from app.ws.study.utils import get_study_metadata_path
 from app.ws.utils import (
+    create_table_json_response,
     delete_column_from_tsv_file,
+    get_row_values,
     get_table_header,
     log_request,
     read_tsv,
@@ -67,18 +71,24 @@ def insert_row(idx, df, df_insert):
     ).reset_index(drop=True)
 
 
+def is_maf_file_name(filename: str) -> bool:
+    return filename.startswith("m_") and filename.endswith(".tsv")
+
+
+def select_default_maf_columns(df: pd.DataFrame) -> pd.DataFrame:
+    selected_columns = []
+    for column in df.columns:
+        header, ext = os.path.splitext(column)
+        if header in default_maf_columns:
+            selected_columns.append(column)
+    return df[selected_columns]
+
+
 def filter_dataframe(
     filename: str, df: pd.DataFrame, df_data_dict, df_header
 ) -> pd.DataFrame:
-    if filename.startswith("m_") and filename.endswith(".tsv"):
-        filtered_df = df
-        filtered_df_header = df_header
-        selected_columns = []
-        for column in df.columns:
-            header, ext = os.path.splitext(column)
-            if header in default_maf_columns:
-                selected_columns.append(column)
-        filtered_df = df[selected_columns]
+    if is_maf_file_name(filename):
+        filtered_df = select_default_maf_columns(df)
         filtered_df_header = get_table_header(filtered_df)
         df_data_dict = totuples(filtered_df.reset_index(), "rows")
         return df_data_dict, filtered_df_header
@@ -722,7 +732,8 @@ class AddRows(Resource):
         notes="""Update an TSV table for a given Study. Only '.tsv', '.csv' or '.txt' files are allowed.
         <p>Please make sure you add a value for echo column/cell combination.
         Use the GET method to see all the columns for this tsv file<br> If you do not provide the row "index" parameter,
-        the row will be added at the end of the TSV table
+        the row will be added at the end of the TSV table.
+        The response contains the inserted rows only, with the row index of the first inserted row and the new row count.
 <pre><code>{
     "data": {
         "index": 4,
@@ -855,15 +866,15 @@ class AddRows(Resource):
         if not valid_column_name:
             abort(417, message=message)
 
+        row_index = len(file_df.index)
+        complete_rows = []
         if data:
-            try:
+            if "index" in data:
+                # rows are inserted before the row with the given index
                 start_index = data["index"]
                 if start_index == -1:
                     start_index = 0
-                start_index = start_index - 0.5
-
-            except KeyError:
-                start_index = len(file_df.index)
+                row_index = min(max(math.ceil(start_index - 0.5), 0), row_index)
 
             # Map the complete row first, update with new_row
             complete_row = {}
@@ -878,13 +889,11 @@ class AddRows(Resource):
                     + str(complete_row)
                 )
             else:
+                # Values of a row are inherited by the next rows if they are not set
                 for row in new_row:
                     complete_row.update(row)
-                    row = complete_row
-                    line = pd.DataFrame(row, index=[start_index])
-                    file_df = pd.concat([file_df, line], ignore_index=False)
-                    file_df = file_df.sort_index().reset_index(drop=True)
-                    start_index += 1
+                    complete_rows.append(complete_row.copy())
+                file_df = insert_row(row_index, file_df, pd.DataFrame(complete_rows))
 
             file_df = file_df.replace(np.nan, "", regex=True)
             message = write_tsv(file_df, file_name)
@@ -892,15 +901,20 @@ class AddRows(Resource):
         # Get an indexed header row
         df_header = get_table_header(file_df)
 
-        # Get the updated data table
-        try:
-            df_data_dict = totuples(get_dataframe(file_basename, file_name), "rows")
-        except FileNotFoundError:
-            abort(400, message="The file " + file_name + " was not found")
+        # Return only the inserted rows
+        inserted_df = file_df.iloc[row_index : row_index + len(complete_rows)]
+        df_data_dict = totuples(inserted_df, "rows")
         df_data_dict, df_header = filter_dataframe(
-            file_basename, file_df, df_data_dict, df_header
+            file_basename, inserted_df, df_data_dict, df_header
         )
-        return {"header": df_header, "data": df_data_dict, "message": message}
+        return {
+            "header": df_header,
+            "data": df_data_dict,
+            "message": message,
+            "rowIndex": row_index,
+            "insertedRowCount": len(complete_rows),
+            "totalRowCount": len(file_df.index),
+        }
 
     @swagger.operation(
         summary="Update existing rows in the given TSV file",
@@ -1377,7 +1391,8 @@ class GetTsvFile(Resource):
             maf_file = True
         try:
             if maf_file:
-                col_names = read_tsv(file_name, nrows=0).columns
+                row_index = get_tsv_row_index_cache().get_index(file_name)
+                col_names = row_index.columns
                 col_length = len(col_names)
                 if col_length > 23:
                     selected_columns = []
@@ -1389,69 +1404,40 @@ class GetTsvFile(Resource):
                         else:
                             non_default_columns.append(column)
                     if len(selected_columns) > 0:
-                        file_df = read_tsv(file_name, selected_columns)
+                        file_df = read_tsv(file_name, selected_columns, read_only=True)
                         col_hidden = True
-                        non_default_columns_len = len(non_default_columns)
-                        if non_default_columns_len > 0:
-                            first_five_non_default_columns = non_default_columns[:5]
-                            data_df = read_tsv(
-                                file_name, first_five_non_default_columns, nrows=10
+                        if non_default_columns:
+                            # check sample abundance values in the first 10 rows
+                            data_df = row_index.read_rows(
+                                count=10, columns=non_default_columns[:5]
                             )
-                            for i in range(0, len(data_df)):
-                                val = data_df.iloc[i][first_five_non_default_columns[0]]
-                                if val:
-                                    sample_abundance = True
-                                    break
-                                if non_default_columns_len > 1:
-                                    val = data_df.iloc[i][
-                                        first_five_non_default_columns[1]
-                                    ]
-                                    if val:
-                                        sample_abundance = True
-                                        break
-                                if non_default_columns_len > 2:
-                                    val = data_df.iloc[i][
-                                        first_five_non_default_columns[2]
-                                    ]
-                                    if val:
-                                        sample_abundance = True
-                                        break
-                                if non_default_columns_len > 3:
-                                    val = data_df.iloc[i][
-                                        first_five_non_default_columns[3]
-                                    ]
-                                    if val:
-                                        sample_abundance = True
-                                        break
-                                if non_default_columns_len > 4:
-                                    val = data_df.iloc[i][
-                                        first_five_non_default_columns[4]
-                                    ]
-                                    if val:
-                                        sample_abundance = True
-                                        break
+                            sample_abundance = bool(data_df.map(bool).to_numpy().any())
                 else:
-                    file_df = read_tsv(file_name)
+                    file_df = read_tsv(file_name, read_only=True)
             else:
-                file_df = read_tsv(file_name)
+                file_df = read_tsv(file_name, read_only=True)
         except FileNotFoundError:
             abort(400, message="The file " + file_name + " was not found")
 
-        df_data_dict = totuples(file_df.reset_index(), "rows")
-        db_study = StudyService.get_instance().get_study_by_req_or_mtbls_id(study_id)
-        # Get an indexed header row
-        df_header = get_assay_table_header(
-            file_df, db_study.template_version, file_name_param
-        )
-        df_data_dict, df_header = filter_dataframe(
-            file_basename, file_df, df_data_dict, df_header
-        )
-        return {
+        if is_maf_file_name(file_basename):
+            file_df = select_default_maf_columns(file_df)
+            df_header = get_table_header(file_df)
+        else:
+            db_study = StudyService.get_instance().get_study_by_req_or_mtbls_id(
+                study_id
+            )
+            # Get an indexed header row
+            df_header = get_assay_table_header(
+                file_df, db_study.template_version, file_name_param
+            )
+        # rows are encoded while the response is sent
+        payload = {
             "header": df_header,
-            "data": df_data_dict,
+            "data": None,
             "columns_hidden": col_hidden,
             "sample_abundance": sample_abundance,
         }
+        return create_table_json_response(payload, file_df.reset_index())
 
 
 class TsvFileRows(Resource):
@@ -1586,7 +1572,8 @@ class TsvFileRows(Resource):
                 "Trying to load TSV file (%s) for Study %s", file_path, study_id
             )
 
-            file_column_names = pd.read_csv(file_path, sep="\t", nrows=0).columns
+            row_index = get_tsv_row_index_cache().get_index(file_path)
+            file_column_names = row_index.columns
 
             if len(file_column_names) > 0:
                 columns = []
@@ -1607,26 +1594,15 @@ class TsvFileRows(Resource):
                     columns = [
                         x for x in columns if x["columnDef"] in valid_column_names
                     ]
-                    file_df = read_tsv(
-                        file_path,
-                        col_names=valid_column_names,
-                        skiprows=range(1, page_size * page_number + 1),
-                        nrows=page_size,
-                    )
-                else:
-                    file_df = read_tsv(
-                        file_path,
-                        col_names=None,
-                        skiprows=range(1, page_size * page_number + 1),
-                        nrows=page_size,
-                    )
+                file_df = row_index.read_rows(
+                    start=page_size * page_number,
+                    count=page_size,
+                    columns=valid_column_names,
+                )
                 df_data_dict = to_tuple_with_index(
                     file_df, skippedRows=page_size * page_number
                 )
-                # for row in df_data_dict["rows"]:
-                #     row.index = int(row.index)
-                file_df_total = read_tsv(file_path, col_names=[valid_column_names[0]])
-                metadata["totalSize"] = int(file_df_total.size)
+                metadata["totalSize"] = row_index.row_count
                 metadata["columnNames"] = valid_column_names
                 metadata["pageNumber"] = int(page_number)
                 metadata["pageSize"] = int(file_df.size)
@@ -1648,13 +1624,12 @@ class TsvFileRows(Resource):
 
 
 def to_tuple_with_index(df: pd.DataFrame, skippedRows=0):
-    rows = []
-    for index, row in df.iterrows():
-        data = dict([(colname, row[i]) for i, colname in enumerate(df.columns)])
-        data["index"] = index + skippedRows
-        rows.append(data)
-
-    return rows
+    columns = list(df.columns)
+    indices = (df.index + skippedRows).tolist()
+    return [
+        dict(zip(columns, row), index=index)
+        for row, index in zip(get_row_values(df), indices)
+    ]
 
 
 class NpEncoder(json.JSONEncoder):
@@ -28,18 +28,20 @@ import pathlib
 import random
 import re
 import shutil
+import stat
 import string
 import time
 import uuid
+from json.encoder import encode_basestring_ascii
 from os.path import basename, normpath
-from typing import Tuple
+from typing import Iterator, Tuple
 from urllib import request as urllib_request
 
 import numpy as np
 import pandas as pd
 import requests
 from email_validator import EmailNotValidError, validate_email
-from flask import request
+from flask import Response, current_app, request
 from flask_restful import abort
 from isatools.model import (
     OntologyAnnotation,
@@ -54,10 +56,18 @@ from pandas import Series
 from app import application_path
 from app.config import get_settings
 from app.config.utils import get_host_internal_url
+from app.study_folder_utils import scan_folder
 from app.tasks.datamover_tasks.basic_tasks.file_management import delete_files
 from app.utils import current_time
 from app.ws.db.dbmanager import DBManager
 from app.ws.settings.utils import get_study_settings
+from app.ws.study.file_reference_index import get_file_reference_index_cache
+from app.ws.study.tsv_row_index import get_tsv_row_index_cache
+from app.ws.study.tsv_table_cache import (
+    detect_tsv_encoding,
+    get_file_signature,
+    get_tsv_table_cache,
+)
 
 """
 Utils
@@ -292,15 +302,75 @@ def validate_row(table_header_df, row, http_type):
     return True, "OK. All columns exist in file"
 
 
+def get_row_values(df: pd.DataFrame) -> list:
+    values = df.values
+    if values.dtype.kind in "mM":
+        return list(values)
+    # tolist converts numpy scalars to python types in one call
+    return values.tolist()
+
+
 # Convert panda DataFrame to json tuples object
 def totuples(df, text):
-    d = [
-        dict([(colname, row[i]) for i, colname in enumerate(df.columns)])
-        for row in df.values
-    ]
+    columns = list(df.columns)
+    d = [dict(zip(columns, row)) for row in get_row_values(df)]
     return {text: d}
 
 
+def _encode_json_key(key) -> str:
+    return json.dumps({key: 0})[1:-4]
+
+
+def iter_json_rows(df: pd.DataFrame, chunk_size: int = 10000) -> Iterator[str]:
+    """
+    Encode DataFrame rows as JSON objects column by column. Each yielded chunk
+    contains comma separated rows and is same as json.dumps output of totuples
+    rows. Memory use is bounded by chunk_size.
+    """
+    columns = list(df.columns)
+    for start in range(0, len(df.index), chunk_size):
+        chunk = df.iloc[start : start + chunk_size]
+        if not df.columns.is_unique or not columns:
+            rows = (json.dumps(dict(zip(columns, x))) for x in get_row_values(chunk))
+            yield ", ".join(rows)
+            continue
+        encoded_columns = []
+        for column, (_, series) in zip(columns, chunk.items()):
+            prefix = _encode_json_key(column) + ": "
+            values = series.tolist()
+            try:
+                encoded = map(encode_basestring_ascii, values)
+                encoded_columns.append([prefix + x for x in encoded])
+            except TypeError:
+                encoded_columns.append([prefix + json.dumps(x) for x in values])
+        yield ", ".join("{" + ", ".join(x) + "}" for x in zip(*encoded_columns))
+
+
+def create_table_json_response(
+    payload: dict, table_df: pd.DataFrame, rows_key: str = "rows"
+):
+    """
+    Return JSON response of payload with table rows. payload["data"][rows_key]
+    is set to rows of table_df. Rows are encoded while the response is sent if
+    the output is same as the default flask-restful output, otherwise payload is
+    returned with totuples rows.
+    """
+    if current_app.debug or current_app.config.get("RESTFUL_JSON"):
+        payload["data"] = totuples(table_df, rows_key)
+        return payload
+    placeholder = f"__rows_{uuid.uuid4().hex}__"
+    payload["data"] = {rows_key: placeholder}
+    prefix, suffix = json.dumps(payload).split(json.dumps(placeholder))
+
+    def generate():
+        yield prefix + "["
+        for idx, rows in enumerate(iter_json_rows(table_df)):
+            yield (", " + rows) if idx else rows
+        yield "]" + suffix + "\n"
+
+    return Response(generate(), mimetype="application/json")
+
+
 # Allow for a more detailed logging when on DEBUG mode
 def log_request(request_obj):
     if not request_obj:
@@ -330,74 +400,75 @@ def log_request(request_obj):
         logger.error(ex)
 
 
-def read_tsv(file_name, col_names=None, sep="\t", **kwargs):
-    table_df = pd.DataFrame()  # Empty file
+def _parse_tsv(file_name, col_names=None, sep="\t", **kwargs) -> pd.DataFrame:
+    custom_kwargs = kwargs.copy()
+    for key in ["sep", "header", "encoding", "usecols", "dtype"]:
+        custom_kwargs.pop(key, None)
+    encoding = detect_tsv_encoding(file_name)
     try:
         # Enforce str datatype for all columns we read from ISA-Tab table
-        filter = True if col_names else False
+        table_df = pd.read_csv(
+            file_name,
+            sep=sep,
+            header=0,
+            encoding=encoding,
+            usecols=col_names or None,
+            dtype=str,
+            **custom_kwargs,
+        )
+    except Exception as e:  # Todo, should check if the file format is Excel. ie. not in the exception handler
+        table_df = pd.read_csv(
+            file_name,
+            sep=sep,
+            header=0,
+            encoding="ISO-8859-1",
+            dtype=str,
+            **custom_kwargs,
+        )  # Excel format
+        logger.info(
+            "Tried to open as Excel tsv file 'ISO-8859-1' file "
+            + file_name
+            + ". "
+            + str(e)
+        )
+    return table_df.fillna("")  # Remove NaN
 
-        try:
-            if not filter:
-                try:
-                    col_names = pd.read_csv(
-                        file_name, sep=sep, nrows=0, dtype=str
-                    ).columns
-                except Exception as ex:
-                    col_names = pd.read_csv(
-                        file_name, sep=sep, nrows=0, encoding="ISO-8859-1", dtype=str
-                    ).columns  # Excel format
-            types_dict = {col: str for col in col_names}
-            if os.path.getsize(file_name) == 0:  # Empty file
-                logger.error("Could not read file " + file_name)
-            else:
-                custom_kwargs = kwargs.copy()
-                for key in ["sep", "header", "encoding", "usecols", "dtype"]:
-                    if key in custom_kwargs:
-                        custom_kwargs.pop(key, None)
-
-                if filter:
-                    table_df = pd.read_csv(
-                        file_name,
-                        sep=sep,
-                        header=0,
-                        encoding="utf-8",
-                        usecols=col_names,
-                        dtype=types_dict,
-                        **custom_kwargs,
-                    )
-                else:
-                    table_df = pd.read_csv(
-                        file_name,
-                        sep=sep,
-                        header=0,
-                        encoding="utf-8",
-                        dtype=types_dict,
-                        **custom_kwargs,
-                    )
-        except Exception as e:  # Todo, should check if the file format is Excel. ie. not in the exception handler
-            custom_kwargs = kwargs.copy()
-            for key in ["sep", "header", "encoding", "usecols", "dtype"]:
-                if key in custom_kwargs:
-                    custom_kwargs.pop(key, None)
-            if os.path.getsize(file_name) > 0:
-                table_df = pd.read_csv(
-                    file_name,
-                    sep=sep,
-                    header=0,
-                    encoding="ISO-8859-1",
-                    dtype=str,
-                    **custom_kwargs,
-                )  # Excel format
-                logger.info(
-                    "Tried to open as Excel tsv file 'ISO-8859-1' file "
-                    + file_name
-                    + ". "
-                    + str(e)
-                )
+
+def read_tsv(
+    file_name, col_names=None, sep="\t", read_only=False, cache=True, **kwargs
+):
+    """
+    Read an ISA-Tab table as str columns and empty strings for empty values.
+
+    Tables read with default parameters are cached until the file is modified.
+    :param read_only: return the cached DataFrame instead of a copy. The caller
+        must not modify it.
+    :param cache: use and update the table cache. Disable it for files that are
+        read only once, e.g. by batch jobs.
+    """
+    table_df = pd.DataFrame()  # Empty file
+    table_cache = get_tsv_table_cache()
+    columns = tuple(col_names) if col_names is not None and len(col_names) else None
+    try:
+        signature = get_file_signature(file_name)
+        if signature[2] == 0:  # Empty file
+            logger.error("Could not read file " + file_name)
+            return table_df
+        cacheable = cache and sep == "\t" and not kwargs
+        cached_df = table_cache.get(signature, columns) if cacheable else None
+        if cached_df is not None:
+            return cached_df if read_only else cached_df.copy()
+        start = time.perf_counter()
+        table_df = _parse_tsv(file_name, columns and list(columns), sep, **kwargs)
+        table_cache.add_parse_time(time.perf_counter() - start)
+        if (
+            cacheable
+            and table_cache.put(signature, columns, table_df)
+            and not read_only
+        ):
+            table_df = table_df.copy()
     except Exception as e:
         logger.error("Could not read file " + file_name + ". " + str(e))
-
-    table_df = table_df.replace(np.nan, "", regex=True)  # Remove NaN
     return table_df
 
 
@@ -556,6 +627,8 @@ def write_tsv(dataframe, file_name):
 
         # Write the new row back in the file
         dataframe.to_csv(file_name, sep="\t", encoding="utf-8", index=False)
+        get_tsv_row_index_cache().invalidate(file_name)
+        get_tsv_table_cache().invalidate(file_name)
     except:
         return "Error: Could not write/update the file " + basename
 
@@ -967,17 +1040,22 @@ def map_file_type(file_name, directory, assay_file_list=None):
     fname, ext = os.path.splitext(final_filename)
     fname = fname.lower()
     ext = ext.lower()
-    empty_exclusion_list = get_settings().file_filters.empty_exclusion_list
-    ignore_file_list = get_settings().file_filters.ignore_file_list
-    raw_files_list = get_settings().file_filters.raw_files_list
-    derived_files_list = get_settings().file_filters.derived_files_list
-    compressed_files_list = get_settings().file_filters.compressed_files_list
-    internal_mapping_list = get_settings().file_filters.internal_mapping_list
-    derived_data_folder_list = get_settings().file_filters.derived_data_folder_list
+    file_filters = get_settings().file_filters
+    empty_exclusion_list = file_filters.empty_exclusion_list
+    ignore_file_list = file_filters.ignore_file_list
+    raw_files_list = file_filters.raw_files_list
+    derived_files_list = file_filters.derived_files_list
+    compressed_files_list = file_filters.compressed_files_list
+    internal_mapping_list = file_filters.internal_mapping_list
+    derived_data_folder_list = file_filters.derived_data_folder_list
 
     full_path = os.path.join(directory, file_name)
-    if os.path.exists(full_path):
-        folder = os.path.isdir(full_path)
+    try:
+        folder = stat.S_ISDIR(os.stat(full_path).st_mode)
+        file_exists = True
+    except (OSError, ValueError):
+        file_exists = False
+    if file_exists:
         if fname in internal_mapping_list:
             return "internal_mapping", active_status, folder
         else:
@@ -1094,18 +1172,12 @@ def map_file_type(file_name, directory, assay_file_list=None):
             file_name, directory, "a_", assay_file_list=assay_file_list
         ):
             if ext in raw_files_list:
-                if os.path.isdir(os.path.join(directory, file_name)):
-                    return "raw", active_status, True
-                else:
-                    return "raw", active_status, folder
+                return "raw", active_status, folder
         else:
             if ext in raw_files_list:
-                if os.path.isdir(os.path.join(directory, file_name)):
-                    return "raw", none_active_status, True
-                else:
-                    return "raw", none_active_status, folder
+                return "raw", none_active_status, folder
 
-            if os.path.isdir(os.path.join(directory, file_name)):
+            if folder:
                 if file_name in derived_data_folder_list:
                     return "derived_data", none_active_status, True
                 else:
@@ -1131,47 +1203,32 @@ def traverse_subfolders(
         return file_list, all_folders
 
     folder_exclusion_list = get_settings().file_filters.folder_exclusion_list
+    if file_location in all_folders or (
+        basename(normpath(file_location)) in folder_exclusion_list
+    ):
+        return file_list, all_folders
 
-    if file_location not in all_folders:
-        for params in os.walk(file_location):
-            root = None
-            sub_directories = None
-            files = None
-
-            if params:
-                if params[0]:
-                    root = params[0]
-                if params[1]:
-                    sub_directories = params[1]
-                if params[2]:
-                    files = params[2]
-
-            if root and basename(normpath(root)) not in folder_exclusion_list:
-                if root not in all_folders:
-                    all_folders.append(root)
-                if files:
-                    for file in files:
-                        if file:
-                            file_name = file
-                            if full_path:
-                                file_name = os.path.join(
-                                    root.replace(study_location, ""), file_name
-                                )
-                            if file_name not in file_list:
-                                file_list.append(file_name)
-
-                if sub_directories:
-                    for directory in sub_directories:
-                        if directory and directory not in folder_exclusion_list:
-                            next_folder = os.path.join(root, directory)
-                            if next_folder not in all_folders:
-                                file_list, all_folders = traverse_subfolders(
-                                    study_location=study_location,
-                                    file_location=next_folder,
-                                    file_list=file_list,
-                                    all_folders=all_folders,
-                                    full_path=full_path,
-                                )
+    listed_files = set(file_list)
+    listed_folders = set(all_folders)
+    listed_folders.add(file_location)
+    all_folders.append(file_location)
+    iterator = scan_folder(file_location, exclude_names=folder_exclusion_list)
+    for entry in iterator:
+        if entry.is_dir():
+            folder = os.path.join(file_location, entry.relative_path)
+            if folder in listed_folders:
+                entry.skip_children = True
+            else:
+                listed_folders.add(folder)
+                all_folders.append(folder)
+            continue
+        file_name = entry.name
+        if full_path:
+            root = os.path.dirname(entry.path)
+            file_name = os.path.join(root.replace(study_location, ""), file_name)
+        if file_name not in listed_files:
+            listed_files.add(file_name)
+            file_list.append(file_name)
 
     return file_list, all_folders
 
@@ -1182,7 +1239,6 @@ def is_file_referenced(
     """There can be more than one assay, so each MAF must be checked against
     each Assay file. Do not state a MAF as not in use if it's used in the 'other' assay"""
     found = False
-    start_time = time.time()
 
     try:  # Submitters using standard ISAcreator (not ours) with a non UFT-8 character set will cause issues
         file_name = file_name.encode("ascii", "ignore").decode("ascii")
@@ -1205,33 +1261,11 @@ def is_file_referenced(
         ):  # FTP metadata
             return False
 
-        isa_tab_file_to_check = isa_tab_file_to_check + "*.txt"
-        isa_tab_file = os.path.join(directory, isa_tab_file_to_check)
-        for ref_file_name in glob.glob(isa_tab_file):
-            """ The filename we pass in is found referenced in the metadata (ref_file_name)
-            One possible problem here is of the maf is found in an old assay file, then we will report it as
-            current """
-            try:
-                logger.info(
-                    "Checking if file "
-                    + file_name
-                    + " is referenced in "
-                    + ref_file_name
-                )
-                with io.open(
-                    ref_file_name, "r", encoding="utf8", errors="ignore"
-                ) as file:
-                    if file_name in file.read():
-                        found = True
-            except Exception as e:
-                logger.error("File Format error? Cannot read or open file " + file_name)
-                logger.error(str(e))
-
-        logger.info(
-            "Looking for file name '"
-            + file_name
-            + "' in ISA-Tab files took %s seconds" % round(time.time() - start_time, 2)
+        # metadata files are read only when they are modified
+        index = get_file_reference_index_cache().get_index(
+            directory, isa_tab_file_to_check + "*.txt"
         )
+        found = index.contains(file_name)
     except Exception as e:
         logger.error("File Format error? Cannot access file :" + str(file_name))
         logger.error(str(e))
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.ws.table_editor import insert_row
+from app.ws.utils import read_tsv, totuples, write_tsv
+from scripts.benchmarks.utils import print_result
+
+COLUMNS = ["Source Name", "Characteristics[Organism]", "Protocol REF", "Sample Name"]
+
+
+def create_file(file_path: str, row_count: int):
+    df = pd.DataFrame(
+        {
+            "Source Name": [f"source {x}" for x in range(row_count)],
+            "Characteristics[Organism]": ["Homo sapiens"] * row_count,
+            "Protocol REF": ["Sample collection"] * row_count,
+            "Sample Name": [f"sample {x}" for x in range(row_count)],
+        }
+    )
+    df.to_csv(file_path, sep="\t", index=False)
+
+
+def add_rows_per_row_concat(file_path: str, rows, start_index: int):
+    # insert loop used before batched inserts
+    file_df = read_tsv(file_path)
+    start_index = start_index - 0.5
+    complete_row = {col: "" for col in file_df.columns}
+    for row in rows:
+        complete_row.update(row)
+        line = pd.DataFrame(complete_row, index=[start_index])
+        file_df = pd.concat([file_df, line], ignore_index=False)
+        file_df = file_df.sort_index().reset_index(drop=True)
+        start_index += 1
+    file_df = file_df.replace(np.nan, "", regex=True)
+    write_tsv(file_df, file_path)
+    return {"data": totuples(read_tsv(file_path), "rows")}
+
+
+def add_rows_batched(file_path: str, rows, start_index: int):
+    file_df = read_tsv(file_path)
+    complete_row = {col: "" for col in file_df.columns}
+    complete_rows = []
+    for row in rows:
+        complete_row.update(row)
+        complete_rows.append(complete_row.copy())
+    file_df = insert_row(start_index, file_df, pd.DataFrame(complete_rows))
+    file_df = file_df.replace(np.nan, "", regex=True)
+    write_tsv(file_df, file_path)
+    inserted_df = file_df.iloc[start_index : start_index + len(rows)]
+    return {
+        "data": totuples(inserted_df, "rows"),
+        "rowIndex": start_index,
+        "insertedRowCount": len(rows),
+        "totalRowCount": len(file_df.index),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark AddRows inserts.")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--inserts", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--max-concat-inserts", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "s_benchmark.txt")
+        for insert_count in args.inserts:
+            rows = [
+                {"Source Name": f"new {x}", "Sample Name": f"new sample {x}"}
+                for x in range(insert_count)
+            ]
+            methods = [("batched", add_rows_batched)]
+            if insert_count <= args.max_concat_inserts:
+                methods.insert(0, ("per_row_concat", add_rows_per_row_concat))
+            for name, method in methods:
+                create_file(file_path, args.rows)
+                start = time.perf_counter()
+                response = method(file_path, rows, args.rows // 2)
+                elapsed = time.perf_counter() - start
+                print_result(
+                    f"{name}_{insert_count}_rows",
+                    {
+                        "elapsed_seconds": elapsed,
+                        "response_kb": len(json.dumps(response)) / 1024,
+                    },
+                )
@@ -0,0 +1,99 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import pandas
+
+from app.config import get_settings
+from app.ws.misc_utilities.dataframe_utils import LCMS_MAF_COLUMNS
+from app.ws.report_builders.combined_maf_builder import CombinedMafBuilder
+from app.ws.settings.utils import get_study_settings
+from app.ws.utils import totuples
+from scripts.benchmarks.utils import peak_rss_mb, print_result
+
+
+def create_corpus(root_path: str, studies: int, rows: int, samples: int):
+    header = LCMS_MAF_COLUMNS + [f"Sample {x}" for x in range(samples)]
+    for idx in range(1, studies + 1):
+        study_id = f"MTBLS{idx}"
+        os.makedirs(os.path.join(root_path, study_id))
+        file_path = os.path.join(root_path, study_id, f"m_{study_id}_LC-MS_maf.tsv")
+        with open(file_path, "w") as f:
+            f.write("\t".join(header) + "\n")
+            for row in range(rows):
+                values = [f"{name} {row}" for name in LCMS_MAF_COLUMNS]
+                values[LCMS_MAF_COLUMNS.index("mass_to_charge")] = f"{row}.1234"
+                values += [f"{row * x}.5" for x in range(samples)]
+                f.write("\t".join(values) + "\n")
+
+
+def build_row_dicts(builder: CombinedMafBuilder, file_path: str):
+    # previous builder: all rows are collected as dicts before writing
+    list_of_mafs = []
+    for study_id, study_location, maf in builder.get_maf_files():
+        maf_temp = pandas.read_csv(
+            os.path.join(study_location, maf),
+            sep="\t",
+            header=0,
+            encoding="unicode_escape",
+        )
+        k = pandas.DataFrame(columns=LCMS_MAF_COLUMNS)
+        k = pandas.concat([k, maf_temp], sort=False)
+        maf_temp = k[LCMS_MAF_COLUMNS]
+        maf_temp.insert(0, "maf_filename", maf)
+        maf_temp.insert(0, "study_id", study_id)
+        list_of_mafs.extend(totuples(df=maf_temp, text="dict")["dict"])
+    pandas.DataFrame(list_of_mafs).to_csv(
+        file_path, sep="\t", encoding="utf-8", index="false"
+    )
+
+
+def run(name: str, root_path: str, studies: int, max_workers: int, queue):
+    get_study_settings().mounted_paths.study_metadata_files_root_path = root_path
+    study_ids = [f"MTBLS{x}" for x in range(1, studies + 1)]
+    builder = CombinedMafBuilder(study_ids, "LCMS", max_workers=max_workers)
+    file_path = os.path.join(root_path, f"{name}_combined_maf.tsv")
+    start = time.perf_counter()
+    if name == "row_dicts":
+        build_row_dicts(builder, file_path)
+    else:
+        builder.write_combined_maf(file_path)
+    elapsed = time.perf_counter() - start
+    queue.put(
+        {
+            "elapsed_seconds": elapsed,
+            "file_mb": os.path.getsize(file_path) / 1024 / 1024,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark combined MAF builder.")
+    parser.add_argument("--studies", type=int, default=5000)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    get_settings()
+    with tempfile.TemporaryDirectory() as root_path:
+        create_corpus(root_path, args.studies, args.rows, args.samples)
+        # each builder runs in a new process, so peak RSS values are not shared
+        context = multiprocessing.get_context("spawn")
+        for name, max_workers in (
+            ("row_dicts", 1),
+            ("streaming_1_worker", 1),
+            (f"streaming_{args.workers}_workers", args.workers),
+        ):
+            queue = context.Queue()
+            process = context.Process(
+                target=run,
+                args=(name, root_path, args.studies, max_workers, queue),
+            )
+            process.start()
+            result = queue.get()
+            process.join()
+            print_result(f"{name}_{args.studies}_mafs", result)
@@ -0,0 +1,141 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import cirpy
+import pubchempy
+
+from app.config import get_settings
+from app.ws.chebi.compound_lookup import get_compound_lookup_engine
+from app.ws.chebi_pipeline_utils import prefetch_compound_lookups, resolve_compound_name
+from scripts.benchmarks.utils import print_result
+
+# response time of each service in seconds
+LATENCIES = {
+    "pubchem": 0.4,
+    "cactus": 0.5,
+    "opsin": 0.1,
+    "chemspider": 0.3,
+    "unichem": 0.2,
+    "dime": 0.3,
+}
+
+
+def get_inchikey(name: str) -> str:
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest().upper()
+    return f"{digest[:14]}-{digest[14:24]}-N"
+
+
+def start_stub_server(latency_scale: float) -> str:
+    """
+    PubChem does not find compounds, other services resolve all names.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = [unquote(x) for x in self.path.split("?")[0].split("/") if x]
+            service = parts[0]
+            time.sleep(LATENCIES[service] * latency_scale)
+            status = 200
+            content_type = "application/json"
+            if service == "pubchem":
+                status = 404
+                body = {"Fault": {"Code": "PUGREST.NotFound", "Message": "No CID"}}
+            elif service == "cactus":
+                name, representation = parts[1], parts[2]
+                value = f"C{name}"
+                if representation == "stdinchikey":
+                    value = f"InChIKey={get_inchikey(name)}"
+                content_type = "text/xml"
+                body = (
+                    f'<request string="{name}" representation="{representation}">'
+                    '<data id="1" resolver="name_by_cir" string_class="chemical name"'
+                    f' notation="{name}"><item id="1">{value}</item></data></request>'
+                )
+            elif service == "opsin":
+                name = parts[1].replace(".json", "")
+                body = {
+                    "smiles": f"C{name}",
+                    "stdinchi": f"InChI=1S/{name}",
+                    "stdinchikey": get_inchikey(name),
+                }
+            elif service == "chemspider":
+                content_type = "text/xml"
+                body = '<string xmlns="http://www.chemspider.com/">1234</string>'
+            elif service == "unichem":
+                body = []
+            else:
+                body = {"_items": []}
+            content = (body if isinstance(body, str) else json.dumps(body)).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def no_chebi_match(comp_name: str):
+    return None
+
+
+def run(name: str, rows, prefetch: bool):
+    get_compound_lookup_engine.cache_clear()
+    engine = get_compound_lookup_engine()
+    start = time.perf_counter()
+    if prefetch:
+        prefetch_compound_lookups(rows, no_chebi_match)
+    # MAF rows are updated one by one
+    for comp_name in rows:
+        resolve_compound_name(comp_name, no_chebi_match)
+    elapsed = time.perf_counter() - start
+    result = {"rows": len(rows), "rows_per_min": len(rows) * 60 / elapsed}
+    if engine:
+        stats = engine.get_stats()
+        result["cache_hit_ratio"] = stats["cache_hits"] / max(stats["lookups"], 1)
+        result["provider_calls"] = stats["provider_calls"]
+    print_result(name, result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark compound name resolution of ChEBI pipeline."
+    )
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--distinct-names", type=int, default=20)
+    parser.add_argument("--latency-scale", type=float, default=0.25)
+    args = parser.parse_args()
+
+    url = start_stub_server(args.latency_scale)
+    pubchempy.API_BASE = f"{url}/pubchem"
+    cirpy.API_BASE = f"{url}/cactus"
+    pipeline_settings = get_settings().chebi.pipeline
+    services = pipeline_settings.search_services
+    services.opsin_url = f"{url}/opsin/"
+    services.chemspider_inchikey_url = f"{url}/chemspider?inchi_key="
+    services.unichem_url = f"{url}/unichem"
+    services.dime_url = f"{url}/dime?where=INCHI_KEY"
+
+    rows = [f"compound{x % args.distinct_names}" for x in range(args.rows)]
+    lookup_settings = pipeline_settings.compound_lookup
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lookup_settings.cache_file_path = os.path.join(temp_dir, "cache.sqlite")
+        lookup_settings.enabled = False
+        run("serial_uncached", rows, prefetch=False)
+        lookup_settings.enabled = True
+        run("concurrent_cold_cache", rows, prefetch=True)
+        # a new run reads the cache file created by the previous run
+        run("concurrent_warm_cache", rows, prefetch=True)
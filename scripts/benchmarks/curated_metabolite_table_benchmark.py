@@ -0,0 +1,81 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from app.ws.chebi.search.curated_metabolite_table import CuratedMetaboliteTable
+from app.ws.chebi.search.utils import (
+    remove_few_characters_for_consistency,
+    safe_split_string,
+)
+from scripts.benchmarks.utils import measure_latency, print_result
+
+
+def create_table_file(file_path: str, row_count: int):
+    with open(file_path, "w") as f:
+        for idx in range(row_count):
+            names = "|".join(f"compound-{idx}-synonym {x}" for x in range(3))
+            f.write(
+                f"CHEBI:{idx}\tC{idx % 30}H{idx % 60}O6\tOCC{idx}\t\t"
+                f"InChI=1S/{idx}\t{names}\t{idx % 7 == 0 and 1 or 0}\n"
+            )
+
+
+def scan_lookup(df: pd.DataFrame, column_index: int, value: str):
+    """Column scan used before the hash indexes were introduced."""
+    input_value = remove_few_characters_for_consistency("".join(value.split())).lower()
+
+    def match_row(data):
+        if not data:
+            return None
+        for item in safe_split_string(data):
+            if remove_few_characters_for_consistency(item).lower() == input_value:
+                return data
+        return None
+
+    return df[column_index].apply(match_row).dropna().index.to_list()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark curated table lookups.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--scan-repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "chebi_masterlist.tsv")
+        create_table_file(file_path, args.rows)
+        names = [
+            f"Compound-{random.randrange(args.rows)}-synonym {random.randrange(3)}"
+            for _ in range(args.repeat)
+        ]
+        column = CuratedMetaboliteTable.COMPOUND_INDEX
+
+        df = pd.read_table(file_path, engine="python", header=None).fillna("")
+        result = measure_latency(
+            lambda: scan_lookup(df, column, random.choice(names)), args.scan_repeat
+        )
+        print_result("column_scan_lookup", result)
+
+        start = time.perf_counter()
+        table = CuratedMetaboliteTable(file_path)
+        table.initialize_df()
+        print_result(
+            "index_build", {"elapsed_ms": (time.perf_counter() - start) * 1000}
+        )
+
+        start = time.perf_counter()
+        table = CuratedMetaboliteTable(file_path)
+        table.initialize_df()
+        print_result(
+            "index_file_reload", {"elapsed_ms": (time.perf_counter() - start) * 1000}
+        )
+
+        result = measure_latency(
+            lambda: table.get_matching_rows(column, random.choice(names)), args.repeat
+        )
+        print_result("hash_index_lookup", result)
@@ -0,0 +1,71 @@
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from app.ws.study.file_hash_cache import FileHashCache
+from scripts.benchmarks.utils import print_result
+
+
+def create_data_files(root_path: str, total_size_mb: int, file_count: int):
+    file_size = max(total_size_mb * 1024 * 1024 // file_count, 1)
+    block = os.urandom(min(file_size, 1024 * 1024))
+    file_paths = []
+    for idx in range(file_count):
+        folder = os.path.join(root_path, f"FOLDER_{idx % 10}")
+        os.makedirs(folder, exist_ok=True)
+        file_path = os.path.join(folder, f"sample_{idx}.raw")
+        with open(file_path, "wb") as f:
+            written = 0
+            while written < file_size:
+                size = min(len(block), file_size - written)
+                f.write(block[:size])
+                written += size
+        file_paths.append(file_path)
+    return file_paths
+
+
+def serial_hashes(file_paths):
+    hashes = {}
+    for file_path in file_paths:
+        sha256_hash = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for byte_block in iter(lambda: f.read(4096), b""):
+                sha256_hash.update(byte_block)
+        hashes[file_path] = sha256_hash.hexdigest()
+    return hashes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark data file hashing.")
+    parser.add_argument("--size-mb", type=int, default=4096)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modified-files", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_path = os.path.join(temp_dir, "FILES")
+        file_paths = create_data_files(data_path, args.size_mb, args.files)
+        cache_file_path = os.path.join(temp_dir, "cache", "hashes.json")
+
+        start = time.time()
+        serial_hashes(file_paths)
+        elapsed = time.time() - start
+        print_result(
+            "serial_4kb_blocks",
+            {
+                "elapsed_seconds": elapsed,
+                "megabytes_per_second": args.size_mb / elapsed,
+            },
+        )
+
+        for name in ("cold_cache", "warm_cache"):
+            if name == "warm_cache":
+                for file_path in file_paths[: args.modified_files]:
+                    with open(file_path, "ab") as f:
+                        f.write(b"updated")
+            cache = FileHashCache(cache_file_path, max_workers=args.workers)
+            result = cache.calculate_hashes(file_paths)
+            print_result(name, result.model_dump(exclude={"hashes"}))
@@ -0,0 +1,106 @@
+import argparse
+import fnmatch
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from app.ws.study.data_file_index import PRIVATE_DATA_FILES, DataFileIndex
+from scripts.benchmarks.utils import measure_latency, peak_rss_mb, print_result
+
+FILES_PER_FOLDER = 1000
+SEARCH_PATTERN = "FILES/group_1/run_10/*.mzML"
+
+
+def create_descriptors(file_count: int) -> dict:
+    descriptors = {}
+    folder_count = max(file_count // FILES_PER_FOLDER, 1)
+    for folder_idx in range(folder_count):
+        group = f"FILES/group_{folder_idx // 100}"
+        folder = f"{group}/run_{folder_idx}"
+        for path, parent, is_dir in ((group, "FILES", True), (folder, group, True)):
+            descriptors[path] = {
+                "name": path.rsplit("/", 1)[1],
+                "relative_path": path,
+                "parent_relative_path": parent,
+                "is_dir": is_dir,
+                "modified_time": 0.0,
+                "extension": "",
+                "file_size": 0,
+                "is_empty": False,
+            }
+        for file_idx in range(FILES_PER_FOLDER):
+            path = f"{folder}/sample_{file_idx}.mzML"
+            descriptors[path] = {
+                "name": f"sample_{file_idx}.mzML",
+                "relative_path": path,
+                "parent_relative_path": folder,
+                "is_dir": False,
+                "modified_time": 0.0,
+                "extension": ".mzML",
+                "file_size": 1024,
+                "is_empty": False,
+            }
+    return descriptors
+
+
+def create_indexes(root_path: str, file_count: int):
+    descriptors = create_descriptors(file_count)
+    legacy_path = os.path.join(root_path, "legacy")
+    os.makedirs(legacy_path)
+    with open(os.path.join(legacy_path, "data_file_index.json"), "w") as f:
+        json.dump({PRIVATE_DATA_FILES: descriptors}, f)
+    index = DataFileIndex(os.path.join(root_path, "sharded"))
+    index.replace_source(PRIVATE_DATA_FILES, descriptors)
+    index.save()
+
+
+def list_monolithic(root_path: str, folder: str) -> int:
+    # load the whole study index and filter by parent path, as before
+    with open(os.path.join(root_path, "legacy", "data_file_index.json")) as f:
+        files = json.load(f)[PRIVATE_DATA_FILES]
+    children = [x for x in files.values() if x["parent_relative_path"] == folder]
+    selected = fnmatch.filter(files.keys(), SEARCH_PATTERN)
+    return len(children) + len(selected)
+
+
+def list_sharded(root_path: str, folder: str) -> int:
+    index = DataFileIndex(os.path.join(root_path, "sharded"))
+    children = index.get_children(PRIVATE_DATA_FILES, folder)
+    selected = list(index.search(PRIVATE_DATA_FILES, SEARCH_PATTERN))
+    return len(children) + len(selected)
+
+
+def run(name: str, root_path: str, repeat: int, queue):
+    method = list_monolithic if name == "monolithic" else list_sharded
+    count = method(root_path, "FILES/group_0/run_0")
+    result = measure_latency(
+        lambda: method(root_path, "FILES/group_0/run_0"), repeat=repeat
+    )
+    queue.put({**result, "returned": count, "peak_rss_mb": peak_rss_mb()})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark data file indexes.")
+    parser.add_argument("--files", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # each step runs in a new process, so peak RSS values are not shared
+        context = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        process = context.Process(target=create_indexes, args=(temp_dir, args.files))
+        process.start()
+        process.join()
+        print_result("create_indexes", {"elapsed_seconds": time.perf_counter() - start})
+        for name in ("monolithic", "sharded"):
+            queue = context.Queue()
+            process = context.Process(
+                target=run, args=(name, temp_dir, args.repeat, queue)
+            )
+            process.start()
+            result = queue.get()
+            process.join()
+            print_result(f"{name}_{args.files}_files", result)
@@ -0,0 +1,105 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from xml.dom.minidom import Document
+
+from app.services.external.eb_eye_search import EbEyeSearchService
+from app.ws.dom_utils import (
+    create_generic_element,
+    create_generic_element_attribute,
+    serialize_pretty_nodes,
+    write_entries_document,
+)
+from scripts.benchmarks.utils import peak_rss_mb, print_result
+
+
+def add_study_entry(doc: Document, root, study_id: str, io_latency: float):
+    # simulates database and metadata file reads of a study
+    time.sleep(io_latency)
+    entry = doc.createElement("entry")
+    entry.setAttribute("id", study_id)
+    root.appendChild(entry)
+    create_generic_element(doc, entry, "name", f"Metabolomics study {study_id}")
+    create_generic_element(doc, entry, "description", "Study description. " * 40)
+    xrefs = doc.createElement("cross_references")
+    for idx in range(50):
+        ref = doc.createElement("ref")
+        ref.setAttribute("dbkey", f"CHEBI:{idx}")
+        ref.setAttribute("dbname", "ChEBI")
+        xrefs.appendChild(ref)
+    entry.appendChild(xrefs)
+    fields = doc.createElement("additional_fields")
+    for idx in range(100):
+        create_generic_element_attribute(
+            doc, fields, "field", f"metabolite {idx}", "name", "metabolite_name"
+        )
+    entry.appendChild(fields)
+
+
+def run_minidom_export(file_path: str, study_ids, io_latency: float):
+    doc = Document()
+    root = doc.createElement("database")
+    doc.appendChild(root)
+    for node in EbEyeSearchService.create_header_nodes(len(study_ids)):
+        root.appendChild(node)
+    entries = doc.createElement("entries")
+    root.appendChild(entries)
+    for study_id in study_ids:
+        add_study_entry(doc, entries, study_id, io_latency)
+    content = doc.toprettyxml(indent="")
+    with open(file_path, "w") as f:
+        f.write(content)
+
+
+def run_streaming_export(file_path: str, study_ids, io_latency: float, workers: int):
+    def create_entry(study_id: str) -> str:
+        doc = Document()
+        entries = doc.createElement("entries")
+        add_study_entry(doc, entries, study_id, io_latency)
+        return serialize_pretty_nodes(entries.childNodes)
+
+    write_entries_document(
+        file_path,
+        EbEyeSearchService.create_header_nodes(len(study_ids)),
+        EbEyeSearchService.generate_entries(study_ids, create_entry, workers),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark EB-eye XML export.")
+    parser.add_argument("--studies", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--io-latency-ms", type=float, default=2)
+    parser.add_argument("--mode", choices=["minidom", "streaming"])
+    args = parser.parse_args()
+
+    if args.mode:
+        study_ids = [f"MTBLS{x}" for x in range(1, args.studies + 1)]
+        io_latency = args.io_latency_ms / 1000
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "export.xml")
+            start = time.time()
+            if args.mode == "minidom":
+                run_minidom_export(file_path, study_ids, io_latency)
+            else:
+                run_streaming_export(file_path, study_ids, io_latency, args.workers)
+            print_result(
+                args.mode,
+                {
+                    "elapsed_seconds": time.time() - start,
+                    "file_mb": os.path.getsize(file_path) / 1024 / 1024,
+                    "peak_rss_mb": peak_rss_mb(),
+                },
+            )
+    else:
+        # each exporter runs in its own process to measure its peak RSS
+        for mode in ("minidom", "streaming"):
+            subprocess.run(
+                [sys.executable, "-m", "scripts.benchmarks.eb_eye_export_benchmark"]
+                + sys.argv[1:]
+                + ["--mode", mode],
+                check=True,
+            )
@@ -0,0 +1,90 @@
+import argparse
+import time
+
+from elasticsearch import Elasticsearch
+
+from app.config.model.elasticsearch import (
+    ElasticsearchConnection,
+    ElasticsearchSettings,
+)
+from app.ws.elasticsearch.elastic_service import ElasticsearchService
+from scripts.benchmarks.utils import print_result
+
+
+class FakeElasticsearchClient(object):
+    """In-process client that simulates a fixed round-trip time per request."""
+
+    def __init__(self, request_latency: float):
+        self.request_latency = request_latency
+        self.requests = 0
+
+    def index(self, index, doc_type, body, id, params=None):
+        self.requests += 1
+        time.sleep(self.request_latency)
+        return {"_id": id, "created": True}
+
+    def bulk(self, body, params=None):
+        self.requests += 1
+        time.sleep(self.request_latency)
+        items = [
+            {"index": {"_id": action["index"]["_id"], "status": 201}}
+            for action in body[::2]
+        ]
+        return {"errors": False, "items": items}
+
+
+def build_document(doc_id: str, build_latency: float):
+    time.sleep(build_latency)
+    return {"id": doc_id, "title": f"Document {doc_id}", "description": "x" * 2000}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk reindex pipeline.")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--build-latency", type=float, default=0.002)
+    parser.add_argument("--request-latency", type=float, default=0.005)
+    parser.add_argument(
+        "--es-url", help="Local Elasticsearch node. In-process fake is used if not set."
+    )
+    args = parser.parse_args()
+
+    settings = ElasticsearchSettings(
+        connection=ElasticsearchConnection(host="localhost", username="", password="")
+    )
+    service = ElasticsearchService(settings, None, None)
+    if args.es_url:
+        service._client = Elasticsearch(args.es_url)
+    else:
+        service._client = FakeElasticsearchClient(args.request_latency)
+    ids = [f"MTBLC{x}" for x in range(args.documents)]
+    doc_type = ElasticsearchService.DOC_TYPE_COMPOUND
+
+    start = time.time()
+    for doc_id in ids:
+        service.client.index(
+            index=ElasticsearchService.INDEX_NAME,
+            doc_type=doc_type,
+            body=build_document(doc_id, args.build_latency),
+            id=doc_id,
+        )
+    elapsed = time.time() - start
+    print_result(
+        "serial_index",
+        {
+            "documents": len(ids),
+            "elapsed_seconds": elapsed,
+            "documents_per_second": len(ids) / elapsed,
+        },
+    )
+
+    result = service.bulk_reindex(
+        doc_type,
+        ids,
+        lambda x: build_document(x, args.build_latency),
+        chunk_size=args.chunk_size,
+        max_workers=args.workers,
+    )
+    result["failed"] = len(result["failed"])
+    print_result("bulk_index", result)
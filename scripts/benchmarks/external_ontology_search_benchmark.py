@@ -0,0 +1,140 @@
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from app.config import get_settings
+from app.ws.external_ontology_search import (
+    get_ontology_search_executor,
+    get_ontology_search_result_cache,
+    search_first_match,
+)
+from app.ws.ontology_info import (
+    get_external_ontology_search,
+    getBioportalTerm,
+    getOLSTerm,
+    getZoomaTerm,
+)
+from scripts.benchmarks.utils import measure_latency, print_result
+
+
+class DictStorage(object):
+    def __init__(self):
+        self.values = {}
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def set_value(self, key, value, ex=None):
+        self.values[key] = value
+
+
+def start_stub_server(args) -> str:
+    """
+    OLS does not find the query and Zooma returns args.rows annotations.
+    Every args.stall_every-th OLS and Zooma search stalls for args.stall seconds.
+    """
+    counter = itertools.count(1)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path.endswith("/terms/findByIdAndIsDefiningOntology"):
+                time.sleep(args.lookup_latency)
+                body = {"_embedded": {"terms": [{"ontology_name": "efo"}]}}
+            else:
+                delay = args.latency
+                if next(counter) % args.stall_every == 0:
+                    delay = args.stall
+                time.sleep(delay)
+                if url.path.startswith("/ols"):
+                    body = {"response": {"docs": []}}
+                elif url.path.startswith("/zooma"):
+                    value = query["propertyValue"][0]
+                    body = [
+                        {
+                            "semanticTags": [f"http://example.org/{value}/EFO_{x}"],
+                            "annotatedProperty": {"propertyValue": f"{value} {x}"},
+                            "confidence": "HIGH",
+                        }
+                        for x in range(args.rows)
+                    ]
+                else:
+                    body = {"collection": []}
+            content = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def search_serial(term: str):
+    # previous fallback: providers one by one and one ontology name lookup per row
+    for search in (getOLSTerm, getZoomaTerm, getBioportalTerm):
+        result = search(term, "")
+        if result:
+            return result
+    return []
+
+
+def search_parallel(term: str):
+    searches = [
+        get_external_ontology_search(x, term) for x in ("OLS", "Zooma", "Bioportal")
+    ]
+    return search_first_match(searches, get_ontology_search_executor())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark external ontology search with slow providers."
+    )
+    parser.add_argument("--repeat", type=int, default=60)
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--lookup-latency", type=float, default=0.02)
+    parser.add_argument("--stall", type=float, default=3)
+    parser.add_argument("--stall-every", type=int, default=20)
+    parser.add_argument("--deadline", type=float, default=1)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    url = start_stub_server(args)
+    settings.external_dependencies.api.ols_api_url = f"{url}/ols"
+    settings.external_dependencies.api.zooma_api_url = f"{url}/zooma"
+    settings.external_dependencies.api.bioontology_api_url = f"{url}/bioportal"
+    search_settings = settings.external_dependencies.ontology_search
+    search_settings.ols_deadline_in_seconds = args.deadline
+    search_settings.zooma_deadline_in_seconds = args.deadline
+    search_settings.bioportal_deadline_in_seconds = args.deadline
+    # in-process storage replaces Redis
+    get_ontology_search_result_cache().storage = DictStorage()
+
+    for name, method, max_workers in (
+        ("serial", search_serial, 1),
+        ("parallel", search_parallel, 8),
+    ):
+        search_settings.ontology_name_lookup_max_workers = max_workers
+        # each query is new and it is not in any cache
+        terms = (f"{name}{x}" for x in itertools.count())
+        print_result(
+            f"{name}_fallback",
+            measure_latency(lambda: method(next(terms)), repeat=args.repeat),
+        )
+    terms = itertools.cycle([f"parallel{x}" for x in range(args.repeat)])
+    print_result(
+        "parallel_fallback_cached",
+        measure_latency(lambda: search_parallel(next(terms)), repeat=args.repeat),
+    )
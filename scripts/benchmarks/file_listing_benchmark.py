@@ -0,0 +1,81 @@
+import argparse
+import glob
+import io
+import os
+import tempfile
+import time
+
+from app.ws.study.file_reference_index import get_file_reference_index_cache
+from app.ws.study.folder_utils import get_basic_files
+from scripts.benchmarks.utils import print_result
+
+
+def create_study(study_path: str, file_count: int, assay_count: int):
+    os.makedirs(study_path, exist_ok=True)
+    with open(os.path.join(study_path, "i_Investigation.txt"), "w") as f:
+        f.write('Study File Name\t"s_MTBLS1.txt"\n')
+        assay_names = [f'"a_MTBLS1_{x}.txt"' for x in range(assay_count)]
+        f.write("Study Assay File Name\t" + "\t".join(assay_names) + "\n")
+    with open(os.path.join(study_path, "s_MTBLS1.txt"), "w") as f:
+        f.write("Source Name\tSample Name\n")
+        for x in range(file_count):
+            f.write(f"source_{x}\tsample_{x}\n")
+    per_assay = file_count // assay_count
+    for assay in range(assay_count):
+        with open(os.path.join(study_path, f"a_MTBLS1_{assay}.txt"), "w") as f:
+            f.write("Sample Name\tRaw Spectral Data File\tMetabolite Assignment File\n")
+            for x in range(assay * per_assay, (assay + 1) * per_assay):
+                f.write(f"sample_{x}\tFILES/sample_{x}.mzML\tm_MTBLS1.tsv\n")
+    with open(os.path.join(study_path, "m_MTBLS1.tsv"), "w") as f:
+        f.write("database_identifier\n")
+    for x in range(file_count):
+        open(os.path.join(study_path, f"sample_{x}.mzML"), "w").close()
+
+
+def is_file_referenced_by_reading_files(file_name, directory, pattern):
+    # glob and read metadata files for each file, as before
+    found = False
+    for ref_file_name in glob.glob(os.path.join(directory, pattern + "*.txt")):
+        with io.open(ref_file_name, "r", encoding="utf8", errors="ignore") as file:
+            if file_name in file.read():
+                found = True
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark study folder listing.")
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--assays", type=int, default=4)
+    parser.add_argument("--legacy-sample", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        study_path = os.path.join(temp_dir, "MTBLS1")
+        create_study(study_path, args.files, args.assays)
+        file_names = sorted(os.listdir(study_path))
+
+        # reading metadata files for every file is slow, so a sample is measured
+        start = time.perf_counter()
+        for file_name in file_names[: args.legacy_sample]:
+            is_file_referenced_by_reading_files(file_name, study_path, "a_")
+        elapsed = time.perf_counter() - start
+        print_result(
+            f"read_files_per_file_{len(file_names)}_files",
+            {
+                "estimated_seconds": elapsed * len(file_names) / args.legacy_sample,
+                "measured_files": args.legacy_sample,
+            },
+        )
+
+        for name in ("indexed_first_listing", "indexed_second_listing"):
+            start = time.perf_counter()
+            files = get_basic_files(study_path, include_sub_dir=False)
+            elapsed = time.perf_counter() - start
+            print_result(
+                f"{name}_{len(files)}_files",
+                {
+                    "elapsed_seconds": elapsed,
+                    "active_files": sum(x["status"] == "active" for x in files),
+                },
+            )
+        print_result("reference_index_cache", get_file_reference_index_cache().stats())
@@ -0,0 +1,111 @@
+import argparse
+import glob
+import os
+import pathlib
+import tempfile
+import time
+from collections import Counter
+from unittest import mock
+
+from app.study_folder_utils import FolderEntry, get_study_folder_files
+from scripts.benchmarks.utils import print_result
+
+COUNTED_FUNCTIONS = ["stat", "lstat", "scandir", "listdir"]
+
+
+def create_tree(root_path: str, entry_count: int, files_per_folder: int = 100):
+    folder_count = max(entry_count // (files_per_folder + 1), 1)
+    for folder_idx in range(folder_count):
+        group = f"group_{folder_idx // 100}"
+        folder = os.path.join(root_path, "FILES", group, f"run_{folder_idx}")
+        os.makedirs(folder, exist_ok=True)
+        for file_idx in range(files_per_folder):
+            with open(os.path.join(folder, f"sample_{file_idx}.mzML"), "w") as f:
+                f.write("x")
+
+
+def list_with_path_calls(root_path: str, root: pathlib.Path, descriptors: dict):
+    # per entry pathlib and os.path calls and a stop folder glob per folder
+    for item in root.iterdir():
+        relative_path = str(item).replace(root_path, "").lstrip("/")
+        if item.name.startswith("."):
+            continue
+        if item.is_dir():
+            files = [
+                x for x in glob.iglob(f"{item}/acqu*") if "." not in os.path.basename(x)
+            ]
+            if files:
+                for pattern in ["fid*", "ser*", "pdata"]:
+                    list(glob.iglob(f"{item}/{pattern}"))
+            descriptors[relative_path] = (True, os.path.getmtime(item), 0)
+            list_with_path_calls(root_path, item, descriptors)
+        else:
+            if item.is_symlink() and not item.resolve().exists():
+                continue
+            if not item.exists():
+                continue
+            descriptors[relative_path] = (
+                False,
+                os.path.getmtime(item),
+                os.path.getsize(item),
+                item.stat().st_size == 0,
+            )
+
+
+def count_calls(func):
+    counter = Counter()
+    patches = []
+    for name in COUNTED_FUNCTIONS:
+        original = getattr(os, name)
+
+        def wrapper(*args, __original=original, __name=name, **kwargs):
+            counter[__name] += 1
+            return __original(*args, **kwargs)
+
+        patches.append(mock.patch.object(os, name, wrapper))
+    original_stat = FolderEntry.stat
+
+    def entry_stat(self):
+        if self._stat is None:
+            counter["dir_entry_stat"] += 1
+        return original_stat(self)
+
+    patches.append(mock.patch.object(FolderEntry, "stat", entry_stat))
+    for patch in patches:
+        patch.start()
+    try:
+        func()
+    finally:
+        for patch in patches:
+            patch.stop()
+    return counter
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark study folder walkers.")
+    parser.add_argument("--entries", type=int, default=500000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        create_tree(temp_dir, args.entries)
+        root = pathlib.Path(temp_dir)
+        methods = {
+            "path_calls": lambda x: list_with_path_calls(temp_dir, root, x),
+            "scandir_walker": lambda x: list(get_study_folder_files(temp_dir, x, root)),
+        }
+        for name, method in methods.items():
+            descriptors = {}
+            start = time.perf_counter()
+            method(descriptors)
+            elapsed = time.perf_counter() - start
+            counter = count_calls(lambda: method({}))
+            calls = sum(counter.values())
+            print_result(
+                f"{name}_{len(descriptors)}_entries",
+                {
+                    "elapsed_seconds": elapsed,
+                    "fs_calls": calls,
+                    "fs_calls_per_entry": calls / max(len(descriptors), 1),
+                    **dict(counter),
+                },
+            )
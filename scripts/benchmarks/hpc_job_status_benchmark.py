@@ -0,0 +1,154 @@
+import argparse
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from app.config import get_settings
+from app.services.cluster import hpc_job_status
+from app.services.cluster.hpc_job_status import HpcJobStatusCache
+from app.services.cluster.hpc_utils import get_new_hpc_datamover_client
+from app.ws import cluster_jobs
+from scripts.benchmarks.utils import percentile, print_result
+
+FAKE_SSH = """#!/bin/sh
+echo session >> "$FAKE_SSH_SESSIONS"
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -i|-o) shift 2 ;;
+        *) shift; break ;;
+    esac
+done
+sleep "$FAKE_SSH_LATENCY"
+exec sh -c "$*"
+"""
+
+FAKE_SQUEUE = """#!/bin/sh
+cat "$FAKE_SQUEUE_OUTPUT"
+"""
+
+
+class DictStorage(object):
+    def __init__(self):
+        self.values = {}
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def set_value(self, key, value, ex=None):
+        self.values[key] = value
+
+
+def write_script(path: str, content: str):
+    with open(path, "w") as f:
+        f.write(content)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def count_sessions(path: str) -> int:
+    with open(path) as f:
+        return len(f.readlines())
+
+
+def list_jobs_direct(queue, job_name):
+    # previous implementation: one ssh + squeue call for each status check
+    client = get_new_hpc_datamover_client()
+    return [x for x in client.get_job_status() if x.name.endswith(job_name)]
+
+
+def run(name: str, check, args, sessions_file: str, refresh_period: float = 0):
+    queue = get_settings().hpc_cluster.datamover.default_queue
+    durations = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    start_sessions = count_sessions(sessions_file)
+
+    def poller():
+        # periodic refresh task of the deployment
+        cache = hpc_job_status.get_hpc_job_status_cache()
+        while not stop.is_set():
+            cache.refresh("datamover")
+            stop.wait(refresh_period)
+
+    def caller(index: int):
+        while not stop.is_set():
+            start = time.perf_counter()
+            check(queue, f"MTBLS{index}_sync")
+            with lock:
+                durations.append((time.perf_counter() - start) * 1000)
+            stop.wait(args.check_interval)
+
+    threads = [threading.Thread(target=caller, args=(x,)) for x in range(args.callers)]
+    if refresh_period:
+        threads.append(threading.Thread(target=poller))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    sessions = count_sessions(sessions_file) - start_sessions
+    print_result(
+        name,
+        {
+            "checks": len(durations),
+            "ssh_sessions": sessions,
+            "ssh_sessions_per_min": sessions * 60 / elapsed,
+            "p50_ms": percentile(durations, 0.5),
+            "p99_ms": percentile(durations, 0.99),
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark HPC job status checks with fake ssh and squeue."
+    )
+    parser.add_argument("--callers", type=int, default=20)
+    parser.add_argument("--check-interval", type=float, default=1)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--ssh-latency", type=float, default=0.3)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--refresh-period", type=float, default=15)
+    args = parser.parse_args()
+
+    datamover = get_settings().hpc_cluster.datamover
+    datamover.workload_manager = "slurm"
+    datamover.use_ssh_tunnel = False
+    prefix = f"{datamover.job_prefix}{datamover.job_prefix_demimeter}"
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bin_path = os.path.join(temp_dir, "bin")
+        os.makedirs(bin_path)
+        write_script(os.path.join(bin_path, "ssh"), FAKE_SSH)
+        write_script(os.path.join(bin_path, "squeue"), FAKE_SQUEUE)
+        sessions_file = os.path.join(temp_dir, "sessions.txt")
+        write_script(sessions_file, "")
+        output_file = os.path.join(temp_dir, "squeue.txt")
+        with open(output_file, "w") as f:
+            for x in range(args.jobs):
+                f.write(
+                    f"{x}::datamover::RUNNING::user::1:00:00::{x}::"
+                    f"{prefix}MTBLS{x}_sync::2026-01-01T10:00:00\n"
+                )
+        os.environ["PATH"] = f"{bin_path}{os.pathsep}{os.environ['PATH']}"
+        os.environ["FAKE_SSH_SESSIONS"] = sessions_file
+        os.environ["FAKE_SQUEUE_OUTPUT"] = output_file
+        os.environ["FAKE_SSH_LATENCY"] = str(args.ssh_latency)
+
+        run("direct_squeue", list_jobs_direct, args, sessions_file)
+        # in-process storage replaces Redis
+        cache = HpcJobStatusCache(
+            DictStorage(), "benchmark", args.refresh_period, args.refresh_period * 4
+        )
+        hpc_job_status.get_hpc_job_status_cache = lambda: cache
+        cluster_jobs.get_hpc_job_status_cache = lambda: cache
+        run(
+            "shared_snapshot",
+            cluster_jobs.list_jobs,
+            args,
+            sessions_file,
+            args.refresh_period,
+        )
@@ -0,0 +1,135 @@
+import argparse
+import os
+import tempfile
+
+from isatools.isatab import load
+
+from app.ws.study.isa_study_cache import IsaStudyCache
+from scripts.benchmarks.utils import measure_latency, print_result
+
+
+def create_investigation_file(study_path: str, assay_count: int):
+    study_id = os.path.basename(study_path)
+    assay_files = [
+        f"a_{study_id}_LC-MS_{idx}_metabolite_profiling.txt"
+        for idx in range(assay_count)
+    ]
+
+    def row(name: str, values: list[str]):
+        return "\t".join([name] + [f'"{x}"' for x in values]) + "\n"
+
+    lines = [
+        "ONTOLOGY SOURCE REFERENCE\n",
+        row("Term Source Name", ["OBI"]),
+        row("Term Source File", [""]),
+        row("Term Source Version", [""]),
+        row("Term Source Description", ["Ontology for Biomedical Investigations"]),
+        "INVESTIGATION\n",
+        row("Investigation Identifier", [study_id]),
+        row("Investigation Title", ["Benchmark investigation"]),
+        row("Investigation Description", [""]),
+        row("Investigation Submission Date", [""]),
+        row("Investigation Public Release Date", [""]),
+        "INVESTIGATION PUBLICATIONS\n",
+        "INVESTIGATION CONTACTS\n",
+        "STUDY\n",
+        row("Study Identifier", [study_id]),
+        row("Study Title", ["Benchmark study"]),
+        row("Study Description", ["Synthetic study " * 200]),
+        row("Study Submission Date", ["2024-01-01"]),
+        row("Study Public Release Date", ["2024-01-01"]),
+        row("Study File Name", [f"s_{study_id}.txt"]),
+        "STUDY DESIGN DESCRIPTORS\n",
+        row("Study Design Type", ["untargeted metabolites"]),
+        row("Study Design Type Term Accession Number", [""]),
+        row("Study Design Type Term Source REF", [""]),
+        "STUDY PUBLICATIONS\n",
+        "STUDY FACTORS\n",
+        row("Study Factor Name", ["Treatment"]),
+        row("Study Factor Type", ["treatment"]),
+        row("Study Factor Type Term Accession Number", [""]),
+        row("Study Factor Type Term Source REF", [""]),
+        "STUDY ASSAYS\n",
+        row("Study Assay File Name", assay_files),
+        row("Study Assay Measurement Type", ["metabolite profiling"] * assay_count),
+        row("Study Assay Measurement Type Term Accession Number", [""] * assay_count),
+        row("Study Assay Measurement Type Term Source REF", ["OBI"] * assay_count),
+        row("Study Assay Technology Type", ["mass spectrometry"] * assay_count),
+        row("Study Assay Technology Type Term Accession Number", [""] * assay_count),
+        row("Study Assay Technology Type Term Source REF", ["OBI"] * assay_count),
+        row(
+            "Study Assay Technology Platform",
+            ["Liquid Chromatography MS"] * assay_count,
+        ),
+        "STUDY PROTOCOLS\n",
+        row("Study Protocol Name", ["Sample collection", "Extraction"]),
+        row("Study Protocol Type", ["Sample collection", "Extraction"]),
+        row("Study Protocol Type Term Accession Number", ["", ""]),
+        row("Study Protocol Type Term Source REF", ["", ""]),
+        row("Study Protocol Description", ["Collected", "Extracted"]),
+        row("Study Protocol URI", ["", ""]),
+        row("Study Protocol Version", ["", ""]),
+        row("Study Protocol Parameters Name", ["", ""]),
+        row("Study Protocol Parameters Name Term Accession Number", ["", ""]),
+        row("Study Protocol Parameters Name Term Source REF", ["", ""]),
+        row("Study Protocol Components Name", ["", ""]),
+        row("Study Protocol Components Type", ["", ""]),
+        row("Study Protocol Components Type Term Accession Number", ["", ""]),
+        row("Study Protocol Components Type Term Source REF", ["", ""]),
+        "STUDY CONTACTS\n",
+        row("Study Person Last Name", ["Doe"]),
+        row("Study Person First Name", ["Jane"]),
+        row("Study Person Mid Initials", [""]),
+        row("Study Person Email", ["jane@example.org"]),
+        row("Study Person Phone", [""]),
+        row("Study Person Fax", [""]),
+        row("Study Person Address", [""]),
+        row("Study Person Affiliation", [""]),
+        row("Study Person Roles", ["Investigator"]),
+        row("Study Person Roles Term Accession Number", [""]),
+        row("Study Person Roles Term Source REF", [""]),
+    ]
+    with open(os.path.join(study_path, "i_Investigation.txt"), "w") as f:
+        f.writelines(lines)
+
+
+def load_investigation(study_path: str):
+    with open(os.path.join(study_path, "i_Investigation.txt"), encoding="utf-8") as fp:
+        return load(fp, True)
+
+
+def load_investigation_with_cache(cache: IsaStudyCache, study_path: str):
+    isa_inv = cache.get(study_path, True)
+    if isa_inv is None:
+        signature = cache.get_signature(study_path, True)
+        isa_inv = load_investigation(study_path)
+        cache.put(study_path, True, signature, isa_inv)
+    return isa_inv
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parsed ISA study cache.")
+    parser.add_argument(
+        "--study-path",
+        help="Existing study folder. A synthetic study is created if not set.",
+    )
+    parser.add_argument("--assays", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        study_path = args.study_path
+        if not study_path:
+            study_path = os.path.join(temp_dir, "MTBLS1000000")
+            os.makedirs(study_path)
+            create_investigation_file(study_path, args.assays)
+
+        result = measure_latency(lambda: load_investigation(study_path), args.repeat)
+        print_result("without_cache", result)
+
+        cache = IsaStudyCache(max_entries=16)
+        result = measure_latency(
+            lambda: load_investigation_with_cache(cache, study_path), args.repeat
+        )
+        result.update(cache.stats())
+        print_result("with_cache", result)
@@ -0,0 +1,118 @@
+import argparse
+import threading
+import time
+
+import psycopg
+
+from app.config import get_settings
+from app.ws.db_connection import add_maf_info_data, reload_maf_info_table
+from scripts.benchmarks.utils import percentile, print_result
+
+
+def create_rows(count: int, studies: int):
+    for idx in range(count):
+        yield (
+            f"MTBLS{idx % studies + 1}",
+            f"CHEBI:{idx}",
+            f"metabolite {idx}",
+            str(idx % 2),
+            "1",
+        )
+
+
+def reload_row_by_row(rows):
+    # previous reload: the live table is dropped and rows are inserted one by one
+    with psycopg.connect(get_conninfo(), autocommit=True) as conn:
+        conn.execute("truncate table maf_info;")
+        conn.execute("drop table maf_info;")
+        conn.execute(
+            "CREATE table maf_info(acc VARCHAR, database_identifier VARCHAR, "
+            "metabolite_identification VARCHAR, database_found VARCHAR, "
+            "metabolite_found VARCHAR);"
+        )
+    for row in rows:
+        add_maf_info_data(*row)
+
+
+def get_conninfo() -> str:
+    config = get_settings().database.connection
+    return psycopg.conninfo.make_conninfo(
+        host=config.host,
+        port=config.port,
+        user=config.user,
+        password=config.password,
+        dbname=config.database,
+    )
+
+
+class Reader(threading.Thread):
+    """
+    Counts maf_info rows continuously. A query is unavailable if it fails
+    or it returns no rows.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.stopped = threading.Event()
+        self.latencies = []
+        self.unavailable_seconds = 0.0
+
+    def run(self):
+        with psycopg.connect(get_conninfo(), autocommit=True) as conn:
+            while not self.stopped.is_set():
+                start = time.perf_counter()
+                try:
+                    count = conn.execute("select count(*) from maf_info").fetchone()[0]
+                except psycopg.Error:
+                    count = 0
+                elapsed = time.perf_counter() - start
+                self.latencies.append(elapsed * 1000)
+                if not count:
+                    self.unavailable_seconds += elapsed + 0.01
+                time.sleep(0.01)
+
+
+def run(name: str, method, rows: int, studies: int):
+    reload_maf_info_table(create_rows(rows, studies))
+    reader = Reader()
+    reader.start()
+    start = time.perf_counter()
+    method(create_rows(rows, studies))
+    elapsed = time.perf_counter() - start
+    reader.stopped.set()
+    reader.join()
+    print_result(
+        f"{name}_{rows}_rows",
+        {
+            "rows_per_second": rows / elapsed,
+            "elapsed_seconds": elapsed,
+            "reader_unavailable_seconds": reader.unavailable_seconds,
+            "reader_p99_ms": percentile(reader.latencies, 0.99),
+            "reader_max_ms": max(reader.latencies, default=0.0),
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark maf_info reload against a local PostgreSQL database."
+    )
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default="postgres")
+    parser.add_argument("--database", default="postgres")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--row-by-row-rows", type=int, default=20000)
+    parser.add_argument("--studies", type=int, default=5000)
+    args = parser.parse_args()
+
+    config = get_settings().database.connection
+    config.host = args.host
+    config.port = args.port
+    config.user = args.user
+    config.password = args.password
+    config.database = args.database
+
+    run("row_by_row", reload_row_by_row, args.row_by_row_rows, args.studies)
+    run("copy_and_swap", reload_maf_info_table, args.rows, args.studies)
@@ -0,0 +1,114 @@
+import argparse
+import os
+import tempfile
+import time
+
+from app.ws.settings.utils import get_study_settings
+from app.ws.stats import (
+    clean_string,
+    get_study_file_names,
+    is_identified,
+    iterate_study_stats,
+)
+from app.ws.utils import read_tsv
+from scripts.benchmarks.isa_study_cache_benchmark import create_investigation_file
+from scripts.benchmarks.utils import peak_rss_mb, print_result
+
+
+def create_study(study_path: str, assays: int, rows: int):
+    study_id = os.path.basename(study_path)
+    os.makedirs(os.path.join(study_path, "FILES"))
+    create_investigation_file(study_path, assays)
+    with open(os.path.join(study_path, f"s_{study_id}.txt"), "w") as f:
+        f.write("Source Name\tSample Name\n")
+        f.writelines(f"source{x}\tsample{x}\n" for x in range(100))
+    for idx in range(assays):
+        assay_file = f"a_{study_id}_LC-MS_{idx}_metabolite_profiling.txt"
+        maf_file = f"m_{study_id}_LC-MS_{idx}_v2_maf.tsv"
+        with open(os.path.join(study_path, assay_file), "w") as f:
+            f.write("Sample Name\tRaw Spectral Data File\tMetabolite Assignment File\n")
+            f.writelines(
+                f"sample{x}\tFILES/sample{x}.raw\t{maf_file}\n" for x in range(100)
+            )
+        with open(os.path.join(study_path, maf_file), "w") as f:
+            f.write(
+                "database_identifier\tchemical_formula\tmetabolite_identification"
+                "\tmass_to_charge\tsample1\tsample2\n"
+            )
+            for x in range(rows):
+                database_identifier = f"CHEBI:{x}" if x % 3 else ""
+                name = f"metabolite {x}" if x % 4 else f"unknown {x}"
+                f.write(f"{database_identifier}\tC6H12O6\t{name}\t{x}.1\t1\t2\n")
+    for x in range(100):
+        open(os.path.join(study_path, "FILES", f"sample{x}.raw"), "w").close()
+
+
+def collect_serial(study_ids, metadata_root_path: str):
+    # previous implementation without database updates
+    for study_id in study_ids:
+        study_metadata_location = os.path.join(metadata_root_path, study_id)
+        # ISA-Tab objects are not created, both methods read file names only
+        sample_file, assay_files = get_study_file_names(study_metadata_location)
+        sum([len(files) for r, d, files in os.walk(study_metadata_location)])
+        read_tsv(os.path.join(study_metadata_location, sample_file))
+        for assay_file in assay_files:
+            assay_df = read_tsv(os.path.join(study_metadata_location, assay_file))
+            maf_name = assay_df["Metabolite Assignment File"].iloc[0]
+            maf_df = read_tsv(os.path.join(study_metadata_location, maf_name))
+            rows = []
+            for idx, row in maf_df.iterrows():
+                database_identifier = row["database_identifier"]
+                metabolite_identification = row["metabolite_identification"]
+                rows.append(
+                    (
+                        study_id,
+                        clean_string(database_identifier),
+                        clean_string(metabolite_identification),
+                        is_identified(database_identifier),
+                        is_identified(metabolite_identification),
+                    )
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark MAF statistics collection on a synthetic archive."
+    )
+    parser.add_argument("--studies", type=int, default=200)
+    parser.add_argument("--assays", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root_path:
+        study_ids = [f"MTBLS{x}" for x in range(1, args.studies + 1)]
+        for study_id in study_ids:
+            create_study(os.path.join(root_path, study_id), args.assays, args.rows)
+        # worker processes read the same settings file
+        get_study_settings().mounted_paths.study_metadata_files_root_path = root_path
+
+        start = time.perf_counter()
+        collect_serial(study_ids, root_path)
+        elapsed = time.perf_counter() - start
+        print_result(
+            "serial_iterrows",
+            {
+                "studies_per_min": len(study_ids) * 60 / elapsed,
+                "elapsed_seconds": elapsed,
+                "peak_rss_mb": peak_rss_mb(),
+            },
+        )
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            maf_info_rows = 0
+            for stats in iterate_study_stats(study_ids, root_path, workers):
+                maf_info_rows += len(stats["maf_info_rows"])
+            elapsed = time.perf_counter() - start
+            print_result(
+                f"process_pool_{workers}_workers",
+                {
+                    "studies_per_min": len(study_ids) * 60 / elapsed,
+                    "elapsed_seconds": elapsed,
+                    "maf_info_rows": maf_info_rows,
+                },
+            )
@@ -0,0 +1,85 @@
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+from scripts.benchmarks.utils import measure_latency, print_result
+
+QUERIES = ["a", "ma", "mass", "Blood", "homo sapiens", "chromatography", "serum"]
+
+
+def get_ontology_class():
+    from app.ws.ontology_info import MetaboLightsOntology
+
+    class BenchmarkOntology(MetaboLightsOntology):
+        # validation controls are loaded from the policy service
+        def update_validation_configuration(self, control_lists):
+            pass
+
+    return BenchmarkOntology
+
+
+def load_owl_file(file_path: str):
+    from owlready2 import get_ontology
+
+    return get_ontology_class()(get_ontology(file_path).load())
+
+
+def measure_startup(name: str, file_path: str, index_path: str, queue):
+    # modules are imported by the web service before the first search
+    from owlready2 import get_ontology
+
+    from app.ws.ontology_search_index import OntologySearchIndex
+    from app.ws.study.file_hash_cache import sha256sum
+
+    ontology_class = get_ontology_class()
+    start = time.perf_counter()
+    if name == "owl_file":
+        ontology_class(get_ontology(file_path).load()).search_ontology_entities("a")
+    else:
+        sha256sum(file_path)
+        OntologySearchIndex.load(index_path).search("a")
+    queue.put({"startup_ms": (time.perf_counter() - start) * 1000})
+
+
+def search_linear(ontology, query: str):
+    # a custom filter method uses the linear search passes
+    from app.ws.ontology_info import filter_term_label
+
+    return ontology.search_ontology_entities(
+        query,
+        filter_method=lambda *args, **kwargs: filter_term_label(*args, **kwargs),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ontology search.")
+    parser.add_argument("--file", default="resources/Metabolights.owl")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    ontology = load_owl_file(args.file)
+    for query in QUERIES:
+        for name, method in (
+            ("linear", lambda: search_linear(ontology, query)),
+            ("indexed", lambda: ontology.search_index.search(query)),
+        ):
+            print_result(
+                f"{name}_search_{query.replace(' ', '_')}",
+                measure_latency(method, repeat=args.repeat),
+            )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = f"{temp_dir}/ontology_search_index.pickle"
+        ontology.search_index.save(index_path)
+        # each startup runs in a new process without imported ontology modules
+        context = multiprocessing.get_context("spawn")
+        for name in ("owl_file", "index_file"):
+            queue = context.Queue()
+            process = context.Process(
+                target=measure_startup, args=(name, args.file, index_path, queue)
+            )
+            process.start()
+            result = queue.get()
+            process.join()
+            print_result(f"{name}_startup", result)
@@ -0,0 +1,74 @@
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from app.ws.study.tsv_table_cache import get_tsv_table_cache
+from app.ws.utils import read_tsv
+from scripts.benchmarks.utils import measure_latency, print_result
+
+
+def create_file(file_path: str, row_count: int):
+    df = pd.DataFrame(
+        {
+            "Source Name": [f"source {x}" for x in range(row_count)],
+            "Characteristics[Organism]": ["Homo sapiens"] * row_count,
+            "Term Source REF": ["NCBITAXON"] * row_count,
+            "Protocol REF": ["Sample collection"] * row_count,
+            "Sample Name": [f"sample {x}" for x in range(row_count)],
+            "Factor Value[Dose]": [
+                str(x % 10) if x % 3 else "" for x in range(row_count)
+            ],
+            "Unit": [""] * row_count,
+        }
+    )
+    df.to_csv(file_path, sep="\t", index=False, encoding="utf-8")
+
+
+def read_tsv_two_pass(file_name):
+    # header read, full read and regex NaN replacement used before
+    col_names = pd.read_csv(file_name, sep="\t", nrows=0, dtype=str).columns
+    types_dict = {col: str for col in col_names}
+    table_df = pd.read_csv(
+        file_name, sep="\t", header=0, encoding="utf-8", dtype=types_dict
+    )
+    return table_df.replace(np.nan, "", regex=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark read_tsv.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cache = get_tsv_table_cache()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for row_count in args.rows:
+            file_path = os.path.join(temp_dir, f"s_{row_count}.txt")
+            create_file(file_path, row_count)
+            print_result(
+                f"two_pass_{row_count}_rows",
+                measure_latency(lambda: read_tsv_two_pass(file_path), args.repeat),
+            )
+
+            def read_uncached():
+                cache.clear()
+                read_tsv(file_path)
+
+            print_result(
+                f"single_pass_{row_count}_rows",
+                measure_latency(read_uncached, args.repeat),
+            )
+            print_result(
+                f"cached_copy_{row_count}_rows",
+                measure_latency(lambda: read_tsv(file_path), args.repeat),
+            )
+            print_result(
+                f"cached_read_only_{row_count}_rows",
+                measure_latency(
+                    lambda: read_tsv(file_path, read_only=True), args.repeat
+                ),
+            )
+    print_result("cache_stats", cache.stats())
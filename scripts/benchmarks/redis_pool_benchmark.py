@@ -0,0 +1,61 @@
+import argparse
+
+import redis
+
+from app.config.model.redis_cache import RedisConnection, StandaloneRedisConnection
+from app.ws.redis.redis import RedisStorage
+from scripts.benchmarks.utils import measure_latency, print_result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Redis client pooling.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--password", default="")
+    parser.add_argument("--db", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5000)
+    parser.add_argument("--keys", type=int, default=100)
+    args = parser.parse_args()
+
+    connection = RedisConnection(
+        redis_password=args.password,
+        redis_db=args.db,
+        redis_connection=StandaloneRedisConnection(
+            redis_host=args.host, redis_port=args.port
+        ),
+    )
+    storage = RedisStorage(connection)
+    keys = [f"benchmark:redis_pool:{x}" for x in range(args.keys)]
+    storage.set_values({x: x for x in keys})
+
+    def new_client_get():
+        client = redis.Redis(
+            host=args.host,
+            port=args.port,
+            password=args.password or None,
+            db=args.db,
+        )
+        try:
+            return client.get(keys[0])
+        finally:
+            client.close()
+
+    def pooled_get():
+        return storage.get_value(keys[0])
+
+    def pooled_get_all():
+        return [storage.get_value(x) for x in keys]
+
+    def pipelined_get_all():
+        return storage.get_values(keys)
+
+    print_result("new_client_per_get", measure_latency(new_client_get, args.repeat))
+    print_result("pooled_get", measure_latency(pooled_get, args.repeat))
+    repeat = max(args.repeat // args.keys, 1)
+    print_result(
+        f"pooled_get_{args.keys}_keys", measure_latency(pooled_get_all, repeat)
+    )
+    print_result(f"mget_{args.keys}_keys", measure_latency(pipelined_get_all, repeat))
+    for stats in RedisStorage.get_pool_stats():
+        print_result("pool_stats", stats)
+
+    storage.delete_values(keys)
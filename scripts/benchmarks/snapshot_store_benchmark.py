@@ -0,0 +1,83 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from app.ws.study.snapshot_store import SnapshotStore
+from scripts.benchmarks.utils import print_result
+
+
+def create_study(study_path: str, file_count: int, file_size_in_mb: int):
+    os.makedirs(study_path)
+    line = "sample\t" + "x" * 120 + "\n"
+    lines = line * (file_size_in_mb * 1024 * 1024 // len(line))
+    for idx in range(file_count):
+        with open(os.path.join(study_path, f"a_MTBLS1_{idx}.txt"), "w") as f:
+            f.write(lines)
+    with open(os.path.join(study_path, "i_Investigation.txt"), "w") as f:
+        f.write("Study Identifier\tMTBLS1\n")
+
+
+def update_study(study_path: str, revision: int):
+    # only investigation file is updated between revisions
+    with open(os.path.join(study_path, "i_Investigation.txt"), "a") as f:
+        f.write(f"Comment[revision]\t{revision}\n")
+
+
+def copy_files(files, target_path: str):
+    os.makedirs(target_path)
+    for file in files:
+        shutil.copy2(file, os.path.join(target_path, os.path.basename(file)))
+
+
+def get_disk_usage_mb(*paths: str) -> float:
+    # hard linked files are counted once
+    inodes = set()
+    total = 0
+    for path in paths:
+        for root, _, files in os.walk(path):
+            for file in files:
+                stat = os.lstat(os.path.join(root, file))
+                if stat.st_ino not in inodes:
+                    inodes.add(stat.st_ino)
+                    total += stat.st_blocks * 512
+    return total / 1024 / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark audit snapshots.")
+    parser.add_argument("--revisions", type=int, default=100)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--file-size-in-mb", type=int, default=20)
+    args = parser.parse_args()
+
+    for name in ("copy", "snapshot_store"):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            study_path = os.path.join(temp_dir, "MTBLS1")
+            create_study(study_path, args.files, args.file_size_in_mb)
+            files = sorted(os.path.join(study_path, x) for x in os.listdir(study_path))
+            audit_path = os.path.join(temp_dir, "audit")
+            store = SnapshotStore(os.path.join(temp_dir, "snapshot-store"))
+            durations = []
+            for revision in range(args.revisions):
+                update_study(study_path, revision)
+                target_path = os.path.join(audit_path, f"MTBLS1_{revision:02d}")
+                start = time.perf_counter()
+                if name == "copy":
+                    copy_files(files, target_path)
+                else:
+                    store.snapshot_files(files, target_path)
+                durations.append(time.perf_counter() - start)
+            usage = get_disk_usage_mb(audit_path, store.store_path)
+            print_result(
+                f"{name}_{args.revisions}_revisions",
+                {
+                    "total_seconds": sum(durations),
+                    "first_snapshot_ms": durations[0] * 1000,
+                    "mean_next_snapshots_ms": sum(durations[1:])
+                    * 1000
+                    / max(len(durations) - 1, 1),
+                    "disk_usage_mb": usage,
+                },
+            )
@@ -0,0 +1,72 @@
+import argparse
+import json
+import multiprocessing
+import time
+
+import pandas as pd
+
+from app.ws.utils import iter_json_rows
+from scripts.benchmarks.utils import peak_rss_mb, print_result
+
+
+def create_table(row_count: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Source Name": [f"source {x}" for x in range(row_count)],
+            "Characteristics[Organism]": ["Homo sapiens"] * row_count,
+            "Characteristics[Organism part]": ["blood plasma"] * row_count,
+            "Protocol REF": ["Sample collection"] * row_count,
+            "Sample Name": [f"sample {x}" for x in range(row_count)],
+            "Factor Value[Dose]": [str(x % 10) for x in range(row_count)],
+        }
+    ).reset_index()
+
+
+def serialize_row_dicts(df: pd.DataFrame) -> int:
+    # totuples and json.dumps of the whole payload used before streaming
+    rows = [
+        dict([(colname, row[i]) for i, colname in enumerate(df.columns)])
+        for row in df.values
+    ]
+    return len(json.dumps({"header": {}, "data": {"rows": rows}}) + "\n")
+
+
+def serialize_streamed(df: pd.DataFrame) -> int:
+    size = 0
+    for chunk in iter_json_rows(df):
+        size += len(chunk) + 2
+    return size
+
+
+def run(name: str, row_count: int, queue):
+    df = create_table(row_count)
+    baseline_rss = peak_rss_mb()
+    method = serialize_row_dicts if name == "row_dicts" else serialize_streamed
+    start = time.perf_counter()
+    size = method(df)
+    elapsed = time.perf_counter() - start
+    queue.put(
+        {
+            "rows_per_second": row_count / elapsed,
+            "elapsed_seconds": elapsed,
+            "response_mb": size / 1024 / 1024,
+            "table_rss_mb": baseline_rss,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark table JSON encoding.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    # each method runs in a new process, so peak RSS values are not shared
+    context = multiprocessing.get_context("spawn")
+    for name in ("row_dicts", "streamed"):
+        queue = context.Queue()
+        process = context.Process(target=run, args=(name, args.rows, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        print_result(f"{name}_{args.rows}_rows", result)
@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.config.model.auth import AuthConfiguration, OpenIdConnnectClient
+from app.ws.auth.auth_manager import KeycloakAuthService
+from app.ws.auth.token_cache import ValidatedTokenCache
+from scripts.benchmarks.utils import measure_latency, print_result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark local JWT validation.")
+    parser.add_argument("--repeat", type=int, default=10000)
+    args = parser.parse_args()
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": "key-1", "alg": "RS256"})
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "iss": "https://auth.example.org/realms/metabolights",
+            "iat": now,
+            "exp": now + 3600,
+            "email": "user@example.org",
+            "email_verified": True,
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        jwks_file = Path(os.path.join(temp_dir, "certs.json"))
+        jwks_file.write_text(json.dumps({"keys": [jwk]}))
+        service = KeycloakAuthService(
+            AuthConfiguration(
+                application_secret_key="benchmark",
+                openid_connect_client=OpenIdConnnectClient(
+                    server_url="https://auth.example.org",
+                    realm_name="metabolights",
+                    client_id="client",
+                    client_secret="secret",
+                    jwks_url=jwks_file.as_uri(),
+                ),
+            )
+        )
+        result = measure_latency(lambda: service.validate_token(token), args.repeat)
+        print_result("local_signature_validation", result)
+
+        cache = ValidatedTokenCache()
+        key = cache.get_key(token)
+        cache.put(key, now + 3600, service.validate_token(token))
+        result = measure_latency(lambda: cache.get(cache.get_key(token)), args.repeat)
+        print_result("validated_token_cache_hit", result)
@@ -0,0 +1,79 @@
+import argparse
+import os
+import tempfile
+import time
+
+from app.ws.study.tsv_row_index import TsvRowIndexCache
+from app.ws.utils import read_tsv
+from scripts.benchmarks.utils import measure_latency, print_result
+
+MAF_COLUMNS = [
+    "database_identifier",
+    "chemical_formula",
+    "smiles",
+    "inchi",
+    "metabolite_identification",
+    "mass_to_charge",
+    "retention_time",
+    "species",
+    "reliability",
+] + [f"Sample {x}" for x in range(20)]
+
+
+def create_maf_file(file_path: str, row_count: int):
+    with open(file_path, "w") as f:
+        f.write("\t".join(MAF_COLUMNS) + "\n")
+        values = "\t".join(str(x * 1.5) for x in range(20))
+        for idx in range(row_count):
+            f.write(
+                f"CHEBI:{idx}\tC6H12O6\tOC[C@H]1OC(O)\tInChI=1S/{idx}\tglucose {idx}"
+                f"\t{idx * 0.01}\t{idx % 600}\tHomo sapiens\t1\t{values}\n"
+            )
+
+
+def skiprows_page(file_path: str, page_number: int, page_size: int, columns):
+    # page read used before the row index
+    df = read_tsv(
+        file_path,
+        col_names=columns,
+        skiprows=range(1, page_size * page_number + 1),
+        nrows=page_size,
+    )
+    total = read_tsv(file_path, col_names=[columns[0]]).size
+    return df, total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark paged TSV row reads.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    columns = ["database_identifier", "metabolite_identification"]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "m_benchmark.tsv")
+        create_maf_file(file_path, args.rows)
+        cache = TsvRowIndexCache()
+        start = time.perf_counter()
+        cache.get_index(file_path)
+        print_result(
+            "row_index_build", {"elapsed_ms": (time.perf_counter() - start) * 1000}
+        )
+        last_page = args.rows // args.page_size - 1
+        for page_number in (0, last_page // 2, last_page):
+            result = measure_latency(
+                lambda: skiprows_page(file_path, page_number, args.page_size, columns),
+                args.repeat,
+            )
+            print_result(f"skiprows_page_{page_number}", result)
+
+            def indexed_page():
+                row_index = cache.get_index(file_path)
+                df = row_index.read_rows(
+                    page_number * args.page_size, args.page_size, columns
+                )
+                return df, row_index.row_count
+
+            result = measure_latency(indexed_page, args.repeat * 100)
+            print_result(f"indexed_page_{page_number}", result)
@@ -0,0 +1,39 @@
+import resource
+import statistics
+import time
+from typing import Callable
+
+
+def percentile(values: list[float], ratio: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure_latency(func: Callable, repeat: int = 100) -> dict[str, float]:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        "count": len(durations),
+        "mean_ms": statistics.fmean(durations) if durations else 0.0,
+        "p50_ms": percentile(durations, 0.50),
+        "p99_ms": percentile(durations, 0.99),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def print_result(name: str, result: dict[str, float]):
+    values = "\t".join(
+        f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in result.items()
+    )
+    print(f"{name}\t{values}")
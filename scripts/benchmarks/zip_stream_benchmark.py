@@ -0,0 +1,104 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+import zipfile
+
+from app.ws.study.zip_stream import stream_zip
+from scripts.benchmarks.utils import print_result
+
+
+def create_files(root_path: str, total_size_mb: int, file_count: int):
+    file_size = max(total_size_mb * 1024 * 1024 // file_count, 1)
+    block = os.urandom(1024 * 1024)
+    text_block = b"Sample Name\tSource Name\tCharacteristics[Organism]\n" * 20000
+    entries = []
+    for idx in range(file_count):
+        is_raw = idx % 2 == 0
+        name = f"FILES/sample_{idx}.raw" if is_raw else f"FILES/sample_{idx}.mzML"
+        file_path = os.path.join(root_path, name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        data = block if is_raw else text_block
+        with open(file_path, "wb") as f:
+            written = 0
+            while written < file_size:
+                size = min(len(data), file_size - written)
+                f.write(data[:size])
+                written += size
+        entries.append((file_path, name))
+    return entries
+
+
+def temp_file_zip(entries, temp_dir: str):
+    zip_path = os.path.join(temp_dir, "download.zip")
+    start = time.perf_counter()
+    with zipfile.ZipFile(zip_path, mode="w", compression=zipfile.ZIP_DEFLATED) as f:
+        for file_path, arcname in entries:
+            f.write(file_path, arcname=arcname)
+    first_byte = None
+    total = 0
+    with open(zip_path, "rb") as f:
+        while data := f.read(1024 * 1024):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            total += len(data)
+    elapsed = time.perf_counter() - start
+    os.remove(zip_path)
+    return first_byte, elapsed, total
+
+
+def streamed_zip(entries):
+    start = time.perf_counter()
+    first_byte = None
+    total = 0
+    for data in stream_zip(entries):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        total += len(data)
+    return first_byte, time.perf_counter() - start, total
+
+
+class RssSampler(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.running = True
+        self.max_rss_mb = 0
+
+    def run(self):
+        while self.running:
+            self.max_rss_mb = max(self.max_rss_mb, current_rss_mb())
+            time.sleep(0.05)
+
+
+def current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark zip downloads.")
+    parser.add_argument("--size-mb", type=int, default=10240)
+    parser.add_argument("--files", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        entries = create_files(temp_dir, args.size_mb, args.files)
+        for name, func in (
+            ("streamed_zip", lambda: streamed_zip(entries)),
+            ("temp_file_zip", lambda: temp_file_zip(entries, temp_dir)),
+        ):
+            sampler = RssSampler()
+            sampler.start()
+            first_byte, elapsed, total = func()
+            sampler.running = False
+            sampler.join()
+            print_result(
+                name,
+                {
+                    "time_to_first_byte_ms": first_byte * 1000,
+                    "elapsed_seconds": elapsed,
+                    "archive_mb": total / 1024 / 1024,
+                    "max_rss_mb": sampler.max_rss_mb,
+                },
+            )
@@ -0,0 +1,97 @@
+import os
+import pathlib
+
+from app.study_folder_utils import get_study_folder_files, scan_folder
+
+
+def create_files(root: pathlib.Path, relative_paths):
+    for relative_path in relative_paths:
+        file_path = root / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("x")
+
+
+class TestScanFolder(object):
+    def test_scan_folder_01(self, tmp_path):
+        create_files(tmp_path, ["a.txt", ".hidden", "sub/b.txt", "AUDIT/c.txt"])
+        entries = scan_folder(
+            str(tmp_path), include_hidden=False, exclude_names={"AUDIT"}
+        )
+        relative_paths = sorted(x.relative_path for x in entries)
+        assert relative_paths == ["a.txt", "sub", os.path.join("sub", "b.txt")]
+
+    def test_scan_folder_skip_children_01(self, tmp_path):
+        create_files(tmp_path, ["sub/b.txt", "sub/inner/c.txt"])
+        relative_paths = []
+        for entry in scan_folder(str(tmp_path)):
+            relative_paths.append(entry.relative_path)
+            if entry.name == "inner":
+                entry.skip_children = True
+        assert sorted(relative_paths) == sorted(
+            ["sub", os.path.join("sub", "b.txt"), os.path.join("sub", "inner")]
+        )
+
+
+class TestGetStudyFolderFiles(object):
+    def test_get_study_folder_files_01(self, tmp_path):
+        create_files(
+            tmp_path,
+            [
+                "i_Investigation.txt",
+                "FILES/sample_1.mzML",
+                "FILES/sample_2.raw/_FUNC001.DAT",
+                "FILES/nmr/1/acqus",
+                "FILES/nmr/1/fid",
+                "FILES/nmr/1/pdata/1/1r",
+                "FILES/.hidden.txt",
+                "AUDIT_FILES/old.txt",
+            ],
+        )
+        (tmp_path / "FILES" / "empty.mzML").write_text("")
+        os.symlink(tmp_path / "missing.raw", tmp_path / "FILES" / "broken.raw")
+
+        descriptors = {}
+        list(
+            get_study_folder_files(
+                str(tmp_path),
+                descriptors,
+                tmp_path,
+                exclude_list=["AUDIT_FILES"],
+            )
+        )
+        assert sorted(descriptors) == [
+            "FILES",
+            "FILES/empty.mzML",
+            "FILES/nmr",
+            "FILES/nmr/1",
+            "FILES/nmr/1/acqus",
+            "FILES/nmr/1/fid",
+            "FILES/nmr/1/pdata",
+            "FILES/sample_1.mzML",
+            "FILES/sample_2.raw",
+        ]
+        assert descriptors["FILES/nmr/1"].is_stop_folder
+        assert descriptors["FILES/sample_2.raw"].sub_filename == "_FUNC001.DAT"
+        assert descriptors["FILES/sample_1.mzML"].file_size == 1
+        assert descriptors["FILES/empty.mzML"].is_empty
+
+    def test_get_study_folder_files_add_sub_folders_01(self, tmp_path):
+        create_files(tmp_path, ["FILES/sub/sample_1.mzML", "FILES/sub/inner/a.txt"])
+        (tmp_path / "FILES" / "empty").mkdir()
+        (tmp_path / "FILES" / "sub" / "empty").mkdir()
+
+        descriptors = {}
+        list(
+            get_study_folder_files(
+                str(tmp_path), descriptors, tmp_path, add_sub_folders=False
+            )
+        )
+        # empty folders are added at all levels, other folders are not
+        assert sorted(descriptors) == [
+            "FILES/empty",
+            "FILES/sub/empty",
+            "FILES/sub/inner/a.txt",
+            "FILES/sub/sample_1.mzML",
+        ]
+        assert descriptors["FILES/empty"].is_empty
+        assert descriptors["FILES/sub/empty"].is_empty
@@ -0,0 +1,30 @@
+import threading
+
+from app.utils import ttl_cache
+
+
+class TestTtlCache(object):
+    def test_ttl_cache_concurrent_calls_01(self):
+        calls = []
+
+        @ttl_cache(1024, ttl=60)
+        def square(value):
+            calls.append(value)
+            return value * value
+
+        errors = []
+
+        def run():
+            try:
+                for x in range(5000):
+                    assert square(x % 100) == (x % 100) ** 2
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert set(calls) == set(range(100))
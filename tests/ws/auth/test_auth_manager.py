@@ -0,0 +1,126 @@
+import json
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.config.model.auth import AuthConfiguration, OpenIdConnnectClient
+from app.utils import MetabolightsAuthenticationException
+from app.ws.auth.auth_manager import KeycloakAuthService
+from app.ws.auth.token_cache import ValidatedTokenCache
+
+ISSUER = "https://auth.example.org/realms/metabolights"
+
+
+def create_key(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk
+
+
+def write_jwks(file_path, jwks: list):
+    file_path.write_text(json.dumps({"keys": jwks}))
+
+
+def create_token(private_key, kid: str, exp_delta: int = 300, **kwargs):
+    now = int(time.time())
+    payload = {
+        "iss": ISSUER,
+        "iat": now,
+        "exp": now + exp_delta,
+        "email": "user@example.org",
+        "email_verified": True,
+        "given_name": "Test",
+        "family_name": "User",
+        "realm_access": {"roles": ["study_submission"]},
+    }
+    payload.update(kwargs)
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def jwks_file(tmp_path):
+    return tmp_path / "certs.json"
+
+
+@pytest.fixture
+def auth_service(jwks_file):
+    config = AuthConfiguration(
+        application_secret_key="test",
+        active_authentication_service="keycloak",
+        openid_connect_client=OpenIdConnnectClient(
+            server_url="https://auth.example.org/",
+            realm_name="metabolights",
+            client_id="client",
+            client_secret="secret",
+            jwks_url=jwks_file.as_uri(),
+        ),
+    )
+    return KeycloakAuthService(config)
+
+
+class TestKeycloakAuthService(object):
+    def test_validate_token_01(self, auth_service, jwks_file):
+        private_key, jwk = create_key("key-1")
+        write_jwks(jwks_file, [jwk])
+        user = auth_service.validate_token(create_token(private_key, "key-1"))
+        assert user.email == "user@example.org"
+        assert user.roles == ["study_submission"]
+
+    def test_validate_token_02(self, auth_service, jwks_file):
+        private_key, jwk = create_key("key-1")
+        other_key, _ = create_key("key-1")
+        write_jwks(jwks_file, [jwk])
+        with pytest.raises(MetabolightsAuthenticationException):
+            auth_service.validate_token(create_token(other_key, "key-1"))
+
+    def test_validate_token_03(self, auth_service, jwks_file):
+        private_key, jwk = create_key("key-1")
+        write_jwks(jwks_file, [jwk])
+        for token in (
+            create_token(private_key, "key-1", exp_delta=-10),
+            create_token(private_key, "key-1", iss="https://other.example.org"),
+            create_token(private_key, "key-1", email_verified=False),
+        ):
+            with pytest.raises(MetabolightsAuthenticationException):
+                auth_service.validate_token(token)
+
+    def test_validate_token_rotated_key_01(self, auth_service, jwks_file):
+        private_key, jwk = create_key("key-1")
+        write_jwks(jwks_file, [jwk])
+        auth_service.validate_token(create_token(private_key, "key-1"))
+
+        new_private_key, new_jwk = create_key("key-2")
+        write_jwks(jwks_file, [jwk, new_jwk])
+        user = auth_service.validate_token(create_token(new_private_key, "key-2"))
+        assert user.email == "user@example.org"
+
+
+class TestValidatedTokenCache(object):
+    def test_get_01(self):
+        cache = ValidatedTokenCache(max_entries=2, ttl_in_seconds=60)
+        key = cache.get_key("token", "audience")
+        assert cache.get(key) is None
+        cache.put(key, time.time() + 10, "user")
+        assert cache.get(key) == "user"
+        assert cache.get(cache.get_key("token", "other")) is None
+        assert cache.stats()["hits"] == 1
+
+    def test_get_02(self):
+        cache = ValidatedTokenCache(max_entries=2, ttl_in_seconds=60)
+        cache.put("expired", time.time() - 1, "user")
+        cache.put("expiring", time.time() + 0.05, "user")
+        assert cache.get("expired") is None
+        assert cache.get("expiring") == "user"
+        time.sleep(0.1)
+        assert cache.get("expiring") is None
+
+    def test_get_03(self):
+        cache = ValidatedTokenCache(max_entries=2, ttl_in_seconds=60)
+        for key in ("a", "b", "c"):
+            cache.put(key, None, key)
+        assert cache.get("a") is None
+        assert cache.get("c") == "c"
+        assert not ValidatedTokenCache(max_entries=0).enabled
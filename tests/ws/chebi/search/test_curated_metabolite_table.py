@@ -0,0 +1,51 @@
+import os
+
+from app.ws.chebi.search.curated_metabolite_table import CuratedMetaboliteTable
+
+TABLE_ROWS = [
+    ["CHEBI:1", "C6H12O6", "OCC1OC(O)", "", "InChI=1S/A", "glucose|dextrose", 0],
+    ["CHEBI:2", "C6H12O6", "OCC1OC(O)", "", "InChI=1S/B", "D-Glucose", 0],
+    ["CHEBI:3", "C6H12O6", "OCC1OC(O)", "", "InChI=1S/C", "d glucose", 1],
+    ["CHEBI:4", "C2H6O", "CCO", "", "InChI=1S/D", "ethanol", 0],
+]
+
+
+class TestCuratedMetaboliteTable(object):
+    def create_table(self, tmp_path) -> CuratedMetaboliteTable:
+        file_path = tmp_path / "curated_metabolites.tsv"
+        lines = ["\t".join(str(x) for x in row) for row in TABLE_ROWS]
+        file_path.write_text("\n".join(lines) + "\n")
+        table = CuratedMetaboliteTable(str(file_path))
+        table.initialize_df()
+        return table
+
+    def test_get_matching_rows_synonym_01(self, tmp_path):
+        table = self.create_table(tmp_path)
+        row = table.get_matching_rows(CuratedMetaboliteTable.COMPOUND_INDEX, "Dextrose")
+        assert row[CuratedMetaboliteTable.CHEBI_ID_INDEX] == "CHEBI:1"
+
+    def test_get_matching_rows_priority_01(self, tmp_path):
+        table = self.create_table(tmp_path)
+        row = table.get_matching_rows(
+            CuratedMetaboliteTable.COMPOUND_INDEX, "D-glucose"
+        )
+        assert row[CuratedMetaboliteTable.CHEBI_ID_INDEX] == "CHEBI:3"
+
+    def test_get_matching_rows_same_name_01(self, tmp_path):
+        table = self.create_table(tmp_path)
+        row = table.get_matching_rows(CuratedMetaboliteTable.COMPOUND_INDEX, "Ethanol")
+        assert row[CuratedMetaboliteTable.CHEBI_ID_INDEX] == "CHEBI:4"
+
+    def test_get_matching_rows_not_found_01(self, tmp_path):
+        table = self.create_table(tmp_path)
+        row = table.get_matching_rows(CuratedMetaboliteTable.COMPOUND_INDEX, "water")
+        assert row == []
+
+    def test_load_index_file_01(self, tmp_path):
+        table = self.create_table(tmp_path)
+        assert os.path.exists(table.index_file_path)
+
+        reloaded_table = CuratedMetaboliteTable(table.file_path)
+        assert reloaded_table.load_index_file(os.stat(table.file_path))
+        assert reloaded_table.rows == table.rows
+        assert reloaded_table.indexes == table.indexes
@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.config import get_settings
+from app.config.model.chebi import (
+    CompoundLookupProviderSettings,
+    CompoundLookupSettings,
+)
+from app.ws.chebi import compound_lookup
+from app.ws.chebi.compound_lookup import CompoundLookupCache, CompoundLookupEngine
+from app.ws.chebi_pipeline_utils import opsin_search
+
+
+@pytest.fixture
+def opsin_server(monkeypatch):
+    """
+    Local OPSIN server. The response is delayed if the compound name starts
+    with 'slow'.
+    """
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            name = self.path.split("/")[-1].replace(".json", "")
+            time.sleep(2 if name.startswith("slow") else 0.1)
+            content = json.dumps({"smiles": f"C{name}"}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/opsin/"
+    search_services = get_settings().chebi.pipeline.search_services
+    monkeypatch.setattr(search_services, "opsin_url", url)
+    yield requests
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def lookup_engine(tmp_path, monkeypatch):
+    settings = CompoundLookupSettings(
+        providers={"opsin": CompoundLookupProviderSettings(deadline_in_seconds=0.5)}
+    )
+    cache = CompoundLookupCache(str(tmp_path / "compound_lookup_cache.sqlite"))
+    engine = CompoundLookupEngine(cache, settings)
+    monkeypatch.setattr(compound_lookup, "get_compound_lookup_engine", lambda: engine)
+    yield engine
+    engine.executor.shutdown(wait=True)
+    cache.close()
+
+
+class TestCompoundLookup(object):
+    def test_cache_ttl_01(self, tmp_path):
+        file_path = str(tmp_path / "cache" / "compound_lookup_cache.sqlite")
+        now = time.time()
+        cache = CompoundLookupCache(file_path)
+        cache.set("pubchem:CCO", ["ethanol", ""], ttl_in_seconds=10, now=now)
+        cache.close()
+
+        cache = CompoundLookupCache(file_path)
+        assert cache.get("pubchem:CCO", now=now + 5) == (True, ["ethanol", ""])
+        assert cache.get("pubchem:CCO", now=now + 10) == (False, None)
+        assert cache.get("pubchem:unknown", now=now + 5) == (False, None)
+        cache.close()
+
+    def test_lookup_01(self, opsin_server, lookup_engine):
+        name = uuid.uuid4().hex
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(lambda _: opsin_search(name, "smiles"), range(4))
+            )
+        # identical requests share one provider call
+        assert results == [f"C{name}"] * 4
+        assert len(opsin_server) == 1
+        assert opsin_search(name, req_type="smiles") == f"C{name}"
+        assert len(opsin_server) == 1
+        stats = lookup_engine.get_stats()
+        assert stats["lookups"] == 5
+        assert stats["provider_calls"] == 1
+        assert stats["cache_hits"] + stats["shared_lookups"] == 4
+
+    def test_lookup_02(self, lookup_engine, monkeypatch):
+        calls = []
+
+        def find_name(name):
+            calls.append(name)
+            return f"C{name}"
+
+        engine = lookup_engine
+        assert engine.lookup("opsin", find_name, ("ethanol",)) == "Cethanol"
+        cache_get = engine.cache.get
+        reads = []
+
+        def get(key, now=None):
+            reads.append(key)
+            if len(reads) == 1:
+                # first read is before the result of the previous call is cached
+                return False, None
+            return cache_get(key, now)
+
+        monkeypatch.setattr(engine.cache, "get", get)
+        assert engine.lookup("opsin", find_name, ("ethanol",)) == "Cethanol"
+        assert calls == ["ethanol"]
+        assert len(reads) == 2
+        assert engine.get_stats()["provider_calls"] == 1
+
+    def test_lookup_deadline_01(self, opsin_server, lookup_engine):
+        start = time.monotonic()
+        assert opsin_search(f"slow{uuid.uuid4().hex}", "smiles") == ""
+        assert time.monotonic() - start < 1.5
+        assert lookup_engine.get_stats()["deadline_exceeded"] == 1
+
+    def test_lookup_error_01(self, lookup_engine):
+        calls = []
+
+        def find_name(name):
+            calls.append(name)
+            if name == "error":
+                compound_lookup.set_lookup_error()
+            return ""
+
+        engine = lookup_engine
+        assert engine.lookup("opsin", find_name, ("error",), "") == ""
+        assert engine.lookup("opsin", find_name, ("error",), "") == ""
+        # empty result of a failed call is not cached, other empty results are
+        assert engine.lookup("opsin", find_name, ("unknown",), "") == ""
+        assert engine.lookup("opsin", find_name, ("unknown",), "") == ""
+        assert calls == ["error", "error", "unknown"]
+        assert engine.get_stats()["provider_errors"] == 2
+
+    def test_lookup_error_02(self, opsin_server, lookup_engine, monkeypatch):
+        search_services = get_settings().chebi.pipeline.search_services
+        opsin_url = search_services.opsin_url
+        monkeypatch.setattr(search_services, "opsin_url", "http://127.0.0.1:1/")
+        name = uuid.uuid4().hex
+        assert opsin_search(name, "smiles") == ""
+        monkeypatch.setattr(search_services, "opsin_url", opsin_url)
+        assert opsin_search(name, "smiles") == f"C{name}"
+        assert len(opsin_server) == 1
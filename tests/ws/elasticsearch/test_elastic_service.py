@@ -1,6 +1,10 @@
 import pytest
 from flask import Flask
 
+from app.config.model.elasticsearch import (
+    ElasticsearchConnection,
+    ElasticsearchSettings,
+)
 from app.utils import MetabolightsException
 from app.ws.elasticsearch.elastic_service import ElasticsearchService
 from tests.fixtures import SensitiveDatastorage
@@ -103,3 +107,68 @@ class TestElasticService(object):
 
             assert study is not None
             mock_index_method.index.assert_called()
+
+
+class FakeBulkClient(object):
+    def __init__(self, failed_ids=None):
+        self.failed_ids = failed_ids or set()
+        self.requests = []
+
+    def bulk(self, body, params=None):
+        self.requests.append(body)
+        items = []
+        for action in body[::2]:
+            doc_id = action["index"]["_id"]
+            if doc_id in self.failed_ids:
+                items.append({"index": {"_id": doc_id, "status": 400, "error": "x"}})
+            else:
+                items.append({"index": {"_id": doc_id, "status": 201}})
+        return {"errors": bool(self.failed_ids), "items": items}
+
+
+class TestElasticServiceBulkReindex(object):
+    def create_service(self, client):
+        settings = ElasticsearchSettings(
+            connection=ElasticsearchConnection(
+                host="localhost", username="", password=""
+            )
+        )
+        service = ElasticsearchService(settings, None, None)
+        service._client = client
+        return service
+
+    def test_bulk_reindex_chunks_01(self):
+        client = FakeBulkClient()
+        service = self.create_service(client)
+        ids = [f"MTBLC{x}" for x in range(25)]
+        chunks = []
+        result = service.bulk_reindex(
+            ElasticsearchService.DOC_TYPE_COMPOUND,
+            ids,
+            lambda x: {"id": x},
+            chunk_size=10,
+            max_workers=3,
+            on_chunk_indexed=lambda chunk, failed: chunks.append(len(chunk)),
+        )
+
+        assert result["indexed"] == 25
+        assert not result["failed"]
+        assert chunks == [10, 10, 5]
+        assert len(client.requests) == 3
+
+    def test_bulk_reindex_failed_documents_01(self):
+        client = FakeBulkClient(failed_ids={"MTBLC2"})
+
+        def build_document(doc_id):
+            if doc_id == "MTBLC3":
+                raise ValueError("invalid")
+            return {"id": doc_id}
+
+        service = self.create_service(client)
+        ids = [f"MTBLC{x}" for x in range(5)]
+        result = service.bulk_reindex(
+            ElasticsearchService.DOC_TYPE_COMPOUND, ids, build_document, chunk_size=10
+        )
+
+        assert result["indexed"] == 3
+        assert set(result["failed"]) == {"MTBLC2", "MTBLC3"}
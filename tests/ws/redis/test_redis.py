@@ -0,0 +1,39 @@
+from app.config.model.redis_cache import RedisConnection, StandaloneRedisConnection
+from app.ws.redis.redis import RedisStorage
+
+
+def get_connection(port: int = 6379) -> RedisConnection:
+    return RedisConnection(
+        redis_password="",
+        redis_db=0,
+        redis_connection=StandaloneRedisConnection(
+            redis_host="localhost", redis_port=port
+        ),
+    )
+
+
+class TestRedisStorage(object):
+    def test_get_redis_01(self):
+        storage = RedisStorage(get_connection(16379))
+        client = storage.get_redis()
+        assert storage.get_redis() is client
+        assert RedisStorage(get_connection(16379)).get_redis() is client
+
+    def test_get_redis_02(self):
+        storage = RedisStorage(get_connection(16380))
+        client = storage.get_redis()
+        assert storage.get_redis(readonly=True) is not client
+        assert storage.get_redis(connection=get_connection(16381)) is not client
+
+    def test_get_pool_stats_01(self):
+        storage = RedisStorage(get_connection(16382))
+        storage.get_redis()
+        storage.get_redis()
+        stats = [
+            x
+            for x in RedisStorage.get_pool_stats()
+            if x["client_requests"] == 2 and not x["readonly"]
+        ]
+        assert stats
+        assert stats[0]["max_connections"] == 50
+        assert stats[0]["created_connections"] == 0
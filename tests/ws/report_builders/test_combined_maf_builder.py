@@ -0,0 +1,61 @@
+import os
+
+import pandas
+
+from app.config import get_settings
+from app.ws.report_builders.combined_maf_builder import CombinedMafBuilder
+from app.ws.settings.utils import get_study_settings
+
+
+def write_maf(file_path: str, rows: int, prefix: str):
+    with open(file_path, "w") as f:
+        f.write("database_identifier\tmass_to_charge\tsample_1\tsample_2\n")
+        for idx in range(rows):
+            f.write(f"CHEBI:{prefix}{idx}\t{idx}.5\t{idx}\t{idx}\n")
+
+
+class TestCombinedMafBuilder(object):
+    def test_build_01(self, tmp_path, monkeypatch):
+        mounted_paths = get_study_settings().mounted_paths
+        metadata_root_path = tmp_path / "metadata"
+        monkeypatch.setattr(
+            mounted_paths, "study_metadata_files_root_path", str(metadata_root_path)
+        )
+        monkeypatch.setattr(mounted_paths, "reports_root_path", str(tmp_path))
+        report_settings = get_settings().report
+        monkeypatch.setattr(report_settings, "report_base_folder_name", "reports")
+        reporting_path = (
+            tmp_path / "reports" / report_settings.report_global_folder_name
+        )
+        reporting_path.mkdir(parents=True)
+        for study_id, rows in (("MTBLS1", 3), ("MTBLS2", 4), ("MTBLS3", 2)):
+            (metadata_root_path / study_id).mkdir(parents=True)
+            write_maf(
+                str(metadata_root_path / study_id / f"m_{study_id}_LC-MS_maf.tsv"),
+                rows,
+                study_id,
+            )
+        (metadata_root_path / "MTBLS2" / "m_MTBLS2_empty_LCMS_maf.tsv").touch()
+        (metadata_root_path / "MTBLS2" / "m_MTBLS2_NMR_maf.tsv").touch()
+
+        builder = CombinedMafBuilder(
+            ["MTBLS1", "MTBLS2", "MTBLS4", "MTBLS3"], "LCMS", max_workers=2
+        )
+        builder.build()
+
+        file_path = reporting_path / "LCMS_combined_maf.tsv"
+        df = pandas.read_csv(file_path, sep="\t", index_col=0)
+        assert list(df.index) == list(range(9))
+        assert list(df.columns) == builder.get_columns()
+        assert list(df["study_id"]) == ["MTBLS1"] * 3 + ["MTBLS2"] * 4 + ["MTBLS3"] * 2
+        assert list(df["database_identifier"][:4]) == [
+            "CHEBI:MTBLS10",
+            "CHEBI:MTBLS11",
+            "CHEBI:MTBLS12",
+            "CHEBI:MTBLS20",
+        ]
+        assert df["maf_filename"][3] == "m_MTBLS2_LC-MS_maf.tsv"
+        assert df["mass_to_charge"][2] == 2.5
+        assert builder.unopenable_maf_register == ["m_MTBLS2_empty_LCMS_maf.tsv"]
+        assert len(builder.missing_study_directory_register) == 1
+        assert os.listdir(reporting_path) == ["LCMS_combined_maf.tsv"]
@@ -0,0 +1,151 @@
+import json
+import os
+import pathlib
+import time
+
+from app.ws.study.data_file_index import (
+    FULL_SCAN_TIMES,
+    PRIVATE_DATA_FILES,
+    PUBLIC_DATA_FILES,
+    DataFileIndex,
+    is_metadata_file_name,
+)
+
+
+def create_files(root: pathlib.Path, relative_paths):
+    for relative_path in relative_paths:
+        file_path = root / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("x")
+
+
+def set_mtime(path: pathlib.Path, seconds_ago: int):
+    timestamp = time.time() - seconds_ago
+    os.utime(path, (timestamp, timestamp))
+
+
+class TestDataFileIndex(object):
+    def test_update_source_01(self, tmp_path):
+        data_path = tmp_path / "ftp"
+        create_files(
+            data_path,
+            ["i_Investigation.txt", "raw/a.mzML", "raw/b.mzML", "derived/c.txt"],
+        )
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        stats = index.update_source(
+            PRIVATE_DATA_FILES, str(data_path), skip_file=is_metadata_file_name
+        )
+        index.save(index_datetime="2024-01-01T00:00:00")
+
+        assert stats["scanned"] == 3
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        assert index.manifest["index_datetime"] == "2024-01-01T00:00:00"
+        assert sorted(index.get_children(PRIVATE_DATA_FILES, "FILES")) == [
+            "FILES/derived",
+            "FILES/raw",
+        ]
+        descriptor = index.get_children(PRIVATE_DATA_FILES, "FILES/raw")[
+            "FILES/raw/a.mzML"
+        ]
+        assert descriptor["parent_relative_path"] == "FILES/raw"
+        assert descriptor["file_size"] == 1
+        assert sorted(
+            x for x, _ in index.search(PRIVATE_DATA_FILES, "FILES/raw/*")
+        ) == [
+            "FILES/raw/a.mzML",
+            "FILES/raw/b.mzML",
+        ]
+        assert index.get_children(PUBLIC_DATA_FILES, "FILES") == {}
+
+    def test_update_source_incremental_01(self, tmp_path):
+        data_path = tmp_path / "ftp"
+        create_files(data_path, ["raw/a.mzML", "old/b.mzML"])
+        for path in (data_path / "raw" / "a.mzML", data_path / "old" / "b.mzML"):
+            set_mtime(path, 10 * 86400)
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        index.update_source(PRIVATE_DATA_FILES, str(data_path))
+        index.save()
+
+        # append to a file without changing its folder, and delete a folder
+        (data_path / "raw" / "a.mzML").write_text("xyz")
+        (data_path / "old" / "b.mzML").unlink()
+        (data_path / "old").rmdir()
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        stats = index.update_source(
+            PRIVATE_DATA_FILES, str(data_path), recheck_window_in_seconds=86400
+        )
+        index.save()
+
+        # a.mzML was not modified in recheck window at the last update
+        assert stats["scanned"] == 1
+        assert stats["reused"] == 1
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        assert list(index.get_children(PRIVATE_DATA_FILES, "FILES")) == ["FILES/raw"]
+        assert index.get_children(PRIVATE_DATA_FILES, "FILES/old") == {}
+        assert len(os.listdir(index.index_path + "/" + PRIVATE_DATA_FILES)) == 2
+
+        stats = index.update_source(
+            PRIVATE_DATA_FILES, str(data_path), recheck_window_in_seconds=20 * 86400
+        )
+        assert stats["rechecked"] == 2
+        files = index.get_children(PRIVATE_DATA_FILES, "FILES/raw")
+        assert files["FILES/raw/a.mzML"]["file_size"] == 3
+
+    def test_update_source_full_scan_01(self, tmp_path):
+        data_path = tmp_path / "ftp"
+        create_files(data_path, ["raw/a.mzML"])
+        set_mtime(data_path / "raw" / "a.mzML", 10 * 86400)
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        stats = index.update_source(PRIVATE_DATA_FILES, str(data_path))
+        index.save()
+        assert stats["full_scan"] == 1
+
+        # overwrite a file in place, its folder is not modified
+        (data_path / "raw" / "a.mzML").write_text("xyz")
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        stats = index.update_source(PRIVATE_DATA_FILES, str(data_path))
+        index.save()
+        assert stats["full_scan"] == 0
+        assert stats["scanned"] == 0
+        files = index.get_children(PRIVATE_DATA_FILES, "FILES/raw")
+        assert files["FILES/raw/a.mzML"]["file_size"] == 1
+
+        # last full scan is older than full scan interval
+        manifest = json.loads(pathlib.Path(index.manifest_path).read_text())
+        manifest[FULL_SCAN_TIMES][PRIVATE_DATA_FILES] -= 8 * 86400
+        pathlib.Path(index.manifest_path).write_text(json.dumps(manifest))
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        stats = index.update_source(PRIVATE_DATA_FILES, str(data_path))
+        index.save()
+        assert stats["full_scan"] == 1
+        assert stats["scanned"] == 2
+        index = DataFileIndex(str(tmp_path / "DATA_FILES"))
+        files = index.get_children(PRIVATE_DATA_FILES, "FILES/raw")
+        assert files["FILES/raw/a.mzML"]["file_size"] == 3
+        assert index.update_source(PRIVATE_DATA_FILES, str(data_path))["full_scan"] == 0
+
+    def test_legacy_index_01(self, tmp_path):
+        root_path = tmp_path / "DATA_FILES"
+        root_path.mkdir()
+        descriptor = {
+            "name": "a.mzML",
+            "relative_path": "FILES/raw/a.mzML",
+            "parent_relative_path": "FILES/raw",
+            "is_dir": False,
+        }
+        legacy_index = {
+            "private_data_files": {"FILES/raw/a.mzML": descriptor},
+            "public_data_files": {},
+            "index_datetime": "2024-01-01T00:00:00",
+        }
+        (root_path / "data_file_index.json").write_text(json.dumps(legacy_index))
+
+        index = DataFileIndex(str(root_path))
+        assert index.exists()
+        assert index.manifest["index_datetime"] == "2024-01-01T00:00:00"
+        assert index.get_children(PRIVATE_DATA_FILES, "FILES/raw") == {
+            "FILES/raw/a.mzML": descriptor
+        }
+        assert list(index.search(PRIVATE_DATA_FILES, "FILES/*.mzML")) == [
+            ("FILES/raw/a.mzML", descriptor)
+        ]
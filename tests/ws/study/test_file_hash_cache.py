@@ -0,0 +1,50 @@
+import hashlib
+import os
+
+from app.ws.study.file_hash_cache import FileHashCache
+
+
+class TestFileHashCache(object):
+    def create_files(self, tmp_path, count=3):
+        file_paths = []
+        for idx in range(count):
+            file_path = tmp_path / f"file_{idx}.raw"
+            file_path.write_bytes(f"content {idx}".encode() * 1000)
+            file_paths.append(str(file_path))
+        return file_paths
+
+    def test_calculate_hashes_01(self, tmp_path):
+        file_paths = self.create_files(tmp_path)
+        cache = FileHashCache(str(tmp_path / "cache" / "hashes.json"), buffer_size=64)
+        result = cache.calculate_hashes(file_paths)
+
+        expected = hashlib.sha256(b"content 0" * 1000).hexdigest()
+        assert result.hashes[file_paths[0]] == expected
+        assert result.hashed_files == 3
+        assert result.skipped_files == 0
+
+    def test_calculate_hashes_unchanged_files_01(self, tmp_path):
+        file_paths = self.create_files(tmp_path)
+        cache_file_path = str(tmp_path / "cache" / "hashes.json")
+        first = FileHashCache(cache_file_path).calculate_hashes(file_paths)
+
+        with open(file_paths[1], "ab") as f:
+            f.write(b"updated")
+        second = FileHashCache(cache_file_path).calculate_hashes(file_paths)
+
+        assert second.skipped_files == 2
+        assert second.hashed_files == 1
+        assert second.hashes[file_paths[0]] == first.hashes[file_paths[0]]
+        assert second.hashes[file_paths[1]] != first.hashes[file_paths[1]]
+
+    def test_calculate_hashes_deleted_files_01(self, tmp_path):
+        file_paths = self.create_files(tmp_path)
+        cache_file_path = str(tmp_path / "cache" / "hashes.json")
+        FileHashCache(cache_file_path).calculate_hashes(file_paths)
+        os.remove(file_paths[2])
+
+        cache = FileHashCache(cache_file_path)
+        cache.calculate_hashes(file_paths[:2])
+        cache.load()
+
+        assert set(cache.items) == set(file_paths[:2])
@@ -0,0 +1,37 @@
+import os
+
+from app.ws.study.file_reference_index import FileReferenceIndexCache
+
+
+def write_file(file_path, content: str):
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class TestFileReferenceIndexCache(object):
+    def test_get_index_01(self, tmp_path):
+        assay_file = tmp_path / "a_MTBLS1_assay.txt"
+        write_file(
+            assay_file,
+            "Sample Name\tRaw Spectral Data File\tMetabolite Assignment File\n"
+            'S1\t"FILES/raw/sample_1.mzML"\tm_MTBLS1.tsv\n'
+            "S2\tsample_2.raw\tm_MTBLS1.tsv\n",
+        )
+        cache = FileReferenceIndexCache()
+        index = cache.get_index(str(tmp_path), "a_*.txt")
+        for file_name in (
+            "sample_1.mzML",
+            os.path.join("raw", "sample_1.mzML"),
+            "FILES/raw/sample_1.mzML",
+            "sample_2.raw",
+            "m_MTBLS1.tsv",
+        ):
+            assert index.contains(file_name)
+        assert not index.contains("sample_3.raw")
+        assert not index.contains("sample")
+        assert cache.get_index(str(tmp_path), "a_*.txt") is index
+
+        write_file(tmp_path / "a_MTBLS1_assay_2.txt", "Raw Spectral Data File\nx.d\n")
+        index = cache.get_index(str(tmp_path), "a_*.txt")
+        assert index.contains("x.d") and index.contains("sample_2.raw")
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2}
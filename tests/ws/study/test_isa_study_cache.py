@@ -0,0 +1,55 @@
+import os
+
+from app.ws.study.isa_study_cache import IsaStudyCache
+
+
+class TestIsaStudyCache(object):
+    def create_study(self, tmp_path, content="ONTOLOGY SOURCE REFERENCE\n"):
+        study_path = tmp_path / "MTBLS1"
+        study_path.mkdir(exist_ok=True)
+        (study_path / "i_Investigation.txt").write_text(content)
+        return str(study_path)
+
+    def test_get_returns_copy_01(self, tmp_path):
+        study_path = self.create_study(tmp_path)
+        cache = IsaStudyCache(max_entries=4)
+        signature = cache.get_signature(study_path, True)
+        assert cache.put(study_path, True, signature, {"title": "Study"})
+
+        first = cache.get(study_path, True)
+        first["title"] = "Updated"
+        second = cache.get(study_path, True)
+
+        assert second == {"title": "Study"}
+        assert cache.stats()["hits"] == 2
+
+    def test_get_after_file_update_01(self, tmp_path):
+        study_path = self.create_study(tmp_path)
+        cache = IsaStudyCache(max_entries=4)
+        signature = cache.get_signature(study_path, True)
+        cache.put(study_path, True, signature, {"title": "Study"})
+
+        self.create_study(tmp_path, content="INVESTIGATION\n")
+        i_file = os.path.join(study_path, "i_Investigation.txt")
+        os.utime(i_file, ns=(0, signature[0][1] + 1))
+
+        assert cache.get(study_path, True) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_put_file_updated_while_parsing_01(self, tmp_path):
+        study_path = self.create_study(tmp_path)
+        cache = IsaStudyCache(max_entries=4)
+        signature = cache.get_signature(study_path, True)
+        self.create_study(tmp_path, content="INVESTIGATION\nSTUDY\n")
+
+        assert not cache.put(study_path, True, signature, {"title": "Study"})
+
+    def test_invalidate_01(self, tmp_path):
+        study_path = self.create_study(tmp_path)
+        cache = IsaStudyCache(max_entries=4)
+        signature = cache.get_signature(study_path, True)
+        cache.put(study_path, True, signature, {"title": "Study"})
+        cache.invalidate(study_path)
+
+        assert cache.get(study_path, True) is None
+        assert cache.stats()["invalidations"] == 1
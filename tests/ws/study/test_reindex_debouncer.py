@@ -0,0 +1,43 @@
+import uuid
+
+import pytest
+import redis
+
+from app.ws.study.reindex_debouncer import StudyReindexDebouncer
+
+
+@pytest.fixture
+def redis_client():
+    client = redis.Redis(host="localhost", port=6379, socket_connect_timeout=1)
+    try:
+        client.ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("Local Redis server is not available")
+    yield client
+    client.close()
+
+
+class TestStudyReindexDebouncer(object):
+    def test_request_01(self, redis_client):
+        key_prefix = f"test_study_reindex_{uuid.uuid4().hex}"
+        debouncer = StudyReindexDebouncer(
+            redis_client, debounce_period_in_seconds=30, key_prefix=key_prefix
+        )
+        try:
+            assert debouncer.request("MTBLS1", now=100)
+            for now in (105, 110, 120):
+                assert not debouncer.request("MTBLS1", now=now)
+            assert debouncer.request("MTBLS2", now=110)
+
+            # burst of MTBLS1 settles at 150
+            assert debouncer.pop_due_studies(now=145) == ["MTBLS2"]
+            assert debouncer.pop_due_studies(now=145) == []
+            assert debouncer.pop_due_studies(now=150) == ["MTBLS1"]
+            assert debouncer.stats() == {
+                "requested": 5,
+                "coalesced": 3,
+                "executed": 2,
+                "pending": 0,
+            }
+        finally:
+            redis_client.delete(debouncer.pending_key, debouncer.stats_key)
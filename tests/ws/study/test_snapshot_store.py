@@ -0,0 +1,65 @@
+import os
+import pathlib
+
+from app.ws.study.snapshot_store import SnapshotStore
+
+
+class TestSnapshotStore(object):
+    def test_snapshot_files_01(self, tmp_path: pathlib.Path):
+        study_path = tmp_path / "MTBLS1"
+        study_path.mkdir()
+        (study_path / "i_Investigation.txt").write_text("investigation")
+        (study_path / "s_MTBLS1.txt").write_text("sample")
+        files = [str(x) for x in sorted(study_path.iterdir())]
+        store = SnapshotStore(str(tmp_path / "store"))
+
+        first = store.snapshot_files(files, str(tmp_path / "audit" / "1"))
+        (study_path / "s_MTBLS1.txt").write_text("updated sample")
+        second = store.snapshot_files(files, str(tmp_path / "audit" / "2"))
+
+        assert first.stored_files == 2
+        assert first.linked_files == 2
+        assert second.stored_files == 1
+        assert second.linked_files == 2
+        audit_1 = tmp_path / "audit" / "1"
+        audit_2 = tmp_path / "audit" / "2"
+        assert (audit_1 / "s_MTBLS1.txt").read_text() == "sample"
+        assert (audit_2 / "s_MTBLS1.txt").read_text() == "updated sample"
+        assert os.path.samefile(
+            audit_1 / "i_Investigation.txt", audit_2 / "i_Investigation.txt"
+        )
+
+    def test_prune_01(self, tmp_path: pathlib.Path):
+        source = tmp_path / "i_Investigation.txt"
+        source.write_text("investigation")
+        store = SnapshotStore(str(tmp_path / "store"))
+        store.snapshot_files([str(source)], str(tmp_path / "audit"))
+
+        assert store.prune(min_age_in_seconds=0) == 0
+        os.remove(tmp_path / "audit" / "i_Investigation.txt")
+        assert store.prune(min_age_in_seconds=0) == 1
+        # object is stored again if it is deleted
+        result = store.snapshot_files([str(source)], str(tmp_path / "audit"))
+        assert result.stored_files == 1
+
+    def test_snapshot_files_pruned_object_01(self, tmp_path: pathlib.Path):
+        source = tmp_path / "i_Investigation.txt"
+        source.write_text("investigation")
+        store = SnapshotStore(str(tmp_path / "store"))
+        store.snapshot_files([str(source)], str(tmp_path / "audit" / "1"))
+        os.remove(tmp_path / "audit" / "1" / "i_Investigation.txt")
+        add_files = store.add_files
+
+        def add_files_and_prune(file_paths, result):
+            object_paths = add_files(file_paths, result)
+            # concurrent prune deletes the object before it is linked
+            assert store.prune(min_age_in_seconds=0) == 1
+            return object_paths
+
+        store.add_files = add_files_and_prune
+        result = store.snapshot_files([str(source)], str(tmp_path / "audit" / "2"))
+        assert result.stored_files == 1
+        assert result.linked_files == 1
+        audit_file = tmp_path / "audit" / "2" / "i_Investigation.txt"
+        assert audit_file.read_text() == "investigation"
+        assert audit_file.stat().st_nlink == 2
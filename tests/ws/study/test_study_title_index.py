@@ -0,0 +1,103 @@
+import os
+
+from app.ws.study import study_title_index
+from app.ws.study.study_title_index import STUDY_TITLE_INDEX_KEY, StudyTitleIndex
+
+
+class HashRedis(object):
+    def __init__(self):
+        self.hashes = {}
+
+    def get_redis(self, readonly=False):
+        return self
+
+    def hmget(self, name, keys):
+        return [self.hashes.get(name, {}).get(x) for x in keys]
+
+    def hset(self, name, mapping):
+        self.hashes.setdefault(name, {}).update(mapping)
+
+    def hdel(self, name, key):
+        self.hashes.get(name, {}).pop(key, None)
+
+
+def write_investigation(tmp_path, study_id, title, description="Description"):
+    study_path = tmp_path / study_id
+    study_path.mkdir(exist_ok=True)
+    file_path = study_path / "i_Investigation.txt"
+    file_path.write_text(
+        f'Study Title\t"{title}"\nStudy Description\t"{description}"\n'
+    )
+    return str(file_path)
+
+
+def count_parse_calls(monkeypatch):
+    calls = []
+    parse = study_title_index.parse_title_and_description
+
+    def counted(file_path):
+        calls.append(file_path)
+        return parse(file_path)
+
+    monkeypatch.setattr(study_title_index, "parse_title_and_description", counted)
+    return calls
+
+
+class TestStudyTitleIndex(object):
+    def test_get_items_01(self, tmp_path, monkeypatch):
+        calls = count_parse_calls(monkeypatch)
+        write_investigation(tmp_path, "MTBLS1", "Study 1")
+        index = StudyTitleIndex(str(tmp_path))
+
+        items = index.get_items(["MTBLS1", "MTBLS2"])
+        assert items["MTBLS1"].title == "Study 1"
+        assert items["MTBLS1"].description == "Description"
+        assert len(items["MTBLS1"].updated) == 14
+        # missing investigation file
+        assert items["MTBLS2"].title == "N/A"
+
+        assert index.get_items(["MTBLS1"])["MTBLS1"].title == "Study 1"
+        assert len(calls) == 1
+
+    def test_get_items_after_title_update_01(self, tmp_path, monkeypatch):
+        calls = count_parse_calls(monkeypatch)
+        write_investigation(tmp_path, "MTBLS1", "Study 1")
+        index = StudyTitleIndex(str(tmp_path))
+        assert index.get_items(["MTBLS1"])["MTBLS1"].title == "Study 1"
+
+        write_investigation(tmp_path, "MTBLS1", "Updated study 1")
+        assert index.get_items(["MTBLS1"])["MTBLS1"].title == "Updated study 1"
+        assert len(calls) == 2
+
+    def test_invalidate_01(self, tmp_path):
+        redis = HashRedis()
+        file_path = write_investigation(tmp_path, "MTBLS1", "Study 1")
+        index = StudyTitleIndex(str(tmp_path), redis=redis)
+        assert index.get_items(["MTBLS1"])["MTBLS1"].title == "Study 1"
+        assert "MTBLS1" in redis.hashes[STUDY_TITLE_INDEX_KEY]
+
+        # same size and modification time, file update is not detected
+        stat = os.stat(file_path)
+        write_investigation(tmp_path, "MTBLS1", "Study 2")
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert index.get_items(["MTBLS1"])["MTBLS1"].title == "Study 1"
+
+        index.invalidate("MTBLS1")
+        assert "MTBLS1" not in redis.hashes[STUDY_TITLE_INDEX_KEY]
+        assert index.get_items(["MTBLS1"])["MTBLS1"].title == "Study 2"
+
+    def test_shared_items_01(self, tmp_path, monkeypatch):
+        redis = HashRedis()
+        write_investigation(tmp_path, "MTBLS1", "Study 1")
+        StudyTitleIndex(str(tmp_path), redis=redis).get_items(["MTBLS1"])
+
+        # another worker reads parsed values from Redis
+        calls = count_parse_calls(monkeypatch)
+        index = StudyTitleIndex(str(tmp_path), redis=redis)
+        assert index.get_items(["MTBLS1"])["MTBLS1"].title == "Study 1"
+        assert calls == []
+
+        write_investigation(tmp_path, "MTBLS1", "Updated study 1")
+        index = StudyTitleIndex(str(tmp_path), redis=redis)
+        assert index.get_items(["MTBLS1"])["MTBLS1"].title == "Updated study 1"
+        assert len(calls) == 1
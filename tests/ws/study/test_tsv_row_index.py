@@ -0,0 +1,116 @@
+import os
+
+import pandas as pd
+
+from app.ws.study import tsv_row_index
+from app.ws.study.tsv_row_index import TsvRowIndex, TsvRowIndexCache
+from app.ws.utils import read_tsv
+
+
+def write_file(file_path, content: bytes):
+    with open(file_path, "wb") as f:
+        f.write(content)
+
+
+def read_expected(file_path, encoding="utf-8", **kwargs):
+    return pd.read_csv(
+        file_path, sep="\t", header=0, dtype=str, encoding=encoding, **kwargs
+    ).fillna("")
+
+
+class TestTsvRowIndex(object):
+    def test_read_rows_01(self, tmp_path):
+        file_path = tmp_path / "m_test.tsv"
+        lines = [b"database_identifier\tsmiles\tTerm Source REF\tTerm Source REF"]
+        for idx in range(25):
+            lines.append(f"CHEBI:{idx}\tC{idx}\tCHEBI\t".encode())
+        lines[3] = b'CHEBI:2\t"multi\nline\tvalue"\tCHEBI\tx'
+        lines[5] = b'CHEBI:4\t"quoted ""text"""\t\t'
+        lines.insert(8, b"")
+        content = b"\r\n".join(lines[:12]) + b"\n" + b"\n".join(lines[12:]) + b"\n"
+        write_file(file_path, content)
+
+        row_index = TsvRowIndex(str(file_path))
+        expected = read_expected(file_path)
+        assert row_index.columns == expected.columns.to_list()
+        assert row_index.row_count == len(expected)
+        pd.testing.assert_frame_equal(row_index.read_rows(), expected)
+        for start, count in ((0, 10), (10, 10), (20, 10), (30, 10)):
+            page = row_index.read_rows(start, count).reset_index(drop=True)
+            pd.testing.assert_frame_equal(
+                page, expected.iloc[start : start + count].reset_index(drop=True)
+            )
+        columns = ["smiles", "Term Source REF.1"]
+        pd.testing.assert_frame_equal(
+            row_index.read_rows(2, 3, columns=columns),
+            read_expected(file_path, usecols=columns).iloc[2:5].reset_index(drop=True),
+        )
+
+    def test_read_rows_02(self, tmp_path):
+        file_path = tmp_path / "s_test.txt"
+        write_file(file_path, "Sample Name\tOrganism\ns1\tCafé\n".encode("latin-1"))
+        row_index = TsvRowIndex(str(file_path))
+        assert row_index.read_rows().iloc[0]["Organism"] == "Café"
+
+        write_file(file_path, b"Sample Name\tOrganism")
+        row_index = TsvRowIndex(str(file_path))
+        assert row_index.row_count == 0
+        assert row_index.columns == ["Sample Name", "Organism"]
+        assert row_index.read_rows().empty
+
+        write_file(file_path, b"")
+        assert TsvRowIndex(str(file_path)).read_rows().empty
+
+    def test_read_rows_blank_lines_01(self, tmp_path, monkeypatch):
+        # lines with only spaces are blank lines as in read_tsv
+        monkeypatch.setattr(tsv_row_index, "INDEX_READ_CHUNK_SIZE", 5)
+        file_path = tmp_path / "s_test.txt"
+        write_file(
+            file_path,
+            b'c1\tc2\n   \na\tb\n   \nc\td\n \r\n\t\ne\t"f\n  "\n   ',
+        )
+        row_index = TsvRowIndex(str(file_path))
+        expected = read_tsv(str(file_path))
+        assert row_index.row_count == len(expected) == 4
+        pd.testing.assert_frame_equal(row_index.read_rows(), expected)
+        page = row_index.read_rows(start=1, count=1)
+        assert page.to_dict("records") == [{"c1": "c", "c2": "d"}]
+        assert row_index.read_rows(start=3)["c2"].to_list() == ["f\n  "]
+
+
+class TestTsvRowIndexCache(object):
+    def test_get_index_01(self, tmp_path):
+        file_path = tmp_path / "a_test.txt"
+        write_file(file_path, b"Sample Name\ns1\ns2\n")
+        cache = TsvRowIndexCache(max_entries=2)
+        row_index = cache.get_index(str(file_path))
+        assert cache.get_index(str(file_path)) is row_index
+        assert row_index.row_count == 2
+
+        write_file(file_path, b"Sample Name\ns1\ns2\ns3\n")
+        stat = os.stat(file_path)
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        assert cache.get_index(str(file_path)).row_count == 3
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    def test_read_rows_03(self, tmp_path, monkeypatch):
+        # quotes inside unquoted values are text as in pandas
+        monkeypatch.setattr(tsv_row_index, "INDEX_READ_CHUNK_SIZE", 7)
+        file_path = tmp_path / "a_test.txt"
+        lines = [
+            b"Sample Name\tParameter Value[Column model]\tComment",
+            b's1\t5" tube\tx',
+            b's2\tC18 1.7"\t"quoted\nnew line"',
+            b's3\t"a ""b"" c" d\t""',
+            b's4\tlast 5" tube\t"x"',
+        ]
+        write_file(file_path, b"\n".join(lines) + b"\n")
+        row_index = TsvRowIndex(str(file_path))
+        expected = read_expected(file_path)
+        assert row_index.row_count == len(expected) == 4
+        pd.testing.assert_frame_equal(row_index.read_rows(), expected)
+        pd.testing.assert_frame_equal(
+            row_index.read_rows(1, 2).reset_index(drop=True),
+            expected.iloc[1:3].reset_index(drop=True),
+        )
@@ -0,0 +1,36 @@
+from app.ws.study.tsv_table_cache import TsvTableCache, get_file_signature
+from app.ws.utils import _parse_tsv
+
+
+def write_table(file_path, rows: int = 1000):
+    with open(file_path, "w") as f:
+        f.write("Sample Name\tCharacteristics[Organism]\n")
+        for idx in range(rows):
+            f.write(f"S{idx}\tHomo sapiens\n")
+    return str(file_path)
+
+
+class TestTsvTableCache(object):
+    def test_put_01(self, tmp_path):
+        file_path = write_table(tmp_path / "s_test.txt")
+        signature = get_file_signature(file_path)
+        table_df = _parse_tsv(file_path)
+        memory_usage = int(table_df.memory_usage(deep=True).sum())
+        # cached DataFrame is larger than the file
+        assert memory_usage > 2 * signature[2]
+
+        cache = TsvTableCache(max_size_in_bytes=2 * signature[2])
+        assert not cache.put(signature, None, table_df)
+        assert cache.get(signature) is None
+
+        cache = TsvTableCache(max_size_in_bytes=memory_usage + 1)
+        assert cache.put(signature, None, table_df)
+        assert cache.get(signature) is table_df
+        assert cache.stats()["size_in_bytes"] == memory_usage
+
+        # least recently used table is removed
+        columns = ("Sample Name",)
+        assert cache.put(signature, columns, table_df[list(columns)])
+        assert cache.get(signature) is None
+        assert cache.get(signature, columns) is not None
+        assert cache.stats()["size_in_bytes"] < memory_usage
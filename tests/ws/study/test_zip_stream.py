@@ -0,0 +1,35 @@
+import io
+import zipfile
+
+from app.ws.study.zip_stream import stream_zip
+
+
+class TestStreamZip(object):
+    def test_stream_zip_01(self, tmp_path):
+        text_file = tmp_path / "s_MTBLS1.txt"
+        text_file.write_text("Sample Name\n" * 1000)
+        raw_file = tmp_path / "sample.raw"
+        raw_file.write_bytes(bytes(range(256)) * 100)
+
+        chunks = list(
+            stream_zip(
+                [(str(text_file), "s_MTBLS1.txt"), (str(raw_file), "FILES/sample.raw")],
+                chunk_size=1024,
+            )
+        )
+        assert len(chunks) > 1
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            assert archive.testzip() is None
+            assert archive.namelist() == ["s_MTBLS1.txt", "FILES/sample.raw"]
+            assert archive.read("s_MTBLS1.txt") == text_file.read_bytes()
+            assert archive.read("FILES/sample.raw") == raw_file.read_bytes()
+            text_info = archive.getinfo("s_MTBLS1.txt")
+            raw_info = archive.getinfo("FILES/sample.raw")
+            assert text_info.compress_type == zipfile.ZIP_DEFLATED
+            assert text_info.compress_size < text_info.file_size
+            assert raw_info.compress_type == zipfile.ZIP_STORED
+
+    def test_stream_zip_02(self):
+        content = b"".join(stream_zip([]))
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            assert archive.namelist() == []
@@ -0,0 +1,156 @@
+import os
+import stat
+import threading
+
+import pytest
+
+from app.config import get_settings
+from app.services.cluster import hpc_job_status
+from app.services.cluster.hpc_job_status import HpcJobStatusCache
+from app.services.storage_service.models import SyncTaskStatus
+from app.services.storage_service.unmounted.data_mover_client import (
+    DataMoverAvailableStorage,
+)
+from app.ws import cluster_jobs
+from app.ws.cluster_jobs import list_jobs, submit_job
+
+FAKE_SSH = """#!/bin/sh
+# count session, skip ssh options and destination, run remote command locally
+echo session >> "$FAKE_SSH_SESSIONS"
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -i|-o) shift 2 ;;
+        *) shift; break ;;
+    esac
+done
+sleep 0.2
+exec sh -c "$*"
+"""
+
+FAKE_SQUEUE = """#!/bin/sh
+cat "$FAKE_SQUEUE_OUTPUT"
+"""
+
+FAKE_SBATCH = """#!/bin/sh
+echo "Submitted batch job 201"
+"""
+
+
+class DictStorage(object):
+    def __init__(self):
+        self.values = {}
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def set_value(self, key, value, ex=None):
+        self.values[key] = value
+
+
+def write_script(path, content):
+    path.write_text(content)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+@pytest.fixture
+def fake_cluster(tmp_path, monkeypatch):
+    """
+    Fake ssh and squeue commands. Each ssh session is recorded in a file.
+    """
+    bin_path = tmp_path / "bin"
+    bin_path.mkdir()
+    write_script(bin_path / "ssh", FAKE_SSH)
+    write_script(bin_path / "squeue", FAKE_SQUEUE)
+    write_script(bin_path / "sbatch", FAKE_SBATCH)
+    (tmp_path / "temp_commands").mkdir()
+    monkeypatch.setattr(get_settings().server, "temp_directory_path", str(tmp_path))
+    sessions = tmp_path / "sessions.txt"
+    sessions.write_text("")
+    output = tmp_path / "squeue.txt"
+    monkeypatch.setenv("PATH", f"{bin_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_SSH_SESSIONS", str(sessions))
+    monkeypatch.setenv("FAKE_SQUEUE_OUTPUT", str(output))
+
+    datamover = get_settings().hpc_cluster.datamover
+    monkeypatch.setattr(datamover, "workload_manager", "slurm")
+    monkeypatch.setattr(datamover, "use_ssh_tunnel", False)
+    prefix = f"{datamover.job_prefix}{datamover.job_prefix_demimeter}"
+    output.write_text(
+        f"101::datamover::RUNNING::user::1:00:00::101::{prefix}MTBLS1_sync::2026-01-01T10:00:00\n"
+        f"102::datamover::PENDING::user::1:00:00::102::{prefix}MTBLS2_sync::2026-01-01T10:00:00\n"
+        "103::datamover::RUNNING::user::1:00:00::103::other---MTBLS1_sync::2026-01-01T10:00:00\n"
+    )
+    cache = HpcJobStatusCache(DictStorage(), "test", 60, 60)
+    monkeypatch.setattr(hpc_job_status, "get_hpc_job_status_cache", lambda: cache)
+    monkeypatch.setattr(cluster_jobs, "get_hpc_job_status_cache", lambda: cache)
+
+    def count_sessions():
+        return len(sessions.read_text().splitlines())
+
+    yield count_sessions
+
+
+class TestListJobs(object):
+    def test_list_jobs_01(self, fake_cluster):
+        queue = get_settings().hpc_cluster.datamover.default_queue
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(list_jobs(queue, "MTBLS1_sync"))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # concurrent status checks share one squeue call
+        assert fake_cluster() == 1
+        assert [[(x.job_id, x.status) for x in jobs] for jobs in results] == [
+            [("101", "RUNNING")]
+        ] * 8
+        assert [x.job_id for x in list_jobs(queue)] == ["101", "102"]
+        assert list_jobs(queue, "MTBLS3_sync") == []
+        assert fake_cluster() == 1
+
+    def test_list_jobs_shared_snapshot_01(self, fake_cluster):
+        queue = get_settings().hpc_cluster.datamover.default_queue
+        cache = hpc_job_status.get_hpc_job_status_cache()
+        cache.refresh("datamover")
+        assert fake_cluster() == 1
+        # another process reads the snapshot stored by the periodic task
+        other = HpcJobStatusCache(cache.storage, "test", 60, 60)
+        assert [x.job_id for x in other.get_jobs("datamover", "MTBLS2_sync")] == ["102"]
+        assert [x.job_id for x in list_jobs(queue, "MTBLS2_sync")] == ["102"]
+        assert fake_cluster() == 1
+
+    def test_submit_and_check_job_01(self, fake_cluster, tmp_path, monkeypatch):
+        queue = get_settings().hpc_cluster.datamover.default_queue
+        task_name = "rsync_meta_study"
+        assert list_jobs(queue, f"MTBLS3_{task_name}") == []
+        storage = DataMoverAvailableStorage("test", "MTBLS3")
+        log_file = tmp_path / f"MTBLS3_{task_name}.log"
+        monkeypatch.setattr(
+            storage, "_get_study_log_file_path", lambda **kwargs: str(log_file)
+        )
+        status, *_ = submit_job(
+            queue=queue,
+            job_cmd="rsync",
+            identifier="MTBLS3",
+            taskname=task_name,
+            log_path=str(log_file),
+        )
+        assert status
+        log_file.write_text("")
+        sessions = fake_cluster()
+        # the new job is not in the snapshot, but the status check finds it
+        jobs = list_jobs(queue, f"MTBLS3_{task_name}")
+        assert [(x.job_id, x.status) for x in jobs] == [("201", "PENDING")]
+        result = storage._check_folder_sync_result(task_name=task_name)
+        assert result.status == SyncTaskStatus.PENDING
+        assert result.description == "201"
+        assert fake_cluster() == sessions
+
+        # the job is completed before the next snapshot
+        hpc_job_status.get_hpc_job_status_cache().refresh("datamover")
+        assert list_jobs(queue, f"MTBLS3_{task_name}") == []
@@ -0,0 +1,309 @@
+import datetime
+from contextlib import contextmanager
+
+import pytest
+
+from app.ws import db_connection
+from app.ws.db_connection import (
+    MAF_INFO_STAGING_TABLE,
+    add_maf_info_rows,
+    copy_maf_info_rows,
+    create_maf_info_staging_table,
+    get_all_private_studies_for_user,
+    get_all_studies_for_user,
+    get_user_studies,
+    reload_maf_info_table,
+    swap_maf_info_staging_table,
+)
+from app.ws.study.study_title_index import StudyTitleIndex
+
+
+class RecordingCopy(object):
+    def __init__(self, events):
+        self.events = events
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.events.append(("copy end",))
+
+    def write_row(self, row):
+        self.events.append(("row", tuple(row)))
+
+
+class RecordingConnection(object):
+    """
+    Connection and cursor that record SQL commands and transaction boundaries.
+    A command that contains fail_on raises an error.
+    """
+
+    def __init__(self, fail_on=None, rows=None):
+        self.events = []
+        self.fail_on = fail_on
+        self.rows = rows or []
+
+    def execute(self, sql, params=None):
+        if self.fail_on and self.fail_on in sql:
+            raise Exception("command failed")
+        self.events.append(("execute", " ".join(sql.split()), params))
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def copy(self, sql):
+        self.events.append(("copy", sql))
+        return RecordingCopy(self.events)
+
+    def commit(self):
+        self.events.append(("commit",))
+
+    @contextmanager
+    def transaction(self):
+        self.events.append(("begin",))
+        yield
+        self.events.append(("commit",))
+
+    @contextmanager
+    def connection(self):
+        # pooled connections are committed on exit and rolled back on error
+        try:
+            yield self, self
+        except Exception:
+            self.events.append(("rollback",))
+            raise
+        self.events.append(("commit",))
+
+    def get_sql(self):
+        return [x[1] for x in self.events if x[0] in ("execute", "copy")]
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = RecordingConnection()
+    monkeypatch.setattr(db_connection, "get_connection", connection.connection)
+    yield connection
+
+
+class TestMafInfoRows(object):
+    def test_copy_maf_info_rows_01(self):
+        connection = RecordingConnection()
+        rows = [("MTBLS1", "CHEBI:1", "a", "1", "1"), ("MTBLS1", "", "b", "0", "1")]
+        assert copy_maf_info_rows(connection, iter(rows), "maf_info_staging") == 2
+        assert connection.events == [
+            (
+                "copy",
+                "copy maf_info_staging (acc, database_identifier, "
+                "metabolite_identification, database_found, metabolite_found) "
+                "from stdin",
+            ),
+            ("row", rows[0]),
+            ("row", rows[1]),
+            ("copy end",),
+        ]
+
+    def test_add_maf_info_rows_01(self, connection):
+        rows = [("MTBLS1", "CHEBI:1", "a", "1", "1")]
+        status, _ = add_maf_info_rows(rows, study_id="MTBLS1")
+        assert status
+        # previous rows are deleted and new rows are added in one transaction
+        assert [x[0] for x in connection.events] == [
+            "execute",
+            "copy",
+            "row",
+            "copy end",
+            "commit",
+        ]
+        assert connection.events[0] == (
+            "execute",
+            "delete from maf_info where acc = %(study_id)s;",
+            {"study_id": "MTBLS1"},
+        )
+
+    def test_add_maf_info_rows_02(self, connection, monkeypatch):
+        monkeypatch.setattr(connection, "fail_on", "delete")
+        status, _ = add_maf_info_rows([], study_id="MTBLS1")
+        assert not status
+        assert connection.events == [("rollback",)]
+
+    def test_reload_maf_info_table_01(self, connection):
+        rows = [("MTBLS1", "CHEBI:1", "a", "1", "1")]
+        status, _ = reload_maf_info_table(rows)
+        assert status
+        staging = MAF_INFO_STAGING_TABLE
+        events = [
+            x[1] if x[0] in ("execute", "copy") else x[0] for x in connection.events
+        ]
+        # live table is replaced in the last transaction only
+        assert events == [
+            f"drop table if exists {staging};",
+            f"CREATE TABLE {staging} ( acc VARCHAR, database_identifier VARCHAR, "
+            "metabolite_identification VARCHAR, database_found VARCHAR, "
+            "metabolite_found VARCHAR );",
+            "commit",
+            connection.events[3][1],
+            "row",
+            "copy end",
+            "commit",
+            f"create index if not exists {staging}_acc_idx on {staging} (acc);",
+            f"analyze {staging};",
+            "commit",
+            "begin",
+            "drop table if exists maf_info;",
+            f"alter table {staging} rename to maf_info;",
+            f"alter index {staging}_acc_idx rename to maf_info_acc_idx;",
+            "commit",
+            "commit",
+        ]
+        assert connection.events[3][1].startswith(f"copy {staging} ")
+
+    def test_reload_maf_info_table_02(self, connection, monkeypatch):
+        monkeypatch.setattr(connection, "fail_on", "rename")
+        status, _ = reload_maf_info_table([])
+        assert not status
+        assert "drop table if exists maf_info;" in connection.get_sql()
+        assert connection.events[-1] == ("rollback",)
+
+    def test_swap_maf_info_staging_table_01(self, connection, monkeypatch):
+        monkeypatch.setattr(connection, "fail_on", "rename")
+        status, _ = swap_maf_info_staging_table()
+        assert not status
+        # index of the failed swap is committed, the next swap reuses it
+        monkeypatch.setattr(
+            connection, "fail_on", f"create index {MAF_INFO_STAGING_TABLE}"
+        )
+        status, _ = swap_maf_info_staging_table()
+        assert status
+        assert connection.get_sql()[-1] == (
+            f"alter index {MAF_INFO_STAGING_TABLE}_acc_idx rename to maf_info_acc_idx;"
+        )
+
+    def test_create_maf_info_staging_table_01(self, connection):
+        status, _ = create_maf_info_staging_table(keep_study_ids={"MTBLS1"})
+        assert status
+        sql = connection.get_sql()
+        # staged rows of an interrupted reload are kept
+        assert not any(x.startswith("drop") for x in sql)
+        assert sql[0].startswith(f"CREATE TABLE IF NOT EXISTS {MAF_INFO_STAGING_TABLE}")
+        assert connection.events[1][2] == {"study_ids": ["MTBLS1"]}
+
+
+def user_study_row(study_id, status="Provisional", revision=None):
+    """
+    Row of query_studies_user. Revision columns are None if the study has no
+    study_revisions row.
+    """
+    row = [
+        study_id,
+        "2026-02-01",
+        "2026-01-01",
+        status,
+        "MANUAL_CURATION ",
+        1,
+        1 if revision else 0,
+        datetime.datetime(2026, 1, 2, 10, 0) if revision else None,
+        datetime.datetime(2026, 1, 1, 10, 0),
+        None,
+        "minimum",
+        1,
+        "MTBLS1-MHD",
+        "v0.1",
+        "EMBL-EBI Terms of Use",
+        "2.0",
+        datetime.datetime(2026, 1, 1, 9, 0),
+    ]
+    row.extend(revision or (None, None, None, None))
+    return tuple(row)
+
+
+@pytest.fixture
+def title_index(tmp_path, monkeypatch):
+    study_path = tmp_path / "MTBLS1"
+    study_path.mkdir()
+    (study_path / "i_Investigation.txt").write_text(
+        'Study Title\t"Study 1"\nStudy Description\t"Description 1"\n'
+    )
+    index = StudyTitleIndex(str(tmp_path))
+    monkeypatch.setattr(db_connection, "get_study_title_index", lambda: index)
+    yield index
+
+
+class TestUserStudies(object):
+    def test_get_user_studies_01(self, connection):
+        get_user_studies("token")
+        query, params = connection.events[0][1:]
+        assert query.endswith("order by s.id offset %(offset)s;")
+        assert params == {"apitoken": "token", "offset": 0}
+
+    def test_get_user_studies_paging_01(self, connection):
+        get_user_studies("token", offset=20, limit=10)
+        get_user_studies("token", offset=-1, limit=-5)
+        query, params = connection.events[0][1:]
+        assert query.endswith("order by s.id limit %(limit)s offset %(offset)s;")
+        assert params == {"apitoken": "token", "offset": 20, "limit": 10}
+        assert connection.events[2][2] == {"apitoken": "token", "offset": 0, "limit": 0}
+
+    def test_get_all_studies_for_user_01(self, connection, title_index):
+        connection.rows = [user_study_row("MTBLS1")]
+        study = get_all_studies_for_user("token")[0]
+        assert study["accession"] == "MTBLS1"
+        assert study["title"] == "Study 1"
+        assert study["description"] == "Description 1"
+        assert study["curationRequest"] == "MANUAL_CURATION"
+        assert study["revisionNumber"] == 0
+        assert study["revisionDatetime"] is None
+        assert study["revisionStatus"] is None
+        assert study["revisionComment"] is None
+        assert study["revisionTaskMessage"] is None
+        assert study["mhdSubmissionStatus"] is None
+        assert study["studyCategory"] == "ms-mhd-enabled"
+        assert study["firstPrivateDate"] == "2026-01-01T10:00:00"
+        assert study["firstPublicDate"] is None
+        assert study["studyHttpUrl"] is None
+
+    def test_get_all_studies_for_user_02(self, connection, title_index):
+        revision = ("First revision", 2, None, "SHARED")
+        connection.rows = [user_study_row("MTBLS1", revision=revision)]
+        study = get_all_studies_for_user("token")[0]
+        assert study["revisionNumber"] == 1
+        assert study["revisionDatetime"] == "2026-01-02T10:00:00"
+        assert study["revisionComment"] == "First revision"
+        assert study["revisionStatus"] == 2
+        assert study["revisionTaskMessage"] == ""
+        assert study["mhdSubmissionStatus"] == "SHARED"
+
+    def test_get_all_studies_for_user_03(self, connection, title_index):
+        connection.rows = [user_study_row(""), user_study_row("MTBLS1", "Public")]
+        # rows without study id are skipped
+        studies = get_all_studies_for_user("token")
+        assert [x["accession"] for x in studies] == ["MTBLS1"]
+        assert studies[0]["studyHttpUrl"].endswith("/MTBLS1")
+        connection.rows = []
+        assert get_all_studies_for_user("token", offset=10, limit=10) == []
+        assert connection.events[-2][2]["limit"] == 10
+
+    def test_get_all_private_studies_for_user_01(self, connection, title_index):
+        revision = ("First revision", 2, "Done", "SHARED")
+        connection.rows = [
+            user_study_row("MTBLS1", revision=revision),
+            user_study_row("MTBLS2", status="Public"),
+        ]
+        studies = get_all_private_studies_for_user("token")
+        assert [x["accession"] for x in studies] == ["MTBLS1"]
+        assert studies[0]["title"] == "Study 1"
+        assert studies[0]["revisionNumber"] == 1
+        assert studies[0]["revisionComment"] == "First revision"
+        assert studies[0]["revisionStatus"] == 2
+        assert studies[0]["revisionTaskMessage"] == "Done"
+
+    def test_get_all_studies_for_user_after_title_update_01(
+        self, connection, title_index, tmp_path
+    ):
+        connection.rows = [user_study_row("MTBLS1")]
+        assert get_all_studies_for_user("token")[0]["title"] == "Study 1"
+        (tmp_path / "MTBLS1" / "i_Investigation.txt").write_text(
+            'Study Title\t"Updated study 1"\n'
+        )
+        study = get_all_studies_for_user("token")[0]
+        assert study["title"] == "Updated study 1"
+        assert study["description"] == "N/A"
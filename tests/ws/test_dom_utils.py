@@ -0,0 +1,67 @@
+from xml.dom.minidom import Document
+
+from app.ws.dom_utils import (
+    create_generic_element,
+    create_generic_element_attribute,
+    serialize_pretty_nodes,
+    write_entries_document,
+)
+
+
+def add_entry(doc: Document, root, entry_id: str):
+    entry = doc.createElement("entry")
+    entry.setAttribute("id", entry_id)
+    root.appendChild(entry)
+    create_generic_element(doc, entry, "name", f"Study {entry_id} & <test>")
+    fields = doc.createElement("additional_fields")
+    create_generic_element_attribute(
+        doc, fields, "field", "Homo sapiens", "name", "organism"
+    )
+    entry.appendChild(fields)
+
+
+def create_header(doc: Document, root):
+    create_generic_element(doc, root, "name", "MetaboLights")
+    create_generic_element(doc, root, "entry_count", "3")
+
+
+class TestWriteEntriesDocument(object):
+    def test_write_entries_document_01(self, tmp_path):
+        entry_ids = ["MTBLS1", "MTBLS2", "MTBLS3"]
+        doc = Document()
+        root = doc.createElement("database")
+        doc.appendChild(root)
+        create_header(doc, root)
+        entries = doc.createElement("entries")
+        root.appendChild(entries)
+        for entry_id in entry_ids:
+            add_entry(doc, entries, entry_id)
+        expected = doc.toprettyxml(indent="")
+
+        def create_entry(entry_id: str) -> str:
+            entry_doc = Document()
+            entry_root = entry_doc.createElement("entries")
+            add_entry(entry_doc, entry_root, entry_id)
+            return serialize_pretty_nodes(entry_root.childNodes)
+
+        header_doc = Document()
+        header_root = header_doc.createElement("database")
+        create_header(header_doc, header_root)
+        file_path = tmp_path / "export.xml"
+        count = write_entries_document(
+            str(file_path),
+            list(header_root.childNodes),
+            [create_entry(x) for x in entry_ids] + [""],
+        )
+        assert count == 3
+        assert file_path.read_text() == expected
+        assert [x.name for x in tmp_path.iterdir()] == ["export.xml"]
+
+    def test_write_entries_document_02(self, tmp_path):
+        doc = Document()
+        root = doc.createElement("database")
+        doc.appendChild(root)
+        root.appendChild(doc.createElement("entries"))
+        file_path = tmp_path / "export.xml"
+        assert write_entries_document(str(file_path), [], []) == 0
+        assert file_path.read_text() == doc.toprettyxml(indent="")
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.config import get_settings
+from app.ws import ontology_info
+from app.ws.external_ontology_search import (
+    OntologySearchResultCache,
+    get_ontology_search_executor,
+    search_first_match,
+)
+from app.ws.ontology_info import get_external_ontology_search, get_ontology_names
+
+
+class DictStorage(object):
+    def __init__(self):
+        self.values = {}
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def set_value(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class StubProviderServer(object):
+    """
+    Local OLS, Zooma and Bioportal server. Responses and delays are selected
+    by path prefix.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                for prefix, (delay, body) in stub.routes.items():
+                    if self.path.startswith(prefix):
+                        time.sleep(delay)
+                        content = json.dumps(body).encode("utf-8")
+                        self.send_response(200)
+                        self.send_header("Content-Type", "application/json")
+                        self.send_header("Content-Length", str(len(content)))
+                        self.end_headers()
+                        self.wfile.write(content)
+                        return
+                self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = StubProviderServer()
+    api = get_settings().external_dependencies.api
+    monkeypatch.setattr(api, "ols_api_url", f"{server.url}/ols")
+    monkeypatch.setattr(api, "zooma_api_url", f"{server.url}/zooma")
+    monkeypatch.setattr(api, "bioontology_api_url", f"{server.url}/bioportal")
+    cache = OntologySearchResultCache(DictStorage(), "test", 60, 60)
+    monkeypatch.setattr(
+        ontology_info, "get_ontology_search_result_cache", lambda: cache
+    )
+    yield server
+    server.close()
+
+
+class TestExternalOntologySearch(object):
+    def test_search_first_match_01(self, stub_server, monkeypatch):
+        settings = get_settings().external_dependencies.ontology_search
+        monkeypatch.setattr(settings, "zooma_deadline_in_seconds", 0.2)
+        term = f"Term {uuid.uuid4().hex}"
+        iri = "http://purl.obolibrary.org/obo/EFO_0000001"
+        stub_server.routes = {
+            "/ols/search": (0, {"response": {"docs": []}}),
+            "/zooma/": (2, []),
+            "/bioportal/": (0, {"collection": [{"@id": iri, "prefLabel": term}]}),
+        }
+        searches = [
+            get_external_ontology_search("OLS", term),
+            get_external_ontology_search("Zooma", term),
+            get_external_ontology_search("Bioportal", term),
+        ]
+        start = time.monotonic()
+        result = search_first_match(searches, get_ontology_search_executor())
+        # slow Zooma search is skipped after its deadline
+        assert time.monotonic() - start < 1.5
+        assert [(x.iri, x.provenance_name) for x in result] == [(iri, "BioPortal")]
+
+        requests = len(stub_server.requests)
+        search = get_external_ontology_search("Bioportal", f" {term.upper()} ")
+        assert [x.iri for x in search.search()] == [iri]
+        assert len(stub_server.requests) == requests
+
+    def test_provider_query_01(self, stub_server):
+        term = f"CHEBI:{uuid.uuid4().int % 100000}  Water"
+        iri = "http://purl.obolibrary.org/obo/CHEBI_15377"
+        stub_server.routes = {
+            "/bioportal/": (0, {"collection": [{"@id": iri, "prefLabel": term}]}),
+        }
+        search = get_external_ontology_search("Bioportal", term)
+        assert [x.iri for x in search.search()] == [iri]
+        # provider receives the original term, the cache key is normalized
+        requests = [x for x in stub_server.requests if x.startswith("/bioportal/")]
+        assert len(requests) == 1
+        assert f"q={term.replace(' ', '+')}&" in requests[0]
+        count = len(stub_server.requests)
+        search = get_external_ontology_search("Bioportal", term.lower())
+        assert [x.iri for x in search.search()] == [iri]
+        assert len(stub_server.requests) == count
+
+    def test_get_ontology_names_01(self, stub_server):
+        prefix = uuid.uuid4().hex
+        iris = [f"http://example.org/{prefix}/EFO_{x}" for x in (1, 2, 1, 3, 2)]
+        stub_server.routes = {
+            "/ols/terms/": (0.2, {"_embedded": {"terms": [{"ontology_name": "efo"}]}})
+        }
+        start = time.monotonic()
+        names = get_ontology_names(iris)
+        assert time.monotonic() - start < 0.5
+        assert names == {x: ("EFO", "") for x in iris}
+        assert len(stub_server.requests) == 3
+        get_ontology_names(iris)
+        assert len(stub_server.requests) == 3
@@ -0,0 +1,43 @@
+from app.ws.ontology_info import Entity
+from app.ws.ontology_search_index import OntologySearchIndex
+
+
+def create_index() -> OntologySearchIndex:
+    names = ["Plasma", "blood plasma", "Blood", "blood serum", "plasmid", "Urine"]
+    entities = sorted(
+        [Entity(name=x, iri=f"http://example.org/E_{i}") for i, x in enumerate(names)],
+        key=lambda x: x.name,
+    )
+    branch_map = {"Sample": [x for x in entities if x.name != "Urine"]}
+    return OntologySearchIndex(entities, branch_map)
+
+
+class TestOntologySearchIndex(object):
+    def test_search_01(self):
+        index = create_index()
+        result = index.search("plasma", limit=10)
+        # case sensitive prefix, case insensitive exact and then contains matches
+        assert [x.name for x in result] == ["Plasma", "blood plasma"]
+        result = index.search("Bl", include_case_insensitive_matches=True)
+        assert [x.name for x in result] == ["Blood", "blood plasma", "blood serum"]
+        result = index.search("Bl", include_case_insensitive_matches=False)
+        assert [x.name for x in result] == ["Blood"]
+
+    def test_search_branch_01(self):
+        index = create_index()
+        assert index.search("urine", branch="Sample") == []
+        assert [x.name for x in index.search("", branch="Sample", limit=2)] == [
+            "Blood",
+            "Plasma",
+        ]
+        assert index.search("urine", branch="Unknown") == []
+
+    def test_save_and_load_01(self, tmp_path):
+        index = create_index()
+        file_path = str(tmp_path / "index" / "ontology.pickle")
+        index.save(file_path)
+        loaded = OntologySearchIndex.load(file_path)
+        assert [x.iri for x in loaded.search("blood")] == [
+            x.iri for x in index.search("blood")
+        ]
+        assert OntologySearchIndex.load(str(tmp_path / "missing.pickle")) is None
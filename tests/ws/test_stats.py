@@ -0,0 +1,247 @@
+from types import SimpleNamespace
+
+import pandas
+import pytest
+from flask import Flask
+
+from app.tasks.common_tasks.admin_tasks.maf_stats import update_maf_stats_task
+from app.ws import stats as stats_module
+from app.ws.stats import (
+    UPDATE_MAF_STATS_TASK_NAME,
+    StudyProgressLog,
+    StudyStats,
+    clean_string,
+    collect_study_stats,
+    count_files,
+    get_maf_info_rows,
+    is_identified,
+    iterate_study_stats,
+    update_maf_stats,
+)
+from app.ws.study.tsv_table_cache import get_tsv_table_cache
+
+
+def write_study(study_path, study_id="MTBLS1"):
+    study_path.mkdir()
+    (study_path / "i_Investigation.txt").write_text(
+        "STUDY\n"
+        f'Study File Name\t"s_{study_id}.txt"\n'
+        "STUDY ASSAYS\n"
+        f'Study Assay File Name\t"a_{study_id}_1.txt"\t"a_{study_id}_2.txt"\n'
+    )
+    (study_path / f"s_{study_id}.txt").write_text("Sample Name\ns1\ns2\n")
+    for name in (f"a_{study_id}_1.txt", f"a_{study_id}_2.txt"):
+        (study_path / name).write_text(
+            "Sample Name\tMetabolite Assignment File\n"
+            f"s1\tm_{study_id}_maf.tsv\ns2\tm_{study_id}_maf.tsv\n"
+        )
+    (study_path / f"m_{study_id}_maf.tsv").write_text(
+        "database_identifier\tmetabolite_identification\tsample\n"
+        "CHEBI:15377\twater\t1\n"
+        "\tunknown\t2\n"
+    )
+
+
+@pytest.fixture
+def maf_stats_run(tmp_path, monkeypatch):
+    """
+    Records database calls of update_maf_stats. Studies have one maf_info row.
+    """
+    calls = []
+
+    def iterate_study_stats(study_ids, metadata_root_path, max_workers):
+        calls.append(("iterate", list(study_ids)))
+        for study_id in study_ids:
+            yield {
+                "study_id": study_id,
+                "metadata_loaded": True,
+                "maf_info_rows": [(study_id, "CHEBI:1", "a", "1", "1")],
+            }
+
+    def add_maf_info_rows(rows, study_id=None, table_name="maf_info"):
+        calls.append(("add", table_name, list(rows)))
+        return True, ""
+
+    progress_log = StudyProgressLog(str(tmp_path / "completed_studies.txt"))
+    monkeypatch.setattr(
+        stats_module,
+        "get_all_study_acc",
+        lambda: [("MTBLS1",), ("MTBLS2",)],
+    )
+    monkeypatch.setattr(stats_module, "iterate_study_stats", iterate_study_stats)
+    monkeypatch.setattr(
+        stats_module, "get_maf_stats_progress_log", lambda: progress_log
+    )
+    monkeypatch.setattr(
+        stats_module,
+        "create_maf_info_staging_table",
+        lambda keep_study_ids=None: (
+            calls.append(("create", keep_study_ids)) or (True, "")
+        ),
+    )
+    monkeypatch.setattr(stats_module, "add_maf_info_rows", add_maf_info_rows)
+    monkeypatch.setattr(
+        stats_module,
+        "update_study_stats",
+        lambda rows: (
+            calls.append(("update", [x["study_id"] for x in rows])) or (True, "")
+        ),
+    )
+    monkeypatch.setattr(
+        stats_module,
+        "swap_maf_info_staging_table",
+        lambda: calls.append(("swap",)) or (True, ""),
+    )
+    yield calls, progress_log
+
+
+class TestStats(object):
+    def test_get_maf_info_rows_01(self):
+        values = [
+            "",
+            "CHEBI:15377",
+            " water ",
+            "Unknown 12",
+            "unk-4",
+            "X - 123",
+            "123 m/z",
+            "N/A",
+            "nan",
+            "0",
+            "it's  a*\tname",
+        ]
+        maf_df = pandas.DataFrame(
+            {
+                "database_identifier": values,
+                "metabolite_identification": list(reversed(values)),
+            }
+        )
+        expected = [
+            (
+                "MTBLS1",
+                clean_string(x),
+                clean_string(y),
+                is_identified(x),
+                is_identified(y),
+            )
+            for x, y in zip(values, reversed(values))
+        ]
+        assert get_maf_info_rows(" MTBLS1 ", maf_df) == expected
+
+    def test_progress_log_01(self, tmp_path):
+        (tmp_path / "study" / "FILES").mkdir(parents=True)
+        (tmp_path / "study" / "FILES" / "data.raw").touch()
+        (tmp_path / "study" / "i_Investigation.txt").touch()
+        (tmp_path / "study" / "linked").symlink_to(tmp_path / "study" / "FILES")
+        assert count_files(str(tmp_path / "study")) == 2
+
+        file_path = str(tmp_path / "progress" / "completed_studies.txt")
+        progress_log = StudyProgressLog(file_path)
+        progress_log.add(["MTBLS1", "MTBLS2"])
+        assert StudyProgressLog(file_path).completed == {"MTBLS1", "MTBLS2"}
+        progress_log.clear()
+        assert StudyProgressLog(file_path).completed == set()
+
+    def test_collect_study_stats_01(self, tmp_path):
+        study_path = tmp_path / "MTBLS1"
+        write_study(study_path)
+
+        cache_stats = get_tsv_table_cache().stats()
+        stats = collect_study_stats("MTBLS1", str(study_path))
+        # files are read once, so they are not stored in the table cache
+        assert get_tsv_table_cache().stats()["entries"] == cache_stats["entries"]
+        assert get_tsv_table_cache().stats()["misses"] == cache_stats["misses"]
+
+        assert stats["metadata_loaded"]
+        assert stats["sample_rows"] == 2
+        assert stats["assay_rows"] == 4
+        # MAF file referenced by both assays is counted once
+        assert stats["maf_rows"] == 2
+        assert stats["number_of_files"] == 5
+        assert stats["maf_info_rows"] == [
+            ("MTBLS1", "CHEBI:15377", "water", "1", "1"),
+            ("MTBLS1", "", "unknown", "0", "0"),
+        ]
+        assert not collect_study_stats("MTBLS2", str(tmp_path / "MTBLS2"))[
+            "metadata_loaded"
+        ]
+
+    def test_update_maf_stats_01(self, maf_stats_run):
+        calls, progress_log = maf_stats_run
+        status, _ = update_maf_stats(max_workers=1)
+        assert status
+        # all rows are loaded into the staging table, then it replaces maf_info
+        assert calls == [
+            ("create", None),
+            ("iterate", ["MTBLS1", "MTBLS2"]),
+            (
+                "add",
+                "maf_info_staging",
+                [
+                    ("MTBLS1", "CHEBI:1", "a", "1", "1"),
+                    ("MTBLS2", "CHEBI:1", "a", "1", "1"),
+                ],
+            ),
+            ("update", ["MTBLS1", "MTBLS2"]),
+            ("swap",),
+        ]
+        assert progress_log.completed == set()
+
+    def test_update_maf_stats_02(self, maf_stats_run, monkeypatch):
+        calls, progress_log = maf_stats_run
+        progress_log.add(["MTBLS1"])
+        monkeypatch.setattr(
+            stats_module, "update_study_stats", lambda rows: (False, "failed")
+        )
+        status, _ = update_maf_stats(max_workers=1)
+        # staged rows of the interrupted run are kept and maf_info is not replaced
+        assert not status
+        assert calls[:2] == [("create", {"MTBLS1"}), ("iterate", ["MTBLS2"])]
+        assert ("swap",) not in calls
+        assert progress_log.completed == {"MTBLS1"}
+
+    def test_iterate_study_stats_01(self, tmp_path):
+        write_study(tmp_path / "MTBLS1")
+        write_study(tmp_path / "MTBLS3", "MTBLS3")
+        results = list(
+            iterate_study_stats(["MTBLS1", "MTBLS2", "MTBLS3"], str(tmp_path), 1)
+        )
+        # studies are processed in worker processes and returned in input order
+        assert [(x["study_id"], x["metadata_loaded"]) for x in results] == [
+            ("MTBLS1", True),
+            ("MTBLS2", False),
+            ("MTBLS3", True),
+        ]
+        assert results[2]["maf_info_rows"][0] == (
+            "MTBLS3",
+            "CHEBI:15377",
+            "water",
+            "1",
+            "1",
+        )
+
+    def test_study_stats_post_01(self, monkeypatch):
+        sent = []
+
+        def send_task(name, kwargs):
+            sent.append((name, kwargs))
+            return SimpleNamespace(id="task-1")
+
+        def update_maf_stats(*args, **kwargs):
+            raise AssertionError("Study statistics are updated by request handler")
+
+        monkeypatch.setattr(
+            stats_module,
+            "validate_user_has_curator_role",
+            lambda request: SimpleNamespace(
+                context=SimpleNamespace(user_api_token="token")
+            ),
+        )
+        monkeypatch.setattr(stats_module.celery, "send_task", send_task)
+        monkeypatch.setattr(stats_module, "update_maf_stats", update_maf_stats)
+        with Flask(__name__).test_request_context(method="POST"):
+            result = StudyStats().post()
+        # request handler only starts the task
+        assert "task-1" in result["message"]
+        assert sent == [(UPDATE_MAF_STATS_TASK_NAME, {"user_token": "token"})]
+        assert update_maf_stats_task.name == UPDATE_MAF_STATS_TASK_NAME
@@ -5,7 +5,7 @@ from unittest.mock import Mock
 import pandas as pd
 
 from app.config import get_settings
-from app.ws.table_editor import ColumnsRows
+from app.ws.table_editor import AddRows, ColumnsRows
 
 
 class TestColumnsRows:
@@ -53,3 +53,62 @@ class TestColumnsRows:
         assert table_df.iloc[0, 0] == "ok"
         assert table_df.iloc[0, 1] == "ok2"
         write_tsv_mock.assert_called_once()
+
+
+class TestAddRows:
+    def test_post_inserts_rows_and_returns_inserted_rows(self, flask_app, monkeypatch):
+        study_id = "MTBLS14133"
+        file_name = "s_MTBLS14133.txt"
+        payload = {
+            "data": {
+                "index": 1,
+                "rows": [
+                    {"Source Name": "new1", "Sample Name": "sample1"},
+                    {"Source Name": "new2"},
+                ],
+            }
+        }
+        table_df = pd.DataFrame(
+            [["s1", "a"], ["s2", "b"], ["s3", "c"]],
+            columns=["Source Name", "Sample Name"],
+            dtype=object,
+        )
+        monkeypatch.setattr(
+            "app.ws.table_editor.validate_submission_update",
+            lambda *args, **kwargs: SimpleNamespace(
+                context=SimpleNamespace(study_id=study_id, user_role=None)
+            ),
+        )
+        monkeypatch.setattr(
+            "app.ws.table_editor.get_study_metadata_path",
+            lambda _study_id: f"/tmp/{study_id}",
+        )
+        monkeypatch.setattr("app.ws.table_editor.read_tsv", lambda _path: table_df)
+        write_tsv_mock = Mock(return_value="success")
+        monkeypatch.setattr("app.ws.table_editor.write_tsv", write_tsv_mock)
+
+        with flask_app.test_request_context(
+            f"{get_settings().server.service.resources_path}/studies/{study_id}/rows/{file_name}",
+            method="POST",
+            data=json.dumps(payload),
+            content_type="application/json",
+            headers={"user-token": "token"},
+        ):
+            response = AddRows().post(study_id, file_name)
+
+        written_df = write_tsv_mock.call_args[0][0]
+        assert written_df["Source Name"].to_list() == ["s1", "new1", "new2", "s2", "s3"]
+        assert written_df["Sample Name"].to_list() == [
+            "a",
+            "sample1",
+            "sample1",
+            "b",
+            "c",
+        ]
+        assert response["rowIndex"] == 1
+        assert response["insertedRowCount"] == 2
+        assert response["totalRowCount"] == 5
+        assert response["data"]["rows"] == [
+            {"Source Name": "new1", "Sample Name": "sample1"},
+            {"Source Name": "new2", "Sample Name": "sample1"},
+        ]
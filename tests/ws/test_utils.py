@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+
+from app.ws.study.tsv_table_cache import get_tsv_table_cache
+from app.ws.utils import (
+    create_table_json_response,
+    iter_json_rows,
+    read_tsv,
+    totuples,
+    write_tsv,
+)
+
+
+def create_table() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Sample Name": ["S1", 'S2 "quoted"', "Ångström\tµg", ""],
+            "Characteristics[Organism]": ["Homo sapiens", None, "x", "y"],
+            "Value": [1.5, np.nan, 3.0, 4.25],
+        }
+    ).reset_index()
+
+
+class TestIterJsonRows(object):
+    def test_iter_json_rows_01(self):
+        df = create_table()
+        expected = json.dumps(totuples(df, "rows"))
+        rows = ", ".join(iter_json_rows(df, chunk_size=3))
+        assert '{"rows": [' + rows + "]}" == expected
+
+    def test_iter_json_rows_duplicate_columns_01(self):
+        df = pd.DataFrame([["a", "b"], ["c", "d"]], columns=["Unit", "Unit"])
+        expected = json.dumps(totuples(df, "rows")["rows"])
+        assert "[" + ", ".join(iter_json_rows(df)) + "]" == expected
+
+
+class TestCreateTableJsonResponse(object):
+    def test_create_table_json_response_01(self):
+        df = create_table()
+        payload = {"header": {"Sample Name": 0}, "data": None, "columns_hidden": 1}
+        expected = dict(payload, data=totuples(df, "rows"))
+        app = Flask(__name__)
+        with app.app_context():
+            response = create_table_json_response(payload, df)
+            content = response.get_data(as_text=True)
+        assert content == json.dumps(expected) + "\n"
+
+
+class TestReadTsv(object):
+    def test_read_tsv_01(self, tmp_path):
+        file_path = str(tmp_path / "s_test.txt")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(
+                "Source Name\tSample Name\tUnit\tUnit\nsrc1\t1\t\tNA\nsrc2\t2\tmg\t\n"
+            )
+        cache = get_tsv_table_cache()
+        hits = cache.stats()["hits"]
+
+        table_df = read_tsv(file_path)
+        assert table_df.columns.to_list() == [
+            "Source Name",
+            "Sample Name",
+            "Unit",
+            "Unit.1",
+        ]
+        assert table_df.values.tolist() == [
+            ["src1", "1", "", ""],
+            ["src2", "2", "mg", ""],
+        ]
+        table_df.iloc[0, 0] = "updated"
+        assert read_tsv(file_path).iloc[0, 0] == "src1"
+        assert read_tsv(file_path, read_only=True) is read_tsv(
+            file_path, read_only=True
+        )
+        assert cache.stats()["hits"] == hits + 3
+
+        table_df["Sample Name"] = "3"
+        write_tsv(table_df, file_path)
+        assert read_tsv(file_path)["Sample Name"].to_list() == ["3", "3"]
+        assert read_tsv(file_path, ["Sample Name"]).columns.to_list() == ["Sample Name"]
+
+    def test_read_tsv_iso_8859_1_01(self, tmp_path):
+        file_path = str(tmp_path / "m_test.tsv")
+        with open(file_path, "wb") as f:
+            f.write("name\tunit\n".encode() + "x\tµg".encode("ISO-8859-1") + b"\n")
+        assert read_tsv(file_path).values.tolist() == [["x", "µg"]]